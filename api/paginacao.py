@@ -0,0 +1,24 @@
+# api/paginacao.py
+
+"""
+Paginação por cursor (keyset) da API.
+
+A posição é o valor do campo de ordenação do último item, então a página N
+custa o mesmo que a primeira (sem OFFSET) e inserções durante a leitura não
+duplicam nem pulam itens. Cada viewset define `ordering` com um campo
+indexado e, de preferência, único.
+"""
+
+from rest_framework.pagination import CursorPagination
+
+
+class CursorPaginacao(CursorPagination):
+    page_size = 50
+    page_size_query_param = 'limite'
+    max_page_size = 500
+    cursor_query_param = 'cursor'
+
+    def get_ordering(self, request, queryset, view):
+        """Ordenação declarada no viewset (`ordering`)"""
+        ordering = getattr(view, 'ordering', None) or self.ordering
+        return (ordering,) if isinstance(ordering, str) else tuple(ordering)
@@ -0,0 +1,29 @@
+# api/permissoes.py
+
+"""
+Acesso à API pela mesma matriz de níveis dos portais (core/utils/autorizacao.py).
+"""
+
+from rest_framework.permissions import BasePermission
+
+from core.utils.autorizacao import niveis_do_modulo, niveis_do_portal
+
+
+class PermissaoPortal(BasePermission):
+    """
+    Libera o viewset para os níveis do `portal` ou do `modulo` declarado nele
+    (o módulo, quando houver, é mais restrito que o portal).
+    """
+
+    message = 'Seu nível não tem acesso a este recurso.'
+
+    def has_permission(self, request, view):
+        user = request.user
+        if not user or not user.is_authenticated:
+            return False
+        if user.is_superuser:
+            return True
+
+        modulo = getattr(view, 'modulo', None)
+        niveis = niveis_do_modulo(modulo) if modulo else niveis_do_portal(getattr(view, 'portal', ''))
+        return getattr(user, 'nivel', None) in niveis
@@ -0,0 +1,105 @@
+# api/serializers.py
+
+"""
+Serializers somente leitura da API v1.
+
+Cada serializer lê apenas campos carregados pelo queryset do viewset
+correspondente (select_related/prefetch_related em api/views.py); um
+campo novo que atravesse uma relação precisa entrar lá também.
+"""
+
+from rest_framework import serializers
+
+from core.models import Estoque, ItemPedidoCompra, PedidoCompra, Produto, Proposta
+
+
+class CamposEsparsosMixin:
+    """
+    `?campos=codigo,nome` limita os campos do serializer principal da
+    resposta. Serializers aninhados vêm sempre completos.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = kwargs.get('context', {}).get('request')
+        pedidos = request.query_params.get('campos') if request else None
+        if not pedidos:
+            return
+
+        campos = {campo.strip() for campo in pedidos.split(',') if campo.strip()}
+        invalidos = campos - set(self.fields)
+        if invalidos:
+            raise serializers.ValidationError({
+                'campos': f"Campos inválidos: {', '.join(sorted(invalidos))}. "
+                          f"Disponíveis: {', '.join(self.fields)}"
+            })
+        for campo in set(self.fields) - campos:
+            self.fields.pop(campo)
+
+
+class ProdutoSerializer(CamposEsparsosMixin, serializers.ModelSerializer):
+    grupo = serializers.CharField(source='grupo.codigo', read_only=True)
+    subgrupo = serializers.CharField(source='subgrupo.codigo', read_only=True, default=None)
+
+    class Meta:
+        model = Produto
+        fields = [
+            'id', 'codigo', 'nome', 'descricao', 'tipo', 'grupo', 'subgrupo',
+            'unidade_medida', 'status', 'disponivel', 'controla_estoque',
+            'estoque_minimo', 'estoque_atual', 'custo_material', 'custo_servico',
+            'custo_medio', 'preco_venda', 'fornecedor_principal', 'atualizado_em',
+        ]
+
+
+class EstoqueSerializer(CamposEsparsosMixin, serializers.ModelSerializer):
+    produto = serializers.CharField(source='produto.codigo', read_only=True)
+    produto_nome = serializers.CharField(source='produto.nome', read_only=True)
+    unidade = serializers.CharField(source='produto.unidade_medida', read_only=True)
+    local = serializers.CharField(source='local_estoque.nome', read_only=True)
+    quantidade_disponivel = serializers.DecimalField(max_digits=12, decimal_places=4, read_only=True)
+
+    class Meta:
+        model = Estoque
+        fields = [
+            'id', 'produto', 'produto_nome', 'unidade', 'local', 'quantidade',
+            'quantidade_reservada', 'quantidade_disponivel', 'custo_medio', 'valor_total',
+            'ultima_entrada', 'ultima_saida', 'atualizado_em',
+        ]
+
+
+class PropostaSerializer(CamposEsparsosMixin, serializers.ModelSerializer):
+    cliente = serializers.CharField(source='cliente.nome', read_only=True)
+    vendedor = serializers.CharField(source='vendedor.username', read_only=True, default=None)
+
+    class Meta:
+        model = Proposta
+        fields = [
+            'id', 'numero', 'status', 'status_obra', 'cliente', 'vendedor', 'nome_projeto',
+            'modelo_elevador', 'capacidade', 'pavimentos', 'valor_proposta',
+            'preco_venda_calculado', 'data_validade', 'data_aprovacao', 'criado_em', 'atualizado_em',
+        ]
+
+
+class ItemPedidoCompraSerializer(serializers.ModelSerializer):
+    produto = serializers.CharField(source='produto.codigo', read_only=True)
+    produto_nome = serializers.CharField(source='produto.nome', read_only=True)
+
+    class Meta:
+        model = ItemPedidoCompra
+        fields = [
+            'id', 'produto', 'produto_nome', 'quantidade', 'unidade', 'valor_unitario',
+            'valor_total', 'quantidade_recebida', 'data_recebimento',
+        ]
+
+
+class PedidoCompraSerializer(CamposEsparsosMixin, serializers.ModelSerializer):
+    fornecedor = serializers.CharField(source='fornecedor.razao_social', read_only=True)
+    itens = ItemPedidoCompraSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = PedidoCompra
+        fields = [
+            'id', 'numero', 'status', 'prioridade', 'fornecedor', 'data_emissao',
+            'data_entrega_prevista', 'data_entrega_real', 'valor_total', 'desconto_valor',
+            'valor_frete', 'valor_final', 'condicao_pagamento', 'itens', 'criado_em', 'atualizado_em',
+        ]
@@ -0,0 +1,19 @@
+# api/urls.py
+
+from django.urls import include, re_path
+from rest_framework.routers import DefaultRouter
+
+from . import views
+
+app_name = 'api'
+
+router = DefaultRouter()
+router.register('produtos', views.ProdutoViewSet, basename='produto')
+router.register('estoque', views.EstoqueViewSet, basename='estoque')
+router.register('propostas', views.PropostaViewSet, basename='proposta')
+router.register('pedidos-compra', views.PedidoCompraViewSet, basename='pedido-compra')
+
+urlpatterns = [
+    # Versão na URL (URLPathVersioning): /api/v1/...
+    re_path(r'^(?P<version>v1)/', include(router.urls)),
+]
@@ -1,3 +1,217 @@
-from django.shortcuts import render
+# api/views.py
 
-# Create your views here.
+"""
+API REST v1 (somente leitura) - Sistema Elevadores FUZA
+
+/api/v1/produtos/, /api/v1/estoque/, /api/v1/propostas/, /api/v1/pedidos-compra/
+
+- Paginação por cursor (`?cursor=`, `?limite=`), ver api/paginacao.py
+- `?campos=a,b` devolve só esses campos
+- `?atualizado_desde=<ISO 8601>` para sincronização incremental
+- ETag e Last-Modified em listas e detalhes: clientes que repetem a
+  consulta com If-None-Match / If-Modified-Since recebem 304 sem que a
+  resposta seja serializada
+"""
+
+import hashlib
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Count, Max, Prefetch
+from django.http import Http404
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.dateparse import parse_datetime
+from django.utils.http import http_date
+from rest_framework import viewsets
+from rest_framework.exceptions import ValidationError
+
+from core.models import Estoque, ItemPedidoCompra, PedidoCompra, Produto, Proposta
+
+from .paginacao import CursorPaginacao
+from .permissoes import PermissaoPortal
+from .serializers import EstoqueSerializer, PedidoCompraSerializer, ProdutoSerializer, PropostaSerializer
+
+
+class RespostaCondicionalMixin:
+    """
+    ETag/Last-Modified calculados com um aggregate sobre o queryset filtrado
+    (por padrão, maior `atualizado_em` e quantidade de linhas). Se o cliente
+    já tem a versão atual, responde 304 antes de buscar e serializar a página.
+    """
+
+    validadores = {
+        'ultima_alteracao': Max('atualizado_em'),
+        'total': Count('pk'),
+    }
+
+    def _validadores(self, queryset):
+        valores = queryset.order_by().aggregate(**self.validadores)
+        datas = [v for v in valores.values() if hasattr(v, 'timestamp')]
+        ultima = int(max(datas).timestamp()) if datas else None
+
+        assinatura = '|'.join([
+            str(self.request.version),
+            self.request.get_full_path(),
+            *(f'{chave}={valores[chave]}' for chave in sorted(valores)),
+        ])
+        return f'W/"{hashlib.md5(assinatura.encode()).hexdigest()}"', ultima
+
+    def _responder(self, queryset, gerar):
+        etag, ultima = self._validadores(queryset)
+        nao_modificado = get_conditional_response(self.request, etag=etag, last_modified=ultima)
+        if nao_modificado is not None:
+            return nao_modificado
+
+        response = gerar()
+        response['ETag'] = etag
+        if ultima is not None:
+            response['Last-Modified'] = http_date(ultima)
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return self._responder(queryset, lambda: super(RespostaCondicionalMixin, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup = self.lookup_url_kwarg or self.lookup_field
+        # Mesmo tratamento do get_object_or_404 do DRF: id malformado é 404
+        try:
+            queryset = self.filter_queryset(self.get_queryset()).filter(**{self.lookup_field: kwargs[lookup]})
+        except (TypeError, ValueError, DjangoValidationError):
+            raise Http404
+        return self._responder(queryset, lambda: super(RespostaCondicionalMixin, self).retrieve(request, *args, **kwargs))
+
+
+class BaseViewSet(RespostaCondicionalMixin, viewsets.ReadOnlyModelViewSet):
+    """Leitura com cursor, campos esparsos, filtros simples e respostas condicionais"""
+
+    permission_classes = [PermissaoPortal]
+    pagination_class = CursorPaginacao
+    portal = None
+    modulo = None
+
+    # {parâmetro da URL: lookup do ORM}
+    filtros = {}
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        params = self.request.query_params
+
+        for parametro, lookup in self.filtros.items():
+            valor = params.get(parametro)
+            if valor not in (None, ''):
+                try:
+                    queryset = queryset.filter(**{lookup: valor})
+                except (TypeError, ValueError, DjangoValidationError):
+                    raise ValidationError({parametro: f'Valor inválido: {valor}'})
+
+        desde = params.get('atualizado_desde')
+        if desde:
+            try:
+                data = parse_datetime(desde)
+            except ValueError:
+                data = None
+            if data is None:
+                raise ValidationError({'atualizado_desde': 'Use data/hora ISO 8601 (ex.: 2025-01-31T08:00:00-03:00).'})
+            if timezone.is_naive(data):
+                data = timezone.make_aware(data)
+            queryset = queryset.filter(atualizado_em__gte=data)
+        return queryset
+
+    def campos_pedidos(self):
+        """Campos de `?campos=` (None = todos)"""
+        campos = self.request.query_params.get('campos')
+        return {c.strip() for c in campos.split(',')} if campos else None
+
+
+class ProdutoViewSet(BaseViewSet):
+    serializer_class = ProdutoSerializer
+    portal = 'producao'
+    ordering = 'codigo'
+    filtros = {
+        'tipo': 'tipo',
+        'grupo': 'grupo__codigo',
+        'subgrupo': 'subgrupo__codigo',
+        'status': 'status',
+        'busca': 'nome__icontains',
+    }
+
+    def get_queryset(self):
+        return Produto.objects.select_related('grupo', 'subgrupo').defer(
+            'especificacoes_tecnicas', 'dimensoes', 'motivo_indisponibilidade',
+        )
+
+
+class EstoqueViewSet(BaseViewSet):
+    serializer_class = EstoqueSerializer
+    modulo = 'estoque'
+    ordering = 'id'
+    filtros = {
+        'produto': 'produto__codigo',
+        'local': 'local_estoque_id',
+        'grupo': 'produto__grupo__codigo',
+    }
+    # Nome/unidade do produto também aparecem na posição
+    validadores = {
+        'ultima_alteracao': Max('atualizado_em'),
+        'ultima_alteracao_produto': Max('produto__atualizado_em'),
+        'total': Count('pk'),
+    }
+
+    def get_queryset(self):
+        return Estoque.objects.select_related('produto', 'local_estoque').only(
+            'id', 'quantidade', 'quantidade_reservada', 'custo_medio', 'valor_total',
+            'ultima_entrada', 'ultima_saida', 'atualizado_em',
+            'produto__codigo', 'produto__nome', 'produto__unidade_medida',
+            'local_estoque__nome',
+        )
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.request.query_params.get('com_saldo') in ('1', 'true'):
+            queryset = queryset.filter(quantidade__gt=0)
+        return queryset
+
+
+class PropostaViewSet(BaseViewSet):
+    serializer_class = PropostaSerializer
+    portal = 'vendedor'
+    ordering = '-criado_em'
+    filtros = {
+        'status': 'status',
+        'status_obra': 'status_obra',
+        'vendedor': 'vendedor_id',
+        'cliente': 'cliente_id',
+        'numero': 'numero',
+    }
+
+    def get_queryset(self):
+        return Proposta.objects.sem_calculos().select_related('cliente', 'vendedor')
+
+
+class PedidoCompraViewSet(BaseViewSet):
+    serializer_class = PedidoCompraSerializer
+    modulo = 'compras'
+    ordering = '-id'
+    filtros = {
+        'status': 'status',
+        'fornecedor': 'fornecedor_id',
+        'numero': 'numero',
+    }
+    # Alterações nos itens não mudam o atualizado_em do pedido
+    validadores = {
+        'ultima_alteracao': Max('atualizado_em'),
+        'ultima_alteracao_item': Max('itens__atualizado_em'),
+        'total': Count('pk', distinct=True),
+        'itens': Count('itens'),
+    }
+
+    def get_queryset(self):
+        pedidos = PedidoCompra.objects.select_related('fornecedor')
+        campos = self.campos_pedidos()
+        if campos is None or 'itens' in campos:
+            pedidos = pedidos.prefetch_related(
+                Prefetch('itens', queryset=ItemPedidoCompra.objects.select_related('produto').order_by('id'))
+            )
+        return pedidos
@@ -9,3 +9,6 @@ class CoreConfig(AppConfig):
         """Importar signals quando o app está pronto"""
         import core.signals  # noqa
         import core.signals_saldo  # noqa - signals de controle de saldo
+        import core.signals_cache  # noqa - invalidação do cache de referência
+        import core.signals_custos  # noqa - recálculo de propostas por alteração de custo
+        import core.signals_notificacoes  # noqa - contadores de tarefas pendentes
@@ -0,0 +1,7 @@
+# core/benchmark/__init__.py
+
+"""
+Benchmark reprodutível do motor de custos, estoque e compras.
+
+Uso: python manage.py benchmark --escala 10k --saida resultado.json
+"""
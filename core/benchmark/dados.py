@@ -0,0 +1,305 @@
+# core/benchmark/dados.py
+
+"""
+Gerador de dados sintéticos para o benchmark.
+
+Cria um catálogo de MP/PI no grupo reservado 90/91, regras YAML para as
+quatro categorias (cabine, carrinho, tração e sistemas) apontando para
+códigos desse catálogo, propostas com especificações variadas, estoque
+para os componentes e a estrutura de alguns PIs (para as OPs).
+
+Tudo é criado com bulk_create onde possível; o comando de benchmark roda a
+geração dentro de uma transação que é desfeita no final.
+"""
+
+import random
+from datetime import date
+from decimal import Decimal
+
+import yaml
+
+from core.models import (
+    Usuario, Cliente, Fornecedor, GrupoProduto, SubgrupoProduto, Produto, EstruturaProduto,
+    Proposta, RegraYAML, TipoRegra, LocalEstoque, Estoque, TipoMovimentoEntrada,
+)
+
+ESCALAS = {
+    '1k': 1000,
+    '10k': 10000,
+    '50k': 50000,
+}
+
+GRUPO_MP = '90'
+GRUPO_PI = '91'
+SUBGRUPOS = 10
+
+# Códigos do catálogo usados pelas regras YAML (primeiros de cada subgrupo de MP)
+CODIGOS_REGRAS = 60
+
+MATERIAIS = ['Inox 430', 'Inox 304', 'Chapa Pintada', 'Alumínio']
+ESPESSURAS = ['1,2', '1,5', '2,0']
+MODELOS = ['Passageiro', 'Carga', 'Monta Prato', 'Plataforma Acessibilidade']
+ACIONAMENTOS = ['Motor', 'Hidraulico', 'Carretel']
+MODELOS_PORTA = ['Automática', 'Pantográfica', 'Pivotante', 'Camarão']
+
+
+class DadosBenchmark:
+    """Referências aos objetos gerados, usadas pelos cenários"""
+
+    def __init__(self, usuario, cliente, fornecedor, local, produtos_mp, produtos_pi, propostas):
+        self.usuario = usuario
+        self.cliente = cliente
+        self.fornecedor = fornecedor
+        self.local = local
+        self.produtos_mp = produtos_mp
+        self.produtos_pi = produtos_pi
+        self.propostas = propostas
+
+
+def _codigo(grupo, subgrupo, sequencia):
+    return f"{grupo}.{subgrupo:02d}.{sequencia:05d}"
+
+
+def _codigo_regra(indice):
+    """Código de MP usado pela regra `indice` (distribuído entre subgrupos)"""
+    return _codigo(GRUPO_MP, indice % SUBGRUPOS + 1, indice // SUBGRUPOS + 1)
+
+
+def _regra(rng, nome, unidade, quantidade, base):
+    """Regra com condições sobre a especificação e um código de fallback"""
+    condicoes = [
+        {'quando': {'material': material}, 'codigo_produto': _codigo_regra(base + i)}
+        for i, material in enumerate(MATERIAIS[:rng.randint(2, 4)])
+    ]
+    condicoes.insert(0, {
+        'quando': {'capacidade': f'>={rng.choice([1000, 1500, 2000])}', 'acionamento': 'Motor'},
+        'codigo_produto': _codigo_regra(base + 5),
+    })
+    return {
+        'nome': nome,
+        'unidade': unidade,
+        'condicoes': condicoes,
+        'codigo_produto': _codigo_regra(base + 6),
+        'quantidade': quantidade,
+        'explicacao': f"{nome}: {quantidade}",
+    }
+
+
+def gerar_conteudo_yaml(tipo, rng):
+    """
+    YAML de uma categoria no formato lido pelo CalculoPedidoYAMLService.
+
+    Returns:
+        str: conteúdo YAML
+    """
+    definicoes = {
+        TipoRegra.CABINE: ('CABINE', {
+            'chapas': ('UN', [
+                ('Chapa corpo', '{{ chp.corpo }}'),
+                ('Chapa piso', '{{ chp.piso }}'),
+            ]),
+            'paineis': ('UN', [
+                ('Painel lateral', '{{ pnl.lateral }}'),
+                ('Painel fundo', '{{ pnl.fundo }}'),
+                ('Painel teto', '{{ pnl.teto }}'),
+            ]),
+            'fixacao': ('UN', [
+                ('Parafusos', '{{ ((ctx.largura_cabine|float + ctx.comprimento_cabine|float) * 20)|round(0, "ceil") }}'),
+                ('Perfil reforço', '{{ ((ctx.largura_cabine|float) * 2)|round(2) }}'),
+            ]),
+        }),
+        TipoRegra.CARRINHO: ('CARRINHO', {
+            'estrutura': ('UN', [
+                ('Longarina', '2'),
+                ('Travessa', '{{ 2 if ctx.capacidade|float < 1000 else 4 }}'),
+            ]),
+            'guias': ('MT', [
+                ('Guia cabine', '{{ ((ctx.altura_poco|float) * 2)|round(2) }}'),
+                ('Suporte guia', '{{ (ctx.pavimentos|int) * 2 }}'),
+            ]),
+        }),
+        TipoRegra.TRACAO: ('TRACAO', {
+            'acionamento': ('UN', [
+                ('Máquina de tração', '1'),
+                ('Polia', '{{ 2 if ctx.tracao == "2x1" else 1 }}'),
+            ]),
+            'cabos': ('MT', [
+                ('Cabo de aço', '{{ ((ctx.altura_poco|float) * 4 + 10)|round(1) }}'),
+            ]),
+        }),
+        TipoRegra.SISTEMAS: ('SIST_COMPLEMENTARES', {
+            'comando': ('UN', [
+                ('Quadro de comando', '1'),
+                ('Botoeira pavimento', '{{ ctx.pavimentos|int }}'),
+            ]),
+            'iluminacao': ('UN', [
+                ('Luminária', '{{ 2 if ctx.capacidade|float < 600 else 4 }}'),
+                ('Chicote', '{{ ctx.pavimentos|int + 1 }}'),
+            ]),
+        }),
+    }
+    categoria, subcategorias = definicoes[tipo]
+
+    base = 0
+    estrutura = {'categoria': categoria, 'subcategorias': {}}
+    for nome_subcat, (unidade, regras) in subcategorias.items():
+        lista = []
+        for nome, quantidade in regras:
+            lista.append(_regra(rng, nome, unidade, quantidade, base % (CODIGOS_REGRAS - 7)))
+            base += 7
+        estrutura['subcategorias'][nome_subcat] = {'unidade': unidade, 'regras': lista}
+
+    return yaml.safe_dump({tipo: estrutura}, allow_unicode=True, sort_keys=False)
+
+
+def gerar_dados(escala='1k', propostas=20, semente=42):
+    """
+    Cria o cenário sintético.
+
+    Args:
+        escala (str): chave de ESCALAS (tamanho do catálogo)
+        propostas (int): quantidade de propostas com especificações variadas
+        semente (int): semente do gerador aleatório (execuções comparáveis)
+
+    Returns:
+        DadosBenchmark
+    """
+    rng = random.Random(semente)
+    total_produtos = ESCALAS[escala]
+
+    usuario, _ = Usuario.objects.get_or_create(
+        username='benchmark',
+        defaults={'nivel': 'admin', 'is_superuser': True, 'is_staff': True},
+    )
+
+    # Catálogo: 90% MP, 10% PI
+    grupos = {
+        'MP': GrupoProduto.objects.create(codigo=GRUPO_MP, nome='BENCHMARK MP', tipo_produto='MP', criado_por=usuario),
+        'PI': GrupoProduto.objects.create(codigo=GRUPO_PI, nome='BENCHMARK PI', tipo_produto='PI', criado_por=usuario),
+    }
+    subgrupos = {
+        tipo: [
+            SubgrupoProduto.objects.create(grupo=grupo, codigo=f'{n:02d}', nome=f'BENCH {tipo} {n:02d}', criado_por=usuario)
+            for n in range(1, SUBGRUPOS + 1)
+        ]
+        for tipo, grupo in grupos.items()
+    }
+
+    quantidade_pi = max(total_produtos // 10, 10)
+    quantidade_mp = total_produtos - quantidade_pi
+    produtos = []
+    for tipo, quantidade in (('MP', quantidade_mp), ('PI', quantidade_pi)):
+        for i in range(quantidade):
+            subgrupo = subgrupos[tipo][i % SUBGRUPOS]
+            sequencia = i // SUBGRUPOS + 1
+            custo = Decimal(rng.randint(100, 500000)) / 100
+            produtos.append(Produto(
+                codigo=_codigo(grupos[tipo].codigo, int(subgrupo.codigo), sequencia),
+                nome=f'{tipo} sintético {i + 1}',
+                tipo=tipo,
+                tipo_pi='MONTADO_INTERNO' if tipo == 'PI' else None,
+                grupo=grupos[tipo],
+                subgrupo=subgrupo,
+                unidade_medida=rng.choice(['UN', 'KG', 'MT', 'PC']),
+                custo_material=custo,
+                custo_medio=custo,
+                estoque_minimo=Decimal(rng.randint(0, 50)),
+                utilizado=True,
+                criado_por=usuario,
+                atualizado_por=usuario,
+            ))
+    Produto.objects.bulk_create(produtos, batch_size=2000)
+    for tipo, quantidade in (('MP', quantidade_mp), ('PI', quantidade_pi)):
+        SubgrupoProduto.objects.filter(grupo=grupos[tipo]).update(ultimo_numero=quantidade // SUBGRUPOS + 1)
+
+    produtos_mp = [p for p in produtos if p.tipo == 'MP']
+    produtos_pi = [p for p in produtos if p.tipo == 'PI']
+
+    # Regras YAML das quatro categorias (tipo é único: substitui as existentes)
+    for tipo in TipoRegra.values:
+        RegraYAML.objects.update_or_create(
+            tipo=tipo,
+            defaults={
+                'nome': f'Benchmark {tipo}',
+                'conteudo_yaml': gerar_conteudo_yaml(tipo, rng),
+                'ativa': True,
+                'validado': True,
+                'criado_por': usuario,
+                'atualizado_por': usuario,
+            },
+        )
+
+    # Estoque, estrutura dos PIs e cadastros auxiliares
+    local = LocalEstoque.objects.create(nome='BENCHMARK', tipo='proprio', criado_por=usuario)
+    componentes = produtos_mp[:500]
+    Estoque.objects.bulk_create([
+        Estoque(produto=p, local_estoque=local, quantidade=Decimal('100000'), custo_medio=p.custo_material)
+        for p in componentes
+    ], batch_size=2000)
+    EstruturaProduto.objects.bulk_create([
+        EstruturaProduto(
+            produto_pai=pai,
+            produto_filho=filho,
+            quantidade=Decimal(rng.randint(1, 20)),
+            unidade=filho.unidade_medida,
+            criado_por=usuario,
+        )
+        for pai in produtos_pi[:50]
+        for filho in rng.sample(componentes, 15)
+    ], batch_size=2000)
+
+    TipoMovimentoEntrada.objects.get_or_create(
+        codigo='BM01', defaults={'descricao': 'Entrada benchmark', 'criado_por': usuario}
+    )
+    fornecedor = Fornecedor.objects.create(razao_social='Fornecedor Benchmark', criado_por=usuario)
+    cliente = Cliente.objects.create(tipo_pessoa='PJ', nome='Cliente Benchmark', criado_por=usuario)
+
+    lista_propostas = []
+    for i in range(propostas):
+        acionamento = rng.choice(ACIONAMENTOS)
+        proposta = Proposta(
+            cliente=cliente,
+            vendedor=usuario,
+            nome_projeto=f'Benchmark {i + 1}',
+            faturado_por=rng.choice(['Elevadores', 'Fuza', 'Manutenção']),
+            modelo_elevador=rng.choice(MODELOS),
+            capacidade=Decimal(rng.choice([225, 300, 450, 600, 750, 1000, 1500, 2000])),
+            capacidade_pessoas=rng.choice([None, 3, 4, 6, 8, 10]),
+            acionamento=acionamento,
+            tracao=rng.choice(['1x1', '2x1']) if acionamento == 'Motor' else None,
+            contrapeso=rng.choice(['Traseiro', 'Lateral']) if acionamento == 'Motor' else None,
+            largura_poco=Decimal(rng.randint(130, 260)) / 100,
+            comprimento_poco=Decimal(rng.randint(130, 300)) / 100,
+            altura_poco=Decimal(rng.randint(300, 4500)) / 100,
+            pavimentos=rng.randint(2, 15),
+            material_cabine=rng.choice(MATERIAIS),
+            espessura_cabine=rng.choice(ESPESSURAS),
+            saida_cabine=rng.choice(['Padrão', 'Oposta']),
+            altura_cabine=Decimal(rng.choice([200, 210, 220, 230])) / 100,
+            piso_cabine='Por conta da empresa',
+            material_piso_cabine='Antiderrapante',
+            modelo_porta_cabine=rng.choice(MODELOS_PORTA),
+            material_porta_cabine=rng.choice(MATERIAIS),
+            folhas_porta_cabine=rng.choice(['2', '3']),
+            largura_porta_cabine=Decimal('0.80'),
+            altura_porta_cabine=Decimal('2.00'),
+            modelo_porta_pavimento=rng.choice(MODELOS_PORTA),
+            material_porta_pavimento=rng.choice(MATERIAIS),
+            folhas_porta_pavimento=rng.choice(['2', '3']),
+            largura_porta_pavimento=Decimal('0.80'),
+            altura_porta_pavimento=Decimal('2.00'),
+            data_validade=date.today(),
+            atualizado_por=usuario,
+        )
+        proposta.save()
+        lista_propostas.append(proposta)
+
+    return DadosBenchmark(
+        usuario=usuario,
+        cliente=cliente,
+        fornecedor=fornecedor,
+        local=local,
+        produtos_mp=produtos_mp,
+        produtos_pi=produtos_pi,
+        propostas=lista_propostas,
+    )
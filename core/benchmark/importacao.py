@@ -0,0 +1,117 @@
+# core/benchmark/importacao.py
+
+"""
+Tempo de boot de um worker e perfil de importação.
+
+O boot é medido num processo Python novo, como um worker do gunicorn:
+django.setup(), aplicação WSGI (middlewares) e URLConf completa. As
+repetições cronometradas rodam sem instrumentação; uma execução extra
+com `-X importtime` dá o custo de cada módulo.
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+
+from core.utils.importacao import PACOTES_PESADOS
+
+MARCADOR = '@@boot@@'
+
+SCRIPT_BOOT = f"""
+import json, sys, time
+inicio = time.perf_counter()
+import django
+django.setup()
+from django.core.wsgi import get_wsgi_application
+get_wsgi_application()
+from django.urls import get_resolver
+get_resolver().url_patterns
+fim = time.perf_counter()
+print({MARCADOR!r} + json.dumps({{'boot_ms': (fim - inicio) * 1000, 'modulos': sorted(sys.modules)}}))
+"""
+
+
+def _executar(importtime=False):
+    comando = [sys.executable]
+    if importtime:
+        comando += ['-X', 'importtime']
+    comando += ['-c', SCRIPT_BOOT]
+
+    ambiente = dict(os.environ)
+    ambiente.setdefault('DJANGO_SETTINGS_MODULE', settings.SETTINGS_MODULE)
+    processo = subprocess.run(
+        comando, cwd=settings.BASE_DIR, env=ambiente,
+        capture_output=True, text=True, timeout=300,
+    )
+    linha = next((l for l in processo.stdout.splitlines() if l.startswith(MARCADOR)), None)
+    if processo.returncode != 0 or linha is None:
+        erro = processo.stderr.strip().splitlines()[-1:] or ['sem saída']
+        raise RuntimeError(f"Boot falhou (código {processo.returncode}): {erro[0]}")
+    return json.loads(linha[len(MARCADOR):]), processo.stderr
+
+
+def _ler_importtime(saida):
+    """[(modulo, self_us, cumulativo_us, profundidade)] da saída de -X importtime"""
+    modulos = []
+    for linha in saida.splitlines():
+        if not linha.startswith('import time:'):
+            continue
+        partes = linha[len('import time:'):].split('|')
+        if len(partes) != 3 or not partes[0].strip().isdigit():
+            continue  # cabeçalho
+        nome = partes[2].rstrip()
+        profundidade = (len(nome) - len(nome.lstrip())) // 2
+        modulos.append((nome.strip(), int(partes[0]), int(partes[1]), profundidade))
+    return modulos
+
+
+def medir_boot(repeticoes=3, top=20):
+    """
+    Mede o boot de um worker.
+
+    Args:
+        repeticoes (int): processos cronometrados (vale a mediana)
+        top (int): quantidade de módulos e pacotes no ranking
+
+    Returns:
+        dict: boot_ms (mediana, mínimo, máximo), mais_lentos (módulos por
+              tempo cumulativo), por_pacote (tempo próprio somado por pacote
+              de topo) e pesados (PACOTES_PESADOS carregados no boot)
+    """
+    tempos = []
+    for _ in range(max(1, repeticoes)):
+        resultado, _ = _executar()
+        tempos.append(resultado['boot_ms'])
+
+    resultado, stderr = _executar(importtime=True)
+    modulos = _ler_importtime(stderr)
+
+    por_pacote = defaultdict(int)
+    for nome, proprio, _, _ in modulos:
+        por_pacote[nome.split('.')[0]] += proprio
+
+    carregados = {m.split('.')[0] for m in resultado['modulos']}
+    return {
+        'boot_ms': {
+            'mediana': round(statistics.median(tempos), 1),
+            'minimo': round(min(tempos), 1),
+            'maximo': round(max(tempos), 1),
+        },
+        'modulos_carregados': len(resultado['modulos']),
+        'mais_lentos': [
+            {'modulo': nome, 'cumulativo_ms': round(cumulativo / 1000, 1),
+             'proprio_ms': round(proprio / 1000, 1), 'profundidade': profundidade}
+            for nome, proprio, cumulativo, profundidade in
+            sorted(modulos, key=lambda m: -m[2])[:top]
+        ],
+        'por_pacote': [
+            {'pacote': pacote, 'proprio_ms': round(total / 1000, 1)}
+            for pacote, total in sorted(por_pacote.items(), key=lambda p: -p[1])[:top]
+        ],
+        'pesados': sorted(p for p in PACOTES_PESADOS if p in carregados),
+    }
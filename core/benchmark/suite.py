@@ -0,0 +1,458 @@
+# core/benchmark/suite.py
+
+"""
+Cenários do benchmark e medição.
+
+Cada cenário é medido `repeticoes` vezes (tempo de parede e quantidade de
+queries) e uma vez extra com tracemalloc ligado para o pico de memória, para
+que o custo do rastreamento de memória não entre na medição de tempo.
+"""
+
+import gc
+import logging
+import os
+import platform
+import random
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from decimal import Decimal
+from itertools import cycle
+
+import django
+from django.conf import settings
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from core.models import (
+    MovimentoEntrada, ItemMovimentoEntrada, TipoMovimentoEntrada,
+    OrdemProducao, PedidoCompra, ItemPedidoCompra,
+)
+
+logger = logging.getLogger(__name__)
+
+# Views de relatório medidas (nome da URL)
+RELATORIOS = [
+    'producao:dashboard',
+    'producao:posicao_estoque',
+    'producao:relatorio_produtos_completo',
+    'producao:relatorio_saldos_requisicoes',
+    'producao:relatorio_curva_abc',
+]
+
+# Endpoints da API medidos (nome da rota em api/urls.py)
+ENDPOINTS_API = [
+    'api:produto-list',
+    'api:estoque-list',
+    'api:proposta-list',
+    'api:pedido-compra-list',
+]
+
+ITENS_POR_DOCUMENTO = 20
+
+# Registros DEBUG emitidos por execução no cenário de logging (~ um cálculo de proposta)
+REGISTROS_LOG = 500
+
+# Cenário de alocação de compras: linhas x fornecedores e frete por pedido
+LINHAS_ALOCACAO = 300
+FORNECEDORES_ALOCACAO = 30
+FRETE_ALOCACAO = 150.0
+
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, max(0, round(p / 100 * (len(ordenados) - 1))))
+    return ordenados[indice]
+
+
+def medir(nome, funcao, preparar=None, repeticoes=5, descricao=''):
+    """
+    Mede um cenário.
+
+    Args:
+        nome (str): identificador do cenário no JSON
+        funcao (callable): operação medida; recebe o retorno de `preparar`
+        preparar (callable): monta a entrada de cada execução (fora da medição)
+        repeticoes (int): execuções cronometradas
+
+    Returns:
+        dict: tempos (ms), queries e pico de memória (KB)
+    """
+    preparar = preparar or (lambda: None)
+    tempos, queries, erros = [], [], []
+
+    for _ in range(repeticoes + 1):
+        entrada = preparar()
+        gc.collect()
+        # Savepoint por execução (fora da contagem de queries): um erro de
+        # banco não aborta a transação externa nem os cenários seguintes
+        try:
+            with transaction.atomic(), CaptureQueriesContext(connection) as contexto:
+                inicio = time.perf_counter()
+                try:
+                    funcao(entrada)
+                finally:
+                    duracao = (time.perf_counter() - inicio) * 1000
+        except Exception as e:
+            erros.append(str(e))
+        tempos.append(duracao)
+        queries.append(len(contexto.captured_queries))
+
+    # Primeira execução é aquecimento (imports, caches de template, etc.)
+    tempos, queries = tempos[1:], queries[1:]
+
+    entrada = preparar()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        with transaction.atomic():
+            funcao(entrada)
+    except Exception as e:
+        erros.append(str(e))
+    memoria_pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        'cenario': nome,
+        'descricao': descricao,
+        'repeticoes': repeticoes,
+        'tempo_ms': {
+            'min': round(min(tempos), 2),
+            'mediana': round(statistics.median(tempos), 2),
+            'media': round(statistics.mean(tempos), 2),
+            'p95': round(_percentil(tempos, 95), 2),
+            'max': round(max(tempos), 2),
+        },
+        'queries': {
+            'min': min(queries),
+            'mediana': statistics.median(queries),
+            'max': max(queries),
+        },
+        'memoria_pico_kb': round(memoria_pico / 1024, 1),
+        'erros': sorted(set(erros)),
+    }
+
+
+# =============================================================================
+# CENÁRIOS
+# =============================================================================
+
+def cenario_calculo_proposta(dados, repeticoes):
+    """CalculoPedidoService.calcular_custos_completo sobre propostas variadas"""
+    from core.services.calculo_pedido import CalculoPedidoService
+
+    propostas = cycle(dados.propostas)
+    return medir(
+        'calculo_proposta',
+        CalculoPedidoService.calcular_custos_completo,
+        preparar=lambda: next(propostas),
+        repeticoes=repeticoes,
+        descricao='Cálculo completo (dimensionamento + 4 categorias YAML + preço)',
+    )
+
+
+def cenario_confirmar_entrada(dados, repeticoes, cliente_http):
+    """Confirmação de entrada de estoque pela view do portal de produção"""
+    tipo = TipoMovimentoEntrada.objects.get(codigo='BM01')
+    produtos = cycle(dados.produtos_mp)
+
+    def preparar():
+        movimento = MovimentoEntrada.objects.create(
+            tipo_movimento=tipo, fornecedor=dados.fornecedor, criado_por=dados.usuario,
+        )
+        for _ in range(ITENS_POR_DOCUMENTO):
+            produto = next(produtos)
+            ItemMovimentoEntrada.objects.create(
+                movimento=movimento, produto=produto,
+                quantidade=Decimal('10'), valor_unitario=produto.custo_material,
+            )
+        return reverse('producao:movimento_entrada_confirmar', args=[movimento.pk])
+
+    def confirmar(url):
+        resposta = cliente_http.post(url, secure=True)
+        if resposta.status_code >= 400:
+            raise RuntimeError(f'HTTP {resposta.status_code} em {url}')
+
+    return medir(
+        'confirmar_entrada',
+        confirmar,
+        preparar=preparar,
+        repeticoes=repeticoes,
+        descricao=f'POST de confirmação de entrada com {ITENS_POR_DOCUMENTO} itens',
+    )
+
+
+def cenario_liberar_op(dados, repeticoes):
+    """Liberação de OP (reserva dos materiais da estrutura)"""
+    pais = cycle(dados.produtos_pi[:50])
+
+    def preparar():
+        op = OrdemProducao.objects.create(
+            produto=next(pais),
+            quantidade_planejada=Decimal('1'),
+            local_producao=dados.local,
+            local_destino=dados.local,
+            criado_por=dados.usuario,
+        )
+        op.calcular_materiais_necessarios()
+        return op
+
+    return medir(
+        'liberar_op',
+        lambda op: op.liberar(dados.usuario),
+        preparar=preparar,
+        repeticoes=repeticoes,
+        descricao='OrdemProducao.liberar com 15 componentes',
+    )
+
+
+def cenario_pedido_compra(dados, repeticoes):
+    """Criação de pedido de compra com itens e envio (signals de saldo)"""
+    produtos = cycle(dados.produtos_mp)
+
+    def criar_e_enviar(_entrada):
+        pedido = PedidoCompra.objects.create(fornecedor=dados.fornecedor, criado_por=dados.usuario)
+        for _ in range(ITENS_POR_DOCUMENTO):
+            produto = next(produtos)
+            ItemPedidoCompra.objects.create(
+                pedido=pedido, produto=produto,
+                quantidade=Decimal('5'), valor_unitario=produto.custo_material,
+            )
+        pedido.status = 'ENVIADO'
+        pedido.save()
+
+    return medir(
+        'pedido_compra',
+        criar_e_enviar,
+        repeticoes=repeticoes,
+        descricao=f'Pedido de compra com {ITENS_POR_DOCUMENTO} itens + mudança de status',
+    )
+
+
+def cenario_relatorio(nome_url, repeticoes, cliente_http):
+    """GET de uma view de relatório"""
+    url = reverse(nome_url)
+
+    def abrir(_):
+        resposta = cliente_http.get(url, secure=True)
+        if resposta.status_code >= 400:
+            raise RuntimeError(f'HTTP {resposta.status_code} em {url}')
+
+    return medir(
+        f'relatorio:{nome_url}',
+        abrir,
+        repeticoes=repeticoes,
+        descricao=f'GET {url}',
+    )
+
+
+def cenario_api(nome_url, repeticoes, cliente_http, condicional=False):
+    """GET da primeira página de um endpoint da API; `condicional` repete com If-None-Match (304)"""
+    url = reverse(nome_url, kwargs={'version': 'v1'})
+    cabecalhos = {}
+    if condicional:
+        cabecalhos['HTTP_IF_NONE_MATCH'] = cliente_http.get(url, secure=True)['ETag']
+    esperado = 304 if condicional else 200
+
+    def abrir(_):
+        resposta = cliente_http.get(url, secure=True, **cabecalhos)
+        if resposta.status_code != esperado:
+            raise RuntimeError(f'HTTP {resposta.status_code} em {url} (esperado {esperado})')
+
+    return medir(
+        f"api:{nome_url.split(':')[1]}{':304' if condicional else ''}",
+        abrir,
+        repeticoes=repeticoes,
+        descricao=f"GET {url}{' com If-None-Match' if condicional else ''}",
+    )
+
+
+def cenario_logs(repeticoes):
+    """
+    Custo do logging na thread da requisição: FileHandler síncrono (antes)
+    x HandlerFila (fuza_elevadores/logs.py), com e sem amostragem
+    """
+    from fuza_elevadores import logs
+
+    formatador = logging.Formatter('[FUZA-{levelname}] {asctime} {module} {message}', style='{')
+    variantes = [
+        ('filehandler', lambda caminho: logging.FileHandler(caminho, encoding='utf-8'), None),
+        ('fila', lambda caminho: logs.arquivo(caminho), None),
+        ('fila_amostragem_10pct', lambda caminho: logs.arquivo(caminho), logs.FiltroAmostragem({'benchmark.logs': 0.1})),
+    ]
+    resultados = []
+    with tempfile.TemporaryDirectory() as pasta:
+        for nome, criar, filtro in variantes:
+            handler = criar(os.path.join(pasta, f'{nome}.log'))
+            handler.setFormatter(formatador)
+            if filtro:
+                handler.addFilter(filtro)
+            registrador = logging.getLogger(f'benchmark.logs.{nome}')
+            registrador.handlers, registrador.propagate = [handler], False
+            registrador.setLevel(logging.DEBUG)
+
+            def emitir(_):
+                for i in range(REGISTROS_LOG):
+                    registrador.debug('Regra %s avaliada: quantidade=%s custo=%s', i, Decimal('1.5'), {'codigo': 'MP'})
+
+            try:
+                resultados.append(medir(
+                    f'logs:{nome}',
+                    emitir,
+                    preparar=logs.esvaziar,
+                    repeticoes=repeticoes,
+                    descricao=f'{REGISTROS_LOG} logger.debug na thread da requisição',
+                ))
+            finally:
+                logs.esvaziar()
+                registrador.handlers = []
+                handler.close()
+    return resultados
+
+
+def cenario_alocacao(repeticoes):
+    """Otimização de fornecedores (AlocacaoComprasService.otimizar) sobre custos sintéticos"""
+    from core.services.alocacao_compras import AlocacaoComprasService
+
+    rng = random.Random(42)
+    custos = []
+    for _ in range(LINHAS_ALOCACAO):
+        base = rng.uniform(5, 500)
+        fornecedores = rng.sample(range(FORNECEDORES_ALOCACAO), rng.randint(2, 8))
+        custos.append({f: base * rng.uniform(0.85, 1.3) for f in fornecedores})
+
+    return medir(
+        'alocacao_compras',
+        lambda _: AlocacaoComprasService.otimizar(custos, FRETE_ALOCACAO),
+        repeticoes=repeticoes,
+        descricao=f'{LINHAS_ALOCACAO} linhas x {FORNECEDORES_ALOCACAO} fornecedores, frete {FRETE_ALOCACAO:.0f}',
+    )
+
+
+CENARIOS = ['calculo', 'entrada', 'op', 'compra', 'relatorios', 'api', 'logs', 'alocacao']
+
+
+def executar(dados, cenarios=None, repeticoes=5):
+    """
+    Executa os cenários selecionados sobre os dados gerados.
+
+    Returns:
+        list[dict]: resultado de cada cenário (ver `medir`)
+    """
+    cenarios = cenarios or CENARIOS
+    resultados = []
+
+    # Instrumentação de desempenho desligada: o benchmark mede a view, não o middleware
+    configuracao = {**getattr(settings, 'FUZA_ELEVADORES_SETTINGS', {}), 'DESEMPENHO_ATIVO': False}
+    with override_settings(
+        FUZA_ELEVADORES_SETTINGS=configuracao,
+        ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+    ):
+        cliente_http = Client()
+        cliente_http.force_login(dados.usuario)
+
+        if 'calculo' in cenarios:
+            resultados.append(cenario_calculo_proposta(dados, repeticoes))
+        if 'entrada' in cenarios:
+            resultados.append(cenario_confirmar_entrada(dados, repeticoes, cliente_http))
+        if 'op' in cenarios:
+            resultados.append(cenario_liberar_op(dados, repeticoes))
+        if 'compra' in cenarios:
+            resultados.append(cenario_pedido_compra(dados, repeticoes))
+        if 'relatorios' in cenarios:
+            for nome_url in RELATORIOS:
+                resultados.append(cenario_relatorio(nome_url, repeticoes, cliente_http))
+        if 'api' in cenarios:
+            for nome_url in ENDPOINTS_API:
+                resultados.append(cenario_api(nome_url, repeticoes, cliente_http))
+                resultados.append(cenario_api(nome_url, repeticoes, cliente_http, condicional=True))
+        if 'logs' in cenarios:
+            resultados.extend(cenario_logs(repeticoes))
+        if 'alocacao' in cenarios:
+            resultados.append(cenario_alocacao(repeticoes))
+
+    return resultados
+
+
+def rodar(escala='1k', cenarios=None, repeticoes=5, propostas=20, manter_dados=False):
+    """
+    Gera os dados sintéticos, executa os cenários e monta o resultado.
+
+    Tudo roda em uma transação desfeita no final (a menos que `manter_dados`),
+    então o banco de desenvolvimento não fica com o catálogo sintético.
+
+    Returns:
+        dict: {'meta': ..., 'resultados': [...]}
+    """
+    from core.benchmark.dados import gerar_dados
+    from core.utils.cache import invalidar_referencias
+
+    with transaction.atomic():
+        inicio = time.perf_counter()
+        dados = gerar_dados(escala=escala, propostas=propostas)
+        geracao_s = time.perf_counter() - inicio
+
+        resultados = executar(dados, cenarios=cenarios, repeticoes=repeticoes)
+
+        if not manter_dados:
+            transaction.set_rollback(True)
+
+    # Grupos/subgrupos sintéticos podem ter sido gravados no cache durante a transação
+    invalidar_referencias()
+
+    meta = metadados(escala, repeticoes)
+    meta['geracao_dados_s'] = round(geracao_s, 2)
+    return {'meta': meta, 'resultados': resultados}
+
+
+def metadados(escala, repeticoes):
+    """Informações do ambiente gravadas junto com os resultados"""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, cwd=settings.BASE_DIR, timeout=5,
+        ).stdout.strip() or None
+    except Exception:
+        commit = None
+
+    return {
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'escala': escala,
+        'repeticoes': repeticoes,
+        'banco': connection.vendor,
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'maquina': platform.node(),
+    }
+
+
+def comparar(atual, base):
+    """
+    Compara dois resultados (dicts do JSON) pela mediana de tempo e queries.
+
+    Returns:
+        list[dict]: cenario, tempo_base, tempo_atual, variacao_pct, queries_base, queries_atual
+    """
+    anteriores = {r['cenario']: r for r in base.get('resultados', [])}
+    comparacao = []
+    for resultado in atual.get('resultados', []):
+        anterior = anteriores.get(resultado['cenario'])
+        if not anterior:
+            continue
+        tempo_base = anterior['tempo_ms']['mediana']
+        tempo_atual = resultado['tempo_ms']['mediana']
+        comparacao.append({
+            'cenario': resultado['cenario'],
+            'tempo_base': tempo_base,
+            'tempo_atual': tempo_atual,
+            'variacao_pct': round((tempo_atual - tempo_base) / tempo_base * 100, 1) if tempo_base else None,
+            'queries_base': anterior['queries']['mediana'],
+            'queries_atual': resultado['queries']['mediana'],
+        })
+    return comparacao
@@ -17,32 +17,8 @@ from django.shortcuts import redirect
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 
-
-# Mapeamento de portais para niveis permitidos
-PORTAL_NIVEIS = {
-    'vendedor': ['vendedor', 'vistoria', 'gestor', 'admin'],
-    'gestor': ['gestor', 'admin'],
-    'producao': ['compras', 'engenharia', 'producao', 'almoxarifado', 'gestor', 'admin'],
-}
-
-# Mapeamento de modulos especificos
-MODULO_NIVEIS = {
-    # Portal Gestor - submodulos
-    'cadastros': ['gestor', 'admin'],
-    'estoque': ['almoxarifado', 'producao', 'gestor', 'admin'],
-    'estoque_movimento': ['almoxarifado', 'gestor', 'admin'],
-    'ordem_producao': ['producao', 'almoxarifado', 'gestor', 'admin'],
-    'usuarios': ['gestor', 'admin'],
-    'parametros': ['gestor', 'admin'],
-
-    # Portal Producao - submodulos
-    'compras': ['compras', 'gestor', 'admin'],
-    'requisicao': ['compras', 'engenharia', 'producao', 'gestor', 'admin'],
-    'estrutura': ['engenharia', 'producao', 'gestor', 'admin'],
-    'produtos_mp': ['compras', 'engenharia', 'almoxarifado', 'gestor', 'admin'],
-    'produtos_pi': ['engenharia', 'producao', 'gestor', 'admin'],
-    'produtos_pa': ['engenharia', 'gestor', 'admin'],
-}
+# Matrizes nivel -> portal/modulo (compiladas em core/utils/autorizacao.py)
+from core.utils.autorizacao import MODULO_NIVEIS, PORTAL_NIVEIS, niveis_do_modulo, niveis_do_portal  # noqa: F401
 
 
 def nivel_required(*niveis_permitidos):
@@ -54,6 +30,8 @@ def nivel_required(*niveis_permitidos):
         def minha_view(request):
             ...
     """
+    niveis = frozenset(niveis_permitidos)
+
     def decorator(view_func):
         @wraps(view_func)
         @login_required
@@ -66,7 +44,7 @@ def nivel_required(*niveis_permitidos):
                 return view_func(request, *args, **kwargs)
 
             # Verificar nivel do usuario
-            if request.user.nivel in niveis_permitidos:
+            if request.user.nivel in niveis:
                 return view_func(request, *args, **kwargs)
 
             messages.error(request, 'Voce nao tem permissao para acessar esta pagina.')
@@ -85,8 +63,7 @@ def portal_required(portal):
         def minha_view(request):
             ...
     """
-    niveis = PORTAL_NIVEIS.get(portal, [])
-    return nivel_required(*niveis)
+    return nivel_required(*niveis_do_portal(portal))
 
 
 def modulo_required(modulo):
@@ -98,8 +75,7 @@ def modulo_required(modulo):
         def minha_view(request):
             ...
     """
-    niveis = MODULO_NIVEIS.get(modulo, [])
-    return nivel_required(*niveis)
+    return nivel_required(*niveis_do_modulo(modulo))
 
 
 # Decorators de atalho para portais
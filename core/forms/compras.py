@@ -9,9 +9,11 @@ from django.forms import inlineformset_factory
 from django.core.exceptions import ValidationError
 from datetime import datetime, date, timedelta
 
-from core.models import PedidoCompra, ItemPedidoCompra, HistoricoPedidoCompra, Fornecedor, Produto, ParametrosGerais
+from core.models import PedidoCompra, ItemPedidoCompra, Fornecedor, Produto, ParametrosGerais
+from core.services.auditoria import AuditoriaService
 from .base import BaseModelForm, BaseFiltroForm, AuditMixin, MoneyInput, QuantityInput, CustomDateInput, DateAwareModelForm
 from core.choices import get_status_pedido_choices, get_prioridade_pedido_choices
+from core.utils.cache import parametros_gerais
 
 
 class PedidoCompraForm(DateAwareModelForm, AuditMixin):
@@ -113,7 +115,7 @@ class PedidoCompraForm(DateAwareModelForm, AuditMixin):
             
             # Preencher dados do comprador dos parâmetros
             try:
-                parametros = ParametrosGerais.objects.first()
+                parametros = parametros_gerais()
                 if parametros:
                     if parametros.comprador_responsavel:
                         self.fields['comprador_responsavel'].initial = parametros.comprador_responsavel
@@ -624,11 +626,12 @@ class AlterarStatusPedidoForm(BaseModelForm):
                     pedido.save()
                     
                     # Criar registro no histórico
-                    HistoricoPedidoCompra.objects.create(
-                        pedido=pedido,
+                    AuditoriaService.registrar(
+                        pedido,
+                        f'Status alterado de {status_anterior} para {pedido.status}',
                         usuario=user,
-                        acao=f'Status alterado de {status_anterior} para {pedido.status}',
-                        observacao=self.cleaned_data.get('observacoes_internas', '')
+                        observacao=self.cleaned_data.get('observacoes_internas', ''),
+                        alteracoes={'status': [status_anterior, pedido.status]},
                     )
                 else:
                     pedido.save()
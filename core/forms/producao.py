@@ -13,9 +13,10 @@ from datetime import datetime, date, timedelta
 from core.models import (
     ListaMateriais, ItemListaMateriais,
     RequisicaoCompra, ItemRequisicaoCompra,
-    OrcamentoCompra, ItemOrcamentoCompra, HistoricoOrcamentoCompra,
+    OrcamentoCompra, ItemOrcamentoCompra,
     Fornecedor, Produto, Proposta
 )
+from core.services.auditoria import AuditoriaService
 from .base import BaseModelForm, BaseFiltroForm, AuditMixin, MoneyInput, QuantityInput, CustomDateInput, DateAwareModelForm
 from core.choices import get_prioridade_pedido_choices
 
@@ -754,11 +755,12 @@ class AlterarStatusOrcamentoForm(BaseModelForm):
                     orcamento.save()
                     
                     # Criar registro no histórico
-                    HistoricoOrcamentoCompra.objects.create(
-                        orcamento=orcamento,
+                    AuditoriaService.registrar(
+                        orcamento,
+                        f'Status alterado de {status_anterior} para {orcamento.status}',
                         usuario=user,
-                        acao=f'Status alterado de {status_anterior} para {orcamento.status}',
-                        observacao=self.cleaned_data.get('observacoes_internas', '')
+                        observacao=self.cleaned_data.get('observacoes_internas', ''),
+                        alteracoes={'status': [status_anterior, orcamento.status]},
                     )
                 else:
                     orcamento.save()
@@ -0,0 +1,80 @@
+# management/commands/arquivar_auditoria.py
+
+"""
+Manutenção mensal da trilha de auditoria (RegistroAuditoria).
+
+    python manage.py arquivar_auditoria --manter-meses 12
+
+Cria as partições dos próximos meses (PostgreSQL) e exporta os meses mais
+antigos que o período mantido para arquivos auditoria_AAAAMM.jsonl.gz,
+removendo-os do banco (DETACH + DROP da partição, ou DELETE em bancos sem
+particionamento). Agende para rodar uma vez por mês.
+"""
+
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.services.auditoria import AuditoriaService
+
+
+class Command(BaseCommand):
+    help = 'Cria partições futuras e arquiva meses antigos da trilha de auditoria em arquivos compactados'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--manter-meses',
+            type=int,
+            default=12,
+            help='Meses mantidos no banco, contando o atual (padrão: 12)',
+        )
+        parser.add_argument(
+            '--destino',
+            default=str(Path(settings.BASE_DIR) / 'arquivo' / 'auditoria'),
+            help='Diretório dos arquivos .jsonl.gz (padrão: arquivo/auditoria)',
+        )
+        parser.add_argument(
+            '--particoes-futuras',
+            type=int,
+            default=3,
+            help='Partições mensais garantidas a partir do mês atual (padrão: 3)',
+        )
+        parser.add_argument(
+            '--simular',
+            action='store_true',
+            help='Apenas mostra o que seria arquivado',
+        )
+
+    def handle(self, *args, **options):
+        if options['manter_meses'] < 1:
+            raise CommandError('--manter-meses deve ser pelo menos 1.')
+
+        if AuditoriaService.particionada():
+            if options['simular']:
+                self.stdout.write("🔍 Simulação: partições futuras não são criadas")
+            else:
+                criadas = AuditoriaService.garantir_particoes(options['particoes_futuras'])
+                for nome in criadas:
+                    self.stdout.write(f"🧱 Partição criada: {nome}")
+        else:
+            self.stdout.write("ℹ️  Banco sem particionamento: meses antigos serão exportados e apagados")
+
+        resultado = AuditoriaService.arquivar(
+            options['manter_meses'],
+            Path(options['destino']),
+            simular=options['simular'],
+        )
+
+        self.stdout.write("=" * 70)
+        for item in resultado:
+            origem = f"partição {item['particao']}" if item['particao'] else 'linhas'
+            self.stdout.write(f"   {item['mes']:%m/%Y}  {item['registros']:>8} registros  ({origem}) -> {item['arquivo']}")
+        if not resultado:
+            self.stdout.write("   Nenhum mês a arquivar")
+        self.stdout.write("=" * 70)
+
+        if options['simular']:
+            self.stdout.write(self.style.SUCCESS("✅ Simulação concluída (rode sem --simular para arquivar)"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"✅ {len(resultado)} mês(es) arquivado(s)"))
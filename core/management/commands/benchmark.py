@@ -0,0 +1,174 @@
+# management/commands/benchmark.py
+
+"""
+Benchmark reprodutível: cálculo de propostas, confirmação de entrada de
+estoque, liberação de OP, pedido de compra, views de relatório,
+endpoints da API, custo do logging na thread da requisição e alocação
+de fornecedores de compra.
+
+Os dados sintéticos são gerados e descartados na mesma transação.
+Exemplos:
+    python manage.py benchmark --escala 10k --saida bench.json
+    python manage.py benchmark --comparar bench_main.json --tolerancia 15
+"""
+
+import json
+import logging
+from contextlib import contextmanager, nullcontext
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmark.dados import ESCALAS, GRUPO_MP, GRUPO_PI
+from core.benchmark.suite import CENARIOS, comparar, rodar
+from core.models import GrupoProduto, RegraYAML
+
+
+class Command(BaseCommand):
+    help = 'Executa o benchmark com dados sintéticos e grava o resultado em JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--escala',
+            choices=sorted(ESCALAS),
+            default='1k',
+            help='Tamanho do catálogo sintético (padrão: 1k)',
+        )
+        parser.add_argument(
+            '--cenarios',
+            nargs='+',
+            choices=CENARIOS,
+            help='Cenários a executar (padrão: todos)',
+        )
+        parser.add_argument(
+            '--repeticoes',
+            type=int,
+            default=5,
+            help='Execuções cronometradas por cenário (padrão: 5)',
+        )
+        parser.add_argument(
+            '--propostas',
+            type=int,
+            default=20,
+            help='Propostas sintéticas com especificações variadas (padrão: 20)',
+        )
+        parser.add_argument(
+            '--saida',
+            help='Arquivo JSON de saída (padrão: benchmark_<escala>_<data>.json)',
+        )
+        parser.add_argument(
+            '--comparar',
+            help='JSON de uma execução anterior para comparação',
+        )
+        parser.add_argument(
+            '--tolerancia',
+            type=float,
+            help='Falha se a mediana de algum cenário piorar mais que este %% em relação a --comparar',
+        )
+        parser.add_argument(
+            '--manter-dados',
+            action='store_true',
+            help='Não desfaz a transação (mantém o catálogo sintético no banco; '
+                 'só em banco sem regras YAML, que seriam substituídas pelas sintéticas)',
+        )
+        parser.add_argument(
+            '--sem-log',
+            action='store_true',
+            help='Silencia logs abaixo de WARNING durante a execução (exceto os do cenário logs)',
+        )
+
+    @staticmethod
+    @contextmanager
+    def _silenciar_logs():
+        """
+        Sobe para WARNING o root e os loggers com nível próprio abaixo disso.
+        Os loggers benchmark.* ficam como estão: o cenário logs mede justamente
+        registros DEBUG, que logging.disable descartaria.
+        """
+        registradores = [logging.getLogger()] + [
+            registrador for nome, registrador in logging.Logger.manager.loggerDict.items()
+            if isinstance(registrador, logging.Logger) and not nome.startswith('benchmark')
+        ]
+        niveis = {registrador: registrador.level for registrador in registradores}
+        try:
+            for registrador, nivel in niveis.items():
+                if registrador is logging.getLogger() or logging.NOTSET < nivel < logging.WARNING:
+                    registrador.setLevel(logging.WARNING)
+            yield
+        finally:
+            for registrador, nivel in niveis.items():
+                registrador.setLevel(nivel)
+
+    def handle(self, *args, **options):
+        if GrupoProduto.objects.filter(codigo__in=[GRUPO_MP, GRUPO_PI]).exists():
+            raise CommandError(
+                f"Os grupos {GRUPO_MP}/{GRUPO_PI} já existem neste banco; "
+                f"o benchmark os reserva para o catálogo sintético."
+            )
+
+        if options['manter_dados'] and RegraYAML.objects.exists():
+            raise CommandError(
+                "--manter-dados substituiria as regras YAML deste banco pelas sintéticas; "
+                "use-o só em um banco sem regras."
+            )
+
+        self.stdout.write(f"⏱️  Benchmark - escala {options['escala']}, {options['repeticoes']} repetições")
+
+        with self._silenciar_logs() if options['sem_log'] else nullcontext():
+            resultado = rodar(
+                escala=options['escala'],
+                cenarios=options['cenarios'],
+                repeticoes=options['repeticoes'],
+                propostas=options['propostas'],
+                manter_dados=options['manter_dados'],
+            )
+
+        self.stdout.write(f"   Dados gerados em {resultado['meta']['geracao_dados_s']}s")
+        for r in resultado['resultados']:
+            linha = (
+                f"   {r['cenario']:<45} mediana {r['tempo_ms']['mediana']:>9.1f} ms  "
+                f"p95 {r['tempo_ms']['p95']:>9.1f} ms  {r['queries']['mediana']:>6} queries  "
+                f"{r['memoria_pico_kb']:>9.0f} KB"
+            )
+            if r['erros']:
+                self.stdout.write(self.style.ERROR(f"{linha}  ❌ {r['erros'][0]}"))
+            else:
+                self.stdout.write(linha)
+
+        saida = options['saida'] or (
+            f"benchmark_{options['escala']}_{resultado['meta']['data'][:19].replace(':', '')}.json"
+        )
+        with open(saida, 'w', encoding='utf-8') as arquivo:
+            json.dump(resultado, arquivo, ensure_ascii=False, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"✅ Resultado gravado em {saida}"))
+
+        if options['comparar']:
+            self._comparar(resultado, options['comparar'], options['tolerancia'])
+
+    def _comparar(self, resultado, arquivo_base, tolerancia):
+        try:
+            with open(arquivo_base, encoding='utf-8') as arquivo:
+                base = json.load(arquivo)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Não foi possível ler {arquivo_base}: {e}")
+
+        self.stdout.write(f"\n📊 Comparação com {arquivo_base} (commit {base.get('meta', {}).get('commit')})")
+        if base.get('meta', {}).get('escala') != resultado['meta']['escala']:
+            self.stdout.write(self.style.WARNING(
+                f"⚠️  Escalas diferentes ({base.get('meta', {}).get('escala')} x {resultado['meta']['escala']})"
+            ))
+        piores = []
+        for c in comparar(resultado, base):
+            variacao = c['variacao_pct']
+            texto = (
+                f"   {c['cenario']:<45} {c['tempo_base']:>9.1f} → {c['tempo_atual']:>9.1f} ms "
+                f"({'+' if (variacao or 0) >= 0 else ''}{variacao}%)  "
+                f"queries {c['queries_base']} → {c['queries_atual']}"
+            )
+            if tolerancia is not None and variacao is not None and variacao > tolerancia:
+                piores.append(c['cenario'])
+                self.stdout.write(self.style.ERROR(texto))
+            else:
+                self.stdout.write(texto)
+
+        if piores:
+            raise CommandError(f"Regressão acima de {tolerancia}% em: {', '.join(piores)}")
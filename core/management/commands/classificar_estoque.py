@@ -0,0 +1,32 @@
+# management/commands/classificar_estoque.py
+
+"""
+Recalcula a classificação ABC/XYZ e os dias sem movimento de todos os produtos.
+Pensado para rodar via cron uma vez por noite.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.services.classificacao_estoque import ClassificacaoEstoqueService
+
+
+class Command(BaseCommand):
+    help = 'Atualiza a tabela de classificação ABC/XYZ de estoque'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--meses',
+            type=int,
+            default=12,
+            help='Meses de consumo analisados (padrão: 12)',
+        )
+
+    def handle(self, *args, **options):
+        if options['meses'] < 1:
+            raise CommandError('--meses deve ser pelo menos 1.')
+
+        totais = ClassificacaoEstoqueService.atualizar(meses=options['meses'])
+
+        self.stdout.write(self.style.SUCCESS("✅ Classificação ABC/XYZ atualizada"))
+        for classe in ('A', 'B', 'C'):
+            self.stdout.write(f"   Classe {classe}: {totais.get(classe, 0)} produtos")
@@ -0,0 +1,44 @@
+# management/commands/fechar_saldos_estoque.py
+
+"""
+Gera os fechamentos mensais de estoque (SaldoEstoqueMensal) a partir do MovimentoEstoque.
+Pensado para rodar via cron no início de cada mês.
+"""
+
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.services.kardex import KardexService
+
+
+class Command(BaseCommand):
+    help = 'Materializa os saldos mensais de estoque (fechamento) usados pelo Kardex'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--competencia',
+            help='Fecha (ou refaz) apenas o mês informado, no formato AAAA-MM',
+        )
+
+    def handle(self, *args, **options):
+        if options['competencia']:
+            try:
+                competencia = datetime.strptime(options['competencia'], '%Y-%m').date()
+            except ValueError:
+                raise CommandError('Competência inválida. Use o formato AAAA-MM.')
+
+            total = KardexService.fechar_competencia(competencia)
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ Competência {competencia:%m/%Y} fechada: {total} saldos gravados"
+            ))
+            return
+
+        fechadas = KardexService.fechar_pendentes()
+        if not fechadas:
+            self.stdout.write("ℹ️  Nenhuma competência pendente de fechamento")
+            return
+
+        for competencia in fechadas:
+            self.stdout.write(f"✅ Competência {competencia:%m/%Y} fechada")
+        self.stdout.write(self.style.SUCCESS(f"\n{len(fechadas)} competência(s) fechada(s)"))
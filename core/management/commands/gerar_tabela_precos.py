@@ -0,0 +1,122 @@
+# management/commands/gerar_tabela_precos.py
+
+"""
+Gera a tabela de preços sobre faixas de configuração do elevador.
+
+Exemplos:
+    python manage.py gerar_tabela_precos --eixo capacidade=300:1500:150 --eixo pavimentos=2:20:1 \\
+        --eixo "material_cabine=Inox 430,Inox 304" --saida tabela.xlsx
+    python manage.py gerar_tabela_precos --proposta-base 25000123 --eixo pavimentos=2:12:1 \\
+        --ajuste MP0101=8 --saida what_if.csv
+"""
+
+import logging
+from decimal import Decimal, InvalidOperation
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Proposta
+from core.services.tabela_precos import (
+    GeradorTabelaPrecos, configuracao_base, interpretar_eixo,
+)
+
+
+class Command(BaseCommand):
+    help = 'Gera a tabela de preços (XLSX/CSV) sobre faixas de configuração do elevador'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--eixo',
+            action='append',
+            required=True,
+            help='Campo varrido: campo=v1,v2 ou campo=inicio:fim:passo (repetível)',
+        )
+        parser.add_argument(
+            '--proposta-base',
+            help='Número da proposta usada para os campos fora dos eixos (padrão: configuração padrão)',
+        )
+        parser.add_argument(
+            '--ajuste',
+            action='append',
+            default=[],
+            help='Variação de custo simulada: CODIGO=PERCENTUAL (repetível)',
+        )
+        parser.add_argument(
+            '--saida',
+            default='tabela_precos.xlsx',
+            help='Arquivo .xlsx ou .csv (padrão: tabela_precos.xlsx)',
+        )
+        parser.add_argument(
+            '--processos',
+            type=int,
+            default=1,
+            help='Processos para avaliar as regras (padrão: 1)',
+        )
+        parser.add_argument(
+            '--sem-log',
+            action='store_true',
+            help='Silencia logs abaixo de WARNING durante a execução',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            eixos = dict(interpretar_eixo(texto) for texto in options['eixo'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        ajustes = {}
+        for texto in options['ajuste']:
+            codigo, _, percentual = texto.partition('=')
+            try:
+                ajustes[codigo.strip()] = Decimal(percentual.strip())
+            except InvalidOperation:
+                raise CommandError(f"Ajuste inválido: {texto} (use CODIGO=PERCENTUAL)")
+
+        base = None
+        if options['proposta_base']:
+            try:
+                base = configuracao_base(Proposta.objects.get(numero=options['proposta_base']))
+            except Proposta.DoesNotExist:
+                raise CommandError(f"Proposta {options['proposta_base']} não encontrada")
+
+        if not options['saida'].lower().endswith(('.xlsx', '.csv')):
+            raise CommandError('A saída deve ser .xlsx ou .csv')
+
+        total = 1
+        for valores in eixos.values():
+            total *= len(valores)
+        self.stdout.write(
+            f"📊 Tabela de preços - {total} configurações "
+            f"({' × '.join(f'{campo} [{len(valores)}]' for campo, valores in eixos.items())})"
+        )
+
+        if options['sem_log']:
+            logging.disable(logging.INFO)
+        try:
+            gerador = GeradorTabelaPrecos(ajustes=ajustes)
+            tabela = gerador.gerar(eixos, base=base, processos=max(1, options['processos']))
+        except ValueError as e:
+            raise CommandError(str(e))
+        finally:
+            logging.disable(logging.NOTSET)
+
+        estatisticas = gerador.estatisticas
+        self.stdout.write(
+            f"   {estatisticas['dimensionamentos']} dimensionamentos, "
+            f"{estatisticas['avaliacoes_categoria']} avaliações de categoria, "
+            f"{estatisticas['codigos']} códigos"
+        )
+        self.stdout.write(
+            f"   Regras em {estatisticas['tempo_regras_s']}s, total {estatisticas['tempo_total_s']}s"
+        )
+        if ajustes:
+            self.stdout.write(f"   Ajustes de custo: {', '.join(f'{c} {p:+}%' for c, p in ajustes.items())}")
+
+        if estatisticas['erros']:
+            primeiro = tabela.loc[tabela['erro'] != '', 'erro'].iloc[0]
+            self.stdout.write(self.style.WARNING(
+                f"⚠️  {estatisticas['erros']} configurações com erro (preço em branco). Ex.: {primeiro}"
+            ))
+
+        saida = GeradorTabelaPrecos.exportar(tabela, options['saida'], eixos=list(eixos))
+        self.stdout.write(self.style.SUCCESS(f"✅ Tabela gravada em {saida}"))
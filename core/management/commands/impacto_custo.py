@@ -0,0 +1,84 @@
+# management/commands/impacto_custo.py
+
+"""
+Consulta o índice de consumo das propostas (ConsumoProposta).
+
+Exemplos:
+    python manage.py impacto_custo 06.01.00004 --percentual 10
+    python manage.py impacto_custo 01.01.00013 01.01.00014 --enfileirar
+    python manage.py impacto_custo --indexar      (popula a partir das propostas já calculadas)
+"""
+
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+
+from core.services.consumo_proposta import ConsumoPropostaService
+
+
+class Command(BaseCommand):
+    help = 'Propostas afetadas e exposição em R$ a um aumento de custo dos códigos informados'
+
+    def add_arguments(self, parser):
+        parser.add_argument('codigos', nargs='*', help='Códigos de produto')
+        parser.add_argument(
+            '--percentual',
+            type=Decimal,
+            default=Decimal('10'),
+            help='Aumento simulado em %% (padrão: 10)',
+        )
+        parser.add_argument(
+            '--incluir-fechadas',
+            action='store_true',
+            help='Inclui propostas aprovadas/rejeitadas',
+        )
+        parser.add_argument(
+            '--enfileirar',
+            action='store_true',
+            help='Enfileira o recálculo das propostas abertas afetadas',
+        )
+        parser.add_argument(
+            '--indexar',
+            action='store_true',
+            help='Popula o índice a partir do componentes_calculados gravado nas propostas',
+        )
+
+    def handle(self, *args, **options):
+        if options['indexar']:
+            propostas, linhas = ConsumoPropostaService.indexar_existentes()
+            self.stdout.write(self.style.SUCCESS(f"✅ {propostas} proposta(s) indexada(s), {linhas} consumo(s)"))
+
+        codigos = options['codigos']
+        if not codigos:
+            if not options['indexar']:
+                self._listar_mais_usados()
+            return
+
+        resultado = ConsumoPropostaService.exposicao(
+            codigos,
+            percentual=options['percentual'],
+            apenas_abertas=not options['incluir_fechadas'],
+        )
+
+        self.stdout.write(f"📊 Aumento simulado de {resultado['percentual']}% - {resultado['propostas']} proposta(s) afetada(s)")
+        for linha in resultado['por_codigo']:
+            self.stdout.write(
+                f"   {linha['codigo']:<15} {linha['propostas']:>5} propostas  "
+                f"qtd {linha['quantidade']:>12}  custo atual R$ {linha['custo_atual']:>12}  "
+                f"+custo R$ {linha['aumento_custo']:>10}  +preço R$ {linha['aumento_preco']:>10}"
+            )
+        self.stdout.write(
+            f"   Total: +R$ {resultado['aumento_custo']} em custo de materiais, "
+            f"+R$ {resultado['aumento_preco']} no preço de venda calculado"
+        )
+
+        if options['enfileirar']:
+            quantidade = ConsumoPropostaService.enfileirar_recalculo(
+                codigos, motivo=f"Manual: {', '.join(codigos)}"
+            )
+            self.stdout.write(self.style.SUCCESS(f"✅ {quantidade} proposta(s) na fila de recálculo"))
+
+    def _listar_mais_usados(self):
+        self.stdout.write("📦 Códigos presentes em mais propostas abertas:")
+        for linha in ConsumoPropostaService.codigos_mais_usados():
+            self.stdout.write(f"   {linha['codigo']:<15} {linha['propostas']:>5} propostas  R$ {linha['custo']}")
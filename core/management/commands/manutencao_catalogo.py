@@ -0,0 +1,91 @@
+# management/commands/manutencao_catalogo.py
+
+"""
+Exclusão, mescla e reclassificação de produtos em lote a partir de planilha
+(.xlsx ou .csv com colunas operacao, codigo, destino, grupo, subgrupo, tipo_pi).
+
+Sem --aplicar apenas valida e mostra o relatório (simulação).
+"""
+
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from core.services.manutencao_catalogo import ManutencaoCatalogoService
+
+
+class Command(BaseCommand):
+    help = 'Exclui, mescla e reclassifica produtos em lote a partir de uma planilha'
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivo', help='Planilha .xlsx ou .csv com as operações')
+        parser.add_argument(
+            '--aplicar',
+            action='store_true',
+            help='Grava as alterações (padrão: apenas simulação)',
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=200,
+            help='Operações por transação (padrão: 200)',
+        )
+        parser.add_argument(
+            '--relatorio',
+            help='Grava o relatório por linha neste arquivo CSV',
+        )
+        parser.add_argument(
+            '--inativar-referenciados',
+            action='store_true',
+            help='Inativa, em vez de bloquear, produtos que não podem ser excluídos',
+        )
+        parser.add_argument(
+            '--usuario',
+            help='Username registrado em atualizado_por (obrigatório com --aplicar)',
+        )
+
+    def handle(self, *args, **options):
+        if options['aplicar'] and not options['usuario']:
+            raise CommandError('--usuario é obrigatório com --aplicar (Produto.atualizado_por).')
+
+        usuario = None
+        if options['usuario']:
+            try:
+                usuario = get_user_model().objects.get(username=options['usuario'])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"Usuário {options['usuario']} não encontrado.")
+
+        try:
+            operacoes = ManutencaoCatalogoService.ler_planilha(options['arquivo'])
+        except (OSError, ValidationError) as e:
+            raise CommandError(f"Não foi possível ler a planilha: {e}")
+
+        self.stdout.write(f"🔍 Validando {len(operacoes)} operação(ões)...")
+        ManutencaoCatalogoService.validar(operacoes, inativar_bloqueados=options['inativar_referenciados'])
+
+        for op in operacoes:
+            if op['situacao'] in ('erro', 'bloqueado'):
+                self.stdout.write(self.style.WARNING(
+                    f"⚠️  Linha {op['linha']} {op['operacao']} {op['codigo']}: {op['detalhe']}"
+                ))
+
+        if options['aplicar']:
+            self.stdout.write("🔄 Aplicando alterações...")
+            ManutencaoCatalogoService.aplicar(operacoes, usuario=usuario, lote=options['lote'])
+
+        if options['relatorio']:
+            ManutencaoCatalogoService.gravar_relatorio(operacoes, options['relatorio'])
+            self.stdout.write(f"📄 Relatório gravado em {options['relatorio']}")
+
+        resumo = Counter((op['operacao'], op['situacao']) for op in operacoes)
+        self.stdout.write("=" * 70)
+        for (operacao, situacao), total in sorted(resumo.items()):
+            self.stdout.write(f"   {operacao:<15} {situacao:<12} {total}")
+        self.stdout.write("=" * 70)
+
+        if options['aplicar']:
+            self.stdout.write(self.style.SUCCESS("✅ Manutenção do catálogo concluída"))
+        else:
+            self.stdout.write(self.style.SUCCESS("✅ Simulação concluída (use --aplicar para gravar)"))
@@ -0,0 +1,92 @@
+# management/commands/perfil_importacao.py
+
+"""
+Perfil de importação e orçamento de tempo de boot dos workers.
+
+Mede, em processos novos, django.setup() + aplicação WSGI + URLConf e
+lista as importações mais lentas. Como verificação de CI:
+    python manage.py perfil_importacao --orcamento-ms 1500 --sem-pesados
+
+Sai com erro se a mediana do boot passar do orçamento ou se alguma
+biblioteca pesada (core.utils.importacao.PACOTES_PESADOS) for importada
+durante o boot.
+"""
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmark.importacao import medir_boot
+
+
+class Command(BaseCommand):
+    help = 'Mede o boot de um worker e lista as importações mais lentas'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeticoes',
+            type=int,
+            default=3,
+            help='Processos cronometrados; vale a mediana (padrão: 3)',
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=20,
+            help='Módulos e pacotes listados (padrão: 20)',
+        )
+        parser.add_argument(
+            '--orcamento-ms',
+            type=float,
+            help='Falha se a mediana do boot passar deste tempo',
+        )
+        parser.add_argument(
+            '--sem-pesados',
+            action='store_true',
+            help='Falha se WeasyPrint, ReportLab, openpyxl, pandas etc. forem importados no boot',
+        )
+        parser.add_argument(
+            '--saida',
+            help='Grava o resultado em JSON',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"⏱️  Boot de worker - {options['repeticoes']} repetições")
+        try:
+            resultado = medir_boot(repeticoes=options['repeticoes'], top=options['top'])
+        except RuntimeError as e:
+            raise CommandError(str(e))
+
+        boot = resultado['boot_ms']
+        self.stdout.write(
+            f"   Boot: mediana {boot['mediana']:.1f} ms (mín {boot['minimo']:.1f}, máx {boot['maximo']:.1f}), "
+            f"{resultado['modulos_carregados']} módulos"
+        )
+
+        self.stdout.write("\n🐢 Importações mais lentas (cumulativo / próprio)")
+        for m in resultado['mais_lentos']:
+            nome = '  ' * m['profundidade'] + m['modulo']
+            self.stdout.write(f"   {nome:<55} {m['cumulativo_ms']:>8.1f} ms {m['proprio_ms']:>8.1f} ms")
+
+        self.stdout.write("\n📦 Tempo próprio por pacote")
+        for p in resultado['por_pacote']:
+            self.stdout.write(f"   {p['pacote']:<30} {p['proprio_ms']:>8.1f} ms")
+
+        if options['saida']:
+            with open(options['saida'], 'w', encoding='utf-8') as arquivo:
+                json.dump(resultado, arquivo, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"✅ Resultado gravado em {options['saida']}"))
+
+        falhas = []
+        if resultado['pesados']:
+            texto = f"Bibliotecas pesadas importadas no boot: {', '.join(resultado['pesados'])}"
+            self.stdout.write(self.style.WARNING(f"\n⚠️  {texto}"))
+            if options['sem_pesados']:
+                falhas.append(texto)
+        if options['orcamento_ms'] is not None and boot['mediana'] > options['orcamento_ms']:
+            falhas.append(f"Boot de {boot['mediana']:.1f} ms acima do orçamento de {options['orcamento_ms']:.0f} ms")
+
+        if falhas:
+            raise CommandError('; '.join(falhas))
+        if options['orcamento_ms'] is not None or options['sem_pesados']:
+            self.stdout.write(self.style.SUCCESS("\n✅ Boot dentro do orçamento"))
@@ -0,0 +1,90 @@
+# management/commands/perfil_queries.py
+
+"""
+Relatório de queries por template/linha para páginas do sistema (N+1).
+
+    python manage.py perfil_queries /producao/grupos/ /producao/subgrupos/ --usuario admin
+
+Cada URL é requisitada com o usuário informado (sessão forçada, sem senha)
+e as queries são atribuídas ao template, linha e expressão que as
+dispararam. Use em base de desenvolvimento com dados realistas.
+"""
+
+import json
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+from core.utils.perfil_queries import PerfilQueries, RelatorioPerfil
+
+
+class Command(BaseCommand):
+    help = 'Atribui as queries de páginas ao template/linha que as disparou e lista os piores ofensores'
+
+    def add_arguments(self, parser):
+        parser.add_argument('urls', nargs='+', help='Caminhos a requisitar (GET)')
+        parser.add_argument(
+            '--usuario',
+            help='Username para a sessão (padrão: primeiro superusuário)',
+        )
+        parser.add_argument(
+            '--repeticoes',
+            type=int,
+            default=1,
+            help='Requisições por URL (padrão: 1)',
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=10,
+            help='Ofensores listados por view (padrão: 10)',
+        )
+        parser.add_argument(
+            '--saida',
+            help='Grava o relatório em JSON',
+        )
+
+    def handle(self, *args, **options):
+        Usuario = get_user_model()
+        if options['usuario']:
+            usuario = Usuario.objects.filter(username=options['usuario']).first()
+        else:
+            usuario = Usuario.objects.filter(is_superuser=True).order_by('pk').first()
+        if usuario is None:
+            raise CommandError('Usuário não encontrado.')
+
+        hosts = [h.lstrip('.') for h in settings.ALLOWED_HOSTS if h != '*']
+        cliente = Client(HTTP_HOST=hosts[0] if hosts else 'localhost')
+        cliente.force_login(usuario)
+
+        relatorio = RelatorioPerfil()
+        for url in options['urls']:
+            for _ in range(options['repeticoes']):
+                with PerfilQueries() as perfil:
+                    resposta = cliente.get(url)
+                if resposta.status_code >= 400:
+                    self.stdout.write(self.style.WARNING(f"⚠️  {url} respondeu {resposta.status_code}"))
+                match = resposta.resolver_match
+                relatorio.registrar(f"{match.view_name if match else url} ({url})", perfil)
+
+        resultado = relatorio.gerar(limite=options['top'])
+        for view in resultado:
+            self.stdout.write("=" * 70)
+            self.stdout.write(
+                f"🔎 {view['view']}: {view['queries_media']:.0f} queries, "
+                f"{view['tempo_ms_medio']:.1f} ms de banco"
+            )
+            self.stdout.write("=" * 70)
+            for ofensor in view['ofensores']:
+                marcador = '🔴' if ofensor['vezes_por_requisicao'] > 1 else '  '
+                self.stdout.write(
+                    f"{marcador} {ofensor['vezes_por_requisicao']:>6.0f}x {ofensor['tempo_ms']:>8.1f} ms  {ofensor['origem']}"
+                )
+                self.stdout.write(f"            {ofensor['sql'][:160]}")
+
+        if options['saida']:
+            with open(options['saida'], 'w', encoding='utf-8') as arquivo:
+                json.dump(resultado, arquivo, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"✅ Relatório gravado em {options['saida']}"))
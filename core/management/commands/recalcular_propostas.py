@@ -0,0 +1,28 @@
+# management/commands/recalcular_propostas.py
+
+"""
+Processa a fila de recálculo (RecalculoProposta): propostas abertas que
+consomem produtos cujo custo mudou. Pensado para rodar via cron.
+"""
+
+from django.core.management.base import BaseCommand
+
+from core.services.consumo_proposta import ConsumoPropostaService
+
+
+class Command(BaseCommand):
+    help = 'Recalcula as propostas enfileiradas por alteração de custo de produto'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limite',
+            type=int,
+            help='Máximo de propostas recalculadas nesta execução',
+        )
+
+    def handle(self, *args, **options):
+        totais = ConsumoPropostaService.processar_fila(limite=options['limite'])
+
+        self.stdout.write(self.style.SUCCESS(f"✅ {totais['processadas']} proposta(s) recalculada(s)"))
+        if totais['erros']:
+            self.stdout.write(self.style.ERROR(f"❌ {totais['erros']} com erro (ver RecalculoProposta.erro)"))
@@ -0,0 +1,48 @@
+# management/commands/reconciliar_estoque.py
+
+"""
+Confere a posição de estoque (Estoque) contra o razão (MovimentoEstoque).
+Retorna erro quando há divergências, para uso em rotinas agendadas.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import LocalEstoque
+from core.services.kardex import KardexService
+
+
+class Command(BaseCommand):
+    help = 'Verifica se a posição de estoque confere com o histórico de movimentações'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--local',
+            type=int,
+            help='ID do local de estoque (padrão: todos)',
+        )
+
+    def handle(self, *args, **options):
+        local = None
+        if options['local']:
+            try:
+                local = LocalEstoque.objects.get(pk=options['local'])
+            except LocalEstoque.DoesNotExist:
+                raise CommandError(f"Local de estoque {options['local']} não encontrado.")
+
+        divergencias = KardexService.reconciliar(local)
+        if not divergencias:
+            self.stdout.write(self.style.SUCCESS("✅ Estoque confere com o razão de movimentações"))
+            return
+
+        locais = dict(LocalEstoque.objects.values_list('id', 'nome'))
+        self.stdout.write("=" * 70)
+        self.stdout.write(self.style.WARNING(f"DIVERGÊNCIAS ENCONTRADAS: {len(divergencias)}"))
+        self.stdout.write("=" * 70)
+        for item in divergencias:
+            self.stdout.write(
+                f"❌ {item['produto_codigo'] or item['produto_id']} @ {locais.get(item['local_estoque_id'])}: "
+                f"estoque {item['quantidade_estoque']:.4f} | razão {item['quantidade_razao']:.4f} | "
+                f"diferença {item['diferenca']:+.4f}"
+            )
+
+        raise CommandError(f"{len(divergencias)} posição(ões) divergente(s) do razão.")
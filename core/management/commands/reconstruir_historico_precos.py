@@ -0,0 +1,20 @@
+# management/commands/reconstruir_historico_precos.py
+
+"""
+Reconstrói o histórico de preços de compra (HistoricoPrecoCompra) a partir
+dos itens de pedido recebidos e das entradas de estoque confirmadas.
+Necessário uma vez após a migração; depois a tabela é mantida nos recebimentos.
+"""
+
+from django.core.management.base import BaseCommand
+
+from core.services.historico_precos import HistoricoPrecosService
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói o histórico de preços de compra por produto e fornecedor'
+
+    def handle(self, *args, **options):
+        self.stdout.write("🔄 Reconstruindo histórico de preços de compra...")
+        total = HistoricoPrecosService.reconstruir()
+        self.stdout.write(self.style.SUCCESS(f"✅ {total} pares produto/fornecedor gravados"))
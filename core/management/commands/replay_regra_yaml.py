@@ -0,0 +1,91 @@
+# management/commands/replay_regra_yaml.py
+
+"""
+Compara uma versão candidata de regra YAML com a ativa nas últimas propostas.
+
+Exemplos:
+    python manage.py replay_regra_yaml cabine cabine_v2.yaml --limite 2000 --processos 8
+    python manage.py replay_regra_yaml tracao tracao_v5.yaml --saida replay_tracao.json
+"""
+
+import json
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models.regras_yaml import TipoRegra
+from core.services.replay_regras import ReplayRegraYAML
+
+
+class Command(BaseCommand):
+    help = 'Simula uma nova versão de regra YAML sobre as propostas já calculadas (sem salvar)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('tipo', choices=TipoRegra.values, help='Categoria da regra')
+        parser.add_argument('arquivo', help='Arquivo com o YAML candidato')
+        parser.add_argument(
+            '--limite',
+            type=int,
+            help='Propostas mais recentes avaliadas (padrão: REPLAY_LIMITE_PROPOSTAS)',
+        )
+        parser.add_argument(
+            '--processos',
+            type=int,
+            help='Processos filhos (padrão: REPLAY_PROCESSOS)',
+        )
+        parser.add_argument(
+            '--saida',
+            help='Grava o resultado completo (por proposta) em JSON',
+        )
+        parser.add_argument(
+            '--sem-log',
+            action='store_true',
+            help='Silencia logs abaixo de WARNING durante a execução',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['arquivo'], encoding='utf-8') as arquivo:
+                conteudo = arquivo.read()
+        except OSError as e:
+            raise CommandError(f"Não foi possível ler {options['arquivo']}: {e}")
+
+        if options['sem_log']:
+            logging.disable(logging.INFO)
+        try:
+            replay = ReplayRegraYAML(options['tipo'], conteudo)
+            resultado = replay.executar(limite=options['limite'], processos=options['processos'])
+        except ValueError as e:
+            raise CommandError(str(e))
+        finally:
+            logging.disable(logging.NOTSET)
+
+        resumo = resultado['resumo']
+        self.stdout.write(f"🔁 Replay {options['tipo']} - {resumo['propostas']} propostas em {resultado['tempo_s']}s")
+        if resultado['sem_versao_ativa']:
+            self.stdout.write(self.style.WARNING("⚠️  Sem versão ativa: comparação contra nenhuma regra"))
+        self.stdout.write(f"   Alteradas: {resumo['alteradas']}  (sem dimensionamento: {resumo['sem_dados']})")
+        self.stdout.write(
+            f"   Δ custo total: R$ {resumo['delta_total']:,.2f}  "
+            f"Δ preço estimado: R$ {resumo['delta_preco_total']:,.2f}"
+        )
+        if resumo['delta_pct_medio'] is not None:
+            self.stdout.write(
+                f"   Δ% média {resumo['delta_pct_medio']}  mediana {resumo['delta_pct_mediana']}  "
+                f"min {resumo['delta_pct_min']}  max {resumo['delta_pct_max']}"
+            )
+        for codigo in resumo['codigos'][:10]:
+            self.stdout.write(
+                f"   {codigo['codigo']:<20} {codigo['situacoes']:<20} "
+                f"{codigo['propostas']:>6} propostas  R$ {codigo['delta']:>14,.2f}"
+            )
+
+        if resumo['novos_erros']:
+            self.stdout.write(self.style.ERROR(f"❌ {resumo['novos_erros']} propostas com erros novos na candidata"))
+            exemplo = next(r for r in resultado['resultados'] if r.get('erros_candidato') and not r.get('erros_atual'))
+            self.stdout.write(f"   Ex.: {exemplo['numero']}: {exemplo['erros_candidato'][0]}")
+
+        if options['saida']:
+            with open(options['saida'], 'w', encoding='utf-8') as arquivo:
+                json.dump(resultado, arquivo, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"✅ Resultado gravado em {options['saida']}"))
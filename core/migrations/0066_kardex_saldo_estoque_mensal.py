@@ -0,0 +1,53 @@
+# Generated by Django 5.1.7 on 2026-10-19 14:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0065_parametros_custos_formacao_preco'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SaldoEstoqueMensal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('competencia', models.DateField(help_text='Último dia do mês fechado', verbose_name='Competência')),
+                ('quantidade', models.DecimalField(decimal_places=4, default=0, max_digits=14, verbose_name='Quantidade')),
+                ('custo_medio', models.DecimalField(decimal_places=4, default=0, max_digits=12, verbose_name='Custo Médio')),
+                ('valor_total', models.DecimalField(decimal_places=2, default=0, max_digits=16, verbose_name='Valor Total')),
+                ('quantidade_movimentos', models.PositiveIntegerField(default=0, verbose_name='Movimentos no Mês')),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Saldo Mensal de Estoque',
+                'verbose_name_plural': 'Saldos Mensais de Estoque',
+                'ordering': ['-competencia', 'produto__codigo'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='movimentoestoque',
+            index=models.Index(fields=['produto', 'local_estoque', 'data_movimento'], name='core_movime_produto_8869fa_idx'),
+        ),
+        migrations.AddField(
+            model_name='saldoestoquemensal',
+            name='local_estoque',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='saldos_mensais', to='core.localestoque', verbose_name='Local de Estoque'),
+        ),
+        migrations.AddField(
+            model_name='saldoestoquemensal',
+            name='produto',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='saldos_mensais', to='core.produto', verbose_name='Produto'),
+        ),
+        migrations.AddIndex(
+            model_name='saldoestoquemensal',
+            index=models.Index(fields=['competencia'], name='core_saldoe_compete_38a164_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='saldoestoquemensal',
+            unique_together={('produto', 'local_estoque', 'competencia')},
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.7 on 2026-10-19 14:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0066_kardex_saldo_estoque_mensal'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClassificacaoEstoque',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('classe_abc', models.CharField(choices=[('A', 'A - Alto valor'), ('B', 'B - Valor intermediário'), ('C', 'C - Baixo valor')], max_length=1, verbose_name='Classe ABC')),
+                ('classe_xyz', models.CharField(choices=[('X', 'X - Demanda estável'), ('Y', 'Y - Demanda variável'), ('Z', 'Z - Demanda irregular')], max_length=1, verbose_name='Classe XYZ')),
+                ('quantidade_consumida', models.DecimalField(decimal_places=4, default=0, max_digits=14, verbose_name='Quantidade Consumida')),
+                ('valor_consumido', models.DecimalField(decimal_places=2, default=0, max_digits=16, verbose_name='Valor Consumido')),
+                ('percentual_acumulado', models.DecimalField(decimal_places=4, default=0, max_digits=7, verbose_name='% Acumulado do Valor')),
+                ('consumo_medio_mensal', models.DecimalField(decimal_places=4, default=0, max_digits=14, verbose_name='Consumo Médio Mensal')),
+                ('coeficiente_variacao', models.DecimalField(blank=True, decimal_places=4, max_digits=8, null=True, verbose_name='Coeficiente de Variação')),
+                ('ultimo_movimento', models.DateField(blank=True, null=True, verbose_name='Último Movimento')),
+                ('dias_sem_movimento', models.PositiveIntegerField(blank=True, null=True, verbose_name='Dias sem Movimento')),
+                ('periodo_meses', models.PositiveSmallIntegerField(default=12, verbose_name='Período Analisado (meses)')),
+                ('calculado_em', models.DateTimeField(verbose_name='Calculado em')),
+                ('produto', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='classificacao_estoque', to='core.produto', verbose_name='Produto')),
+            ],
+            options={
+                'verbose_name': 'Classificação de Estoque',
+                'verbose_name_plural': 'Classificações de Estoque',
+                'ordering': ['classe_abc', '-valor_consumido'],
+                'indexes': [models.Index(fields=['classe_abc', 'classe_xyz'], name='core_classi_classe__9708e7_idx'), models.Index(fields=['dias_sem_movimento'], name='core_classi_dias_se_d63b85_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.1.7 on 2026-10-19 14:11
+
+import core.models.monitoramento
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0067_classificacao_estoque'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DesempenhoView',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url_name', models.CharField(db_index=True, max_length=150)),
+                ('metodo', models.CharField(max_length=10)),
+                ('periodo', models.DateTimeField(help_text='Início da hora agregada')),
+                ('requisicoes', models.PositiveIntegerField(default=0)),
+                ('erros', models.PositiveIntegerField(default=0, help_text='Respostas 5xx')),
+                ('lentas', models.PositiveIntegerField(default=0, help_text='Acima do limite de requisição lenta')),
+                ('tempo_total_ms', models.FloatField(default=0)),
+                ('tempo_max_ms', models.FloatField(default=0)),
+                ('tempo_db_total_ms', models.FloatField(default=0)),
+                ('queries_total', models.PositiveIntegerField(default=0)),
+                ('queries_max', models.PositiveIntegerField(default=0)),
+                ('bytes_total', models.BigIntegerField(default=0)),
+                ('histograma', models.JSONField(default=core.models.monitoramento.histograma_vazio, help_text='Contagem de requisições por faixa de latência (FAIXAS_LATENCIA_MS)')),
+            ],
+            options={
+                'verbose_name': 'Desempenho de View',
+                'verbose_name_plural': 'Desempenho de Views',
+                'ordering': ['-periodo', 'url_name'],
+                'indexes': [models.Index(fields=['periodo'], name='core_desemp_periodo_acc2b1_idx')],
+                'unique_together': {('url_name', 'metodo', 'periodo')},
+            },
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.1.7 on 2026-10-19 14:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0068_desempenho_view'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConsumoProposta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('codigo', models.CharField(max_length=50, verbose_name='Código do Produto')),
+                ('categoria', models.CharField(max_length=30, verbose_name='Categoria')),
+                ('subcategoria', models.CharField(blank=True, max_length=100, verbose_name='Subcategoria')),
+                ('quantidade', models.DecimalField(decimal_places=4, max_digits=14, verbose_name='Quantidade')),
+                ('custo_unitario', models.DecimalField(decimal_places=4, max_digits=12, verbose_name='Custo Unitário Usado')),
+                ('custo_total', models.DecimalField(decimal_places=2, max_digits=14, verbose_name='Custo Total')),
+                ('calculado_em', models.DateTimeField(auto_now_add=True)),
+                ('proposta', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='consumos', to='core.proposta')),
+            ],
+            options={
+                'verbose_name': 'Consumo da Proposta',
+                'verbose_name_plural': 'Consumos das Propostas',
+                'ordering': ['proposta', 'categoria', 'codigo'],
+                'indexes': [models.Index(fields=['codigo', 'proposta'], name='core_consum_codigo_a10a97_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='RecalculoProposta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('codigos', models.JSONField(default=list, verbose_name='Códigos Alterados')),
+                ('motivo', models.CharField(blank=True, max_length=200, verbose_name='Motivo')),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+                ('processado_em', models.DateTimeField(blank=True, null=True, verbose_name='Processado em')),
+                ('preco_anterior', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('preco_novo', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('erro', models.TextField(blank=True)),
+                ('proposta', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recalculos', to='core.proposta')),
+            ],
+            options={
+                'verbose_name': 'Recálculo de Proposta',
+                'verbose_name_plural': 'Recálculos de Propostas',
+                'ordering': ['criado_em'],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('processado_em__isnull', True)), fields=('proposta',), name='recalculo_pendente_unico_por_proposta')],
+            },
+        ),
+    ]
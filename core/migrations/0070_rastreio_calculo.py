@@ -0,0 +1,34 @@
+# Generated by Django 5.1.7 on 2026-10-19 14:41
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0069_consumo_proposta'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RastreioCalculoProposta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+                ('descricao', models.CharField(blank=True, max_length=200, verbose_name='Descrição')),
+                ('duracao_ms', models.FloatField(default=0, verbose_name='Duração (ms)')),
+                ('sucesso', models.BooleanField(default=True)),
+                ('erro', models.TextField(blank=True)),
+                ('eventos', models.JSONField(default=list, verbose_name='Eventos')),
+                ('criado_por', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='rastreios_calculo', to=settings.AUTH_USER_MODEL)),
+                ('proposta', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rastreios', to='core.proposta')),
+            ],
+            options={
+                'verbose_name': 'Rastreio de Cálculo',
+                'verbose_name_plural': 'Rastreios de Cálculo',
+                'ordering': ['-criado_em'],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.7 on 2026-10-19 15:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0070_rastreio_calculo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HistoricoPrecoCompra',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ultimo_preco', models.DecimalField(decimal_places=4, max_digits=12, verbose_name='Último Preço')),
+                ('data_ultima_compra', models.DateField(verbose_name='Data da Última Compra')),
+                ('preco_medio', models.DecimalField(decimal_places=4, max_digits=12, verbose_name='Preço Médio')),
+                ('preco_minimo', models.DecimalField(decimal_places=4, max_digits=12, verbose_name='Preço Mínimo')),
+                ('preco_maximo', models.DecimalField(decimal_places=4, max_digits=12, verbose_name='Preço Máximo')),
+                ('quantidade_total', models.DecimalField(decimal_places=4, default=0, max_digits=14, verbose_name='Quantidade Comprada')),
+                ('valor_total', models.DecimalField(decimal_places=2, default=0, max_digits=16, verbose_name='Valor Comprado')),
+                ('compras', models.PositiveIntegerField(default=0, verbose_name='Recebimentos')),
+                ('atualizado_em', models.DateTimeField(auto_now=True)),
+                ('fornecedor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='historico_precos_compra', to='core.fornecedor', verbose_name='Fornecedor')),
+                ('produto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='historico_precos_compra', to='core.produto', verbose_name='Produto')),
+            ],
+            options={
+                'verbose_name': 'Histórico de Preço de Compra',
+                'verbose_name_plural': 'Históricos de Preço de Compra',
+                'ordering': ['produto', '-data_ultima_compra'],
+                'indexes': [models.Index(fields=['produto', '-data_ultima_compra'], name='core_histor_produto_a007b6_idx')],
+                'unique_together': {('produto', 'fornecedor')},
+            },
+        ),
+    ]
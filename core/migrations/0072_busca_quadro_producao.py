@@ -0,0 +1,46 @@
+# Generated by Django 5.1.7 on 2026-10-19 15:31
+
+from django.db import migrations, models
+
+# Busca textual dos quadros da produção (QuadroProducaoService.busca_textual):
+# icontains no PostgreSQL gera UPPER(coluna::text) LIKE UPPER(%s), então o
+# índice trigram é sobre a mesma expressão. Outros bancos ignoram.
+INDICES_TRIGRAM = [
+    ('core_proposta_numero_trgm', 'core_proposta', 'numero'),
+    ('core_proposta_numero_op_trgm', 'core_proposta', 'numero_op'),
+    ('core_proposta_nome_projeto_trgm', 'core_proposta', 'nome_projeto'),
+    ('core_cliente_nome_trgm', 'core_cliente', 'nome'),
+    ('core_cliente_nome_fantasia_trgm', 'core_cliente', 'nome_fantasia'),
+]
+
+
+def criar_indices_trigram(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for nome, tabela, coluna in INDICES_TRIGRAM:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {nome} ON {tabela} USING gin ((UPPER({coluna}::text)) gin_trgm_ops)'
+        )
+
+
+def remover_indices_trigram(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for nome, _, _ in INDICES_TRIGRAM:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {nome}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0071_historico_preco_compra'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='proposta',
+            index=models.Index(fields=['status', '-criado_em', '-id'], name='core_propos_status_834712_idx'),
+        ),
+        migrations.RunPython(criar_indices_trigram, remover_indices_trigram),
+    ]
@@ -0,0 +1,155 @@
+# Generated by Django 5.1.7 on 2026-10-19 15:37
+
+from datetime import date
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+# No PostgreSQL a tabela é particionada por mês em criado_em; a chave
+# primária precisa incluir a coluna de partição, então a tabela é criada à
+# mão (o estado do Django continua vendo `id` como pk). A partição padrão
+# recebe o que não couber nas mensais (ex.: histórico antigo copiado).
+MESES_INICIAIS = 3
+
+
+def _somar_meses(mes, quantidade):
+    indice = mes.year * 12 + mes.month - 1 + quantidade
+    return date(indice // 12, indice % 12 + 1, 1)
+
+
+def criar_tabela(apps, schema_editor):
+    RegistroAuditoria = apps.get_model('core', 'RegistroAuditoria')
+    if schema_editor.connection.vendor != 'postgresql':
+        schema_editor.create_model(RegistroAuditoria)
+        return
+
+    qn = schema_editor.quote_name
+    meta = RegistroAuditoria._meta
+    tabela = meta.db_table
+    colunas = []
+    for campo in meta.local_fields:
+        if campo.primary_key:
+            colunas.append(f'{qn(campo.column)} bigint GENERATED BY DEFAULT AS IDENTITY')
+        else:
+            definicao, _ = schema_editor.column_sql(RegistroAuditoria, campo)
+            colunas.append(f'{qn(campo.column)} {definicao}')
+    usuario = meta.get_field('usuario')
+    colunas.append(f'PRIMARY KEY ({qn(meta.pk.column)}, {qn("criado_em")})')
+    colunas.append(
+        f'FOREIGN KEY ({qn(usuario.column)}) '
+        f'REFERENCES {qn(usuario.target_field.model._meta.db_table)} ({qn(usuario.target_field.column)}) '
+        'DEFERRABLE INITIALLY DEFERRED'
+    )
+    schema_editor.execute(f'CREATE TABLE {qn(tabela)} ({", ".join(colunas)}) PARTITION BY RANGE ({qn("criado_em")})')
+    schema_editor.execute(f'CREATE TABLE {qn(tabela + "_padrao")} PARTITION OF {qn(tabela)} DEFAULT')
+
+    inicio = timezone.localdate().replace(day=1)
+    for i in range(MESES_INICIAIS):
+        mes = _somar_meses(inicio, i)
+        schema_editor.execute(
+            f'CREATE TABLE {qn(f"{tabela}_p{mes:%Y%m}")} PARTITION OF {qn(tabela)} '
+            f"FOR VALUES FROM ('{mes:%Y-%m-%d}') TO ('{_somar_meses(mes, 1):%Y-%m-%d}')"
+        )
+    for index in meta.indexes:
+        schema_editor.add_index(RegistroAuditoria, index)
+
+
+def remover_tabela(apps, schema_editor):
+    schema_editor.delete_model(apps.get_model('core', 'RegistroAuditoria'))
+
+
+def _status(anterior, novo):
+    """HistoricoProposta: "Obra: X" vem da vistoria (status_obra)"""
+    if novo.startswith('Obra: '):
+        anterior = anterior[len('Obra: '):] if anterior.startswith('Obra: ') else anterior
+        return 'Alteração de status da obra', {'status_obra': [anterior or None, novo[len('Obra: '):]]}
+    return 'Alteração de status', {'status': [anterior or None, novo]}
+
+
+def _diferencas(antes, depois):
+    antes, depois = antes or {}, depois or {}
+    return {
+        campo: [antes.get(campo), depois.get(campo)]
+        for campo in sorted(set(antes) | set(depois))
+        if antes.get(campo) != depois.get(campo)
+    }
+
+
+def copiar_historicos(apps, schema_editor):
+    """Copia HistoricoPedidoCompra, HistoricoOrcamentoCompra, HistoricoProposta e HistoricoTarefa"""
+    RegistroAuditoria = apps.get_model('core', 'RegistroAuditoria')
+
+    def pedido(h):
+        return 'core.pedidocompra', h.pedido_id, h.acao, h.observacao, _diferencas(h.dados_anteriores, h.dados_novos), h.data_alteracao
+
+    def orcamento(h):
+        return 'core.orcamentocompra', h.orcamento_id, h.acao, h.observacao, _diferencas(h.dados_anteriores, h.dados_novos), h.data_alteracao
+
+    def proposta(h):
+        acao, alteracoes = _status(h.status_anterior, h.status_novo)
+        return 'core.proposta', h.proposta_id, acao, h.observacao, alteracoes, h.data_mudanca
+
+    def tarefa(h):
+        return 'core.tarefa', h.tarefa_id, h.acao, h.descricao, {}, h.data
+
+    for modelo, converter in (
+        ('HistoricoPedidoCompra', pedido),
+        ('HistoricoOrcamentoCompra', orcamento),
+        ('HistoricoProposta', proposta),
+        ('HistoricoTarefa', tarefa),
+    ):
+        lote = []
+        for historico in apps.get_model('core', modelo).objects.order_by('pk').iterator(chunk_size=2000):
+            entidade, entidade_id, acao, observacao, alteracoes, criado_em = converter(historico)
+            lote.append(RegistroAuditoria(
+                entidade=entidade,
+                entidade_id=str(entidade_id),
+                acao=acao[:100],
+                observacao=observacao or '',
+                alteracoes=alteracoes,
+                usuario_id=historico.usuario_id,
+                criado_em=criado_em,
+            ))
+            if len(lote) >= 2000:
+                RegistroAuditoria.objects.bulk_create(lote)
+                lote = []
+        RegistroAuditoria.objects.bulk_create(lote)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0072_busca_quadro_producao'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='RegistroAuditoria',
+                    fields=[
+                        ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('entidade', models.CharField(help_text='app_label.model, ex.: core.pedidocompra', max_length=50)),
+                        ('entidade_id', models.CharField(max_length=40)),
+                        ('acao', models.CharField(max_length=100, verbose_name='Ação')),
+                        ('observacao', models.TextField(blank=True, verbose_name='Observação')),
+                        ('alteracoes', models.JSONField(blank=True, default=dict, help_text='{campo: [antes, depois]} somente dos campos alterados')),
+                        ('criado_em', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+                        ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                    ],
+                    options={
+                        'verbose_name': 'Registro de Auditoria',
+                        'verbose_name_plural': 'Registros de Auditoria',
+                        'ordering': ['-criado_em', '-id'],
+                        'indexes': [models.Index(fields=['entidade', 'entidade_id', '-criado_em'], name='core_auditoria_entidade_idx')],
+                    },
+                ),
+            ],
+        ),
+        migrations.RunPython(criar_tabela, remover_tabela),
+        migrations.RunPython(copiar_historicos, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-19 15:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0073_auditoria'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='proposta',
+            name='assinatura_calculo',
+            field=models.CharField(blank=True, editable=False, help_text='Hash da especificação, versões das regras e parâmetros usados no último cálculo', max_length=64, verbose_name='Assinatura do Cálculo'),
+        ),
+    ]
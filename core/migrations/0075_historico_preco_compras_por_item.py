@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-19 16:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0074_proposta_assinatura_calculo'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='historicoprecocompra',
+            name='compras',
+            field=models.PositiveIntegerField(default=0, help_text='Itens de pedido ou de entrada recebidos (recebimentos parciais do mesmo item contam uma vez)', verbose_name='Compras'),
+        ),
+    ]
@@ -10,7 +10,7 @@ from .clientes import Cliente
 from .fornecedores import Fornecedor, FornecedorProduto
 from .parametros import ParametrosGerais
 from .produtos import GrupoProduto, SubgrupoProduto, Produto, EstruturaProduto
-from .compras import PedidoCompra, ItemPedidoCompra, HistoricoPedidoCompra
+from .compras import PedidoCompra, ItemPedidoCompra, HistoricoPedidoCompra, HistoricoPrecoCompra
 from .propostas import Proposta
 from .propostas2 import (
     HistoricoProposta,
@@ -18,6 +18,9 @@ from .propostas2 import (
     ParcelaProposta,
     VistoriaHistorico,
     VaoPortaVistoria,
+    ConsumoProposta,
+    RecalculoProposta,
+    RastreioCalculoProposta,
     criar_vaos_porta_automaticos
 )
 
@@ -33,6 +36,8 @@ from .producao import (
 from .portas_pavimento import PortaPavimento
 from .regras_yaml import RegraYAML, TipoRegra
 from .workflow import Tarefa, HistoricoTarefa
+from .monitoramento import DesempenhoView
+from .auditoria import RegistroAuditoria
 
 # Estoque
 from .estoque import (
@@ -45,6 +50,8 @@ from .estoque import (
     ItemMovimentoSaida,
     Estoque,
     MovimentoEstoque,
+    SaldoEstoqueMensal,
+    ClassificacaoEstoque,
     # Requisição de Material
     RequisicaoMaterial,
     ItemRequisicaoMaterial,
@@ -75,6 +82,7 @@ __all__ = [
     'PedidoCompra',
     'ItemPedidoCompra',
     'HistoricoPedidoCompra',
+    'HistoricoPrecoCompra',
     
     # Propostas
     'Proposta',
@@ -83,6 +91,9 @@ __all__ = [
     'ParcelaProposta',
     'PortaPavimento',
     'VistoriaHistorico',
+    'ConsumoProposta',
+    'RecalculoProposta',
+    'RastreioCalculoProposta',
     
     # Medição
     'VaoPortaVistoria',
@@ -115,8 +126,16 @@ __all__ = [
     'ItemMovimentoSaida',
     'Estoque',
     'MovimentoEstoque',
+    'SaldoEstoqueMensal',
+    'ClassificacaoEstoque',
 
     # FASE 4 - Ordens de Producao
     'OrdemProducao',
     'ItemConsumoOP',
+
+    # Monitoramento
+    'DesempenhoView',
+
+    # Auditoria
+    'RegistroAuditoria',
 ]
\ No newline at end of file
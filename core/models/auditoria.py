@@ -0,0 +1,54 @@
+# core/models/auditoria.py
+
+"""
+Trilha de auditoria unificada (somente inclusão)
+"""
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class RegistroAuditoria(models.Model):
+    """
+    Uma ação sobre uma entidade (proposta, pedido, orçamento, tarefa...) com
+    apenas os campos alterados. Gravado por AuditoriaService em lote no
+    commit da transação.
+
+    No PostgreSQL a tabela é particionada por mês em criado_em (migração
+    0073); partições antigas são arquivadas pelo comando arquivar_auditoria.
+    """
+
+    entidade = models.CharField(max_length=50, help_text="app_label.model, ex.: core.pedidocompra")
+    entidade_id = models.CharField(max_length=40)
+    acao = models.CharField(max_length=100, verbose_name="Ação")
+    observacao = models.TextField(blank=True, verbose_name="Observação")
+    alteracoes = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="{campo: [antes, depois]} somente dos campos alterados"
+    )
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    criado_em = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        verbose_name = "Registro de Auditoria"
+        verbose_name_plural = "Registros de Auditoria"
+        ordering = ['-criado_em', '-id']
+        indexes = [
+            models.Index(fields=['entidade', 'entidade_id', '-criado_em'], name='core_auditoria_entidade_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.entidade}:{self.entidade_id} - {self.acao} - {self.criado_em:%d/%m/%Y %H:%M}"
+
+    @property
+    def lista_alteracoes(self):
+        """[(campo, antes, depois)] para exibição"""
+        return [(campo, valores[0], valores[1]) for campo, valores in (self.alteracoes or {}).items()]
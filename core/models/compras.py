@@ -159,8 +159,8 @@ class PedidoCompra(models.Model):
     def atualizar_dados_compras(self):
         """Atualiza dados do comprador dos parâmetros gerais"""
         try:
-            from .parametros import ParametrosGerais
-            parametros = ParametrosGerais.objects.first()
+            from core.utils.cache import parametros_gerais
+            parametros = parametros_gerais()
             if parametros:
                 if parametros.comprador_responsavel:
                     self.comprador_responsavel = parametros.comprador_responsavel
@@ -484,4 +484,81 @@ class HistoricoPedidoCompra(models.Model):
         ordering = ['-data_alteracao']
     
     def __str__(self):
-        return f"{self.pedido.numero} - {self.acao} - {self.data_alteracao.strftime('%d/%m/%Y %H:%M')}"
\ No newline at end of file
+        return f"{self.pedido.numero} - {self.acao} - {self.data_alteracao.strftime('%d/%m/%Y %H:%M')}"
+
+class HistoricoPrecoCompra(models.Model):
+    """
+    Resumo dos preços pagos por produto e fornecedor. Atualizado a cada
+    recebimento (HistoricoPrecosService) e reconstruído do histórico com
+    `manage.py reconstruir_historico_precos`; os formulários de compra
+    leem daqui em vez de varrer os pedidos.
+    """
+
+    produto = models.ForeignKey(
+        'Produto',
+        on_delete=models.CASCADE,
+        related_name='historico_precos_compra',
+        verbose_name="Produto"
+    )
+    fornecedor = models.ForeignKey(
+        'Fornecedor',
+        on_delete=models.CASCADE,
+        related_name='historico_precos_compra',
+        verbose_name="Fornecedor"
+    )
+
+    # Última compra
+    ultimo_preco = models.DecimalField(
+        max_digits=12,
+        decimal_places=4,
+        verbose_name="Último Preço"
+    )
+    data_ultima_compra = models.DateField(verbose_name="Data da Última Compra")
+
+    # Acumulados (preço médio ponderado pela quantidade)
+    preco_medio = models.DecimalField(
+        max_digits=12,
+        decimal_places=4,
+        verbose_name="Preço Médio"
+    )
+    preco_minimo = models.DecimalField(
+        max_digits=12,
+        decimal_places=4,
+        verbose_name="Preço Mínimo"
+    )
+    preco_maximo = models.DecimalField(
+        max_digits=12,
+        decimal_places=4,
+        verbose_name="Preço Máximo"
+    )
+    quantidade_total = models.DecimalField(
+        max_digits=14,
+        decimal_places=4,
+        default=0,
+        verbose_name="Quantidade Comprada"
+    )
+    valor_total = models.DecimalField(
+        max_digits=16,
+        decimal_places=2,
+        default=0,
+        verbose_name="Valor Comprado"
+    )
+    compras = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Compras",
+        help_text="Itens de pedido ou de entrada recebidos (recebimentos parciais do mesmo item contam uma vez)"
+    )
+
+    atualizado_em = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Histórico de Preço de Compra"
+        verbose_name_plural = "Históricos de Preço de Compra"
+        unique_together = ['produto', 'fornecedor']
+        ordering = ['produto', '-data_ultima_compra']
+        indexes = [
+            models.Index(fields=['produto', '-data_ultima_compra']),
+        ]
+
+    def __str__(self):
+        return f"{self.produto_id}/{self.fornecedor_id}: R$ {self.ultimo_preco} em {self.data_ultima_compra}"
@@ -1153,6 +1153,9 @@ class MovimentoEstoque(models.Model):
         ('transferencia_saida', 'Transferência (Saída)'),
     ]
 
+    # Tipos que somam ao saldo (os demais subtraem)
+    TIPOS_ENTRADA = ('entrada', 'ajuste_positivo', 'transferencia_entrada')
+
     produto = models.ForeignKey(
         'Produto',
         on_delete=models.PROTECT,
@@ -1247,15 +1250,198 @@ class MovimentoEstoque(models.Model):
         ordering = ['-criado_em']
         indexes = [
             models.Index(fields=['produto', 'local_estoque']),
+            models.Index(fields=['produto', 'local_estoque', 'data_movimento']),
             models.Index(fields=['data_movimento']),
             models.Index(fields=['documento_tipo', 'documento_id']),
         ]
 
     def __str__(self):
-        sinal = '+' if 'entrada' in self.tipo or 'positivo' in self.tipo else '-'
+        sinal = '+' if self.tipo in self.TIPOS_ENTRADA else '-'
         return f"{self.produto.codigo} {sinal}{self.quantidade} ({self.documento_numero})"
 
 
+# ===============================================
+# FECHAMENTO MENSAL DE ESTOQUE (KARDEX)
+# ===============================================
+
+class SaldoEstoqueMensal(models.Model):
+    """
+    Saldo de fechamento mensal por produto e local.
+    Materializado a partir do MovimentoEstoque para que consultas
+    "saldo em data X" leiam o fechamento anterior + o delta do mês.
+    """
+
+    produto = models.ForeignKey(
+        'Produto',
+        on_delete=models.CASCADE,
+        related_name='saldos_mensais',
+        verbose_name="Produto"
+    )
+    local_estoque = models.ForeignKey(
+        LocalEstoque,
+        on_delete=models.CASCADE,
+        related_name='saldos_mensais',
+        verbose_name="Local de Estoque"
+    )
+    competencia = models.DateField(
+        verbose_name="Competência",
+        help_text="Último dia do mês fechado"
+    )
+
+    # Saldo no fechamento
+    quantidade = models.DecimalField(
+        max_digits=14,
+        decimal_places=4,
+        default=0,
+        verbose_name="Quantidade"
+    )
+    custo_medio = models.DecimalField(
+        max_digits=12,
+        decimal_places=4,
+        default=0,
+        verbose_name="Custo Médio"
+    )
+    valor_total = models.DecimalField(
+        max_digits=16,
+        decimal_places=2,
+        default=0,
+        verbose_name="Valor Total"
+    )
+    quantidade_movimentos = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Movimentos no Mês"
+    )
+
+    # Controle
+    criado_em = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Saldo Mensal de Estoque"
+        verbose_name_plural = "Saldos Mensais de Estoque"
+        unique_together = ['produto', 'local_estoque', 'competencia']
+        ordering = ['-competencia', 'produto__codigo']
+        indexes = [
+            models.Index(fields=['competencia']),
+        ]
+
+    def __str__(self):
+        return f"{self.produto.codigo} @ {self.local_estoque.nome} [{self.competencia:%m/%Y}]: {self.quantidade}"
+
+
+# ===============================================
+# CLASSIFICAÇÃO ABC / XYZ (ANALÍTICO)
+# ===============================================
+
+CLASSE_ABC_CHOICES = [
+    ('A', 'A - Alto valor'),
+    ('B', 'B - Valor intermediário'),
+    ('C', 'C - Baixo valor'),
+]
+
+CLASSE_XYZ_CHOICES = [
+    ('X', 'X - Demanda estável'),
+    ('Y', 'Y - Demanda variável'),
+    ('Z', 'Z - Demanda irregular'),
+]
+
+
+class ClassificacaoEstoque(models.Model):
+    """
+    Classificação ABC (valor consumido) e XYZ (variabilidade da demanda)
+    por produto. Tabela-resumo recalculada em lote (rotina noturna);
+    as telas leem daqui em vez de calcular sobre o razão.
+    """
+
+    produto = models.OneToOneField(
+        'Produto',
+        on_delete=models.CASCADE,
+        related_name='classificacao_estoque',
+        verbose_name="Produto"
+    )
+
+    classe_abc = models.CharField(
+        max_length=1,
+        choices=CLASSE_ABC_CHOICES,
+        verbose_name="Classe ABC"
+    )
+    classe_xyz = models.CharField(
+        max_length=1,
+        choices=CLASSE_XYZ_CHOICES,
+        verbose_name="Classe XYZ"
+    )
+
+    # Consumo no período analisado
+    quantidade_consumida = models.DecimalField(
+        max_digits=14,
+        decimal_places=4,
+        default=0,
+        verbose_name="Quantidade Consumida"
+    )
+    valor_consumido = models.DecimalField(
+        max_digits=16,
+        decimal_places=2,
+        default=0,
+        verbose_name="Valor Consumido"
+    )
+    percentual_acumulado = models.DecimalField(
+        max_digits=7,
+        decimal_places=4,
+        default=0,
+        verbose_name="% Acumulado do Valor"
+    )
+    consumo_medio_mensal = models.DecimalField(
+        max_digits=14,
+        decimal_places=4,
+        default=0,
+        verbose_name="Consumo Médio Mensal"
+    )
+    coeficiente_variacao = models.DecimalField(
+        max_digits=8,
+        decimal_places=4,
+        blank=True,
+        null=True,
+        verbose_name="Coeficiente de Variação"
+    )
+
+    # Giro
+    ultimo_movimento = models.DateField(
+        blank=True,
+        null=True,
+        verbose_name="Último Movimento"
+    )
+    dias_sem_movimento = models.PositiveIntegerField(
+        blank=True,
+        null=True,
+        verbose_name="Dias sem Movimento"
+    )
+
+    # Controle
+    periodo_meses = models.PositiveSmallIntegerField(
+        default=12,
+        verbose_name="Período Analisado (meses)"
+    )
+    calculado_em = models.DateTimeField(
+        verbose_name="Calculado em"
+    )
+
+    class Meta:
+        verbose_name = "Classificação de Estoque"
+        verbose_name_plural = "Classificações de Estoque"
+        ordering = ['classe_abc', '-valor_consumido']
+        indexes = [
+            models.Index(fields=['classe_abc', 'classe_xyz']),
+            models.Index(fields=['dias_sem_movimento']),
+        ]
+
+    def __str__(self):
+        return f"{self.produto.codigo}: {self.classe_abc}{self.classe_xyz}"
+
+    @property
+    def classe(self):
+        """Classe combinada (ex: AX, CZ)"""
+        return f"{self.classe_abc}{self.classe_xyz}"
+
+
 # ===============================================
 # ORDEM DE PRODUCAO - FASE 4
 # ===============================================
@@ -0,0 +1,96 @@
+# core/models/monitoramento.py
+
+"""
+Models de monitoramento de desempenho das views
+"""
+
+from django.db import models
+
+# Limites superiores (ms) das faixas do histograma de latência.
+# A última posição do histograma conta as requisições acima do último limite.
+FAIXAS_LATENCIA_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+def histograma_vazio():
+    return [0] * (len(FAIXAS_LATENCIA_MS) + 1)
+
+
+class DesempenhoView(models.Model):
+    """
+    Agregado horário de desempenho por view (nome da URL resolvida + método).
+    Gravado pelo DesempenhoMiddleware a partir do buffer em memória.
+    """
+
+    url_name = models.CharField(max_length=150, db_index=True)
+    metodo = models.CharField(max_length=10)
+    periodo = models.DateTimeField(help_text="Início da hora agregada")
+
+    requisicoes = models.PositiveIntegerField(default=0)
+    erros = models.PositiveIntegerField(default=0, help_text="Respostas 5xx")
+    lentas = models.PositiveIntegerField(default=0, help_text="Acima do limite de requisição lenta")
+
+    tempo_total_ms = models.FloatField(default=0)
+    tempo_max_ms = models.FloatField(default=0)
+    tempo_db_total_ms = models.FloatField(default=0)
+    queries_total = models.PositiveIntegerField(default=0)
+    queries_max = models.PositiveIntegerField(default=0)
+    bytes_total = models.BigIntegerField(default=0)
+
+    histograma = models.JSONField(
+        default=histograma_vazio,
+        help_text="Contagem de requisições por faixa de latência (FAIXAS_LATENCIA_MS)"
+    )
+
+    class Meta:
+        verbose_name = "Desempenho de View"
+        verbose_name_plural = "Desempenho de Views"
+        ordering = ['-periodo', 'url_name']
+        unique_together = [['url_name', 'metodo', 'periodo']]
+        indexes = [
+            models.Index(fields=['periodo']),
+        ]
+
+    def __str__(self):
+        return f"{self.metodo} {self.url_name} @ {self.periodo:%d/%m/%Y %H:00}"
+
+    def acumular(self, agregado):
+        """Soma um agregado do buffer (dict com as mesmas chaves) neste registro"""
+        self.requisicoes += agregado['requisicoes']
+        self.erros += agregado['erros']
+        self.lentas += agregado['lentas']
+        self.tempo_total_ms += agregado['tempo_total_ms']
+        self.tempo_max_ms = max(self.tempo_max_ms, agregado['tempo_max_ms'])
+        self.tempo_db_total_ms += agregado['tempo_db_total_ms']
+        self.queries_total += agregado['queries_total']
+        self.queries_max = max(self.queries_max, agregado['queries_max'])
+        self.bytes_total += agregado['bytes_total']
+        self.histograma = somar_histogramas(self.histograma, agregado['histograma'])
+
+
+def somar_histogramas(a, b):
+    """Soma posição a posição (tolera histogramas gravados com outro tamanho)"""
+    tamanho = max(len(a or []), len(b or []))
+    a = list(a or []) + [0] * (tamanho - len(a or []))
+    b = list(b or []) + [0] * (tamanho - len(b or []))
+    return [x + y for x, y in zip(a, b)]
+
+
+def percentil_histograma(histograma, percentil, maximo=None):
+    """
+    Percentil aproximado a partir do histograma: limite superior da faixa
+    que contém a posição. Na faixa aberta (acima do último limite) usa o
+    máximo observado, se informado.
+    """
+    total = sum(histograma)
+    if not total:
+        return None
+    alvo = total * percentil / 100
+    acumulado = 0
+    for indice, quantidade in enumerate(histograma):
+        acumulado += quantidade
+        if acumulado >= alvo and quantidade:
+            if indice < len(FAIXAS_LATENCIA_MS):
+                limite = FAIXAS_LATENCIA_MS[indice]
+                return min(limite, maximo) if maximo else limite
+            return maximo or FAIXAS_LATENCIA_MS[-1]
+    return maximo
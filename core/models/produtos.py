@@ -4,6 +4,9 @@ from django.db import models
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.db import transaction
+from django.db.models import F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from decimal import Decimal
 import uuid
 
 from .base import (
@@ -12,7 +15,83 @@ from .base import (
     STATUS_PRODUTO_CHOICES
 )
 
-# Adicione estas classes no INÍCIO do arquivo core/models/produtos.py
+# Colunas que as listagens de produtos exibem (ver ProdutoQuerySet.para_lista)
+CAMPOS_LISTA_PRODUTO = (
+    'id', 'codigo', 'nome', 'descricao', 'tipo', 'tipo_pi', 'status', 'disponivel', 'utilizado',
+    'unidade_medida', 'controla_estoque', 'estoque_atual', 'estoque_minimo',
+    'custo_material', 'custo_servico',
+    'grupo__codigo', 'grupo__nome', 'subgrupo__codigo', 'subgrupo__nome',
+)
+
+
+class GrupoProdutoQuerySet(models.QuerySet):
+
+    def para_lista(self):
+        """
+        Colunas das listagens de grupos, com `total_subgrupos` calculado na
+        própria query em vez de um COUNT por linha no template.
+        """
+        return self.only('id', 'codigo', 'nome', 'tipo_produto', 'ativo').annotate(
+            total_subgrupos=models.Count('subgrupos', distinct=True),
+        )
+
+
+class SubgrupoProdutoQuerySet(models.QuerySet):
+
+    def para_lista(self):
+        """Colunas das listagens de subgrupos (com o grupo) e `total_produtos`"""
+        return self.select_related('grupo').only(
+            'id', 'codigo', 'nome', 'ativo', 'grupo__id', 'grupo__codigo', 'grupo__nome', 'grupo__tipo_produto',
+        ).annotate(
+            total_produtos=models.Count('produtos', distinct=True),
+        )
+
+
+class ProdutoQuerySet(models.QuerySet):
+
+    def para_lista(self, componentes=False, fornecedores=False, custo_estrutura=False):
+        """
+        Colunas exibidas nas listagens de MP/PI (CAMPOS_LISTA_PRODUTO), com
+        grupo e subgrupo no mesmo SELECT. Uma página sai em duas queries
+        (COUNT da paginação + página), independente do volume de dados.
+
+        Args:
+            componentes (bool): anota `total_componentes` (linhas de estrutura)
+            fornecedores (bool): anota `total_fornecedores`
+            custo_estrutura (bool): anota `custo_estrutura`, custo dos
+                componentes com perda (subquery; só faz sentido para PI montado)
+        """
+        produtos = self.select_related('grupo', 'subgrupo').only(*CAMPOS_LISTA_PRODUTO)
+
+        contagens = {}
+        if componentes:
+            contagens['total_componentes'] = models.Count('componentes', distinct=True)
+        if fornecedores:
+            contagens['total_fornecedores'] = models.Count('fornecedores_produto', distinct=True)
+        if contagens:
+            produtos = produtos.annotate(**contagens)
+
+        if custo_estrutura:
+            custo_unitario = (
+                Coalesce('produto_filho__custo_material', Decimal('0'))
+                + Coalesce('produto_filho__custo_servico', Decimal('0'))
+            )
+            custo = EstruturaProduto.objects.filter(produto_pai=OuterRef('pk')).order_by().values(
+                'produto_pai',
+            ).annotate(
+                total=models.Sum(
+                    custo_unitario * F('quantidade') * (1 + F('percentual_perda') / 100),
+                    output_field=models.DecimalField(max_digits=14, decimal_places=4),
+                ),
+            ).values('total')
+            produtos = produtos.annotate(
+                custo_estrutura=Coalesce(
+                    Subquery(custo), Decimal('0'),
+                    output_field=models.DecimalField(max_digits=14, decimal_places=4),
+                ),
+            )
+        return produtos
+
 
 class GrupoProduto(models.Model):
     """Grupos de produtos com classificação por tipo"""
@@ -35,6 +114,8 @@ class GrupoProduto(models.Model):
         related_name='grupos_produtos_criados'
     )
     
+    objects = GrupoProdutoQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Grupo de Produto"
         verbose_name_plural = "Grupos de Produtos"
@@ -78,6 +159,8 @@ class SubgrupoProduto(models.Model):
         related_name='subgrupos_produtos_criados'
     )
     
+    objects = SubgrupoProdutoQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Subgrupo de Produto"
         verbose_name_plural = "Subgrupos de Produtos"
@@ -291,6 +374,8 @@ class Produto(models.Model):
         related_name='produtos_atualizados'
     )
     
+    objects = ProdutoQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Produto"
         verbose_name_plural = "Produtos"
@@ -1,6 +1,8 @@
 # core/models/propostas.py
 
 from django.db import models
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.conf import settings
 from datetime import datetime, timedelta, date
 from decimal import Decimal
@@ -10,6 +12,70 @@ import uuid
 import logging
 logger = logging.getLogger(__name__)
 
+# Artefatos do cálculo (JSON/texto grandes): só detalhe, PDFs e cálculo leem
+CAMPOS_CALCULO = (
+    'ficha_tecnica',
+    'componentes_calculados',
+    'dimensionamento_detalhado',
+    'custos_detalhados',
+    'formacao_preco',
+    'explicacao_calculo',
+)
+
+# Entradas do motor de cálculo: campos lidos por extrair_especificacoes_do_pedido
+# e pelo contexto YAML (tabela de preços, assinatura do cálculo)
+CAMPOS_ESPECIFICACAO = (
+    'faturado_por', 'modelo_elevador', 'capacidade', 'capacidade_pessoas',
+    'acionamento', 'tracao', 'contrapeso',
+    'largura_poco', 'comprimento_poco', 'altura_poco', 'pavimentos',
+    'modelo_porta_cabine', 'material_porta_cabine', 'folhas_porta_cabine',
+    'largura_porta_cabine', 'altura_porta_cabine',
+    'modelo_porta_pavimento', 'material_porta_pavimento', 'folhas_porta_pavimento',
+    'largura_porta_pavimento', 'altura_porta_pavimento',
+    'material_cabine', 'espessura_cabine', 'saida_cabine', 'altura_cabine',
+    'piso_cabine', 'material_piso_cabine',
+)
+
+# Campos que o save() compara com a versão gravada
+CAMPOS_MONITORADOS = ('status', 'data_vistoria_medicao')
+
+
+class PropostaQuerySet(models.QuerySet):
+
+    def sem_calculos(self):
+        """
+        Adia os artefatos do cálculo (CAMPOS_CALCULO); para listagens e
+        atualizações de status. Um save() numa instância assim grava só
+        os campos carregados.
+        """
+        return self.defer(*CAMPOS_CALCULO)
+
+    def para_quadro_producao(self):
+        """
+        Quadros do portal de produção: sem os artefatos do cálculo, com a
+        lista de materiais no mesmo SELECT e `valor_lista_materiais` (soma
+        dos itens, como ListaMateriais.calcular_valor_total) numa subquery,
+        o que permite exibir e ordenar pelo valor sem um aggregate por linha.
+        """
+        from .producao import ItemListaMateriais
+
+        valor_itens = ItemListaMateriais.objects.filter(
+            lista__proposta=OuterRef('pk'),
+        ).order_by().values('lista').annotate(
+            total=models.Sum(
+                models.F('quantidade') * models.F('valor_unitario_estimado'),
+                output_field=models.DecimalField(max_digits=12, decimal_places=2),
+            ),
+        ).values('total')
+
+        return self.sem_calculos().select_related('lista_materiais').annotate(
+            valor_lista_materiais=Coalesce(
+                Subquery(valor_itens), Decimal('0'),
+                output_field=models.DecimalField(max_digits=12, decimal_places=2),
+            ),
+        )
+
+
 class Proposta(models.Model):
 
     STATUS_CHOICES = [
@@ -624,6 +690,13 @@ class Proposta(models.Model):
         blank=True,
         verbose_name="Formação de Preço"
     )
+    assinatura_calculo = models.CharField(
+        max_length=64,
+        blank=True,
+        editable=False,
+        verbose_name="Assinatura do Cálculo",
+        help_text="Hash da especificação, versões das regras e parâmetros usados no último cálculo"
+    )
 
     # === ARQUIVOS DE PROJETO ===
     arquivo_projeto_executivo = models.FileField(
@@ -759,6 +832,8 @@ class Proposta(models.Model):
     # === AUDITORIA ===
     criado_em = models.DateTimeField(auto_now_add=True)
     atualizado_em = models.DateTimeField(auto_now=True)
+
+    objects = PropostaQuerySet.as_manager()
     
     class Meta:
         verbose_name = "Proposta"
@@ -769,6 +844,7 @@ class Proposta(models.Model):
             models.Index(fields=['vendedor', 'status']),
             models.Index(fields=['cliente']),
             models.Index(fields=['-criado_em']),
+            models.Index(fields=['status', '-criado_em', '-id']),  # Quadros da produção (paginação por chave)
             models.Index(fields=['status']),
             models.Index(fields=['data_validade']),
             models.Index(fields=['valor_proposta']),
@@ -806,13 +882,10 @@ class Proposta(models.Model):
         Salvar com número automático formato 25.00001, definir data de validade
         e ATUALIZAR automaticamente data_proxima_vistoria baseada em data_vistoria_medicao
         """
-        # Verificar se há instância anterior para comparar mudanças
-        instancia_anterior = None
+        # Valores gravados dos campos monitorados (sem trazer a linha inteira)
+        anterior = None
         if self.pk:
-            try:
-                instancia_anterior = Proposta.objects.get(pk=self.pk)
-            except Proposta.DoesNotExist:
-                pass
+            anterior = Proposta.objects.filter(pk=self.pk).values(*CAMPOS_MONITORADOS).first()
         
         # Gerar número automático se novo
         if not self.numero:
@@ -841,15 +914,15 @@ class Proposta(models.Model):
         if not self.data_validade:
             self.data_validade = date.today() + timedelta(days=30)
 
-        if instancia_anterior and instancia_anterior.status != 'aprovado' and self.status == 'aprovado':
+        if anterior and anterior['status'] != 'aprovado' and self.status == 'aprovado':
             self.data_aprovacao = timezone.now()
 
         # ✅ NOVA FUNCIONALIDADE: Auto-update de próxima vistoria
         if self.data_vistoria_medicao:
             # Verificar se data_vistoria_medicao mudou ou é uma nova proposta
             data_medicao_mudou = (
-                instancia_anterior is None or  # Nova proposta
-                instancia_anterior.data_vistoria_medicao != self.data_vistoria_medicao  # Data mudou
+                anterior is None or  # Nova proposta
+                anterior['data_vistoria_medicao'] != self.data_vistoria_medicao  # Data mudou
             )
             
             if data_medicao_mudou:
@@ -883,17 +956,15 @@ class Proposta(models.Model):
             logger.info(f"Iniciando exclusão da proposta {self.numero}")
             
             # Contar relacionamentos que serão excluídos
-            from core.models import PortaPavimento, HistoricoProposta, AnexoProposta
+            # (a auditoria fica em RegistroAuditoria e não é excluída)
+            from core.models import PortaPavimento, AnexoProposta
             
             portas_count = PortaPavimento.objects.filter(proposta=self).count()
-            historico_count = HistoricoProposta.objects.filter(proposta=self).count()
             anexos_count = AnexoProposta.objects.filter(proposta=self).count()
             
             # Log dos relacionamentos
             if portas_count > 0:
                 logger.info(f"Serão excluídas {portas_count} portas individuais")
-            if historico_count > 0:
-                logger.info(f"Serão excluídos {historico_count} registros de histórico")
             if anexos_count > 0:
                 logger.info(f"Serão excluídos {anexos_count} anexos")
             
@@ -913,7 +984,7 @@ class Proposta(models.Model):
         """
         Calcula impostos baseado no campo 'faturado_por' e parâmetros do sistema
         """
-        from core.models import ParametrosGerais
+        from core.utils.cache import parametros_gerais
         from decimal import Decimal
         import logging
         
@@ -926,7 +997,7 @@ class Proposta(models.Model):
             return Decimal('0.00')
         
         try:
-            parametros = ParametrosGerais.objects.first()
+            parametros = parametros_gerais()
             if not parametros:
                 return Decimal(str(valor_base)) * Decimal('0.10')
             
@@ -346,31 +346,6 @@ def criar_vaos_porta_automaticos(vistoria, numero_pavimentos):
         )
 
 
-# =============================================================================
-# FUNÇÃO PARA ATUALIZAR STATUS DA OBRA (mantida do código original)
-# =============================================================================
-
-def atualizar_status_obra_proposta(proposta, novo_status, usuario, observacao=""):
-    """
-    Função helper para atualizar status da obra e criar histórico
-    """
-    status_anterior = proposta.status_obra
-    proposta.status_obra = novo_status
-    proposta.save()
-    
-    # Criar entrada no histórico da proposta
-    from .propostas import HistoricoProposta
-    HistoricoProposta.objects.create(
-        proposta=proposta,
-        status_anterior=f"Obra: {status_anterior or 'Aguardando'}",
-        status_novo=f"Obra: {novo_status}",
-        observacao=f"Status da obra alterado. {observacao}".strip(),
-        usuario=usuario
-    )
-    
-    return proposta
-
-
 # =============================================================================
 # MODELOS RELACIONADOS (mantém os existentes)
 # =============================================================================
@@ -491,4 +466,88 @@ class ParcelaProposta(models.Model):
         if self.pago:
             return None
         delta = self.data_vencimento - date.today()
-        return delta.days
\ No newline at end of file
+        return delta.days
+
+
+class ConsumoProposta(models.Model):
+    """
+    Produto consumido pelo último cálculo da proposta (índice reverso
+    código → propostas). Regravado a cada execução de
+    CalculoPedidoService._salvar_calculos_no_pedido.
+    """
+    proposta = models.ForeignKey(Proposta, on_delete=models.CASCADE, related_name='consumos')
+    codigo = models.CharField(max_length=50, verbose_name="Código do Produto")
+    categoria = models.CharField(max_length=30, verbose_name="Categoria")
+    subcategoria = models.CharField(max_length=100, blank=True, verbose_name="Subcategoria")
+    quantidade = models.DecimalField(max_digits=14, decimal_places=4, verbose_name="Quantidade")
+    custo_unitario = models.DecimalField(max_digits=12, decimal_places=4, verbose_name="Custo Unitário Usado")
+    custo_total = models.DecimalField(max_digits=14, decimal_places=2, verbose_name="Custo Total")
+    calculado_em = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Consumo da Proposta"
+        verbose_name_plural = "Consumos das Propostas"
+        ordering = ['proposta', 'categoria', 'codigo']
+        indexes = [
+            models.Index(fields=['codigo', 'proposta']),
+        ]
+
+    def __str__(self):
+        return f"{self.proposta.numero} - {self.codigo} x {self.quantidade}"
+
+
+class RecalculoProposta(models.Model):
+    """
+    Fila de recálculo: propostas que consomem produtos cujo custo mudou.
+    Uma entrada pendente por proposta; processada por
+    `manage.py recalcular_propostas`.
+    """
+    proposta = models.ForeignKey(Proposta, on_delete=models.CASCADE, related_name='recalculos')
+    codigos = models.JSONField(default=list, verbose_name="Códigos Alterados")
+    motivo = models.CharField(max_length=200, blank=True, verbose_name="Motivo")
+    criado_em = models.DateTimeField(auto_now_add=True)
+    processado_em = models.DateTimeField(null=True, blank=True, verbose_name="Processado em")
+    preco_anterior = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    preco_novo = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    erro = models.TextField(blank=True)
+
+    class Meta:
+        verbose_name = "Recálculo de Proposta"
+        verbose_name_plural = "Recálculos de Propostas"
+        ordering = ['criado_em']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['proposta'],
+                condition=models.Q(processado_em__isnull=True),
+                name='recalculo_pendente_unico_por_proposta',
+            ),
+        ]
+
+    def __str__(self):
+        situacao = 'pendente' if self.processado_em is None else 'processado'
+        return f"{self.proposta.numero} - recálculo {situacao}"
+
+
+class RastreioCalculoProposta(models.Model):
+    """
+    Rastreio gravado de um cálculo de proposta (core.utils.rastreio).
+    Só existe quando alguém pede a gravação na tela de rastreio.
+    """
+    proposta = models.ForeignKey(Proposta, on_delete=models.CASCADE, related_name='rastreios')
+    criado_em = models.DateTimeField(auto_now_add=True)
+    criado_por = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='rastreios_calculo'
+    )
+    descricao = models.CharField(max_length=200, blank=True, verbose_name="Descrição")
+    duracao_ms = models.FloatField(default=0, verbose_name="Duração (ms)")
+    sucesso = models.BooleanField(default=True)
+    erro = models.TextField(blank=True)
+    eventos = models.JSONField(default=list, verbose_name="Eventos")
+
+    class Meta:
+        verbose_name = "Rastreio de Cálculo"
+        verbose_name_plural = "Rastreios de Cálculo"
+        ordering = ['-criado_em']
+
+    def __str__(self):
+        return f"{self.proposta.numero} - rastreio {self.criado_em:%d/%m/%Y %H:%M}"
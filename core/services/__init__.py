@@ -1,10 +1,13 @@
 from .calculo_pedido_yaml import CalculoPedidoYAMLService
 from .dimensionamento import DimensionamentoService
+from .duplicacao_proposta import DuplicacaoPropostaService
+from .portas_pavimento import PortaPavimentoService
 from .pricing import PricingService
 
 __all__ = [
     "CalculoPedidoYAMLService",
     "DimensionamentoService",
+    "DuplicacaoPropostaService",
     "PricingService",
     "PortaPavimentoService",
 ]
\ No newline at end of file
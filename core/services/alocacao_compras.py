@@ -0,0 +1,544 @@
+# core/services/alocacao_compras.py
+
+"""
+Alocação de fornecedores para requisições e orçamentos de compra.
+
+Para cada produto necessário escolhe o fornecedor que minimiza o custo
+total, usando FornecedorProduto (preço, prioridade, prazo, quantidade
+mínima) e as cotações recentes de ItemOrcamentoCompra:
+
+- fornecedores cujo prazo não atende a data de necessidade são descartados
+  (se nenhum atende, fica o de menor prazo e o item sai como atrasado);
+- a quantidade mínima do fornecedor entra no custo (compra-se o mínimo);
+- a prioridade do cadastro pesa como acréscimo percentual no custo de decisão;
+- `frete_por_pedido` penaliza cada pedido adicional, o que favorece
+  concentrar itens em menos fornecedores.
+
+Sem frete o problema se resolve item a item. Com frete é um problema de
+localização de facilidades: a solução gulosa passa por uma busca local
+(abrir/fechar fornecedor) e depois por um branch-and-bound limitado em nós
+e tempo, que prova a solução ótima quando termina dentro do limite.
+"""
+
+import logging
+import time
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import FornecedorProduto, ItemOrcamentoCompra, ItemPedidoCompra, PedidoCompra
+
+logger = logging.getLogger(__name__)
+
+
+class AlocacaoComprasService:
+    """
+    Serviço de alocação de itens de compra a fornecedores
+    """
+
+    # Acréscimo no custo de decisão por nível de prioridade (1 = Principal)
+    PENALIDADE_PRIORIDADE = Decimal('0.02')
+
+    # Cotações mais antigas que isso não são consideradas
+    VALIDADE_COTACAO_DIAS = 90
+
+    # Limites da etapa exata (branch-and-bound)
+    LIMITE_NOS = 20000
+    LIMITE_SEGUNDOS = 0.3
+
+    # =========================================================================
+    # ENTRADA
+    # =========================================================================
+
+    @staticmethod
+    def linhas_requisicao(requisicao, itens_ids=None):
+        """
+        Linhas de alocação com o saldo dos itens de uma requisição.
+
+        Args:
+            requisicao (RequisicaoCompra): requisição de origem
+            itens_ids (list): restringe aos itens informados
+
+        Returns:
+            list[dict]: linhas para `planejar`
+        """
+        itens = requisicao.itens.select_related('produto')
+        if itens_ids:
+            itens = itens.filter(id__in=itens_ids)
+
+        linhas = []
+        for item in itens:
+            saldo = item.quantidade_saldo
+            if saldo <= 0:
+                continue
+            linhas.append({
+                'produto_id': item.produto_id,
+                'produto_codigo': item.produto.codigo,
+                'quantidade': saldo,
+                'unidade': item.unidade or item.produto.unidade_medida,
+                'data_necessidade': requisicao.data_necessidade,
+                'valor_estimado': item.valor_unitario_estimado,
+                'item_requisicao_id': item.id,
+                'observacoes': item.observacoes,
+                'cotacoes': {},
+            })
+        return linhas
+
+    @staticmethod
+    def linhas_orcamento(orcamento):
+        """
+        Linhas de alocação dos itens de um orçamento; a cotação registrada
+        no item entra como candidata mesmo fora do cadastro do fornecedor.
+
+        Returns:
+            list[dict]: linhas para `planejar`
+        """
+        linhas = []
+        for item in orcamento.itens.select_related('produto', 'fornecedor'):
+            cotacoes = {}
+            if item.fornecedor_id and item.valor_unitario_cotado is not None:
+                cotacoes[item.fornecedor_id] = {
+                    'preco': item.valor_unitario_cotado,
+                    'prazo': item.prazo_entrega,
+                    'fornecedor_nome': str(item.fornecedor),
+                }
+            linhas.append({
+                'produto_id': item.produto_id,
+                'produto_codigo': item.produto.codigo,
+                'quantidade': item.quantidade,
+                'unidade': item.unidade or item.produto.unidade_medida,
+                'data_necessidade': orcamento.data_necessidade,
+                'valor_estimado': item.valor_unitario_estimado,
+                'item_requisicao_id': None,
+                'observacoes': item.observacoes,
+                'cotacoes': cotacoes,
+            })
+        return linhas
+
+    @classmethod
+    def candidatos(cls, produto_ids, data_base):
+        """
+        Fornecedores possíveis por produto (2 queries).
+
+        Returns:
+            dict: {produto_id: {fornecedor_id: {fornecedor_nome, preco, prazo,
+                  minimo, prioridade, origem_preco}}}
+        """
+        resultado = defaultdict(dict)
+
+        relacoes = FornecedorProduto.objects.filter(
+            produto_id__in=produto_ids, ativo=True, fornecedor__ativo=True,
+        ).select_related('fornecedor').only(
+            'produto_id', 'fornecedor_id', 'preco_unitario', 'prazo_entrega',
+            'quantidade_minima', 'prioridade',
+            'fornecedor__razao_social', 'fornecedor__nome_fantasia',
+        )
+        for relacao in relacoes:
+            resultado[relacao.produto_id][relacao.fornecedor_id] = {
+                'fornecedor_nome': str(relacao.fornecedor),
+                'preco': relacao.preco_unitario,
+                'prazo': relacao.prazo_entrega,
+                'minimo': relacao.quantidade_minima or Decimal('0'),
+                'prioridade': relacao.prioridade,
+                'origem_preco': 'cadastro',
+            }
+
+        # Cotação mais recente de cada produto/fornecedor prevalece sobre o cadastro
+        cotacoes = ItemOrcamentoCompra.objects.filter(
+            produto_id__in=produto_ids,
+            fornecedor__isnull=False,
+            fornecedor__ativo=True,
+            valor_unitario_cotado__isnull=False,
+            orcamento__data_orcamento__gte=data_base - timedelta(days=cls.VALIDADE_COTACAO_DIAS),
+        ).exclude(
+            orcamento__status__in=['rejeitado', 'cancelado'],
+        ).exclude(
+            orcamento__data_validade__lt=data_base,
+        ).select_related('fornecedor').only(
+            'produto_id', 'fornecedor_id', 'valor_unitario_cotado', 'prazo_entrega',
+            'fornecedor__razao_social', 'fornecedor__nome_fantasia',
+        ).order_by('-orcamento__data_orcamento', '-id')
+
+        vistos = set()
+        for cotacao in cotacoes:
+            chave = (cotacao.produto_id, cotacao.fornecedor_id)
+            if chave in vistos:
+                continue
+            vistos.add(chave)
+            atual = resultado[cotacao.produto_id].get(cotacao.fornecedor_id)
+            resultado[cotacao.produto_id][cotacao.fornecedor_id] = {
+                'fornecedor_nome': str(cotacao.fornecedor),
+                'preco': cotacao.valor_unitario_cotado,
+                'prazo': cotacao.prazo_entrega if cotacao.prazo_entrega is not None else (atual or {}).get('prazo'),
+                'minimo': (atual or {}).get('minimo', Decimal('0')),
+                'prioridade': (atual or {}).get('prioridade', 2),
+                'origem_preco': 'cotacao',
+            }
+        return resultado
+
+    # =========================================================================
+    # PLANEJAMENTO
+    # =========================================================================
+
+    @staticmethod
+    def _agrupar(linhas):
+        """Soma linhas do mesmo produto (a quantidade mínima vale por pedido)"""
+        grupos = {}
+        for linha in linhas:
+            grupo = grupos.get(linha['produto_id'])
+            if grupo is None:
+                grupo = grupos[linha['produto_id']] = {
+                    'produto_id': linha['produto_id'],
+                    'produto_codigo': linha.get('produto_codigo', ''),
+                    'quantidade': Decimal('0'),
+                    'data_necessidade': None,
+                    'valor_estimado': None,
+                    'cotacoes': {},
+                    'linhas': [],
+                }
+            grupo['quantidade'] += Decimal(str(linha['quantidade']))
+            data = linha.get('data_necessidade')
+            if data and (grupo['data_necessidade'] is None or data < grupo['data_necessidade']):
+                grupo['data_necessidade'] = data
+            if grupo['valor_estimado'] is None:
+                grupo['valor_estimado'] = linha.get('valor_estimado')
+            grupo['cotacoes'].update(linha.get('cotacoes') or {})
+            grupo['linhas'].append(linha)
+        return list(grupos.values())
+
+    @classmethod
+    def _opcoes(cls, grupo, candidatos, data_base):
+        """Opções viáveis de fornecedor para um produto, com custo real e de decisão"""
+        opcoes = {}
+        for fornecedor_id in set(candidatos) | set(grupo['cotacoes']):
+            base = candidatos.get(fornecedor_id, {})
+            cotacao = grupo['cotacoes'].get(fornecedor_id)
+
+            if cotacao:
+                preco, origem = cotacao['preco'], 'cotacao'
+                prazo = cotacao['prazo'] if cotacao['prazo'] is not None else base.get('prazo')
+            else:
+                preco, origem, prazo = base.get('preco'), base.get('origem_preco'), base.get('prazo')
+            if preco is None:
+                preco, origem = grupo['valor_estimado'], 'estimado'
+            if preco is None:
+                continue
+
+            minimo = base.get('minimo') or Decimal('0')
+            quantidade_compra = max(grupo['quantidade'], minimo)
+            custo = (quantidade_compra * preco).quantize(Decimal('0.01'))
+            prioridade = base.get('prioridade', 2)
+            chegada = data_base + timedelta(days=prazo) if prazo is not None else None
+
+            opcoes[fornecedor_id] = {
+                'fornecedor_id': fornecedor_id,
+                'fornecedor_nome': base.get('fornecedor_nome') or (cotacao or {}).get('fornecedor_nome', ''),
+                'valor_unitario': preco,
+                'quantidade_compra': quantidade_compra,
+                'custo': custo,
+                'custo_decisao': float(custo * (1 + cls.PENALIDADE_PRIORIDADE * (prioridade - 1))),
+                'prazo_entrega': prazo,
+                'data_prevista': chegada,
+                # Prazo não informado conta como atendido
+                'atrasado': bool(grupo['data_necessidade'] and chegada and chegada > grupo['data_necessidade']),
+                'origem_preco': origem,
+            }
+
+        no_prazo = {f: o for f, o in opcoes.items() if not o['atrasado']}
+        if no_prazo or not opcoes:
+            return no_prazo
+        mais_rapido = min(o['data_prevista'] for o in opcoes.values())
+        return {f: o for f, o in opcoes.items() if o['data_prevista'] == mais_rapido}
+
+    @classmethod
+    def planejar(cls, linhas, frete_por_pedido=0, data_base=None):
+        """
+        Propõe os pedidos de compra para um conjunto de linhas.
+
+        Args:
+            linhas (list[dict]): ver `linhas_requisicao` / `linhas_orcamento`
+            frete_por_pedido (Decimal): custo fixo estimado de cada pedido
+            data_base (date): data de emissão considerada (padrão: hoje)
+
+        Returns:
+            dict: pedidos (um por fornecedor, com itens), sem_fornecedor,
+                  valor_itens, custo_pedidos, custo_total, otimo, nos e tempo_ms
+        """
+        inicio = time.perf_counter()
+        data_base = data_base or timezone.localdate()
+        frete = Decimal(str(frete_por_pedido or 0))
+
+        grupos = cls._agrupar(linhas)
+        candidatos = cls.candidatos([g['produto_id'] for g in grupos], data_base)
+
+        alocaveis, sem_fornecedor = [], []
+        for grupo in grupos:
+            opcoes = cls._opcoes(grupo, candidatos.get(grupo['produto_id'], {}), data_base)
+            if opcoes:
+                alocaveis.append((grupo, opcoes))
+            else:
+                sem_fornecedor.extend(grupo['linhas'])
+
+        escolha, otimo, nos = cls.otimizar(
+            [{f: o['custo_decisao'] for f, o in opcoes.items()} for _, opcoes in alocaveis],
+            float(frete),
+        )
+
+        pedidos = {}
+        for (grupo, opcoes), fornecedor_id in zip(alocaveis, escolha):
+            opcao = opcoes[fornecedor_id]
+            pedido = pedidos.setdefault(fornecedor_id, {
+                'fornecedor_id': fornecedor_id,
+                'fornecedor_nome': opcao['fornecedor_nome'],
+                'prazo_entrega': None,
+                'itens': [],
+                'valor_itens': Decimal('0'),
+                'custo_pedido': frete,
+            })
+            pedido['itens'].append({
+                'produto_id': grupo['produto_id'],
+                'produto_codigo': grupo['produto_codigo'],
+                'quantidade': grupo['quantidade'],
+                'quantidade_compra': opcao['quantidade_compra'],
+                'excedente': opcao['quantidade_compra'] - grupo['quantidade'],
+                'valor_unitario': opcao['valor_unitario'],
+                'valor_total': opcao['custo'],
+                'prazo_entrega': opcao['prazo_entrega'],
+                'data_prevista': opcao['data_prevista'],
+                'data_necessidade': grupo['data_necessidade'],
+                'atrasado': opcao['atrasado'],
+                'origem_preco': opcao['origem_preco'],
+                'alternativas': len(opcoes) - 1,
+                'linhas': grupo['linhas'],
+            })
+            pedido['valor_itens'] += opcao['custo']
+            if opcao['prazo_entrega'] is not None:
+                pedido['prazo_entrega'] = max(pedido['prazo_entrega'] or 0, opcao['prazo_entrega'])
+
+        propostos = sorted(pedidos.values(), key=lambda p: p['fornecedor_nome'])
+        for pedido in propostos:
+            pedido['itens'].sort(key=lambda i: i['produto_codigo'])
+
+        valor_itens = sum((p['valor_itens'] for p in propostos), Decimal('0'))
+        custo_pedidos = frete * len(propostos)
+        tempo_ms = (time.perf_counter() - inicio) * 1000
+        logger.info(
+            f"Alocação de compras: {len(grupos)} produtos em {len(propostos)} pedidos, "
+            f"{len(sem_fornecedor)} linhas sem fornecedor, ótimo={otimo}, {nos} nós, {tempo_ms:.0f} ms"
+        )
+        return {
+            'pedidos': propostos,
+            'sem_fornecedor': sem_fornecedor,
+            'atrasados': sum(1 for p in propostos for i in p['itens'] if i['atrasado']),
+            'valor_itens': valor_itens,
+            'custo_pedidos': custo_pedidos,
+            'custo_total': valor_itens + custo_pedidos,
+            'otimo': otimo,
+            'nos': nos,
+            'tempo_ms': round(tempo_ms, 1),
+        }
+
+    # =========================================================================
+    # OTIMIZAÇÃO
+    # =========================================================================
+
+    @classmethod
+    def otimizar(cls, custos, frete=0.0):
+        """
+        Escolhe um fornecedor por linha minimizando soma dos custos +
+        frete × fornecedores usados.
+
+        Args:
+            custos (list[dict]): {fornecedor_id: custo} das opções viáveis de cada linha
+            frete (float): custo fixo por fornecedor usado
+
+        Returns:
+            tuple: (fornecedor escolhido por linha, ótimo provado, nós explorados)
+        """
+        ordenados = [sorted((custo, f) for f, custo in linha.items()) for linha in custos]
+        if not ordenados:
+            return [], True, 0
+        if not frete:
+            return [opcoes[0][1] for opcoes in ordenados], True, 0
+
+        obrigatorios = frozenset(opcoes[0][1] for opcoes in ordenados if len(opcoes) == 1)
+        abertos = cls._busca_local(ordenados, {opcoes[0][1] for opcoes in ordenados}, obrigatorios, frete)
+        abertos, otimo, nos = cls._branch_and_bound(ordenados, abertos, obrigatorios, frete)
+        return [cls._melhor(opcoes, abertos)[1] for opcoes in ordenados], otimo, nos
+
+    @staticmethod
+    def _melhor(opcoes, abertos, exceto=None):
+        """Opção mais barata entre os fornecedores abertos"""
+        for custo, fornecedor in opcoes:
+            if fornecedor in abertos and fornecedor != exceto:
+                return custo, fornecedor
+        return None
+
+    @classmethod
+    def _custo(cls, ordenados, abertos, frete):
+        escolhas = [cls._melhor(opcoes, abertos) for opcoes in ordenados]
+        return sum(c for c, _ in escolhas) + frete * len({f for _, f in escolhas})
+
+    @classmethod
+    def _busca_local(cls, ordenados, abertos, obrigatorios, frete):
+        """Abre ou fecha um fornecedor por vez enquanto o custo total cair"""
+        por_fornecedor = defaultdict(list)
+        for indice, opcoes in enumerate(ordenados):
+            for custo, fornecedor in opcoes:
+                por_fornecedor[fornecedor].append((indice, custo))
+
+        for _ in range(2 * len(por_fornecedor)):
+            atual = [cls._melhor(opcoes, abertos) for opcoes in ordenados]
+            abertos = {f for _, f in atual}
+            melhor_delta, movimento = -1e-9, None
+
+            for fornecedor in abertos - obrigatorios:
+                delta = -frete
+                for indice, custo in por_fornecedor[fornecedor]:
+                    if atual[indice][1] != fornecedor:
+                        continue
+                    alternativa = cls._melhor(ordenados[indice], abertos, exceto=fornecedor)
+                    if alternativa is None:
+                        break
+                    delta += alternativa[0] - custo
+                else:
+                    if delta < melhor_delta:
+                        melhor_delta, movimento = delta, abertos - {fornecedor}
+
+            for fornecedor in por_fornecedor.keys() - abertos:
+                delta = frete + sum(
+                    min(0.0, custo - atual[indice][0]) for indice, custo in por_fornecedor[fornecedor]
+                )
+                if delta < melhor_delta:
+                    melhor_delta, movimento = delta, abertos | {fornecedor}
+
+            if movimento is None:
+                break
+            abertos = movimento
+        return abertos
+
+    @classmethod
+    def _branch_and_bound(cls, ordenados, abertos, obrigatorios, frete):
+        """
+        Busca exata sobre o conjunto de fornecedores abertos, partindo da
+        solução da busca local. O limite inferior cobra o frete só dos
+        fornecedores já abertos e usa, em cada linha, a opção mais barata
+        ainda não fechada. Para ao atingir LIMITE_NOS ou LIMITE_SEGUNDOS.
+        """
+        por_fornecedor = defaultdict(list)
+        for indice, opcoes in enumerate(ordenados):
+            for _, fornecedor in opcoes:
+                por_fornecedor[fornecedor].append(indice)
+        decidir = sorted(por_fornecedor.keys() - obrigatorios, key=lambda f: -len(por_fornecedor[f]))
+
+        melhor = {'custo': cls._custo(ordenados, abertos, frete), 'abertos': set(abertos)}
+        estado = {'nos': 0, 'interrompido': False}
+        inicio = time.perf_counter()
+
+        def ramificar(k, fixos, fechados, ponteiros, soma):
+            estado['nos'] += 1
+            if estado['nos'] > cls.LIMITE_NOS or (
+                estado['nos'] % 256 == 0 and time.perf_counter() - inicio > cls.LIMITE_SEGUNDOS
+            ):
+                estado['interrompido'] = True
+                return
+            if soma + frete * len(fixos) >= melhor['custo'] - 1e-9:
+                return
+            if k == len(decidir):
+                melhor['custo'] = soma + frete * len(fixos)
+                melhor['abertos'] = set(fixos)
+                return
+
+            fornecedor = decidir[k]
+            ramos = (True, False) if fornecedor in melhor['abertos'] else (False, True)
+            for abrir in ramos:
+                if estado['interrompido']:
+                    return
+                if abrir:
+                    ramificar(k + 1, fixos | {fornecedor}, fechados, ponteiros, soma)
+                    continue
+
+                # Fechar: linhas que estavam no fornecedor passam para a próxima opção
+                fechados_ramo = fechados | {fornecedor}
+                novos, nova_soma = ponteiros, soma
+                for indice in por_fornecedor[fornecedor]:
+                    opcoes = ordenados[indice]
+                    posicao = ponteiros[indice]
+                    if opcoes[posicao][1] != fornecedor:
+                        continue
+                    if novos is ponteiros:
+                        novos = list(ponteiros)
+                    seguinte = posicao + 1
+                    while seguinte < len(opcoes) and opcoes[seguinte][1] in fechados_ramo:
+                        seguinte += 1
+                    if seguinte == len(opcoes):
+                        break
+                    novos[indice] = seguinte
+                    nova_soma += opcoes[seguinte][0] - opcoes[posicao][0]
+                else:
+                    ramificar(k + 1, fixos, fechados_ramo, novos, nova_soma)
+
+        ramificar(
+            0, frozenset(obrigatorios), frozenset(), [0] * len(ordenados),
+            sum(opcoes[0][0] for opcoes in ordenados),
+        )
+        return melhor['abertos'], not estado['interrompido'], estado['nos']
+
+    # =========================================================================
+    # GRAVAÇÃO
+    # =========================================================================
+
+    @staticmethod
+    def criar_pedidos(plano, usuario, prioridade='NORMAL', observacoes=''):
+        """
+        Grava os pedidos propostos por `planejar`.
+
+        Cada linha de origem vira um item (mantendo o vínculo com o item da
+        requisição); o que for comprado a mais por causa da quantidade
+        mínima entra como item separado, sem vínculo.
+
+        Returns:
+            list[PedidoCompra]: pedidos criados
+        """
+        criados = []
+        with transaction.atomic():
+            for proposto in plano['pedidos']:
+                pedido = PedidoCompra(
+                    fornecedor_id=proposto['fornecedor_id'],
+                    prioridade=prioridade,
+                    observacoes=observacoes,
+                    observacoes_internas='Fornecedor escolhido pela alocação automática de compras',
+                    criado_por=usuario,
+                    atualizado_por=usuario,
+                )
+                if proposto['prazo_entrega'] is not None:
+                    pedido.prazo_entrega = proposto['prazo_entrega']
+                pedido.save()
+
+                for item in proposto['itens']:
+                    for linha in item['linhas']:
+                        ItemPedidoCompra.objects.create(
+                            pedido=pedido,
+                            produto_id=item['produto_id'],
+                            item_requisicao_id=linha.get('item_requisicao_id'),
+                            quantidade=linha['quantidade'],
+                            unidade=linha['unidade'],
+                            valor_unitario=item['valor_unitario'],
+                            observacoes=linha.get('observacoes') or '',
+                        )
+                    if item['excedente'] > 0:
+                        ItemPedidoCompra.objects.create(
+                            pedido=pedido,
+                            produto_id=item['produto_id'],
+                            quantidade=item['excedente'],
+                            unidade=item['linhas'][0]['unidade'],
+                            valor_unitario=item['valor_unitario'],
+                            observacoes='Complemento para a quantidade mínima do fornecedor',
+                        )
+
+                pedido.recalcular_valores()
+                criados.append(pedido)
+        return criados
@@ -0,0 +1,306 @@
+# core/services/auditoria.py
+
+"""
+Trilha de auditoria unificada.
+
+Cada ação sobre uma entidade vira um RegistroAuditoria com apenas os campos
+alterados ({campo: [antes, depois]}), em vez de instantâneos completos.
+Os registros de uma transação são acumulados e gravados com um único
+bulk_create no commit (transaction.on_commit); se a transação (ou o
+savepoint em que foram feitos) for desfeita, eles são descartados junto.
+
+No PostgreSQL a tabela é particionada por mês: garantir_particoes cria as
+partições dos próximos meses e arquivar exporta meses antigos para
+arquivos .jsonl.gz e remove as partições (DETACH + DROP). Em outros bancos
+a tabela é comum e o arquivamento apaga as linhas exportadas.
+"""
+
+import gzip
+import json
+import logging
+from datetime import date, datetime
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections, transaction
+from django.utils import timezone
+
+from core.models import RegistroAuditoria
+from core.utils.view_utils import paginar_keyset
+
+logger = logging.getLogger(__name__)
+
+TABELA = RegistroAuditoria._meta.db_table
+CAMPOS_EXPORTACAO = ('id', 'entidade', 'entidade_id', 'acao', 'observacao', 'alteracoes', 'usuario_id', 'criado_em')
+
+
+def _somar_meses(mes, quantidade):
+    """Primeiro dia do mês `quantidade` meses depois de `mes`"""
+    indice = mes.year * 12 + mes.month - 1 + quantidade
+    return date(indice // 12, indice % 12 + 1, 1)
+
+
+def _json(valor):
+    """Valor serializável (Decimal, datas e UUID viram texto)"""
+    return json.loads(json.dumps(valor, cls=DjangoJSONEncoder))
+
+
+class _LoteAuditoria:
+    """Registros pendentes de um nível de transação/savepoint"""
+
+    def __init__(self, using):
+        self.using = using
+        self.registros = []
+
+    def gravar(self):
+        if self.registros:
+            RegistroAuditoria.objects.using(self.using).bulk_create(self.registros)
+            self.registros = []
+
+
+class AuditoriaService:
+    """
+    Registro e consulta da trilha de auditoria
+    """
+
+    # =========================================================================
+    # REGISTRO
+    # =========================================================================
+
+    @staticmethod
+    def chave(instancia):
+        """(entidade, entidade_id) de uma instância"""
+        return instancia._meta.label_lower, str(instancia.pk)
+
+    @staticmethod
+    def instantaneo(instancia, campos=None):
+        """
+        Valores atuais dos campos concretos (FKs pelo id), serializáveis.
+
+        Args:
+            instancia: model
+            campos (iterable): nomes dos campos (padrão: todos os concretos)
+
+        Returns:
+            dict: {campo: valor}
+        """
+        resultado = {}
+        for campo in instancia._meta.concrete_fields:
+            if campos is not None and campo.name not in campos and campo.attname not in campos:
+                continue
+            resultado[campo.name] = _json(getattr(instancia, campo.attname))
+        return resultado
+
+    @staticmethod
+    def diferencas(antes, depois):
+        """
+        Campos cujo valor mudou.
+
+        Args:
+            antes (dict): {campo: valor}
+            depois (dict): {campo: valor}
+
+        Returns:
+            dict: {campo: [antes, depois]}
+        """
+        antes, depois = _json(antes or {}), _json(depois or {})
+        return {
+            campo: [antes.get(campo), depois.get(campo)]
+            for campo in sorted(set(antes) | set(depois))
+            if antes.get(campo) != depois.get(campo)
+        }
+
+    @staticmethod
+    def _lote(using):
+        """Lote do savepoint atual; registra o on_commit na primeira chamada"""
+        conexao = connections[using]
+        if conexao.in_atomic_block:
+            savepoints = set(conexao.savepoint_ids)
+            for ids, funcao, _ in conexao.run_on_commit:
+                if ids == savepoints and isinstance(getattr(funcao, '__self__', None), _LoteAuditoria):
+                    return funcao.__self__
+        return _LoteAuditoria(using)
+
+    @classmethod
+    def registrar(cls, instancia, acao, usuario=None, observacao='', antes=None, depois=None,
+                  alteracoes=None, using=DEFAULT_DB_ALIAS):
+        """
+        Registra uma ação; a gravação acontece no commit da transação.
+
+        Args:
+            instancia: entidade auditada (Proposta, PedidoCompra, Tarefa...)
+            acao (str): descrição curta da ação
+            usuario: quem executou (opcional)
+            observacao (str): texto livre
+            antes, depois (dict): instantâneos; só as diferenças são gravadas
+            alteracoes (dict): {campo: [antes, depois]} já calculado
+
+        Returns:
+            RegistroAuditoria: não salvo ainda se houver transação aberta
+        """
+        entidade, entidade_id = cls.chave(instancia)
+        if alteracoes is None:
+            alteracoes = cls.diferencas(antes, depois) if (antes or depois) else {}
+        registro = RegistroAuditoria(
+            entidade=entidade,
+            entidade_id=entidade_id,
+            acao=acao[:100],
+            observacao=observacao or '',
+            alteracoes=_json(alteracoes),
+            usuario=usuario if getattr(usuario, 'pk', None) else None,
+            criado_em=timezone.now(),
+        )
+
+        lote = cls._lote(using)
+        novo = not lote.registros
+        lote.registros.append(registro)
+        if novo:
+            transaction.on_commit(lote.gravar, using=using)
+        return registro
+
+    @classmethod
+    def registrar_varios(cls, instancias, acao, usuario=None, observacao='', using=DEFAULT_DB_ALIAS):
+        """A mesma ação para várias entidades (ex.: pedidos gerados em lote)"""
+        return [cls.registrar(i, acao, usuario, observacao, using=using) for i in instancias]
+
+    # =========================================================================
+    # CONSULTA
+    # =========================================================================
+
+    @classmethod
+    def historico(cls, instancia):
+        """Queryset dos registros da entidade, do mais recente ao mais antigo"""
+        entidade, entidade_id = cls.chave(instancia)
+        return RegistroAuditoria.objects.filter(
+            entidade=entidade, entidade_id=entidade_id
+        ).select_related('usuario').order_by('-criado_em', '-id')
+
+    @classmethod
+    def ultimas(cls, instancia, limite=10):
+        """As `limite` alterações mais recentes (uma query)"""
+        return list(cls.historico(instancia)[:limite])
+
+    @classmethod
+    def pagina(cls, instancia, request, itens_por_pagina=20):
+        """Página do histórico por chave (ver paginar_keyset)"""
+        return paginar_keyset(cls.historico(instancia), request, ('-criado_em', '-id'), itens_por_pagina)
+
+    # =========================================================================
+    # PARTIÇÕES E ARQUIVAMENTO
+    # =========================================================================
+
+    @staticmethod
+    def particionada(using=DEFAULT_DB_ALIAS):
+        return connections[using].vendor == 'postgresql'
+
+    @staticmethod
+    def nome_particao(mes):
+        return f'{TABELA}_p{mes:%Y%m}'
+
+    @classmethod
+    def garantir_particoes(cls, meses=3, using=DEFAULT_DB_ALIAS):
+        """
+        Cria as partições do mês atual e dos próximos (PostgreSQL).
+
+        Returns:
+            list[str]: partições criadas
+        """
+        if not cls.particionada(using):
+            return []
+        conexao = connections[using]
+        existentes = {nome for nome, _ in cls.particoes(using)}
+        inicio = timezone.localdate().replace(day=1)
+        criadas = []
+        for i in range(meses):
+            mes = _somar_meses(inicio, i)
+            nome = cls.nome_particao(mes)
+            if nome in existentes:
+                continue
+            try:
+                with transaction.atomic(using=using), conexao.cursor() as cursor:
+                    cursor.execute(
+                        f'CREATE TABLE {nome} PARTITION OF {TABELA} '
+                        f"FOR VALUES FROM ('{mes:%Y-%m-%d}') TO ('{_somar_meses(mes, 1):%Y-%m-%d}')"
+                    )
+                criadas.append(nome)
+            except DatabaseError as e:
+                # Ex.: a partição padrão já tem linhas desse mês
+                logger.warning(f"Não foi possível criar a partição {nome}: {e}")
+        if criadas:
+            logger.info(f"Partições de auditoria criadas: {', '.join(criadas)}")
+        return criadas
+
+    @staticmethod
+    def particoes(using=DEFAULT_DB_ALIAS):
+        """[(nome, primeiro dia do mês)] das partições mensais existentes"""
+        conexao = connections[using]
+        if conexao.vendor != 'postgresql':
+            return []
+        with conexao.cursor() as cursor:
+            cursor.execute(
+                "SELECT filha.relname FROM pg_inherits i "
+                "JOIN pg_class filha ON filha.oid = i.inhrelid "
+                "JOIN pg_class mae ON mae.oid = i.inhparent "
+                "WHERE mae.relname = %s",
+                [TABELA],
+            )
+            nomes = [linha[0] for linha in cursor.fetchall()]
+        resultado = []
+        prefixo = f'{TABELA}_p'
+        for nome in nomes:
+            sufixo = nome[len(prefixo):] if nome.startswith(prefixo) else ''
+            if len(sufixo) == 6 and sufixo.isdigit():
+                resultado.append((nome, date(int(sufixo[:4]), int(sufixo[4:]), 1)))
+        return sorted(resultado, key=lambda p: p[1])
+
+    @classmethod
+    def arquivar(cls, manter_meses, destino, simular=False, using=DEFAULT_DB_ALIAS):
+        """
+        Exporta os meses anteriores aos `manter_meses` mais recentes para
+        `destino`/auditoria_AAAAMM.jsonl.gz e os remove do banco.
+
+        Args:
+            manter_meses (int): meses mantidos, contando o atual
+            destino (Path): diretório dos arquivos
+            simular (bool): apenas conta
+
+        Returns:
+            list[dict]: mes, registros, arquivo e particao (nome ou None)
+        """
+        corte = _somar_meses(timezone.localdate().replace(day=1), -(manter_meses - 1))
+        conexao = connections[using]
+        particoes = {mes: nome for nome, mes in cls.particoes(using) if mes < corte}
+
+        registros = RegistroAuditoria.objects.using(using)
+        meses = {d.replace(day=1) for d in registros.filter(criado_em__lt=cls._inicio_do_dia(corte)).dates('criado_em', 'month')}
+        meses |= set(particoes)
+
+        resultado = []
+        for mes in sorted(meses):
+            faixa = registros.filter(
+                criado_em__gte=cls._inicio_do_dia(mes),
+                criado_em__lt=cls._inicio_do_dia(_somar_meses(mes, 1)),
+            )
+            arquivo = destino / f'auditoria_{mes:%Y%m}.jsonl.gz'
+            item = {'mes': mes, 'registros': faixa.count(), 'arquivo': arquivo, 'particao': particoes.get(mes)}
+            resultado.append(item)
+            if simular:
+                continue
+
+            destino.mkdir(parents=True, exist_ok=True)
+            with transaction.atomic(using=using):
+                # Modo "at": um novo membro gzip no fim, caso o mês já tenha arquivo
+                with gzip.open(arquivo, 'at', encoding='utf-8') as saida:
+                    for linha in faixa.order_by('criado_em', 'id').values(*CAMPOS_EXPORTACAO).iterator(chunk_size=2000):
+                        saida.write(json.dumps(linha, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n')
+                if item['particao']:
+                    with conexao.cursor() as cursor:
+                        cursor.execute(f'ALTER TABLE {TABELA} DETACH PARTITION {item["particao"]}')
+                        cursor.execute(f'DROP TABLE {item["particao"]}')
+                else:
+                    faixa.delete()
+            logger.info(f"Auditoria {mes:%m/%Y} arquivada: {item['registros']} registros em {arquivo}")
+        return resultado
+
+    @staticmethod
+    def _inicio_do_dia(dia):
+        return timezone.make_aware(datetime(dia.year, dia.month, dia.day))
@@ -6,9 +6,11 @@ from typing import Dict, Any, Union
 from django.db import transaction
 from django.db.models import Q
 
-from core.models import Produto, ParametrosGerais
+from core.models import Produto
 from core.services.dimensionamento import DimensionamentoService
 from core.services.pricing import PricingService
+from core.services.consumo_proposta import ConsumoPropostaService
+from core.services.duplicacao_proposta import DuplicacaoPropostaService
 
 # ✅ IMPORT PARA CABINE YAML
 from core.services.calculo_pedido_yaml import CalculoPedidoYAMLService
@@ -18,6 +20,8 @@ from .calculo_carrinho import CalculoCarrinhoService
 from .calculo_tracao import CalculoTracaoService
 from .calculo_sistemas import CalculoSistemasService
 from core.utils.formatters import extrair_especificacoes_do_pedido
+from core.utils.cache import parametros_gerais
+from core.utils.rastreio import rastrear
 
 logger = logging.getLogger(__name__)
 
@@ -49,7 +53,7 @@ class CalculoPedidoService:
         Retorna valores padrão se não existir registro.
         """
         try:
-            params = ParametrosGerais.objects.first()
+            params = parametros_gerais()
             if params:
                 return {
                     'percentual_mao_obra': params.percentual_mao_obra / Decimal('100'),
@@ -71,21 +75,82 @@ class CalculoPedidoService:
         }
 
     @staticmethod
-    def _calcular_custos_componentes(pedido, dimensionamento) -> Dict[str, Any]:
-        """
-        Calcula os custos de produção completos
-        ✅ YAML OBRIGATÓRIO PARA TUDO - SEM FALLBACK HARD-CODED
-        """
-
+    def carregar_custos_db(codigos=None) -> Dict[str, Produto]:
+        """Catálogo usado pelas regras YAML: {código: Produto} (MP/PI ativos e utilizados), opcionalmente só de `codigos`"""
         qs = Produto.objects.filter(
             utilizado=True,
             status='ATIVO',
         ).filter(
             Q(tipo__istartswith='MP') | Q(tipo__istartswith='PI')
         )
-        custos_db = {p.codigo.strip(): p for p in qs}
+        if codigos is not None:
+            qs = qs.filter(codigo__in=codigos)
+        return {p.codigo.strip(): p for p in qs}
+
+    @staticmethod
+    def formar_preco(custo_materiais, params, calcular_impostos) -> Dict[str, Any]:
+        """
+        Custos derivados do custo de materiais e formação de preço.
+        Usada pelo cálculo da proposta (valores Decimal) e pela tabela de
+        preços (arrays numpy, TabelaPrecosService.gerar).
+
+        Args:
+            custo_materiais: custo de materiais (Decimal ou np.ndarray)
+            params (dict): percentuais de _obter_parametros, no mesmo tipo numérico
+            calcular_impostos: função preço com comissão -> impostos
+
+        Returns:
+            dict: custo_mao_obra_producao, custo_indiretos_fabricacao, custo_instalacao,
+                  custo_producao, custo_total_projeto, margem_lucro, preco_com_margem,
+                  comissao, preco_com_comissao, impostos e preco_final
+        """
+        # MOD, indiretos, etc. (PARAMETRIZADO)
+        custo_mao_obra_producao = custo_materiais * params['percentual_mao_obra']
+        custo_indiretos_fabricacao = custo_materiais * params['percentual_indiretos_fabricacao']
+        custo_instalacao = custo_materiais * params['percentual_instalacao']
+
+        # CUSTO DE PRODUÇÃO = só fábrica (SEM instalação)
+        custo_producao = custo_materiais + custo_mao_obra_producao + custo_indiretos_fabricacao
+
+        # CUSTO TOTAL DO PROJETO
+        custo_total_projeto = custo_producao + custo_instalacao
+
+        # FORMAÇÃO DE PREÇO LINEAR (PARAMETRIZADO)
+        margem_lucro = custo_total_projeto * params['margem_padrao']
+        preco_com_margem = custo_total_projeto + margem_lucro
+
+        comissao = preco_com_margem * params['comissao_padrao']
+        preco_com_comissao = preco_com_margem + comissao
+
+        impostos = calcular_impostos(preco_com_comissao)
+        preco_final = preco_com_comissao + impostos
+
+        return {
+            'custo_mao_obra_producao': custo_mao_obra_producao,
+            'custo_indiretos_fabricacao': custo_indiretos_fabricacao,
+            'custo_instalacao': custo_instalacao,
+            # Totais de custo
+            'custo_producao': custo_producao,
+            'custo_total_projeto': custo_total_projeto,
+            # Formação de preço
+            'margem_lucro': margem_lucro,
+            'preco_com_margem': preco_com_margem,
+            'comissao': comissao,
+            'preco_com_comissao': preco_com_comissao,
+            'impostos': impostos,
+            'preco_final': preco_final,
+        }
+
+    @staticmethod
+    def _calcular_custos_componentes(pedido, dimensionamento) -> Dict[str, Any]:
+        """
+        Calcula os custos de produção completos
+        ✅ YAML OBRIGATÓRIO PARA TUDO - SEM FALLBACK HARD-CODED
+        """
+
+        custos_db = CalculoPedidoService.carregar_custos_db()
 
-        logger.info(f"Produtos disponíveis para cálculo: {len(custos_db)}")
+        rastrear('catalogo', "Produtos disponíveis para cálculo: %s", len(custos_db))
 
         componentes_consolidados = {}
         custos_por_categoria = {}
@@ -98,7 +163,6 @@ class CalculoPedidoService:
         # 1. CABINE - YAML OBRIGATÓRIO
         # =================================================================
         try:
-            logger.info("🔥 CALCULANDO CABINE VIA YAML...")
             resultado_wrap = yaml_service.calcular_completo(pedido, dimensionamento, categorias=['cabine'])
             resultado_cabine_yaml = resultado_wrap['categorias']['CABINE']
 
@@ -115,7 +179,7 @@ class CalculoPedidoService:
             
             componentes_consolidados["CABINE"] = cabine_compativel
             custos_por_categoria['CABINE'] = safe_decimal(resultado_cabine_yaml.get('total_categoria', 0))
-            logger.info(f"✅ CABINE YAML: R$ {custos_por_categoria['CABINE']}")
+            rastrear('categoria', "CABINE: R$ %s", custos_por_categoria['CABINE'])
             
         except Exception as e:
             logger.error(f"❌ ERRO CRÍTICO - CABINE YAML falhou: {e}")
@@ -125,7 +189,6 @@ class CalculoPedidoService:
         # 2. CARRINHO - YAML OBRIGATÓRIO (SEM FALLBACK)
         # =================================================================
         try:
-            logger.info("🔥 CALCULANDO CARRINHO VIA YAML...")
             resultado_wrap = yaml_service.calcular_completo(pedido, dimensionamento, categorias=['carrinho'])
             resultado_carrinho_yaml = resultado_wrap['categorias']['CARRINHO']
 
@@ -143,7 +206,7 @@ class CalculoPedidoService:
             
             componentes_consolidados["CARRINHO"] = carrinho_compativel
             custos_por_categoria['CARRINHO'] = safe_decimal(resultado_carrinho_yaml.get('total_categoria', 0))
-            logger.info(f"✅ CARRINHO YAML: R$ {custos_por_categoria['CARRINHO']}")
+            rastrear('categoria', "CARRINHO: R$ %s", custos_por_categoria['CARRINHO'])
             
         except Exception as e:
             logger.error(f"❌ ERRO CRÍTICO - CARRINHO YAML falhou: {e}")
@@ -154,7 +217,6 @@ class CalculoPedidoService:
         # 3. TRAÇÃO - YAML OBRIGATÓRIO (SEM FALLBACK)
         # =================================================================
         try:
-            logger.info("🔥 CALCULANDO TRAÇÃO VIA YAML...")
             resultado_wrap = yaml_service.calcular_completo(pedido, dimensionamento, categorias=['tracao'])
             resultado_tracao_yaml = resultado_wrap['categorias']['TRACAO']
 
@@ -172,7 +234,7 @@ class CalculoPedidoService:
             
             componentes_consolidados["TRACAO"] = tracao_compativel
             custos_por_categoria['TRACAO'] = safe_decimal(resultado_tracao_yaml.get('total_categoria', 0))
-            logger.info(f"✅ TRAÇÃO YAML: R$ {custos_por_categoria['TRACAO']}")
+            rastrear('categoria', "TRACAO: R$ %s", custos_por_categoria['TRACAO'])
             
         except Exception as e:
             logger.error(f"❌ ERRO CRÍTICO - TRAÇÃO YAML falhou: {e}")
@@ -183,7 +245,6 @@ class CalculoPedidoService:
         # 4. SISTEMAS - YAML OBRIGATÓRIO (SEM FALLBACK)
         # =================================================================
         try:
-            logger.info("🔥 CALCULANDO SISTEMAS VIA YAML...")
             resultado_wrap = yaml_service.calcular_completo(pedido, dimensionamento, categorias=['sistemas'])
             resultado_sistemas_yaml = resultado_wrap['categorias']['SIST_COMPLEMENTARES']
 
@@ -201,7 +262,7 @@ class CalculoPedidoService:
             
             componentes_consolidados["SIST_COMPLEMENTARES"] = sistemas_compativel
             custos_por_categoria['SIST_COMPLEMENTARES'] = safe_decimal(resultado_sistemas_yaml.get('total_categoria', 0))
-            logger.info(f"✅ SISTEMAS YAML: R$ {custos_por_categoria['SIST_COMPLEMENTARES']}")
+            rastrear('categoria', "SIST_COMPLEMENTARES: R$ %s", custos_por_categoria['SIST_COMPLEMENTARES'])
             
         except Exception as e:
             logger.error(f"❌ ERRO CRÍTICO - SISTEMAS YAML falhou: {e}")
@@ -213,65 +274,27 @@ class CalculoPedidoService:
         # =================================================================
 
         custo_materiais = sum(custos_por_categoria.values())
-        logger.info(f"📊 TOTAL MATERIAIS: R$ {custo_materiais}")
+        rastrear('preco', "Total materiais: R$ %s", custo_materiais)
 
         # ✅ OBTER PARÂMETROS DO BANCO DE DADOS
         params = CalculoPedidoService._obter_parametros()
-        logger.info(f"📋 Parâmetros: MOD={params['percentual_mao_obra']*100}%, "
-                    f"Indiretos={params['percentual_indiretos_fabricacao']*100}%, "
-                    f"Instalação={params['percentual_instalacao']*100}%, "
-                    f"Margem={params['margem_padrao']*100}%, "
-                    f"Comissão={params['comissao_padrao']*100}%")
+        rastrear('parametros', "Parâmetros de formação de preço", dados=params)
 
-        # MOD, indiretos, etc. (PARAMETRIZADO)
-        custo_mao_obra_producao = custo_materiais * params['percentual_mao_obra']
-        custo_indiretos_fabricacao = custo_materiais * params['percentual_indiretos_fabricacao']
-        custo_instalacao = custo_materiais * params['percentual_instalacao']
-
-        # CUSTO DE PRODUÇÃO = só fábrica (SEM instalação)
-        custo_producao = custo_materiais + custo_mao_obra_producao + custo_indiretos_fabricacao
+        formacao = CalculoPedidoService.formar_preco(custo_materiais, params, pedido.calcular_impostos_dinamicos)
 
-        # CUSTO TOTAL DO PROJETO
-        custo_total_projeto = custo_producao + custo_instalacao
-
-        # FORMAÇÃO DE PREÇO LINEAR (PARAMETRIZADO)
-        margem_lucro = custo_total_projeto * params['margem_padrao']
-        preco_com_margem = custo_total_projeto + margem_lucro
-
-        comissao = preco_com_margem * params['comissao_padrao']
-        preco_com_comissao = preco_com_margem + comissao
+        rastrear(
+            'preco', "Custo total R$ %s, preço com comissão R$ %s, impostos R$ %s, preço final R$ %s",
+            formacao['custo_total_projeto'], formacao['preco_com_comissao'],
+            formacao['impostos'], formacao['preco_final'],
+        )
 
-        impostos = pedido.calcular_impostos_dinamicos(preco_com_comissao)
-        preco_final = preco_com_comissao + impostos
-        
-        # LOGS DE SUCESSO TOTAL
-        logger.info(f"=== SUCESSO: TODOS OS CÁLCULOS VIA YAML ===")
-        logger.info(f"  - CABINE (YAML): R$ {custos_por_categoria.get('CABINE', 0)}")
-        logger.info(f"  - CARRINHO (YAML): R$ {custos_por_categoria.get('CARRINHO', 0)}")
-        logger.info(f"  - TRAÇÃO (YAML): R$ {custos_por_categoria.get('TRACAO', 0)}")
-        logger.info(f"  - SISTEMAS (YAML): R$ {custos_por_categoria.get('SIST_COMPLEMENTARES', 0)}")
-        logger.info(f"  - TOTAL MATERIAIS: R$ {custo_materiais}")
-        logger.info(f"  - PREÇO FINAL: R$ {preco_final}")
-        logger.info(f"===== 🎉 TUDO FUNCIONANDO VIA YAML! =====")
-        
         return {
             'componentes': componentes_consolidados,
             'custos_por_categoria': custos_por_categoria,
             # Custos base
             'custo_materiais': custo_materiais,
-            'custo_mao_obra_producao': custo_mao_obra_producao,
-            'custo_indiretos_fabricacao': custo_indiretos_fabricacao,
-            'custo_instalacao': custo_instalacao,
-            # Totais de custo
-            'custo_producao': custo_producao,
-            'custo_total_projeto': custo_total_projeto,
-            # Formação de preço
-            'margem_lucro': margem_lucro,
-            'preco_com_margem': preco_com_margem,
-            'comissao': comissao,
-            'preco_com_comissao': preco_com_comissao,
-            'impostos': impostos,
-            'preco_final': preco_final,
+            # Custos derivados, totais e formação de preço
+            **formacao,
             # Outros
             'total_componentes': len(componentes_consolidados),
             # ✅ TODOS VIA YAML
@@ -303,27 +326,25 @@ class CalculoPedidoService:
         ✅ MANTIDO: Só mudou a parte de cálculo de materiais para híbrido
         """
         try:
-            logger.info(f"Iniciando cálculo completo HÍBRIDO para pedido {pedido.numero}")
+            rastrear('inicio', "Cálculo completo da proposta %s", pedido.numero)
             
             # 1. Extrair especificações do pedido
             especificacoes = extrair_especificacoes_do_pedido(pedido)
-            logger.info(f"Especificações extraídas: {list(especificacoes.keys())}")
+            rastrear('especificacoes', "%s especificações extraídas", len(especificacoes), dados=especificacoes)
             
             # 2. Calcular dimensionamento
             dimensionamento, explicacao_dimensionamento = DimensionamentoService.calcular_dimensionamento_completo(especificacoes)
-            logger.info(f"Dimensionamento calculado - Cabine: {dimensionamento.get('cab', {}).get('largura', 0)}x{dimensionamento.get('cab', {}).get('compr', 0)}m")
+            rastrear('dimensionamento', "Cabine %s x %s m", dimensionamento.get('cab', {}).get('largura', 0),
+                     dimensionamento.get('cab', {}).get('compr', 0), dados=dimensionamento)
             
             # 3. ✅ HÍBRIDO: Calcular custos (CABINE YAML + resto hard-coded)
             custos_resultado = CalculoPedidoService._calcular_custos_componentes(pedido, dimensionamento)
-            logger.info(f"Custos HÍBRIDOS calculados - Total: R$ {custos_resultado['custo_total_projeto']}")
-            logger.info(f"Método usado: {custos_resultado['metodo_usado']}")
             
             # 4. Calcular formação de preço (compatibilidade)
             formacao_preco_result = PricingService.calcular_formacao_preco(
                 custos_resultado['custo_total_projeto'], 
                 pedido.faturado_por
             )
-            logger.info(f"Preço calculado - Sugerido: R$ {custos_resultado['preco_final']}")
             
             # 5. Montar ficha técnica
             ficha_tecnica = CalculoPedidoService._montar_ficha_tecnica(pedido, dimensionamento, custos_resultado)
@@ -334,7 +355,7 @@ class CalculoPedidoService:
                 custos_resultado, formacao_preco_result, ficha_tecnica
             )
             
-            logger.info(f"✅ Cálculo HÍBRIDO completo finalizado para pedido {pedido.numero}")
+            rastrear('fim', "Cálculo da proposta %s concluído", pedido.numero)
             
             return {
                 'success': True,
@@ -466,9 +487,15 @@ class CalculoPedidoService:
         if pedido.status == 'rascunho':
             if pedido.preco_venda_calculado:
                 pedido.status = 'simulado'
+
+        # Entradas deste cálculo (DuplicacaoPropostaService reaproveita se não mudarem)
+        pedido.assinatura_calculo = DuplicacaoPropostaService.assinatura(pedido)
         
         pedido.save()
-        logger.info(f"Cálculos HÍBRIDOS salvos no pedido {pedido.numero}")
+
+        # Índice reverso código → proposta (re-custeio direcionado)
+        ConsumoPropostaService.registrar(pedido, custos_resultado['componentes'])
+        rastrear('gravacao', "Cálculos gravados na proposta %s", pedido.numero)
 
     # ============================================================================
     # MÉTODOS ADICIONAIS MANTIDOS IGUAIS
@@ -478,7 +505,7 @@ class CalculoPedidoService:
     def recalcular_proposta_existente(pedido):
         """Recalcula uma proposta existente mantendo valores negociados"""
         try:
-            logger.info(f"Recalculando proposta existente {pedido.numero} - MODO HÍBRIDO")
+            rastrear('inicio', "Recálculo da proposta %s (mantendo valor negociado)", pedido.numero)
             
             # Salvar valor negociado atual
             valor_proposta_atual = pedido.valor_proposta
@@ -502,13 +529,66 @@ class CalculoPedidoService:
                 
                 pedido.save()
             
-            logger.info(f"Recálculo HÍBRIDO finalizado para proposta {pedido.numero}")
             return resultado
             
         except Exception as e:
             logger.error(f"Erro no recálculo HÍBRIDO da proposta {pedido.numero}: {str(e)}")
             raise ValueError(f"Erro no recálculo: {str(e)}")
 
+    @staticmethod
+    def calcular_com_rastreio(pedido, gravar: bool = False, usuario=None) -> Dict[str, Any]:
+        """
+        Executa o cálculo completo com rastreio, sem alterar a proposta
+        (tudo que o cálculo grava é desfeito ao final).
+
+        Args:
+            pedido: Proposta a calcular
+            gravar (bool): grava o rastreio em RastreioCalculoProposta
+            usuario: autor do rastreio gravado
+
+        Returns:
+            dict: 'sucesso', 'erro', 'duracao_ms', 'eventos' (formatados),
+                  'descartados' e 'registro' (RastreioCalculoProposta ou None)
+        """
+        from core.models import RastreioCalculoProposta
+        from core.utils.rastreio import rastreando
+
+        erro = ''
+        with rastreando(f"Proposta {pedido.numero}") as rastreio:
+            try:
+                with transaction.atomic():
+                    CalculoPedidoService.calcular_custos_completo(pedido)
+                    transaction.set_rollback(True)
+            except Exception as e:
+                logger.warning(f"Rastreio da proposta {pedido.numero} terminou com erro: {e}")
+                erro = str(e) or e.__class__.__name__
+            rastreio.encerrar()
+
+        # O banco voltou ao estado anterior; o objeto em memória também
+        pedido.refresh_from_db()
+
+        eventos = rastreio.eventos_formatados()
+        registro = None
+        if gravar:
+            registro = RastreioCalculoProposta.objects.create(
+                proposta=pedido,
+                criado_por=usuario,
+                descricao=rastreio.descricao,
+                duracao_ms=round(rastreio.duracao_ms, 3),
+                sucesso=not erro,
+                erro=erro,
+                eventos=eventos,
+            )
+
+        return {
+            'sucesso': not erro,
+            'erro': erro,
+            'duracao_ms': round(rastreio.duracao_ms, 3),
+            'eventos': eventos,
+            'descartados': rastreio.descartados,
+            'registro': registro,
+        }
+
     @staticmethod
     def obter_resumo_custos(pedido) -> Dict[str, Any]:
         """Retorna resumo dos custos de uma proposta"""
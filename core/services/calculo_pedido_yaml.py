@@ -9,6 +9,7 @@ import yaml
 from jinja2 import Environment, BaseLoader, StrictUndefined
 
 from core.models import Produto
+from core.utils.rastreio import rastrear
 
 logger = logging.getLogger(__name__)
 __PARSER_VERSION__ = "yaml-v2.0.0 (avançado com ranges e operadores)"
@@ -125,6 +126,9 @@ class AdvancedTemplateProcessor:
         self.env.filters["max"] = lambda x, y: max(float(x), float(y))
         self.env.filters["min"] = lambda x, y: min(float(x), float(y))
 
+        # Templates compilados (as mesmas expressões se repetem entre regras e cálculos)
+        self._compilados: Dict[str, Any] = {}
+
     def _advanced_round(self, value: Any, precision: int = 0, method: str = 'round') -> float:
         """
         Filtro de arredondamento avançado
@@ -147,7 +151,10 @@ class AdvancedTemplateProcessor:
         if not isinstance(tpl, str):
             return str(tpl)
         try:
-            return self.env.from_string(tpl).render(**context)
+            compilado = self._compilados.get(tpl)
+            if compilado is None:
+                compilado = self._compilados[tpl] = self.env.from_string(tpl)
+            return compilado.render(**context)
         except Exception as e:
             logger.error(f"[TPL] Erro ao renderizar '{tpl}': {e}")
             return ""
@@ -319,6 +326,10 @@ class AdvancedSubcategoriaProcessor:
             if not item.get("skip", False):
                 itens.append(item)
                 total_sub += d(item.get("valor_total", 0))
+                rastrear(
+                    "regra", "%s / %s: %s x %s = R$ %s", nome_subcat, item.get("nome"),
+                    item.get("codigo"), item.get("quantidade"), item.get("valor_total"),
+                )
                 
             if not item.get("sucesso", True):
                 erros.extend(item.get("erros", []))
@@ -339,9 +350,6 @@ class AdvancedContextBuilder:
     @staticmethod
     def build(pedido: Any, dimensionamento: Dict[str, Any]) -> Dict[str, Any]:
         """Constrói contexto completo e detalhado para TODOS os YAMLs avançados"""
-        import logging
-        logger = logging.getLogger(__name__)
-        
         cab = dimensionamento.get("cab", {}) or {}
         cab.setdefault("pnl", {})
         cab.setdefault("chp", {})
@@ -381,11 +389,13 @@ class AdvancedContextBuilder:
             "tracao_cabine": float(cab.get('tracao', 0) or 0),
         }
 
-        # ✅ DEBUG COMPLETO
-        logger.info(f"=== CONTEXTO AVANÇADO PARA TODOS OS YAMLs ===")
-        logger.info(f"📊 DIMENSIONAMENTO: capacidade={cab.get('capacidade')}, largura={cab.get('largura')}, compr={cab.get('compr')}")
-        logger.info(f"🎨 ESPECIFICAÇÕES: acionamento='{ctx['acionamento']}', tracao='{ctx['tracao']}', contrapeso='{ctx['contrapeso']}'")
-        logger.info(f"📏 POÇO: {ctx['largura_poco']}x{ctx['comprimento_poco']}x{ctx['altura_poco']}m, {ctx['pavimentos']} pavimentos")
+        rastrear(
+            "contexto", "Cabine %s x %s m, capacidade %s; %s/%s/%s; poço %sx%sx%s m, %s pavimentos",
+            cab.get("largura"), cab.get("compr"), cab.get("capacidade"),
+            ctx["acionamento"], ctx["tracao"], ctx["contrapeso"],
+            ctx["largura_poco"], ctx["comprimento_poco"], ctx["altura_poco"], ctx["pavimentos"],
+            dados=ctx,
+        )
 
         context = {
             "ctx": ctx,
@@ -406,11 +416,18 @@ class CalculoPedidoYAMLService:
         self.custos_db = custos_db
         self.template_proc = AdvancedTemplateProcessor()
         self.subcat_proc = AdvancedSubcategoriaProcessor(self.template_proc, custos_db)
-        logger.info(f"[CalculoPedidoYAMLService] carregado {__PARSER_VERSION__}")
+        self._yaml_cache: Dict[str, Dict[str, Any]] = {}
+        logger.debug("[CalculoPedidoYAMLService] carregado %s", __PARSER_VERSION__)
 
     def _load_yaml_dict(self, categoria_slug: str) -> Dict[str, Any]:
-        from core.models.regras_yaml import RegraYAML
+        """YAML ativo da categoria, lido e parseado uma vez por instância do serviço"""
         slug = (categoria_slug or "").strip().lower()
+        if slug not in self._yaml_cache:
+            self._yaml_cache[slug] = self._ler_yaml_dict(slug)
+        return self._yaml_cache[slug]
+
+    def _ler_yaml_dict(self, slug: str) -> Dict[str, Any]:
+        from core.models.regras_yaml import RegraYAML
 
         registro = (
             RegraYAML.objects.filter(ativa=True, tipo__iexact=slug)
@@ -429,7 +446,21 @@ class CalculoPedidoYAMLService:
             raise ValueError("Estrutura YAML raiz não é dict.")
         return data
 
+    def definir_yaml(self, categoria_slug: str, conteudo: str) -> None:
+        """Usa `conteudo` no lugar da regra ativa da categoria (simulação de uma nova versão)"""
+        slug = (categoria_slug or "").strip().lower()
+        data = yaml.safe_load(conteudo or "") or {}
+        if not isinstance(data, dict):
+            raise ValueError("Estrutura YAML raiz não é dict.")
+        self._yaml_cache[slug] = data
+
     def calcular_categoria(self, categoria_slug: str, pedido: Any, dimensionamento: Dict[str, Any]) -> Dict[str, Any]:
+        # ✅ USAR CONTEXT BUILDER AVANÇADO
+        context = AdvancedContextBuilder.build(pedido, dimensionamento)
+        return self.calcular_categoria_com_contexto(categoria_slug, context)
+
+    def calcular_categoria_com_contexto(self, categoria_slug: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Calcula a categoria sobre um contexto já montado (AdvancedContextBuilder.build)"""
         slug = (categoria_slug or "").strip().lower()
         if not slug:
             raise ValueError("Categoria não informada.")
@@ -444,9 +475,6 @@ class CalculoPedidoYAMLService:
         if not isinstance(subcats, dict):
             raise ValueError(f"Categoria '{nome_categoria}' sem 'subcategorias' válidas.")
 
-        # ✅ USAR CONTEXT BUILDER AVANÇADO
-        context = AdvancedContextBuilder.build(pedido, dimensionamento)
-
         resultado_subcats: Dict[str, Any] = {}
         erros_cat: List[str] = []
         total_categoria = Decimal("0.00")
@@ -454,10 +482,10 @@ class CalculoPedidoYAMLService:
 
         for nome_subcat, subdef in subcats.items():
             subres = self.subcat_proc.process_subcategoria(nome_subcat, subdef, context)
-            
+            itens_lista = subres.get('itens', [])
+
             # ✅ CONVERTER para compatibilidade com template
             if 'itens' in subres and isinstance(subres['itens'], list):
-                itens_lista = subres['itens']
                 itens_dict = {}
                 for item in itens_lista:
                     codigo = item.get('codigo', item.get('nome', f'item_{len(itens_dict)}'))
@@ -468,7 +496,8 @@ class CalculoPedidoYAMLService:
             total_categoria += d(subres.get("total_subcategoria", 0))
             if not subres.get("sucesso", True):
                 erros_cat.extend(subres.get("erros", []))
-            itens_flat.extend(subres.get("itens", []) if isinstance(subres.get("itens", []), list) else list(subres.get("itens", {}).values()))
+            # Lista completa (o dict por código acima colapsa códigos repetidos na subcategoria)
+            itens_flat.extend(itens_lista)
 
         return {
             "categoria": nome_categoria,
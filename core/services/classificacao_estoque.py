@@ -0,0 +1,230 @@
+# core/services/classificacao_estoque.py
+
+"""
+Classificação ABC / XYZ de estoque calculada em lote.
+
+O consumo vem do razão (saídas do MovimentoEstoque) e dos consumos de OP
+(ItemConsumoOP), lidos com agrupamento por produto/mês no banco e processados
+com pandas/NumPy. O resultado é gravado em ClassificacaoEstoque, que é a
+tabela lida pelas telas e relatórios.
+"""
+
+import logging
+from datetime import date
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import DecimalField, ExpressionWrapper, F, Max, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from core.models import ClassificacaoEstoque, ItemConsumoOP, MovimentoEstoque, Produto
+
+logger = logging.getLogger(__name__)
+
+
+class ClassificacaoEstoqueService:
+    """
+    Serviço de classificação ABC (valor) e XYZ (variabilidade da demanda)
+    """
+
+    # Faixas de % acumulado do valor consumido
+    LIMITE_A = 0.80
+    LIMITE_B = 0.95
+
+    # Faixas de coeficiente de variação do consumo mensal
+    LIMITE_X = 0.50
+    LIMITE_Y = 1.00
+
+    TIPOS_CONSUMO = ('saida',)
+
+    @staticmethod
+    def _meses_periodo(data_base, meses):
+        """Primeiro dia de cada mês do período (mais antigo primeiro)"""
+        ano, mes = data_base.year, data_base.month
+        periodo = []
+        for _ in range(meses):
+            periodo.append(date(ano, mes, 1))
+            mes -= 1
+            if mes == 0:
+                ano, mes = ano - 1, 12
+        return list(reversed(periodo))
+
+    @classmethod
+    def _consumo_mensal(cls, inicio, fim):
+        """
+        Consumo por produto e mês: saídas do razão + consumos de OP,
+        em uma única ida ao banco (UNION ALL de dois agrupamentos).
+        """
+        valor = DecimalField(max_digits=18, decimal_places=4)
+
+        saidas = MovimentoEstoque.objects.filter(
+            tipo__in=cls.TIPOS_CONSUMO,
+            data_movimento__gte=inicio,
+            data_movimento__lte=fim,
+        ).annotate(
+            mes=TruncMonth('data_movimento'),
+        ).values('produto_id', 'mes').annotate(
+            quantidade_mes=Sum('quantidade'),
+            valor_mes=Sum(ExpressionWrapper(F('quantidade') * F('custo_unitario'), output_field=valor)),
+        ).order_by()
+
+        consumos_op = ItemConsumoOP.objects.filter(
+            status='consumido',
+            ordem_producao__data_fim_real__gte=inicio,
+            ordem_producao__data_fim_real__lte=fim,
+        ).annotate(
+            mes=TruncMonth('ordem_producao__data_fim_real'),
+        ).values('produto_id', 'mes').annotate(
+            quantidade_mes=Sum('quantidade_consumida'),
+            valor_mes=Sum(ExpressionWrapper(F('quantidade_consumida') * F('custo_unitario_real'), output_field=valor)),
+        ).order_by()
+
+        return list(saidas.union(consumos_op, all=True))
+
+    @staticmethod
+    def _ultimos_movimentos():
+        """Data do último movimento (razão ou consumo de OP) por produto"""
+        ultimos = dict(
+            MovimentoEstoque.objects.values('produto_id').annotate(
+                ultimo=Max('data_movimento')
+            ).values_list('produto_id', 'ultimo')
+        )
+        for produto_id, ultimo in ItemConsumoOP.objects.filter(
+            status='consumido', ordem_producao__data_fim_real__isnull=False
+        ).values('produto_id').annotate(
+            ultimo=Max('ordem_producao__data_fim_real')
+        ).values_list('produto_id', 'ultimo'):
+            if ultimo and (produto_id not in ultimos or ultimo > ultimos[produto_id]):
+                ultimos[produto_id] = ultimo
+        return ultimos
+
+    @classmethod
+    def calcular(cls, meses=12, data_base=None):
+        """
+        Calcula a classificação de todos os produtos ativos que controlam estoque.
+
+        Args:
+            meses (int): quantidade de meses de consumo analisados
+            data_base (date): fim do período (padrão: hoje)
+
+        Returns:
+            pandas.DataFrame indexado por produto_id
+        """
+        import numpy as np
+        import pandas as pd
+
+        if meses < 1:
+            raise ValueError(f"meses deve ser pelo menos 1 (recebido: {meses})")
+
+        data_base = data_base or date.today()
+        periodo = cls._meses_periodo(data_base, meses)
+
+        produtos = list(Produto.objects.filter(
+            status='ATIVO', controla_estoque=True
+        ).values_list('id', flat=True))
+        resultado = pd.DataFrame(index=pd.Index(produtos, name='produto_id'))
+
+        # Consumo mensal -> matriz produto x mês (zeros onde não houve consumo)
+        consumo = pd.DataFrame.from_records(
+            cls._consumo_mensal(periodo[0], data_base),
+            columns=['produto_id', 'mes', 'quantidade_mes', 'valor_mes'],
+        )
+        if not consumo.empty:
+            consumo['mes'] = pd.to_datetime(consumo['mes']).dt.date
+            consumo['quantidade_mes'] = consumo['quantidade_mes'].astype(float)
+            consumo['valor_mes'] = consumo['valor_mes'].fillna(0).astype(float)
+
+        matriz = consumo.pivot_table(
+            index='produto_id', columns='mes', values='quantidade_mes',
+            aggfunc='sum', fill_value=0.0,
+        ).reindex(index=resultado.index, columns=periodo, fill_value=0.0)
+        valores = consumo.groupby('produto_id')['valor_mes'].sum().reindex(resultado.index, fill_value=0.0)
+
+        quantidades = matriz.to_numpy(dtype=float)
+        resultado['quantidade_consumida'] = quantidades.sum(axis=1)
+        resultado['valor_consumido'] = valores.to_numpy(dtype=float)
+        media = quantidades.mean(axis=1)
+        desvio = quantidades.std(axis=1)
+        resultado['consumo_medio_mensal'] = media
+
+        # XYZ: coeficiente de variação do consumo mensal
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cv = np.where(media > 0, desvio / media, np.nan)
+        resultado['coeficiente_variacao'] = cv
+        resultado['classe_xyz'] = np.select(
+            [cv <= cls.LIMITE_X, cv <= cls.LIMITE_Y],
+            ['X', 'Y'],
+            default='Z',
+        )
+
+        # ABC: % acumulado do valor consumido (ordem decrescente)
+        resultado = resultado.sort_values('valor_consumido', ascending=False, kind='stable')
+        total = resultado['valor_consumido'].sum()
+        acumulado = resultado['valor_consumido'].cumsum()
+        if total > 0:
+            resultado['percentual_acumulado'] = acumulado / total
+            anterior = (acumulado - resultado['valor_consumido']) / total
+        else:
+            resultado['percentual_acumulado'] = 0.0
+            anterior = pd.Series(1.0, index=resultado.index)
+        resultado['classe_abc'] = np.select(
+            [(resultado['valor_consumido'] > 0) & (anterior < cls.LIMITE_A),
+             (resultado['valor_consumido'] > 0) & (anterior < cls.LIMITE_B)],
+            ['A', 'B'],
+            default='C',
+        )
+
+        # Dias sem movimento (0 para movimento posterior à data base)
+        ultimos = cls._ultimos_movimentos()
+        resultado['ultimo_movimento'] = [ultimos.get(produto_id) for produto_id in resultado.index]
+        resultado['dias_sem_movimento'] = [
+            max((data_base - ultimo).days, 0) if ultimo else None
+            for ultimo in resultado['ultimo_movimento']
+        ]
+
+        return resultado
+
+    @classmethod
+    def atualizar(cls, meses=12, data_base=None):
+        """
+        Recalcula e grava a tabela ClassificacaoEstoque (substituição completa).
+
+        Returns:
+            dict: total de produtos por classe ABC
+        """
+        import pandas as pd
+
+        resultado = cls.calcular(meses=meses, data_base=data_base)
+        agora = timezone.now()
+
+        def _decimal(valor, casas):
+            if valor is None or pd.isna(valor):
+                return None
+            return Decimal(str(round(float(valor), casas)))
+
+        registros = [
+            ClassificacaoEstoque(
+                produto_id=produto_id,
+                classe_abc=linha.classe_abc,
+                classe_xyz=linha.classe_xyz,
+                quantidade_consumida=_decimal(linha.quantidade_consumida, 4),
+                valor_consumido=_decimal(linha.valor_consumido, 2),
+                percentual_acumulado=_decimal(linha.percentual_acumulado * 100, 4),
+                consumo_medio_mensal=_decimal(linha.consumo_medio_mensal, 4),
+                coeficiente_variacao=_decimal(min(linha.coeficiente_variacao, 9999), 4),
+                ultimo_movimento=linha.ultimo_movimento,
+                dias_sem_movimento=None if pd.isna(linha.dias_sem_movimento) else int(linha.dias_sem_movimento),
+                periodo_meses=meses,
+                calculado_em=agora,
+            )
+            for produto_id, linha in zip(resultado.index, resultado.itertuples(index=False))
+        ]
+
+        with transaction.atomic():
+            ClassificacaoEstoque.objects.all().delete()
+            ClassificacaoEstoque.objects.bulk_create(registros, batch_size=2000)
+
+        totais = resultado['classe_abc'].value_counts().to_dict()
+        logger.info("Classificação ABC/XYZ atualizada: %d produtos %s", len(registros), totais)
+        return totais
@@ -0,0 +1,296 @@
+# core/services/consumo_proposta.py
+
+"""
+Índice reverso produto → propostas (ConsumoProposta) e fila de recálculo.
+
+Cada cálculo de proposta grava, em linhas normalizadas, os códigos usados
+com quantidade e custo unitário. Com isso dá para responder "quais
+propostas usam estes códigos" e "quanto um aumento de X% neste código
+custa" sem abrir o JSON `componentes_calculados` de cada proposta, e
+enfileirar o recálculo só das propostas afetadas quando um custo muda.
+"""
+
+import logging
+from collections import defaultdict
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from core.models import ConsumoProposta, Proposta, RecalculoProposta
+
+logger = logging.getLogger(__name__)
+
+
+def _decimal(valor):
+    try:
+        return Decimal(str(valor or 0))
+    except (InvalidOperation, ValueError):
+        return Decimal('0')
+
+
+class ConsumoPropostaService:
+    """
+    Serviço do índice de consumo das propostas
+    """
+
+    # Propostas que não são mais recalculadas automaticamente
+    STATUS_FECHADOS = ('aprovado', 'rejeitado')
+
+    # Campos de Produto que entram no custo unitário do cálculo (_get_unit_cost)
+    CAMPOS_CUSTO = ('custo_material', 'custo_servico', 'custo_medio', 'custo_industrializacao')
+
+    @staticmethod
+    def extrair_consumos(componentes):
+        """
+        Achata a estrutura de componentes do cálculo.
+
+        Args:
+            componentes (dict): {CATEGORIA: {subcategoria: {'itens': {...} | [...]}}}
+
+        Returns:
+            list[dict]: codigo, categoria, subcategoria, quantidade, custo_unitario, custo_total
+        """
+        consumos = []
+        for categoria, subcategorias in (componentes or {}).items():
+            if not isinstance(subcategorias, dict):
+                continue
+            for subcategoria, dados in subcategorias.items():
+                if not isinstance(dados, dict):
+                    continue
+                itens = dados.get('itens') or {}
+                if isinstance(itens, dict):
+                    itens = itens.values()
+                for item in itens:
+                    if not isinstance(item, dict) or item.get('skip'):
+                        continue
+                    codigo = (item.get('codigo') or '').strip()
+                    quantidade = _decimal(item.get('quantidade'))
+                    if not codigo or quantidade <= 0:
+                        continue
+                    custo_unitario = _decimal(item.get('valor_unitario'))
+                    consumos.append({
+                        'codigo': codigo,
+                        'categoria': str(categoria)[:30],
+                        'subcategoria': str(subcategoria)[:100],
+                        'quantidade': quantidade,
+                        'custo_unitario': custo_unitario,
+                        'custo_total': _decimal(item.get('valor_total', quantidade * custo_unitario)),
+                    })
+        return consumos
+
+    @staticmethod
+    def registrar(proposta, componentes):
+        """
+        Substitui os consumos da proposta pelos do cálculo atual.
+
+        Args:
+            proposta (Proposta): proposta recém-calculada
+            componentes (dict): custos_resultado['componentes']
+
+        Returns:
+            int: linhas gravadas
+        """
+        consumos = ConsumoPropostaService.extrair_consumos(componentes)
+        with transaction.atomic():
+            ConsumoProposta.objects.filter(proposta=proposta).delete()
+            ConsumoProposta.objects.bulk_create(
+                [ConsumoProposta(proposta=proposta, **consumo) for consumo in consumos],
+                batch_size=500,
+            )
+        return len(consumos)
+
+    @staticmethod
+    def indexar_existentes(queryset=None):
+        """
+        Popula o índice a partir do `componentes_calculados` já gravado nas
+        propostas (sem recalcular).
+
+        Returns:
+            tuple: (propostas indexadas, linhas gravadas)
+        """
+        queryset = queryset if queryset is not None else Proposta.objects.all()
+        propostas = linhas = 0
+        for proposta in queryset.exclude(componentes_calculados__isnull=True).only(
+            'id', 'numero', 'componentes_calculados'
+        ).iterator(chunk_size=200):
+            componentes = proposta.componentes_calculados
+            if not isinstance(componentes, dict) or not componentes:
+                continue
+            linhas += ConsumoPropostaService.registrar(proposta, componentes)
+            propostas += 1
+        return propostas, linhas
+
+    # =========================================================================
+    # CONSULTAS
+    # =========================================================================
+
+    @staticmethod
+    def propostas_afetadas(codigos, apenas_abertas=True):
+        """
+        Propostas cujo último cálculo consumiu algum dos códigos.
+
+        Args:
+            codigos (list[str]): códigos de produto
+            apenas_abertas (bool): ignora propostas aprovadas/rejeitadas
+
+        Returns:
+            QuerySet[Proposta]
+        """
+        propostas = Proposta.objects.filter(
+            id__in=ConsumoProposta.objects.filter(codigo__in=codigos).values('proposta_id')
+        )
+        if apenas_abertas:
+            propostas = propostas.exclude(status__in=ConsumoPropostaService.STATUS_FECHADOS)
+        return propostas
+
+    @staticmethod
+    def exposicao(codigos, percentual=Decimal('10'), apenas_abertas=True):
+        """
+        Impacto de um aumento de `percentual`% no custo dos códigos.
+
+        O aumento no preço de venda usa a razão preço/custo de materiais de
+        cada proposta (a formação de preço é linear sobre o custo de
+        materiais: MOD, indiretos, instalação, margem, comissão e impostos).
+
+        Args:
+            codigos (list[str]): códigos de produto
+            percentual (Decimal): aumento simulado em %
+            apenas_abertas (bool): ignora propostas aprovadas/rejeitadas
+
+        Returns:
+            dict: 'por_codigo' (lista) e os totais 'propostas',
+                  'aumento_custo' e 'aumento_preco' (R$)
+        """
+        fator = _decimal(percentual) / Decimal('100')
+        consumos = ConsumoProposta.objects.filter(codigo__in=codigos)
+        if apenas_abertas:
+            consumos = consumos.exclude(proposta__status__in=ConsumoPropostaService.STATUS_FECHADOS)
+
+        linhas = consumos.values(
+            'codigo', 'proposta_id', 'proposta__custo_materiais', 'proposta__preco_venda_calculado',
+        ).annotate(
+            quantidade=Sum('quantidade'),
+            custo=Sum('custo_total'),
+        ).order_by()
+
+        por_codigo = defaultdict(lambda: {
+            'propostas': 0, 'quantidade': Decimal('0'), 'custo_atual': Decimal('0'),
+            'aumento_custo': Decimal('0'), 'aumento_preco': Decimal('0'),
+        })
+        propostas = set()
+        for linha in linhas:
+            aumento = (linha['custo'] or Decimal('0')) * fator
+            custo_materiais = linha['proposta__custo_materiais']
+            preco = linha['proposta__preco_venda_calculado']
+            markup = preco / custo_materiais if custo_materiais and preco else Decimal('1')
+
+            resumo = por_codigo[linha['codigo']]
+            resumo['propostas'] += 1
+            resumo['quantidade'] += linha['quantidade'] or Decimal('0')
+            resumo['custo_atual'] += linha['custo'] or Decimal('0')
+            resumo['aumento_custo'] += aumento
+            resumo['aumento_preco'] += aumento * markup
+            propostas.add(linha['proposta_id'])
+
+        resultado = [
+            {'codigo': codigo, **{k: (v.quantize(Decimal('0.01')) if isinstance(v, Decimal) else v)
+                                  for k, v in resumo.items()}}
+            for codigo, resumo in sorted(por_codigo.items(), key=lambda x: -x[1]['aumento_preco'])
+        ]
+        return {
+            'percentual': _decimal(percentual),
+            'por_codigo': resultado,
+            'propostas': len(propostas),
+            'aumento_custo': sum((r['aumento_custo'] for r in resultado), Decimal('0')),
+            'aumento_preco': sum((r['aumento_preco'] for r in resultado), Decimal('0')),
+        }
+
+    @staticmethod
+    def codigos_mais_usados(limite=20):
+        """Códigos presentes em mais propostas (abertas)"""
+        return list(
+            ConsumoProposta.objects.exclude(proposta__status__in=ConsumoPropostaService.STATUS_FECHADOS)
+            .values('codigo')
+            .annotate(propostas=Count('proposta', distinct=True), custo=Sum('custo_total'))
+            .order_by('-propostas', '-custo')[:limite]
+        )
+
+    # =========================================================================
+    # FILA DE RECÁLCULO
+    # =========================================================================
+
+    @staticmethod
+    def enfileirar_recalculo(codigos, motivo=''):
+        """
+        Enfileira o recálculo das propostas abertas que consomem os códigos.
+        Propostas já pendentes só recebem os novos códigos.
+
+        Returns:
+            int: propostas enfileiradas ou atualizadas
+        """
+        codigos = sorted(set(codigos))
+        ids = list(ConsumoPropostaService.propostas_afetadas(codigos).values_list('id', flat=True))
+        if not ids:
+            return 0
+
+        with transaction.atomic():
+            pendentes = {
+                r.proposta_id: r
+                for r in RecalculoProposta.objects.select_for_update().filter(
+                    proposta_id__in=ids, processado_em__isnull=True
+                )
+            }
+            atualizar = []
+            for recalculo in pendentes.values():
+                novos = sorted(set(recalculo.codigos) | set(codigos))
+                if novos != recalculo.codigos:
+                    recalculo.codigos = novos
+                    atualizar.append(recalculo)
+            if atualizar:
+                RecalculoProposta.objects.bulk_update(atualizar, ['codigos'])
+
+            RecalculoProposta.objects.bulk_create([
+                RecalculoProposta(proposta_id=proposta_id, codigos=codigos, motivo=motivo[:200])
+                for proposta_id in ids if proposta_id not in pendentes
+            ])
+
+        logger.info(f"Recálculo enfileirado para {len(ids)} proposta(s) - códigos {', '.join(codigos)}")
+        return len(ids)
+
+    @staticmethod
+    def processar_fila(limite=None):
+        """
+        Recalcula as propostas pendentes (mantendo o valor negociado).
+
+        Args:
+            limite (int): máximo de propostas nesta execução
+
+        Returns:
+            dict: processadas, erros
+        """
+        from core.services.calculo_pedido import CalculoPedidoService
+
+        pendentes = RecalculoProposta.objects.filter(
+            processado_em__isnull=True
+        ).select_related('proposta').order_by('criado_em')
+        if limite:
+            pendentes = pendentes[:limite]
+
+        processadas = erros = 0
+        for recalculo in pendentes:
+            proposta = recalculo.proposta
+            recalculo.preco_anterior = proposta.preco_venda_calculado
+            try:
+                CalculoPedidoService.recalcular_proposta_existente(proposta)
+                recalculo.preco_novo = proposta.preco_venda_calculado
+                processadas += 1
+            except Exception as e:
+                recalculo.erro = str(e)
+                erros += 1
+                logger.error(f"Erro no recálculo enfileirado da proposta {proposta.numero}: {e}")
+            recalculo.processado_em = timezone.now()
+            recalculo.save(update_fields=['preco_anterior', 'preco_novo', 'erro', 'processado_em'])
+
+        return {'processadas': processadas, 'erros': erros}
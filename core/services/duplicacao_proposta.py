@@ -0,0 +1,197 @@
+# core/services/duplicacao_proposta.py
+
+"""
+Duplicação de propostas (mesmo elevador para outra obra/cliente).
+
+A cópia leva a especificação, as portas de pavimento (bulk_create) e, se o
+cálculo da origem ainda vale, os artefatos do cálculo e os consumos, tudo
+em uma transação: a nova proposta já sai precificada sem rodar o motor.
+
+O cálculo vale quando:
+- a assinatura atual da origem (especificação + versões das regras YAML
+  ativas + parâmetros gerais) é igual à gravada no último cálculo;
+- todo produto consumido continua no catálogo do cálculo com o mesmo custo
+  unitário gravado em ConsumoProposta.
+"""
+
+import hashlib
+import json
+import logging
+from decimal import Decimal
+
+from django.db import transaction
+
+from core.models import ConsumoProposta, PortaPavimento, Proposta, RegraYAML
+from core.models.propostas import CAMPOS_CALCULO, CAMPOS_ESPECIFICACAO
+from core.services.auditoria import AuditoriaService
+from core.utils.cache import parametros_gerais
+
+logger = logging.getLogger(__name__)
+
+# Copiados junto com CAMPOS_ESPECIFICACAO, mas sem efeito no cálculo
+CAMPOS_COMPLEMENTARES = (
+    'normas_abnt', 'tipo_motor', 'abertura_cabine',
+    'observacoes', 'local_instalacao', 'documentacao_prefeitura', 'prazo_entrega_dias',
+    'forma_pagamento', 'numero_parcelas', 'tipo_parcela', 'percentual_entrada',
+)
+
+# Resultados do cálculo gravados em colunas (CalculoPedidoService._salvar_calculos_no_pedido)
+CAMPOS_CALCULADOS = (
+    'largura_cabine_calculada', 'comprimento_cabine_calculado', 'capacidade_cabine_calculada',
+    'tracao_cabine_calculada',
+    'custo_materiais', 'custo_mao_obra', 'custo_indiretos_fabricacao', 'custo_instalacao',
+    'custo_producao', 'custo_total_projeto',
+    'margem_lucro', 'preco_com_margem', 'comissao', 'preco_com_comissao', 'impostos',
+    'preco_venda_calculado',
+)
+
+CAMPOS_PORTA = tuple(
+    campo.attname for campo in PortaPavimento._meta.concrete_fields
+    if campo.name not in ('id', 'proposta', 'criado_em')
+)
+
+CAMPOS_CONSUMO = ('codigo', 'categoria', 'subcategoria', 'quantidade', 'custo_unitario', 'custo_total')
+
+CENTESIMO_DE_CENTAVO = Decimal('0.0001')
+
+
+class DuplicacaoPropostaService:
+    """
+    Assinatura do cálculo e duplicação de propostas
+    """
+
+    @staticmethod
+    def _valor(proposta, campo):
+        """Valor normalizado para a assinatura (decimais com as casas do campo)"""
+        valor = getattr(proposta, campo)
+        if valor is None or valor == '':
+            return None
+        casas = getattr(Proposta._meta.get_field(campo), 'decimal_places', None)
+        if casas is not None:
+            return str(Decimal(str(valor)).quantize(Decimal(1).scaleb(-casas)))
+        return str(valor)
+
+    @classmethod
+    def assinatura(cls, proposta):
+        """
+        Hash das entradas do cálculo: especificação da proposta, versões das
+        regras YAML ativas e última alteração dos parâmetros gerais.
+
+        Args:
+            proposta: Proposta (valores em memória, salvos ou não)
+
+        Returns:
+            str: sha256 hexadecimal
+        """
+        parametros = parametros_gerais()
+        dados = {
+            'especificacao': {campo: cls._valor(proposta, campo) for campo in CAMPOS_ESPECIFICACAO},
+            'regras': sorted(RegraYAML.objects.filter(ativa=True).values_list('id', 'versao')),
+            'parametros': parametros.atualizado_em.isoformat() if parametros else None,
+        }
+        return hashlib.sha256(json.dumps(dados, sort_keys=True).encode()).hexdigest()
+
+    @classmethod
+    def _verificar(cls, origem, consumos):
+        """calculo_reutilizavel com os consumos já carregados"""
+        if not origem.preco_venda_calculado or not origem.assinatura_calculo:
+            return False, 'Proposta de origem sem cálculo gravado'
+        if not consumos:
+            return False, 'Proposta de origem sem consumos registrados'
+        if cls.assinatura(origem) != origem.assinatura_calculo:
+            return False, 'Especificação, regras ou parâmetros mudaram desde o cálculo'
+
+        # Import local: calculo_pedido importa este módulo
+        from core.services.calculo_pedido import CalculoPedidoService
+        from core.services.calculo_pedido_yaml import _get_unit_cost
+
+        codigos = {consumo.codigo for consumo in consumos}
+        atuais = CalculoPedidoService.carregar_custos_db(codigos)
+        alterados = sorted(
+            consumo.codigo for consumo in consumos
+            if consumo.codigo not in atuais
+            or _get_unit_cost(atuais[consumo.codigo]).quantize(CENTESIMO_DE_CENTAVO)
+            != consumo.custo_unitario.quantize(CENTESIMO_DE_CENTAVO)
+        )
+        if alterados:
+            return False, f"Custo alterado ou produto indisponível: {', '.join(alterados[:5])}" + (
+                f" e mais {len(alterados) - 5}" if len(alterados) > 5 else ''
+            )
+        return True, 'Cálculo da origem continua válido'
+
+    @classmethod
+    def calculo_reutilizavel(cls, origem):
+        """
+        Indica se o cálculo gravado na origem vale para uma cópia.
+
+        Args:
+            origem: Proposta
+
+        Returns:
+            tuple: (bool, motivo)
+        """
+        return cls._verificar(origem, list(ConsumoProposta.objects.filter(proposta=origem)))
+
+    @classmethod
+    def duplicar(cls, origem, usuario, cliente=None, nome_projeto=None):
+        """
+        Cria uma nova proposta em rascunho a partir de `origem`.
+
+        Args:
+            origem: Proposta copiada
+            usuario: vendedor da nova proposta
+            cliente: Cliente da nova proposta (padrão: o da origem)
+            nome_projeto (str): padrão "<nome da origem> (Cópia)"
+
+        Returns:
+            tuple: (nova proposta, cálculo reaproveitado?, motivo)
+        """
+        with transaction.atomic():
+            origem = Proposta.objects.select_for_update().get(pk=origem.pk)
+            consumos = list(ConsumoProposta.objects.filter(proposta=origem))
+            reaproveitar, motivo = cls._verificar(origem, consumos)
+
+            nova = Proposta(
+                cliente=cliente or origem.cliente,
+                nome_projeto=nome_projeto or f"{origem.nome_projeto} (Cópia)",
+                vendedor=usuario,
+                atualizado_por=usuario,
+                status='rascunho',
+            )
+            for campo in CAMPOS_ESPECIFICACAO + CAMPOS_COMPLEMENTARES:
+                setattr(nova, campo, getattr(origem, campo))
+
+            if reaproveitar:
+                for campo in CAMPOS_CALCULO + CAMPOS_CALCULADOS:
+                    setattr(nova, campo, getattr(origem, campo))
+                nova.assinatura_calculo = origem.assinatura_calculo
+                # Mesmo efeito do cálculo: valor_proposta parte do preço calculado (save)
+                nova.status = 'simulado'
+            nova.save()
+
+            PortaPavimento.objects.bulk_create([
+                PortaPavimento(proposta=nova, **{campo: getattr(porta, campo) for campo in CAMPOS_PORTA})
+                for porta in PortaPavimento.objects.filter(proposta=origem).order_by('andar')
+            ])
+            if reaproveitar:
+                ConsumoProposta.objects.bulk_create(
+                    [ConsumoProposta(proposta=nova, **{campo: getattr(c, campo) for campo in CAMPOS_CONSUMO})
+                     for c in consumos],
+                    batch_size=500,
+                )
+
+            AuditoriaService.registrar(
+                nova,
+                'Proposta duplicada',
+                usuario,
+                observacao=(
+                    f"Duplicada da proposta {origem.numero}. "
+                    + ('Cálculo reaproveitado.' if reaproveitar else f"Recalcular: {motivo}.")
+                ),
+            )
+
+        logger.info(
+            f"Proposta {origem.numero} duplicada como {nova.numero} "
+            f"({'cálculo reaproveitado' if reaproveitar else 'sem cálculo: ' + motivo})"
+        )
+        return nova, reaproveitar, motivo
@@ -0,0 +1,307 @@
+# core/services/historico_precos.py
+
+"""
+Histórico de preços de compra por produto e fornecedor.
+
+HistoricoPrecoCompra guarda, por par produto/fornecedor, o último preço
+pago, média ponderada, mínimo, máximo e data da última compra. A tabela é
+atualizada de forma incremental nos recebimentos (recebimento de item do
+pedido e confirmação de entrada de estoque) e pode ser reconstruída do
+histórico com uma única query agrupada.
+"""
+
+import logging
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Max, Min, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from core.models import HistoricoPrecoCompra, ItemMovimentoEntrada, ItemPedidoCompra
+
+logger = logging.getLogger(__name__)
+
+CASAS_PRECO = Decimal('0.0001')
+
+
+class HistoricoPrecosService:
+    """
+    Serviço de manutenção e consulta do histórico de preços de compra
+    """
+
+    CAMPOS_ATUALIZADOS = [
+        'ultimo_preco', 'data_ultima_compra', 'preco_medio', 'preco_minimo', 'preco_maximo',
+        'quantidade_total', 'valor_total', 'compras', 'atualizado_em',
+    ]
+
+    # =========================================================================
+    # ATUALIZAÇÃO INCREMENTAL
+    # =========================================================================
+
+    @classmethod
+    def registrar(cls, fornecedor_id, compras, data=None, novas_compras=True):
+        """
+        Acrescenta recebimentos de um fornecedor ao histórico.
+
+        Args:
+            fornecedor_id (int): fornecedor
+            compras (list): [(produto_id, preco_unitario, quantidade)]
+            data (date): data do recebimento (padrão: hoje)
+            novas_compras (bool): cada tupla é um item ainda não registrado
+                (False em recebimento parcial seguinte do mesmo item: soma
+                quantidade e valor, mas não conta outra compra, como em
+                `reconstruir`)
+
+        Returns:
+            int: pares produto/fornecedor atualizados
+        """
+        data = data or timezone.localdate()
+        por_produto = defaultdict(list)
+        for produto_id, preco, quantidade in compras:
+            if preco is None or quantidade is None:
+                continue
+            preco, quantidade = Decimal(str(preco)), Decimal(str(quantidade))
+            if preco > 0 and quantidade > 0:
+                por_produto[produto_id].append((preco, quantidade))
+        if not fornecedor_id or not por_produto:
+            return 0
+
+        try:
+            return cls._aplicar(fornecedor_id, por_produto, data, novas_compras)
+        except IntegrityError:
+            # Outro recebimento criou o mesmo par ao mesmo tempo: agora ele existe
+            return cls._aplicar(fornecedor_id, por_produto, data, novas_compras)
+
+    @classmethod
+    def _aplicar(cls, fornecedor_id, por_produto, data, novas_compras):
+        with transaction.atomic():
+            existentes = {
+                h.produto_id: h
+                for h in HistoricoPrecoCompra.objects.select_for_update().filter(
+                    fornecedor_id=fornecedor_id, produto_id__in=list(por_produto),
+                )
+            }
+            novos, alterados = [], []
+            for produto_id, precos in por_produto.items():
+                historico = existentes.get(produto_id)
+                if historico is None:
+                    historico = HistoricoPrecoCompra(
+                        produto_id=produto_id,
+                        fornecedor_id=fornecedor_id,
+                        ultimo_preco=precos[-1][0],
+                        data_ultima_compra=data,
+                        preco_minimo=precos[0][0],
+                        preco_maximo=precos[0][0],
+                        preco_medio=precos[0][0],
+                    )
+                    novos.append(historico)
+                else:
+                    alterados.append(historico)
+                cls._acumular(historico, precos, data, novas_compras)
+
+            if alterados:
+                HistoricoPrecoCompra.objects.bulk_update(alterados, cls.CAMPOS_ATUALIZADOS)
+            if novos:
+                HistoricoPrecoCompra.objects.bulk_create(novos)
+        return len(novos) + len(alterados)
+
+    @staticmethod
+    def _acumular(historico, precos, data, novas_compras):
+        for preco, quantidade in precos:
+            if novas_compras:
+                historico.compras += 1
+            historico.quantidade_total += quantidade
+            historico.valor_total += (preco * quantidade).quantize(Decimal('0.01'))
+            historico.preco_minimo = min(historico.preco_minimo, preco)
+            historico.preco_maximo = max(historico.preco_maximo, preco)
+        if historico.quantidade_total > 0:
+            historico.preco_medio = (historico.valor_total / historico.quantidade_total).quantize(CASAS_PRECO)
+        # Recebimento com data retroativa não substitui o último preço
+        if data >= historico.data_ultima_compra:
+            historico.ultimo_preco = precos[-1][0]
+            historico.data_ultima_compra = data
+        historico.atualizado_em = timezone.now()
+
+    @classmethod
+    def registrar_entrada(cls, movimento, itens=None):
+        """
+        Registra os itens de uma entrada de estoque confirmada.
+
+        O fornecedor é o da entrada ou, se vazio, o do pedido vinculado.
+        """
+        fornecedor_id = movimento.fornecedor_id
+        if not fornecedor_id and movimento.pedido_compra_id:
+            fornecedor_id = movimento.pedido_compra.fornecedor_id
+        if not fornecedor_id:
+            return 0
+
+        itens = itens if itens is not None else movimento.itens.all()
+        return cls.registrar(
+            fornecedor_id,
+            [(item.produto_id, item.valor_unitario, item.quantidade) for item in itens],
+            movimento.data_movimento,
+        )
+
+    @classmethod
+    def registrar_recebimento(cls, item, quantidade):
+        """
+        Registra o recebimento (parcial ou total) de um item de pedido.
+        `item.quantidade_recebida` já inclui `quantidade`; só o primeiro
+        recebimento do item conta como compra.
+        """
+        anterior = Decimal(str(item.quantidade_recebida)) - Decimal(str(quantidade))
+        return cls.registrar(
+            item.pedido.fornecedor_id,
+            [(item.produto_id, item.valor_unitario, quantidade)],
+            novas_compras=anterior <= 0,
+        )
+
+    # =========================================================================
+    # CONSULTA
+    # =========================================================================
+
+    @staticmethod
+    def _como_dict(historico):
+        return {
+            'fornecedor_id': historico.fornecedor_id,
+            'ultimo_preco': float(historico.ultimo_preco),
+            'data_ultima_compra': historico.data_ultima_compra.isoformat(),
+            'preco_medio': float(historico.preco_medio),
+            'preco_minimo': float(historico.preco_minimo),
+            'preco_maximo': float(historico.preco_maximo),
+            'compras': historico.compras,
+        }
+
+    @classmethod
+    def do_produto(cls, produto_id):
+        """
+        Histórico de um produto em todos os fornecedores, mais recente primeiro.
+
+        Returns:
+            list[dict]: ultimo_preco, data_ultima_compra, preco_medio,
+                        preco_minimo, preco_maximo, compras e fornecedor_id
+        """
+        return [
+            cls._como_dict(h)
+            for h in HistoricoPrecoCompra.objects.filter(produto_id=produto_id).order_by('-data_ultima_compra')
+        ]
+
+    @classmethod
+    def ultimos_precos(cls, produto_ids, fornecedor_id=None):
+        """
+        Última compra de cada produto (do fornecedor, se informado) em uma query.
+
+        Returns:
+            dict: {produto_id: dict de `do_produto`}
+        """
+        historicos = HistoricoPrecoCompra.objects.filter(produto_id__in=produto_ids)
+        if fornecedor_id:
+            historicos = historicos.filter(fornecedor_id=fornecedor_id)
+
+        resultado = {}
+        for historico in historicos.order_by('produto_id', '-data_ultima_compra'):
+            resultado.setdefault(historico.produto_id, cls._como_dict(historico))
+        return resultado
+
+    # =========================================================================
+    # RECONSTRUÇÃO
+    # =========================================================================
+
+    @staticmethod
+    def _agrupado_pedidos():
+        """Itens de pedido recebidos, agrupados por produto/fornecedor"""
+        recebidos = ItemPedidoCompra.objects.filter(quantidade_recebida__gt=0).exclude(pedido__status='CANCELADO')
+        data = Coalesce(TruncDate('data_recebimento'), 'pedido__data_emissao')
+        ultimo = recebidos.filter(
+            produto_id=OuterRef('produto_id'), pedido__fornecedor_id=OuterRef('fornecedor_id'),
+        ).order_by(F('data_recebimento').desc(nulls_last=True), '-id').values('valor_unitario')[:1]
+
+        return recebidos.filter(valor_unitario__gt=0).values('produto_id').annotate(
+            fornecedor_id=F('pedido__fornecedor_id'),
+        ).values('produto_id', 'fornecedor_id').annotate(
+            compras=Count('id'),
+            soma_quantidade=Sum('quantidade_recebida'),
+            soma_valor=Sum(ExpressionWrapper(
+                F('quantidade_recebida') * F('valor_unitario'),
+                output_field=DecimalField(max_digits=18, decimal_places=4),
+            )),
+            minimo=Min('valor_unitario'),
+            maximo=Max('valor_unitario'),
+            ultima_data=Max(data),
+            ultimo_preco=Subquery(ultimo),
+        ).order_by()
+
+    @staticmethod
+    def _agrupado_entradas():
+        """Itens de entradas confirmadas com fornecedor, agrupados por produto/fornecedor"""
+        fornecedor = Coalesce('movimento__fornecedor_id', 'movimento__pedido_compra__fornecedor_id')
+        confirmados = ItemMovimentoEntrada.objects.filter(
+            movimento__status='confirmado', quantidade__gt=0, valor_unitario__gt=0,
+        ).annotate(fornecedor_ref=fornecedor).filter(fornecedor_ref__isnull=False)
+        ultimo = confirmados.filter(
+            produto_id=OuterRef('produto_id'), fornecedor_ref=OuterRef('fornecedor_id'),
+        ).order_by('-movimento__data_movimento', '-id').values('valor_unitario')[:1]
+
+        return confirmados.values('produto_id').annotate(
+            fornecedor_id=F('fornecedor_ref'),
+        ).values('produto_id', 'fornecedor_id').annotate(
+            compras=Count('id'),
+            soma_quantidade=Sum('quantidade'),
+            soma_valor=Sum(ExpressionWrapper(
+                F('quantidade') * F('valor_unitario'),
+                output_field=DecimalField(max_digits=18, decimal_places=4),
+            )),
+            minimo=Min('valor_unitario'),
+            maximo=Max('valor_unitario'),
+            ultima_data=Max('movimento__data_movimento'),
+            ultimo_preco=Subquery(ultimo),
+        ).order_by()
+
+    @classmethod
+    def reconstruir(cls):
+        """
+        Recria a tabela a partir dos pedidos recebidos e das entradas
+        confirmadas, em uma única ida ao banco (UNION ALL de dois agrupamentos).
+
+        Returns:
+            int: pares produto/fornecedor gravados
+        """
+        pares = {}
+        for linha in cls._agrupado_pedidos().union(cls._agrupado_entradas(), all=True):
+            chave = (linha['produto_id'], linha['fornecedor_id'])
+            atual = pares.get(chave)
+            if atual is None:
+                pares[chave] = dict(linha)
+                continue
+            atual['compras'] += linha['compras']
+            atual['soma_quantidade'] += linha['soma_quantidade']
+            atual['soma_valor'] += linha['soma_valor']
+            atual['minimo'] = min(atual['minimo'], linha['minimo'])
+            atual['maximo'] = max(atual['maximo'], linha['maximo'])
+            if linha['ultima_data'] > atual['ultima_data']:
+                atual['ultima_data'], atual['ultimo_preco'] = linha['ultima_data'], linha['ultimo_preco']
+
+        historicos = [
+            HistoricoPrecoCompra(
+                produto_id=produto_id,
+                fornecedor_id=fornecedor_id,
+                ultimo_preco=linha['ultimo_preco'],
+                data_ultima_compra=linha['ultima_data'],
+                preco_medio=(Decimal(linha['soma_valor']) / Decimal(linha['soma_quantidade'])).quantize(CASAS_PRECO),
+                preco_minimo=linha['minimo'],
+                preco_maximo=linha['maximo'],
+                quantidade_total=linha['soma_quantidade'],
+                valor_total=Decimal(linha['soma_valor']).quantize(Decimal('0.01')),
+                compras=linha['compras'],
+            )
+            for (produto_id, fornecedor_id), linha in pares.items()
+        ]
+
+        with transaction.atomic():
+            HistoricoPrecoCompra.objects.all().delete()
+            HistoricoPrecoCompra.objects.bulk_create(historicos, batch_size=1000)
+
+        logger.info(f"Histórico de preços reconstruído: {len(historicos)} pares produto/fornecedor")
+        return len(historicos)
@@ -0,0 +1,336 @@
+# core/services/kardex.py
+
+"""
+Kardex e saldo de estoque em data passada.
+
+O MovimentoEstoque é o razão imutável. Para não varrer o razão inteiro a cada
+consulta, o fechamento mensal (SaldoEstoqueMensal) materializa o saldo de cada
+(produto, local) no último dia do mês; o saldo em uma data qualquer é o
+fechamento anterior + o delta do razão a partir dele. Movimento lançado em
+mês já fechado remove os fechamentos dali em diante (core/signals_saldo.py).
+"""
+
+import calendar
+import logging
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import (
+    Case, When, F, Q, Sum, Count, Max, Min, Value, Window, Subquery, OuterRef,
+    DecimalField,
+)
+
+from core.models import Estoque, MovimentoEstoque, SaldoEstoqueMensal
+
+logger = logging.getLogger(__name__)
+
+ZERO = Decimal('0')
+TOLERANCIA = Decimal('0.0001')
+
+
+def _quantidade_com_sinal():
+    """Quantidade do movimento com sinal (+ entradas, - saídas)"""
+    return Case(
+        When(tipo__in=MovimentoEstoque.TIPOS_ENTRADA, then=F('quantidade')),
+        default=-F('quantidade'),
+        output_field=DecimalField(max_digits=14, decimal_places=4),
+    )
+
+
+def ultimo_dia_mes(data):
+    """Último dia do mês da data informada"""
+    return date(data.year, data.month, calendar.monthrange(data.year, data.month)[1])
+
+
+class KardexService:
+    """
+    Serviço de consultas históricas sobre o MovimentoEstoque
+    """
+
+    # =========================================================================
+    # SALDO EM DATA
+    # =========================================================================
+
+    @staticmethod
+    def _fechamento_base(data):
+        """Competência do último fechamento anterior à data (ou None)"""
+        return SaldoEstoqueMensal.objects.filter(
+            competencia__lt=data
+        ).aggregate(ultima=Max('competencia'))['ultima']
+
+    @classmethod
+    def saldo_em(cls, produto, local_estoque=None, data=None):
+        """
+        Saldo e custo médio do produto ao final de uma data.
+
+        Args:
+            produto: Produto (ou id)
+            local_estoque: LocalEstoque (ou id); None consolida todos os locais
+            data (date): data de referência (padrão: hoje)
+
+        Returns:
+            dict: quantidade, custo_medio, valor_total e competencia_base
+        """
+        data = data or date.today()
+        competencia = cls._fechamento_base(data)
+
+        filtro = Q(produto=produto)
+        if local_estoque is not None:
+            filtro &= Q(local_estoque=local_estoque)
+
+        # 1) Fechamento anterior
+        quantidade_base = ZERO
+        if competencia:
+            quantidade_base = SaldoEstoqueMensal.objects.filter(
+                filtro, competencia=competencia
+            ).aggregate(total=Sum('quantidade'))['total'] or ZERO
+
+        # 2) Delta do razão após o fechamento
+        movimentos = MovimentoEstoque.objects.filter(filtro, data_movimento__lte=data)
+        if competencia:
+            movimentos = movimentos.filter(data_movimento__gt=competencia)
+        delta = movimentos.aggregate(total=Sum(_quantidade_com_sinal()))['total'] or ZERO
+
+        # 3) Custo médio vigente: último movimento até a data
+        custo_medio = MovimentoEstoque.objects.filter(
+            filtro, data_movimento__lte=data
+        ).order_by('-data_movimento', '-id').values_list(
+            'custo_medio_posterior', flat=True
+        ).first() or ZERO
+
+        quantidade = quantidade_base + delta
+        return {
+            'quantidade': quantidade,
+            'custo_medio': custo_medio,
+            'valor_total': (quantidade * custo_medio).quantize(Decimal('0.01')),
+            'competencia_base': competencia,
+        }
+
+    # =========================================================================
+    # KARDEX (SALDO CORRIDO)
+    # =========================================================================
+
+    @classmethod
+    def kardex(cls, produto, local_estoque=None, data_inicio=None, data_fim=None):
+        """
+        Movimentos do produto com saldo corrido calculado no banco (window function).
+
+        O saldo inicial do período vem de saldo_em(data_inicio - 1), então o
+        queryset pode ser paginado com LIMIT/OFFSET sem perder o saldo corrido.
+
+        Returns:
+            tuple: (saldo_inicial dict, queryset anotado com quantidade_sinal e saldo_acumulado)
+        """
+        if data_inicio:
+            saldo_inicial = cls.saldo_em(produto, local_estoque, data_inicio - timedelta(days=1))
+        else:
+            saldo_inicial = {
+                'quantidade': ZERO, 'custo_medio': ZERO,
+                'valor_total': ZERO, 'competencia_base': None,
+            }
+
+        movimentos = MovimentoEstoque.objects.filter(produto=produto)
+        if local_estoque is not None:
+            movimentos = movimentos.filter(local_estoque=local_estoque)
+        if data_inicio:
+            movimentos = movimentos.filter(data_movimento__gte=data_inicio)
+        if data_fim:
+            movimentos = movimentos.filter(data_movimento__lte=data_fim)
+
+        movimentos = movimentos.select_related(
+            'local_estoque', 'criado_por'
+        ).annotate(
+            quantidade_sinal=_quantidade_com_sinal(),
+            saldo_acumulado=Window(
+                expression=Sum(_quantidade_com_sinal()),
+                order_by=[F('data_movimento').asc(), F('id').asc()],
+            ) + Value(saldo_inicial['quantidade'], output_field=DecimalField(max_digits=14, decimal_places=4)),
+        ).order_by('data_movimento', 'id')
+
+        return saldo_inicial, movimentos
+
+    # =========================================================================
+    # FECHAMENTO MENSAL
+    # =========================================================================
+
+    @classmethod
+    def fechar_competencia(cls, competencia):
+        """
+        Materializa o saldo de fechamento de um mês para todos os (produto, local).
+
+        Usa o fechamento anterior + um único agrupamento do razão no intervalo.
+        Refazer um mês já fechado substitui os registros dele.
+
+        Args:
+            competencia (date): qualquer data do mês a fechar
+
+        Returns:
+            int: quantidade de saldos gravados
+        """
+        fim = ultimo_dia_mes(competencia)
+        inicio = fim.replace(day=1)
+        anterior = cls._fechamento_base(inicio)
+
+        # Saldos do fechamento anterior
+        saldos = {}
+        if anterior:
+            for row in SaldoEstoqueMensal.objects.filter(competencia=anterior).values(
+                'produto_id', 'local_estoque_id', 'quantidade', 'custo_medio'
+            ):
+                saldos[(row['produto_id'], row['local_estoque_id'])] = {
+                    'quantidade': row['quantidade'],
+                    'custo_medio': row['custo_medio'],
+                    'movimentos': 0,
+                }
+
+        # Delta do razão desde o fechamento anterior (uma query agrupada)
+        movimentos = MovimentoEstoque.objects.filter(data_movimento__lte=fim)
+        if anterior:
+            movimentos = movimentos.filter(data_movimento__gt=anterior)
+
+        ultimo_custo = MovimentoEstoque.objects.filter(
+            produto_id=OuterRef('produto_id'),
+            local_estoque_id=OuterRef('local_estoque_id'),
+            data_movimento__lte=fim,
+        ).order_by('-data_movimento', '-id').values('custo_medio_posterior')[:1]
+
+        deltas = movimentos.values('produto_id', 'local_estoque_id').annotate(
+            delta=Sum(_quantidade_com_sinal()),
+            movimentos=Count('id', filter=Q(data_movimento__gte=inicio)),
+            custo=Subquery(ultimo_custo),
+        )
+
+        for row in deltas:
+            chave = (row['produto_id'], row['local_estoque_id'])
+            saldo = saldos.setdefault(chave, {'quantidade': ZERO, 'custo_medio': ZERO, 'movimentos': 0})
+            saldo['quantidade'] += row['delta'] or ZERO
+            saldo['movimentos'] = row['movimentos']
+            if row['custo'] is not None:
+                saldo['custo_medio'] = row['custo']
+
+        # Só persistir posições não zeradas ou com movimento no mês
+        registros = [
+            SaldoEstoqueMensal(
+                produto_id=produto_id,
+                local_estoque_id=local_id,
+                competencia=fim,
+                quantidade=saldo['quantidade'],
+                custo_medio=saldo['custo_medio'],
+                valor_total=(saldo['quantidade'] * saldo['custo_medio']).quantize(Decimal('0.01')),
+                quantidade_movimentos=saldo['movimentos'],
+            )
+            for (produto_id, local_id), saldo in saldos.items()
+            if saldo['quantidade'] != ZERO or saldo['movimentos']
+        ]
+
+        with transaction.atomic():
+            SaldoEstoqueMensal.objects.filter(competencia=fim).delete()
+            SaldoEstoqueMensal.objects.bulk_create(registros, batch_size=1000)
+
+        logger.info("Fechamento de estoque %s: %d saldos gravados", fim, len(registros))
+        return len(registros)
+
+    @staticmethod
+    def invalidar_fechamentos(data):
+        """
+        Remove os fechamentos do mês da data em diante (movimento lançado em
+        mês já fechado). O saldo em data passa a partir do fechamento anterior
+        e o próximo fechar_pendentes refaz os meses removidos.
+
+        Returns:
+            int: quantidade de saldos removidos
+        """
+        removidos, _ = SaldoEstoqueMensal.objects.filter(competencia__gte=ultimo_dia_mes(data)).delete()
+        if removidos:
+            logger.info("Fechamentos de estoque a partir de %s invalidados: %d saldos", ultimo_dia_mes(data), removidos)
+        return removidos
+
+    @classmethod
+    def fechar_pendentes(cls, ate=None):
+        """
+        Fecha, em ordem, todos os meses ainda não fechados até o mês anterior a `ate`.
+
+        Returns:
+            list: competências fechadas
+        """
+        ate = ate or date.today()
+        limite = ate.replace(day=1) - timedelta(days=1)
+
+        ultima = SaldoEstoqueMensal.objects.aggregate(ultima=Max('competencia'))['ultima']
+        if ultima:
+            proxima = ultima + timedelta(days=1)
+        else:
+            primeira = MovimentoEstoque.objects.aggregate(primeira=Min('data_movimento'))['primeira']
+            if not primeira:
+                return []
+            proxima = primeira.replace(day=1)
+
+        fechadas = []
+        while proxima <= limite:
+            cls.fechar_competencia(proxima)
+            fechadas.append(ultimo_dia_mes(proxima))
+            proxima = ultimo_dia_mes(proxima) + timedelta(days=1)
+        return fechadas
+
+    # =========================================================================
+    # RECONCILIAÇÃO
+    # =========================================================================
+
+    @staticmethod
+    def reconciliar(local_estoque=None):
+        """
+        Confere a posição atual (Estoque) contra a soma do razão.
+
+        Returns:
+            list[dict]: divergências com produto_id, local_estoque_id,
+            quantidade_estoque, quantidade_razao e diferenca
+        """
+        movimentos = MovimentoEstoque.objects.all()
+        posicoes = Estoque.objects.all()
+        if local_estoque is not None:
+            movimentos = movimentos.filter(local_estoque=local_estoque)
+            posicoes = posicoes.filter(local_estoque=local_estoque)
+
+        razao = {
+            (row['produto_id'], row['local_estoque_id']): row['total'] or ZERO
+            for row in movimentos.values('produto_id', 'local_estoque_id').annotate(
+                total=Sum(_quantidade_com_sinal())
+            )
+        }
+
+        divergencias = []
+        for row in posicoes.values('produto_id', 'produto__codigo', 'local_estoque_id', 'quantidade'):
+            chave = (row['produto_id'], row['local_estoque_id'])
+            quantidade_razao = razao.pop(chave, ZERO)
+            if abs(row['quantidade'] - quantidade_razao) > TOLERANCIA:
+                divergencias.append({
+                    'produto_id': row['produto_id'],
+                    'produto_codigo': row['produto__codigo'],
+                    'local_estoque_id': row['local_estoque_id'],
+                    'quantidade_estoque': row['quantidade'],
+                    'quantidade_razao': quantidade_razao,
+                    'diferenca': row['quantidade'] - quantidade_razao,
+                })
+
+        # Movimentos sem posição de estoque correspondente
+        orfaos = {
+            chave: quantidade for chave, quantidade in razao.items()
+            if abs(quantidade) > TOLERANCIA
+        }
+        if orfaos:
+            from core.models import Produto
+            codigos = dict(Produto.objects.filter(
+                id__in={produto_id for produto_id, _ in orfaos}
+            ).values_list('id', 'codigo'))
+            for (produto_id, local_id), quantidade_razao in orfaos.items():
+                divergencias.append({
+                    'produto_id': produto_id,
+                    'produto_codigo': codigos.get(produto_id),
+                    'local_estoque_id': local_id,
+                    'quantidade_estoque': ZERO,
+                    'quantidade_razao': quantidade_razao,
+                    'diferenca': -quantidade_razao,
+                })
+
+        return divergencias
@@ -0,0 +1,622 @@
+# core/services/manutencao_catalogo.py
+
+"""
+Manutenção do catálogo de produtos em lote: exclusão, mescla e reclassificação.
+
+A planilha de entrada tem uma operação por linha:
+
+    operacao       codigo        destino       grupo  subgrupo  tipo_pi
+    EXCLUIR        01.01.00009
+    MESCLAR        01.01.00010   01.01.00011
+    RECLASSIFICAR  01.02.00003                 02     04        COMPRADO
+
+Fluxo:
+1. validação de todas as linhas com poucas queries agrupadas (produtos,
+   grupos/subgrupos e contagem de referências por tabela);
+2. relatório por linha (simulação, nada é gravado);
+3. com `aplicar`, execução em lotes, cada lote numa transação: mesclas,
+   depois exclusões, depois reclassificações.
+
+Na mescla todas as referências do produto antigo passam para o destino.
+Posições de estoque e saldos mensais do mesmo local são somados;
+fornecedores, estruturas e históricos duplicados ficam com o registro do
+destino. Mescla que juntaria os dois produtos na mesma requisição,
+orçamento ou lista de materiais é bloqueada para revisão manual.
+"""
+
+import csv
+import logging
+import re
+import unicodedata
+from collections import defaultdict
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import Case, Count, Q, Value, When
+from django.utils import timezone
+
+from core.models import (
+    ClassificacaoEstoque, ConsumoProposta, Estoque, EstruturaProduto, FornecedorProduto,
+    HistoricoPrecoCompra, ItemConsumoOP, ItemListaMateriais, ItemMovimentoEntrada,
+    ItemMovimentoSaida, ItemOrcamentoCompra, ItemPedidoCompra, ItemRequisicaoCompra,
+    ItemRequisicaoMaterial, MovimentoEstoque, OrdemProducao, Produto, RegraYAML, SaldoEstoqueMensal,
+    SubgrupoProduto,
+)
+from core.utils.importacao import modulo_tardio
+
+openpyxl = modulo_tardio('openpyxl')
+
+logger = logging.getLogger(__name__)
+
+# Referências que impedem a exclusão (on_delete=PROTECT ou uso como componente)
+REFERENCIAS_BLOQUEANTES = [
+    (ItemPedidoCompra, 'produto', 'itens de pedido de compra'),
+    (ItemRequisicaoCompra, 'produto', 'itens de requisição de compra'),
+    (ItemOrcamentoCompra, 'produto', 'itens de orçamento de compra'),
+    (ItemListaMateriais, 'produto', 'itens de lista de materiais'),
+    (ItemMovimentoEntrada, 'produto', 'itens de entrada'),
+    (ItemMovimentoSaida, 'produto', 'itens de saída'),
+    (ItemRequisicaoMaterial, 'produto', 'itens de requisição de material'),
+    (MovimentoEstoque, 'produto', 'movimentos de estoque'),
+    (OrdemProducao, 'produto', 'ordens de produção'),
+    (ItemConsumoOP, 'produto', 'consumos de OP'),
+    (EstruturaProduto, 'produto_filho', 'estruturas como componente'),
+]
+
+# Na mescla, só mudam de produto
+REFERENCIAS_SIMPLES = [
+    (ItemPedidoCompra, 'produto'),
+    (ItemMovimentoEntrada, 'produto'),
+    (ItemMovimentoSaida, 'produto'),
+    (ItemRequisicaoMaterial, 'produto'),
+    (MovimentoEstoque, 'produto'),
+    (OrdemProducao, 'produto'),
+    (ItemConsumoOP, 'produto'),
+]
+
+# Documentos com um item por produto: mescla que juntaria os dois é bloqueada
+DOCUMENTOS_UNICOS = [
+    (ItemRequisicaoCompra, 'requisicao', 'requisição'),
+    (ItemOrcamentoCompra, 'orcamento', 'orçamento'),
+    (ItemListaMateriais, 'lista', 'lista de materiais'),
+]
+
+# Resumos recalculáveis: em caso de duplicidade fica o do destino
+RESUMOS_UNICOS = [
+    (FornecedorProduto, 'fornecedor'),
+    (HistoricoPrecoCompra, 'fornecedor'),
+]
+
+SINONIMOS = {
+    'EXCLUIR': 'EXCLUIR', 'EXCLUSAO': 'EXCLUIR', 'DELETAR': 'EXCLUIR', 'REMOVER': 'EXCLUIR',
+    'MESCLAR': 'MESCLAR', 'MESCLA': 'MESCLAR', 'FUNDIR': 'MESCLAR', 'SUBSTITUIR': 'MESCLAR',
+    'RECLASSIFICAR': 'RECLASSIFICAR', 'RECLASSIFICACAO': 'RECLASSIFICAR',
+}
+
+TAMANHO_FATIA = 500
+
+PADRAO_CODIGO = re.compile(r'\b\d{2}\.\d{2}\.\d{5}\b')
+
+
+def _normalizar(texto):
+    texto = unicodedata.normalize('NFKD', str(texto or '')).encode('ascii', 'ignore').decode()
+    return texto.strip().lower().replace(' ', '_')
+
+
+def _fatias(itens, tamanho=TAMANHO_FATIA):
+    itens = list(itens)
+    for inicio in range(0, len(itens), tamanho):
+        yield itens[inicio:inicio + tamanho]
+
+
+class ManutencaoCatalogoService:
+    """
+    Motor de operações em lote sobre o catálogo de produtos
+    """
+
+    COLUNAS = {
+        'operacao': 'operacao', 'acao': 'operacao',
+        'codigo': 'codigo', 'codigo_origem': 'codigo',
+        'destino': 'destino', 'codigo_destino': 'destino',
+        'grupo': 'grupo', 'subgrupo': 'subgrupo', 'tipo_pi': 'tipo_pi',
+    }
+
+    # =========================================================================
+    # LEITURA
+    # =========================================================================
+
+    @classmethod
+    def ler_planilha(cls, caminho):
+        """
+        Lê operações de .xlsx ou .csv (separador ; ou ,).
+
+        Returns:
+            list[dict]: linha, operacao, codigo, destino, grupo, subgrupo, tipo_pi
+        """
+        if str(caminho).lower().endswith(('.xlsx', '.xlsm')):
+            planilha = openpyxl.load_workbook(caminho, read_only=True, data_only=True).active
+            linhas = planilha.iter_rows(values_only=True)
+        else:
+            with open(caminho, encoding='utf-8-sig', newline='') as arquivo:
+                amostra = arquivo.read(4096)
+                arquivo.seek(0)
+                dialeto = csv.Sniffer().sniff(amostra, delimiters=';,')
+                linhas = list(csv.reader(arquivo, dialeto))
+
+        linhas = iter(linhas)
+        cabecalho = [cls.COLUNAS.get(_normalizar(c)) for c in next(linhas, [])]
+        if 'operacao' not in cabecalho or 'codigo' not in cabecalho:
+            raise ValidationError('A planilha precisa das colunas "operacao" e "codigo".')
+
+        operacoes = []
+        for numero, valores in enumerate(linhas, start=2):
+            registro = {
+                coluna: str(valor).strip() if valor is not None else ''
+                for coluna, valor in zip(cabecalho, valores) if coluna
+            }
+            if not registro.get('operacao') and not registro.get('codigo'):
+                continue
+            operacoes.append({
+                'linha': numero,
+                'operacao': SINONIMOS.get(_normalizar(registro.get('operacao')).upper(), registro.get('operacao', '').upper()),
+                'codigo': registro.get('codigo', ''),
+                'destino': registro.get('destino', ''),
+                'grupo': registro.get('grupo', ''),
+                'subgrupo': registro.get('subgrupo', ''),
+                'tipo_pi': registro.get('tipo_pi', '').upper(),
+            })
+        return operacoes
+
+    # =========================================================================
+    # VALIDAÇÃO
+    # =========================================================================
+
+    @staticmethod
+    def _contar(modelo, campo, ids, filtro=None):
+        """{produto_id: quantidade de linhas} com um GROUP BY por fatia de ids"""
+        contagem = {}
+        for fatia in _fatias(ids):
+            consulta = modelo.objects.filter(**{f'{campo}__in': fatia})
+            if filtro is not None:
+                consulta = consulta.filter(filtro)
+            for linha in consulta.values(campo).annotate(n=Count('pk')).order_by():
+                contagem[linha[campo]] = linha['n']
+        return contagem
+
+    @classmethod
+    def _referencias(cls, ids):
+        """{produto_id: {descricao: quantidade}} das referências que bloqueiam exclusão"""
+        referencias = defaultdict(dict)
+        for modelo, campo, descricao in REFERENCIAS_BLOQUEANTES:
+            for produto_id, n in cls._contar(modelo, campo, ids).items():
+                referencias[produto_id][descricao] = n
+        # Posição zerada não bloqueia: é removida junto com o produto
+        saldo = ~Q(quantidade=0) | ~Q(quantidade_reservada=0)
+        for produto_id, n in cls._contar(Estoque, 'produto', ids, saldo).items():
+            referencias[produto_id]['posições de estoque com saldo'] = n
+        return referencias
+
+    @staticmethod
+    def _conflitos_documentos(pares):
+        """{origem_id: motivo} para mesclas que juntariam origem e destino no mesmo documento"""
+        conflitos = {}
+        ids = set(pares) | set(pares.values())
+        for modelo, documento, descricao in DOCUMENTOS_UNICOS:
+            produtos_por_documento = defaultdict(set)
+            for fatia in _fatias(ids):
+                for doc_id, produto_id in modelo.objects.filter(produto_id__in=fatia).values_list(f'{documento}_id', 'produto_id'):
+                    produtos_por_documento[doc_id].add(produto_id)
+            for produtos in produtos_por_documento.values():
+                for origem in produtos & set(pares):
+                    if pares[origem] in produtos:
+                        conflitos.setdefault(origem, f'origem e destino na mesma {descricao}')
+        return conflitos
+
+    @staticmethod
+    def _subgrupos(operacoes):
+        """{(grupo, subgrupo): SubgrupoProduto} dos destinos de reclassificação"""
+        chaves = set()
+        for op in operacoes:
+            if op['operacao'] != 'RECLASSIFICAR':
+                continue
+            grupo, subgrupo = op['grupo'], op['subgrupo']
+            if '.' in subgrupo:
+                grupo, subgrupo = subgrupo.split('.', 1)
+            op['grupo'], op['subgrupo'] = grupo, subgrupo
+            chaves.add((grupo, subgrupo))
+
+        filtro = Q()
+        for grupo, subgrupo in chaves:
+            filtro |= Q(grupo__codigo=grupo, codigo=subgrupo)
+        if not chaves:
+            return {}
+        return {
+            (s.grupo.codigo, s.codigo): s
+            for s in SubgrupoProduto.objects.filter(filtro).select_related('grupo')
+        }
+
+    @classmethod
+    def validar(cls, operacoes, inativar_bloqueados=False):
+        """
+        Valida as operações e monta o relatório (nada é gravado).
+
+        Args:
+            operacoes (list[dict]): ver `ler_planilha`
+            inativar_bloqueados (bool): exclusões bloqueadas por referências
+                                         viram inativação do produto
+
+        Returns:
+            list[dict]: operações com produto_id, destino_id, subgrupo_obj,
+                        situacao ('ok', 'inativar', 'bloqueado', 'erro') e detalhe
+        """
+        codigos = {op['codigo'] for op in operacoes} | {op['destino'] for op in operacoes if op['destino']}
+        produtos = {}
+        for fatia in _fatias(codigos):
+            for produto in Produto.objects.filter(codigo__in=fatia).only(
+                'id', 'codigo', 'tipo', 'tipo_pi', 'grupo_id', 'subgrupo_id', 'estoque_atual',
+            ):
+                produtos[produto.codigo] = produto
+        subgrupos = cls._subgrupos(operacoes)
+
+        vistos = defaultdict(int)
+        for op in operacoes:
+            vistos[op['codigo']] += 1
+        origens_mescla = {op['codigo'] for op in operacoes if op['operacao'] in ('MESCLAR', 'EXCLUIR')}
+
+        for op in operacoes:
+            op.update(situacao='ok', detalhe='', novo_codigo='', produto_id=None, destino_id=None)
+            produto = produtos.get(op['codigo'])
+
+            if op['operacao'] not in ('EXCLUIR', 'MESCLAR', 'RECLASSIFICAR'):
+                op.update(situacao='erro', detalhe=f"Operação desconhecida: {op['operacao'] or '(vazia)'}")
+            elif produto is None:
+                op.update(situacao='erro', detalhe='Produto não encontrado')
+            elif vistos[op['codigo']] > 1:
+                op.update(situacao='erro', detalhe='Produto aparece em mais de uma linha')
+            elif op['operacao'] == 'MESCLAR':
+                destino = produtos.get(op['destino'])
+                if destino is None:
+                    op.update(situacao='erro', detalhe=f"Destino não encontrado: {op['destino'] or '(vazio)'}")
+                elif destino.codigo == produto.codigo:
+                    op.update(situacao='erro', detalhe='Destino igual à origem')
+                elif destino.codigo in origens_mescla:
+                    op.update(situacao='erro', detalhe='Destino também é excluído ou mesclado na planilha')
+                else:
+                    op['destino_id'] = destino.id
+            elif op['operacao'] == 'RECLASSIFICAR':
+                subgrupo = subgrupos.get((op['grupo'], op['subgrupo']))
+                if subgrupo is None:
+                    op.update(situacao='erro', detalhe=f"Subgrupo não encontrado: {op['grupo']}.{op['subgrupo']}")
+                elif subgrupo.grupo.tipo_produto == 'PI' and not (op['tipo_pi'] or produto.tipo_pi):
+                    op.update(situacao='erro', detalhe='Informe tipo_pi para reclassificar como PI')
+                elif subgrupo.id == produto.subgrupo_id:
+                    op.update(situacao='erro', detalhe='Produto já está neste subgrupo')
+                else:
+                    op['subgrupo_obj'] = subgrupo
+            if produto is not None:
+                op['produto_id'] = produto.id
+                op['produto'] = produto
+
+        # Referências: uma consulta agrupada por tabela para todas as exclusões
+        exclusoes = [op for op in operacoes if op['operacao'] == 'EXCLUIR' and op['situacao'] == 'ok']
+        referencias = cls._referencias([op['produto_id'] for op in exclusoes])
+        for op in exclusoes:
+            refs = referencias.get(op['produto_id'])
+            if refs:
+                texto = ', '.join(f'{n} {descricao}' for descricao, n in sorted(refs.items()))
+                if inativar_bloqueados:
+                    op.update(situacao='inativar', detalhe=f'Referenciado ({texto}); será inativado')
+                else:
+                    op.update(situacao='bloqueado', detalhe=f'Referenciado: {texto}')
+
+        mesclas = [op for op in operacoes if op['operacao'] == 'MESCLAR' and op['situacao'] == 'ok']
+        conflitos = cls._conflitos_documentos({op['produto_id']: op['destino_id'] for op in mesclas})
+        movidos = cls._referencias([op['produto_id'] for op in mesclas]) if mesclas else {}
+        for op in mesclas:
+            if op['produto_id'] in conflitos:
+                op.update(situacao='bloqueado', detalhe=conflitos[op['produto_id']])
+            elif movidos.get(op['produto_id']):
+                op['detalhe'] = 'Transfere ' + ', '.join(
+                    f'{n} {descricao}' for descricao, n in sorted(movidos[op['produto_id']].items())
+                )
+
+        # Regras YAML citam códigos no texto: só avisa, a regra é ajustada à mão
+        alterados = {op['codigo']: op for op in operacoes if op['situacao'] in ('ok', 'inativar')}
+        for regra in RegraYAML.objects.filter(ativa=True).only('nome', 'conteudo_yaml'):
+            for codigo in alterados.keys() & set(PADRAO_CODIGO.findall(regra.conteudo_yaml)):
+                op = alterados[codigo]
+                aviso = f'Citado na regra YAML "{regra.nome}"'
+                op['detalhe'] = f"{op['detalhe']}; {aviso}" if op['detalhe'] else aviso
+
+        # Prévia dos novos códigos (sem reservar)
+        por_subgrupo = defaultdict(list)
+        for op in operacoes:
+            if op['operacao'] == 'RECLASSIFICAR' and op['situacao'] == 'ok':
+                por_subgrupo[op['subgrupo_obj'].id].append(op)
+        for ops in por_subgrupo.values():
+            for op, codigo in zip(ops, cls.alocar_codigos(ops[0]['subgrupo_obj'], len(ops), reservar=False)):
+                op['novo_codigo'] = codigo
+
+        return operacoes
+
+    # =========================================================================
+    # CÓDIGOS
+    # =========================================================================
+
+    @staticmethod
+    def alocar_codigos(subgrupo, quantidade, reservar=True):
+        """
+        Próximos `quantidade` códigos livres do subgrupo (GG.SS.NNNNN), em bloco:
+        uma leitura dos códigos já usados e uma gravação do contador.
+
+        Args:
+            subgrupo (SubgrupoProduto): subgrupo de destino
+            quantidade (int): códigos necessários
+            reservar (bool): trava o subgrupo e grava o novo `ultimo_numero`
+                             (precisa estar dentro de uma transação)
+
+        Returns:
+            list[str]: códigos alocados
+        """
+        if reservar:
+            subgrupo = SubgrupoProduto.objects.select_for_update().select_related('grupo').get(pk=subgrupo.pk)
+        prefixo = f"{subgrupo.grupo.codigo}.{subgrupo.codigo}."
+        usados = {
+            int(codigo[len(prefixo):])
+            for codigo in Produto.objects.filter(codigo__startswith=prefixo).values_list('codigo', flat=True)
+            if codigo[len(prefixo):].isdigit()
+        }
+
+        codigos, numero = [], subgrupo.ultimo_numero
+        while len(codigos) < quantidade:
+            numero += 1
+            if numero > 99999:
+                raise ValidationError(
+                    f'Limite de produtos atingido para o subgrupo {subgrupo.codigo_completo}. '
+                    f'Máximo permitido: 99999 produtos.'
+                )
+            if numero not in usados:
+                codigos.append(f"{prefixo}{numero:05d}")
+
+        if reservar and codigos:
+            subgrupo.ultimo_numero = numero
+            subgrupo.save(update_fields=['ultimo_numero'])
+        return codigos
+
+    # =========================================================================
+    # APLICAÇÃO
+    # =========================================================================
+
+    @classmethod
+    def aplicar(cls, operacoes, usuario=None, lote=200):
+        """
+        Executa as operações validadas (situacao 'ok' ou 'inativar') em lotes.
+
+        Cada lote roda numa transação; se falhar, suas operações ficam com
+        situacao 'erro' e os demais lotes continuam.
+
+        Returns:
+            dict: {situacao: quantidade} após a execução
+        """
+        etapas = [
+            ('MESCLAR', cls._mesclar),
+            ('EXCLUIR', cls._excluir),
+            ('RECLASSIFICAR', cls._reclassificar),
+        ]
+        for operacao, executar in etapas:
+            pendentes = [
+                op for op in operacoes
+                if op['operacao'] == operacao and op['situacao'] in ('ok', 'inativar')
+            ]
+            for fatia in _fatias(pendentes, lote):
+                try:
+                    with transaction.atomic():
+                        executar(fatia, usuario)
+                except Exception as e:
+                    logger.error(f"Manutenção de catálogo: lote de {operacao} falhou: {e}", exc_info=True)
+                    for op in fatia:
+                        op.update(situacao='erro', detalhe=f'Lote desfeito: {e}')
+                else:
+                    for op in fatia:
+                        op['situacao'] = 'aplicado' if op['situacao'] == 'ok' else 'inativado'
+
+        resumo = defaultdict(int)
+        for op in operacoes:
+            resumo[op['situacao']] += 1
+        logger.info(f"Manutenção de catálogo aplicada: {dict(resumo)}")
+        return dict(resumo)
+
+    @staticmethod
+    def _trocar_produto(consulta, campo, mapa):
+        """UPDATE ... SET campo = CASE campo WHEN origem THEN destino ... END"""
+        if not mapa:
+            return 0
+        caso = Case(
+            *[When(**{f'{campo}_id': origem}, then=Value(destino)) for origem, destino in mapa.items()],
+            output_field=Produto._meta.pk.__class__(),
+        )
+        return consulta.filter(**{f'{campo}_id__in': list(mapa)}).update(**{campo: caso})
+
+    @classmethod
+    def _mesclar(cls, operacoes, usuario):
+        mapa = {op['produto_id']: op['destino_id'] for op in operacoes}
+        origens, destinos = list(mapa), set(mapa.values())
+
+        for modelo, campo in REFERENCIAS_SIMPLES:
+            cls._trocar_produto(modelo.objects.all(), campo, mapa)
+        for modelo, _, _ in DOCUMENTOS_UNICOS:
+            cls._trocar_produto(modelo.objects.all(), 'produto', mapa)
+
+        # Fornecedores e histórico de preços: duplicado fica o do destino
+        for modelo, chave in RESUMOS_UNICOS:
+            existentes = set(
+                modelo.objects.filter(produto_id__in=destinos).values_list('produto_id', f'{chave}_id')
+            )
+            duplicados = [
+                pk for pk, produto_id, chave_id in
+                modelo.objects.filter(produto_id__in=origens).values_list('pk', 'produto_id', f'{chave}_id')
+                if (mapa[produto_id], chave_id) in existentes
+            ]
+            modelo.objects.filter(pk__in=duplicados).delete()
+            cls._trocar_produto(modelo.objects.all(), 'produto', mapa)
+        ClassificacaoEstoque.objects.filter(produto_id__in=origens).delete()
+
+        cls._mesclar_saldos(Estoque, ('local_estoque_id',), mapa)
+        cls._mesclar_saldos(SaldoEstoqueMensal, ('local_estoque_id', 'competencia'), mapa)
+        pais_afetados = cls._mesclar_estruturas(mapa)
+
+        # Códigos gravados como texto nos consumos das propostas
+        codigos = dict(Produto.objects.filter(pk__in=set(origens) | destinos).values_list('pk', 'codigo'))
+        por_codigo = {codigos[o]: codigos[d] for o, d in mapa.items()}
+        ConsumoProposta.objects.filter(codigo__in=list(por_codigo)).update(codigo=Case(
+            *[When(codigo=antigo, then=Value(novo)) for antigo, novo in por_codigo.items()],
+            output_field=models.CharField(),
+        ))
+
+        # Estoque consolidado no cadastro do destino
+        estoque_origens = defaultdict(Decimal)
+        for op in operacoes:
+            estoque_origens[op['destino_id']] += op['produto'].estoque_atual or 0
+        destinos_obj = list(Produto.objects.filter(pk__in=destinos).only('id', 'estoque_atual'))
+        for destino in destinos_obj:
+            destino.estoque_atual = (destino.estoque_atual or 0) + estoque_origens[destino.id]
+        Produto.objects.bulk_update(destinos_obj, ['estoque_atual'])
+
+        Produto.objects.filter(pk__in=origens).delete()
+
+        for pai in Produto.objects.filter(pk__in=pais_afetados - set(origens)):
+            if pai.pode_ter_estrutura:
+                pai.aplicar_custo_calculado(salvar=True)
+
+    @staticmethod
+    def _mesclar_saldos(modelo, chave, mapa):
+        """Soma saldos da origem no registro do destino com a mesma chave (local, competência)"""
+        campos = ['produto_id', *chave]
+        destinos = {
+            tuple(getattr(r, c) for c in campos): r
+            for r in modelo.objects.filter(produto_id__in=set(mapa.values()))
+        }
+        somados, removidos = [], []
+        for registro in modelo.objects.filter(produto_id__in=list(mapa)):
+            alvo = destinos.get((mapa[registro.produto_id], *(getattr(registro, c) for c in chave)))
+            if alvo is None:
+                continue
+            # Custo médio ponderado pelas quantidades dos dois registros
+            valor = alvo.quantidade * alvo.custo_medio + registro.quantidade * registro.custo_medio
+            alvo.quantidade += registro.quantidade
+            if alvo.quantidade:
+                alvo.custo_medio = (valor / alvo.quantidade).quantize(Decimal('0.0001'))
+            alvo.valor_total = (alvo.quantidade * alvo.custo_medio).quantize(Decimal('0.01'))
+            if hasattr(alvo, 'quantidade_reservada'):
+                alvo.quantidade_reservada += registro.quantidade_reservada
+                alvo.ultima_entrada = max(filter(None, [alvo.ultima_entrada, registro.ultima_entrada]), default=None)
+                alvo.ultima_saida = max(filter(None, [alvo.ultima_saida, registro.ultima_saida]), default=None)
+            somados.append(alvo)
+            removidos.append(registro.pk)
+
+        campos_somados = ['quantidade', 'valor_total', 'custo_medio']
+        if modelo is Estoque:
+            campos_somados += ['quantidade_reservada', 'ultima_entrada', 'ultima_saida']
+        modelo.objects.filter(pk__in=removidos).delete()
+        modelo.objects.bulk_update(list({id(r): r for r in somados}.values()), campos_somados)
+        ManutencaoCatalogoService._trocar_produto(modelo.objects.all(), 'produto', mapa)
+
+    @staticmethod
+    def _mesclar_estruturas(mapa):
+        """
+        Estruturas em que a origem é pai ou componente passam para o destino.
+        Componente repetido soma a quantidade; autorreferência é removida.
+
+        Returns:
+            set: produtos pai cujo custo precisa ser recalculado
+        """
+        def novo(produto_id):
+            return mapa.get(produto_id, produto_id)
+
+        ids = set(mapa) | set(mapa.values())
+        linhas = list(EstruturaProduto.objects.filter(Q(produto_pai_id__in=ids) | Q(produto_filho_id__in=ids)))
+
+        finais, remover, alterar = {}, [], {}
+        # Linhas que não mudam primeiro, para que sejam as mantidas
+        for linha in sorted(linhas, key=lambda l: l.produto_pai_id in mapa or l.produto_filho_id in mapa):
+            par = (novo(linha.produto_pai_id), novo(linha.produto_filho_id))
+            if par[0] == par[1]:
+                remover.append(linha.pk)
+            elif par in finais:
+                finais[par].quantidade += linha.quantidade
+                alterar[finais[par].pk] = finais[par]
+                remover.append(linha.pk)
+            else:
+                finais[par] = linha
+
+        EstruturaProduto.objects.filter(pk__in=remover).delete()
+        EstruturaProduto.objects.bulk_update(list(alterar.values()), ['quantidade'])
+        ManutencaoCatalogoService._trocar_produto(EstruturaProduto.objects.all(), 'produto_pai', mapa)
+        ManutencaoCatalogoService._trocar_produto(EstruturaProduto.objects.all(), 'produto_filho', mapa)
+        return {novo(linha.produto_pai_id) for linha in linhas}
+
+    @staticmethod
+    def _excluir(operacoes, usuario):
+        inativar = [op['produto_id'] for op in operacoes if op['situacao'] == 'inativar']
+        excluir = [op['produto_id'] for op in operacoes if op['situacao'] == 'ok']
+
+        if inativar:
+            # atualizado_por é obrigatório: sem usuário, mantém o anterior
+            quem = {'atualizado_por': usuario} if usuario else {}
+            Produto.objects.filter(pk__in=inativar).update(
+                status='INATIVO', atualizado_em=timezone.now(), **quem,
+            )
+        if excluir:
+            Estoque.objects.filter(produto_id__in=excluir, quantidade=0, quantidade_reservada=0).delete()
+            Produto.objects.filter(pk__in=excluir).delete()
+
+    @classmethod
+    def _reclassificar(cls, operacoes, usuario):
+        por_subgrupo = defaultdict(list)
+        for op in operacoes:
+            por_subgrupo[op['subgrupo_obj'].pk].append(op)
+
+        produtos, trocas = [], {}
+        agora = timezone.now()
+        for ops in por_subgrupo.values():
+            subgrupo = ops[0]['subgrupo_obj']
+            for op, codigo in zip(ops, cls.alocar_codigos(subgrupo, len(ops))):
+                produto = op['produto']
+                trocas[produto.codigo] = codigo
+                op['novo_codigo'] = codigo
+                produto.codigo = codigo
+                produto.grupo_id = subgrupo.grupo_id
+                produto.subgrupo_id = subgrupo.pk
+                produto.tipo = subgrupo.grupo.tipo_produto
+                if produto.tipo == 'PI':
+                    produto.tipo_pi = op['tipo_pi'] or produto.tipo_pi
+                else:
+                    produto.tipo_pi = None
+                if usuario:
+                    produto.atualizado_por = usuario
+                produto.atualizado_em = agora
+                produtos.append(produto)
+
+        campos = ['codigo', 'grupo', 'subgrupo', 'tipo', 'tipo_pi', 'atualizado_em']
+        if usuario:
+            campos.append('atualizado_por')
+        Produto.objects.bulk_update(produtos, campos, batch_size=500)
+        ConsumoProposta.objects.filter(codigo__in=list(trocas)).update(codigo=Case(
+            *[When(codigo=antigo, then=Value(novo)) for antigo, novo in trocas.items()],
+            output_field=models.CharField(),
+        ))
+
+    # =========================================================================
+    # RELATÓRIO
+    # =========================================================================
+
+    CAMPOS_RELATORIO = ['linha', 'operacao', 'codigo', 'destino', 'novo_codigo', 'situacao', 'detalhe']
+
+    @classmethod
+    def gravar_relatorio(cls, operacoes, caminho):
+        """Relatório por linha da planilha em CSV (separador ;)"""
+        with open(caminho, 'w', encoding='utf-8-sig', newline='') as arquivo:
+            escritor = csv.DictWriter(arquivo, cls.CAMPOS_RELATORIO, delimiter=';', extrasaction='ignore')
+            escritor.writeheader()
+            escritor.writerows(operacoes)
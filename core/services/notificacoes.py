@@ -0,0 +1,277 @@
+# core/services/notificacoes.py
+
+"""
+Contadores de tarefas pendentes e entrega por server-sent events (SSE).
+
+O badge de tarefas consultava o banco (COUNT com OR entre usuário e nível)
+a cada 60 s em cada aba aberta. Agora:
+
+- os contadores ficam no cache compartilhado, um por nível
+  (`nivel_destino`) e um por usuário (tarefas atribuídas diretamente e que
+  não são do nível dele, para não contar duas vezes); só são recalculados
+  depois que uma Tarefa muda (core/signals_notificacoes.py);
+- a mudança é publicada num hub nos canais 'usuario:<id>' e
+  'nivel:<nivel>'; cada conexão SSE aberta (producao:tarefas_eventos) está
+  inscrita nos canais do seu usuário e recebe o novo total na hora.
+
+O hub padrão (HubLocal) distribui em memória, dentro do processo: serve
+para um worker ASGI. Com vários workers, use HubPostgres
+(NOTIFICACOES_HUB), que repassa as publicações por LISTEN/NOTIFY.
+
+SSE exige servidor ASGI (fuza_elevadores.asgi). Com NOTIFICACOES_SSE
+desligado, as páginas continuam consultando producao:tarefas_contador, que
+agora lê os mesmos contadores do cache.
+"""
+
+import asyncio
+import json
+import logging
+import select
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils.module_loading import import_string
+
+from core.utils.cache import invalidar, obter
+
+logger = logging.getLogger(__name__)
+
+CONFIGURACAO_PADRAO = {
+    'NOTIFICACOES_SSE': False,
+    'NOTIFICACOES_HUB': 'core.services.notificacoes.HubLocal',
+    'NOTIFICACOES_HEARTBEAT_S': 25,
+    'NOTIFICACOES_TTL_CONTADOR_S': 60 * 60,
+}
+
+CANAL_POSTGRES = 'fuza_notificacoes'
+
+
+def configuracao(chave):
+    """Lê a chave em FUZA_ELEVADORES_SETTINGS (com padrão)"""
+    return getattr(settings, 'FUZA_ELEVADORES_SETTINGS', {}).get(chave, CONFIGURACAO_PADRAO[chave])
+
+
+def canais_do_usuario(usuario) -> list:
+    canais = [f'usuario:{usuario.pk}']
+    if getattr(usuario, 'nivel', None):
+        canais.append(f'nivel:{usuario.nivel}')
+    return canais
+
+
+# =============================================================================
+# CONTADORES
+# =============================================================================
+
+class ContadorTarefas:
+    """Tarefas pendentes por nível e por usuário, em cache até a próxima mudança"""
+
+    @staticmethod
+    def _chave_nivel(nivel):
+        return f'tarefas_pendentes:nivel:{nivel}'
+
+    @staticmethod
+    def _chave_usuario(usuario_id, nivel):
+        return f'tarefas_pendentes:usuario:{usuario_id}:{nivel or "-"}'
+
+    @classmethod
+    def do_nivel(cls, nivel: str) -> int:
+        from core.models import Tarefa
+
+        return obter(
+            cls._chave_nivel(nivel),
+            lambda: Tarefa.objects.filter(status='pendente', nivel_destino=nivel).count(),
+            configuracao('NOTIFICACOES_TTL_CONTADOR_S'),
+        )
+
+    @classmethod
+    def do_usuario(cls, usuario_id: int, nivel: Optional[str]) -> int:
+        """Atribuídas diretamente ao usuário, fora do nível dele (essas já estão em do_nivel)"""
+        from core.models import Tarefa
+
+        def contar():
+            tarefas = Tarefa.objects.filter(status='pendente', usuario_destino_id=usuario_id)
+            if nivel:
+                tarefas = tarefas.exclude(nivel_destino=nivel)
+            return tarefas.count()
+
+        return obter(cls._chave_usuario(usuario_id, nivel), contar, configuracao('NOTIFICACOES_TTL_CONTADOR_S'))
+
+    @classmethod
+    def pendentes(cls, usuario) -> int:
+        """Mesmo resultado de Tarefa(usuario_destino=usuario OU nivel_destino=usuario.nivel, pendente).count()"""
+        nivel = getattr(usuario, 'nivel', None)
+        total = cls.do_usuario(usuario.pk, nivel)
+        if nivel:
+            total += cls.do_nivel(nivel)
+        return total
+
+    @classmethod
+    def tarefa_alterada(cls, usuarios: Iterable[int], niveis: Iterable[str]) -> None:
+        """
+        Após o commit, invalida os contadores afetados e avisa os canais.
+
+        Invalidar antes do commit deixaria uma leitura concorrente regravar
+        a contagem antiga no cache até o TTL.
+
+        Args:
+            usuarios: ids de usuario_destino (antes e depois da mudança)
+            niveis: nivel_destino (antes e depois da mudança)
+        """
+        from core.models import Usuario
+
+        usuarios = {u for u in usuarios if u}
+        niveis = {n for n in niveis if n}
+        if not usuarios and not niveis:
+            return
+
+        # A chave por usuário inclui o nível atual dele
+        nivel_por_usuario = dict(Usuario.objects.filter(pk__in=usuarios).values_list('pk', 'nivel'))
+        chaves = [
+            *(cls._chave_nivel(nivel) for nivel in niveis),
+            *(cls._chave_usuario(u, nivel_por_usuario.get(u)) for u in usuarios),
+        ]
+
+        def apos_commit():
+            invalidar(*chaves)
+            for u in usuarios:
+                hub().publicar(f'usuario:{u}', {'tipo': 'tarefas'})
+            for nivel in niveis:
+                hub().publicar(f'nivel:{nivel}', {'tipo': 'tarefas'})
+
+        transaction.on_commit(apos_commit)
+
+
+# =============================================================================
+# HUB
+# =============================================================================
+
+class HubLocal:
+    """
+    Fan-out em memória para as conexões SSE deste processo.
+
+    `publicar` pode ser chamado de qualquer thread (views síncronas rodam
+    fora do event loop sob ASGI); a entrega usa call_soon_threadsafe.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._assinantes: Dict[str, set] = defaultdict(set)
+
+    def assinar(self, canais: Iterable[str]) -> asyncio.Queue:
+        """Fila que recebe as mensagens dos `canais` (chamar dentro do event loop)"""
+        fila = asyncio.Queue(maxsize=100)
+        inscricao = (asyncio.get_running_loop(), fila)
+        with self._lock:
+            for canal in canais:
+                self._assinantes[canal].add(inscricao)
+        fila.canais = tuple(canais)
+        return fila
+
+    def cancelar(self, fila: asyncio.Queue) -> None:
+        with self._lock:
+            for canal in getattr(fila, 'canais', ()):
+                self._assinantes[canal] = {i for i in self._assinantes[canal] if i[1] is not fila}
+                if not self._assinantes[canal]:
+                    del self._assinantes[canal]
+
+    def conexoes(self) -> int:
+        with self._lock:
+            return len({id(fila) for inscricoes in self._assinantes.values() for _, fila in inscricoes})
+
+    def publicar(self, canal: str, dados: dict) -> None:
+        self._entregar(canal, dados)
+
+    def _entregar(self, canal: str, dados: dict) -> None:
+        with self._lock:
+            inscricoes = list(self._assinantes.get(canal, ()))
+        for loop, fila in inscricoes:
+            try:
+                loop.call_soon_threadsafe(self._colocar, fila, canal, dados)
+            except RuntimeError:
+                # Loop encerrado: a conexão caiu sem passar pelo cancelar
+                self.cancelar(fila)
+
+    @staticmethod
+    def _colocar(fila, canal, dados):
+        try:
+            fila.put_nowait((canal, dados))
+        except asyncio.QueueFull:
+            pass  # cliente lento: a próxima mensagem traz o total atualizado
+
+
+class HubPostgres(HubLocal):
+    """
+    Hub para vários workers: publica com pg_notify e cada processo escuta o
+    canal numa conexão própria (thread), repassando ao fan-out local.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._ouvinte = None
+
+    def assinar(self, canais):
+        self._iniciar_ouvinte()
+        return super().assinar(canais)
+
+    def publicar(self, canal, dados):
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_notify(%s, %s)', [CANAL_POSTGRES, json.dumps({'canal': canal, 'dados': dados})])
+        except Exception as e:
+            logger.warning(f"pg_notify falhou, entregando só neste processo: {e}")
+            self._entregar(canal, dados)
+
+    def _iniciar_ouvinte(self):
+        with self._lock:
+            if self._ouvinte and self._ouvinte.is_alive():
+                return
+            self._ouvinte = threading.Thread(target=self._ouvir, name='hub-notificacoes', daemon=True)
+            self._ouvinte.start()
+
+    def _ouvir(self):
+        import psycopg2
+        import psycopg2.extensions
+
+        db = settings.DATABASES['default']
+        conexao = psycopg2.connect(
+            dbname=db['NAME'], user=db.get('USER'), password=db.get('PASSWORD'),
+            host=db.get('HOST') or None, port=db.get('PORT') or None,
+        )
+        conexao.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        with conexao.cursor() as cursor:
+            cursor.execute(f'LISTEN {CANAL_POSTGRES}')
+        logger.info(f"Hub de notificações escutando {CANAL_POSTGRES}")
+
+        try:
+            while True:
+                if select.select([conexao], [], [], 60) == ([], [], []):
+                    continue
+                conexao.poll()
+                while conexao.notifies:
+                    aviso = conexao.notifies.pop(0)
+                    try:
+                        mensagem = json.loads(aviso.payload)
+                        self._entregar(mensagem['canal'], mensagem['dados'])
+                    except (ValueError, KeyError) as e:
+                        logger.warning(f"Notificação inválida ignorada: {e}")
+        except Exception as e:
+            logger.error(f"Hub de notificações parou de escutar: {e}")
+        finally:
+            conexao.close()
+
+
+_hub = None
+_hub_lock = threading.Lock()
+
+
+def hub() -> HubLocal:
+    """Hub configurado em NOTIFICACOES_HUB (um por processo)"""
+    global _hub
+    if _hub is None:
+        with _hub_lock:
+            if _hub is None:
+                _hub = import_string(configuracao('NOTIFICACOES_HUB'))()
+    return _hub
@@ -0,0 +1,246 @@
+# core/services/portas_pavimento.py
+
+"""
+Configuração das portas por pavimento (etapa 2 da proposta).
+
+O POST é convertido em uma estrutura compacta {andar: {campo: valor}} e
+comparada com as portas gravadas: só os pavimentos alterados são escritos
+(bulk_create/bulk_update/delete em uma transação), preservando os IDs das
+portas que não mudaram. Um "modelo de intervalo" (campos intervalo_*)
+aplica os mesmos valores a uma faixa de pavimentos.
+"""
+
+import logging
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+
+from core.models import PortaPavimento
+
+logger = logging.getLogger(__name__)
+
+CAMPOS = (
+    'nome_andar', 'ativo', 'saida', 'abertura_porta', 'modelo', 'material',
+    'largura', 'altura', 'folhas', 'observacoes',
+)
+
+# Campos do modelo de intervalo: sufixo no POST -> campo da porta
+CAMPOS_INTERVALO = {
+    'saida': 'saida',
+    'abertura': 'abertura_porta',
+    'modelo': 'modelo',
+    'material': 'material',
+    'largura': 'largura',
+    'altura': 'altura',
+    'folhas': 'folhas',
+}
+
+_ESCOLHAS = {
+    'saida': {valor for valor, _ in PortaPavimento.SAIDA_CHOICES},
+    'abertura_porta': {valor for valor, _ in PortaPavimento.ABERTURA_CHOICES},
+    'modelo': {valor for valor, _ in PortaPavimento.MODELO_CHOICES},
+    'material': {valor for valor, _ in PortaPavimento.MATERIAL_CHOICES},
+    'folhas': {valor for valor, _ in PortaPavimento._meta.get_field('folhas').choices},
+}
+
+
+class PortaPavimentoService:
+    """
+    Leitura, comparação e gravação das portas de pavimento de uma proposta
+    """
+
+    @staticmethod
+    def nome_padrao(andar):
+        if andar == 0:
+            return "Térreo"
+        if andar < 0:
+            return f"Subsolo {abs(andar)}" if abs(andar) > 1 else "Subsolo"
+        return f"{andar}º Andar"
+
+    @classmethod
+    def padrao(cls, proposta, andar):
+        """Configuração de um pavimento a partir dos padrões da proposta"""
+        return {
+            'nome_andar': cls.nome_padrao(andar),
+            'ativo': True,
+            'saida': 'normal',
+            'abertura_porta': 'direita',
+            'modelo': proposta.modelo_porta_pavimento or 'Automática',
+            'material': proposta.material_porta_pavimento or 'Inox 430',
+            'largura': proposta.largura_porta_pavimento or Decimal('0.80'),
+            'altura': proposta.altura_porta_pavimento or Decimal('2.10'),
+            'folhas': proposta.folhas_porta_pavimento or '2',
+            'observacoes': '',
+        }
+
+    @staticmethod
+    def _decimal(valor):
+        """Aceita vírgula ou ponto; vazio, inválido ou não positivo vira None"""
+        if not valor or not str(valor).strip():
+            return None
+        try:
+            numero = Decimal(str(valor).strip().replace(',', '.')).quantize(Decimal('0.01'))
+        except InvalidOperation:
+            return None
+        return numero if numero > 0 else None
+
+    @classmethod
+    def _valor(cls, campo, bruto, padrao):
+        """Valor de um campo vindo do POST, com o padrão quando vazio ou inválido"""
+        if campo in ('largura', 'altura'):
+            return cls._decimal(bruto) or padrao
+        if campo in _ESCOLHAS:
+            return bruto if bruto in _ESCOLHAS[campo] else padrao
+        return bruto.strip() if bruto else padrao
+
+    @classmethod
+    def ler_post(cls, proposta, dados):
+        """
+        Converte o POST da etapa 2 na configuração por pavimento.
+
+        Campos por andar: porta_nome_N, porta_ativo_N, porta_saida_N,
+        porta_abertura_N, porta_modelo_N, porta_material_N, porta_largura_N,
+        porta_altura_N, porta_folhas_N e porta_observacoes_N. Depois, se
+        intervalo_de/intervalo_ate vierem preenchidos, os campos intervalo_*
+        não vazios são aplicados aos pavimentos da faixa.
+
+        Args:
+            proposta: Proposta (pavimentos e padrões de porta)
+            dados: request.POST
+
+        Returns:
+            dict: {andar: {campo: valor}} para andar em range(pavimentos)
+        """
+        configuracao = {}
+        for andar in range(proposta.pavimentos or 0):
+            padrao = cls.padrao(proposta, andar)
+            configuracao[andar] = {
+                'nome_andar': cls._valor('nome_andar', dados.get(f'porta_nome_{andar}'), padrao['nome_andar']),
+                'ativo': dados.get(f'porta_ativo_{andar}') == 'on',
+                'saida': cls._valor('saida', dados.get(f'porta_saida_{andar}'), padrao['saida']),
+                'abertura_porta': cls._valor('abertura_porta', dados.get(f'porta_abertura_{andar}'), padrao['abertura_porta']),
+                'modelo': cls._valor('modelo', dados.get(f'porta_modelo_{andar}'), padrao['modelo']),
+                'material': cls._valor('material', dados.get(f'porta_material_{andar}'), padrao['material']),
+                'largura': cls._valor('largura', dados.get(f'porta_largura_{andar}'), padrao['largura']),
+                'altura': cls._valor('altura', dados.get(f'porta_altura_{andar}'), padrao['altura']),
+                'folhas': cls._valor('folhas', dados.get(f'porta_folhas_{andar}'), padrao['folhas']),
+                'observacoes': (dados.get(f'porta_observacoes_{andar}') or '').strip(),
+            }
+
+        try:
+            inicio = int(dados.get('intervalo_de', ''))
+            fim = int(dados.get('intervalo_ate', ''))
+        except ValueError:
+            return configuracao
+
+        valores = {}
+        for sufixo, campo in CAMPOS_INTERVALO.items():
+            bruto = dados.get(f'intervalo_{sufixo}')
+            valor = cls._valor(campo, bruto, None) if bruto else None
+            if valor is not None:
+                valores[campo] = valor
+        if dados.get('intervalo_ativo') in ('sim', 'nao'):
+            valores['ativo'] = dados['intervalo_ativo'] == 'sim'
+
+        return cls.aplicar_intervalo(configuracao, inicio, fim, valores)
+
+    @staticmethod
+    def aplicar_intervalo(configuracao, inicio, fim, valores):
+        """
+        Aplica `valores` aos pavimentos de `inicio` a `fim` (inclusive, em
+        qualquer ordem) que existam na configuração.
+
+        Returns:
+            dict: a própria configuração
+        """
+        if not valores:
+            return configuracao
+        inicio, fim = sorted((inicio, fim))
+        for andar in range(inicio, fim + 1):
+            if andar in configuracao:
+                configuracao[andar].update(valores)
+        logger.debug(f"Intervalo {inicio}-{fim} aplicado: {sorted(valores)}")
+        return configuracao
+
+    @staticmethod
+    def _normalizar(campo, valor):
+        if campo in ('largura', 'altura') and valor is not None:
+            return Decimal(valor).quantize(Decimal('0.01'))
+        return valor
+
+    @classmethod
+    def sincronizar(cls, proposta, configuracao):
+        """
+        Grava a configuração escrevendo só o que mudou.
+
+        Pavimentos sem porta gravada são criados, portas com algum campo
+        diferente são atualizadas (apenas os campos alterados) e portas de
+        andares fora da configuração (ex.: pavimentos reduzidos) são removidas.
+
+        Args:
+            proposta: Proposta
+            configuracao (dict): {andar: {campo: valor}} (ver ler_post)
+
+        Returns:
+            dict: criadas, atualizadas, removidas e inalteradas
+        """
+        with transaction.atomic():
+            existentes = {p.andar: p for p in PortaPavimento.objects.select_for_update().filter(proposta=proposta)}
+
+            novas, alteradas, campos_alterados = [], [], set()
+            for andar, valores in configuracao.items():
+                porta = existentes.get(andar)
+                if porta is None:
+                    novas.append(PortaPavimento(proposta=proposta, andar=andar, **valores))
+                    continue
+                diferentes = [
+                    campo for campo in CAMPOS
+                    if campo in valores
+                    and cls._normalizar(campo, getattr(porta, campo)) != cls._normalizar(campo, valores[campo])
+                ]
+                if diferentes:
+                    for campo in diferentes:
+                        setattr(porta, campo, valores[campo])
+                    alteradas.append(porta)
+                    campos_alterados.update(diferentes)
+
+            removidas = [porta.pk for andar, porta in existentes.items() if andar not in configuracao]
+
+            if removidas:
+                PortaPavimento.objects.filter(pk__in=removidas).delete()
+            if novas:
+                PortaPavimento.objects.bulk_create(novas)
+            if alteradas:
+                PortaPavimento.objects.bulk_update(alteradas, sorted(campos_alterados))
+
+        resultado = {
+            'criadas': len(novas),
+            'atualizadas': len(alteradas),
+            'removidas': len(removidas),
+            'inalteradas': len(existentes) - len(alteradas) - len(removidas),
+        }
+        logger.info(
+            f"Portas da proposta {proposta.numero}: {resultado['criadas']} criadas, "
+            f"{resultado['atualizadas']} atualizadas, {resultado['removidas']} removidas"
+        )
+        return resultado
+
+    @classmethod
+    def salvar_post(cls, proposta, dados):
+        """ler_post + sincronizar"""
+        return cls.sincronizar(proposta, cls.ler_post(proposta, dados))
+
+    @classmethod
+    def portas_para_edicao(cls, proposta):
+        """
+        Uma porta por pavimento para o formulário: as gravadas (uma query) e,
+        para andares sem registro, instâncias não salvas com os padrões.
+
+        Returns:
+            list[PortaPavimento]: ordenadas por andar
+        """
+        existentes = {p.andar: p for p in PortaPavimento.objects.filter(proposta=proposta)}
+        return [
+            existentes.get(andar) or PortaPavimento(proposta=proposta, andar=andar, **cls.padrao(proposta, andar))
+            for andar in range(proposta.pavimentos or 0)
+        ]
@@ -0,0 +1,129 @@
+# core/services/quadro_producao.py
+
+"""
+Quadros do portal de produção: projetos aprovados e ordens de produção.
+
+Cada filtro é empurrado para a tabela dona da coluna: a busca textual vira
+um OR de colunas da proposta com `cliente_id IN (subquery de clientes)`, em
+vez de um OR sobre o JOIN, para que cada parte use o próprio índice
+trigram (migração 0072, PostgreSQL). O valor da lista de materiais vem
+anotado na mesma query (PropostaQuerySet.para_quadro_producao), a
+contagem é feita uma vez e serve ao cabeçalho e à paginação, e a paginação
+é por chave sobre a ordenação escolhida.
+"""
+
+import logging
+from datetime import date, timedelta
+
+from django.db.models import Q
+
+from core.forms.propostas import PropostaFiltroForm
+from core.models import Cliente, Proposta
+from core.utils.view_utils import paginar_keyset
+
+logger = logging.getLogger(__name__)
+
+# Todas terminam em campo único (id) para a paginação por chave
+ORDENACOES = {
+    'recentes': ('Mais recentes', ('-criado_em', '-id')),
+    'antigos': ('Mais antigos', ('criado_em', 'id')),
+    'maior_lista': ('Maior lista de materiais', ('-valor_lista_materiais', '-criado_em', '-id')),
+    'menor_lista': ('Menor lista de materiais', ('valor_lista_materiais', 'criado_em', 'id')),
+}
+
+FILTROS_PADRAO = ('modelo_elevador', 'vendedor', 'validade', 'valor', 'q')
+
+
+class QuadroProducaoService:
+    """
+    Monta a listagem dos quadros (filtros, ordenação, contagem e página)
+    """
+
+    @staticmethod
+    def busca_textual(propostas, termo):
+        """Número, OP, projeto ou nome/fantasia do cliente contendo `termo`"""
+        clientes = Cliente.objects.filter(
+            Q(nome__icontains=termo) | Q(nome_fantasia__icontains=termo)
+        ).values('pk')
+        return propostas.filter(
+            Q(numero__icontains=termo) |
+            Q(numero_op__icontains=termo) |
+            Q(nome_projeto__icontains=termo) |
+            Q(cliente_id__in=clientes)
+        )
+
+    @classmethod
+    def filtrar(cls, propostas, dados, filtros=FILTROS_PADRAO):
+        """
+        Aplica os campos válidos de PropostaFiltroForm.
+
+        Args:
+            propostas: queryset base do quadro
+            dados (dict): form.cleaned_data
+            filtros (tuple): filtros habilitados no quadro
+        """
+        if 'modelo_elevador' in filtros and dados.get('modelo_elevador'):
+            propostas = propostas.filter(modelo_elevador=dados['modelo_elevador'])
+
+        if 'vendedor' in filtros and dados.get('vendedor'):
+            propostas = propostas.filter(vendedor=dados['vendedor'])
+
+        validade = dados.get('validade') if 'validade' in filtros else None
+        if validade:
+            hoje = date.today()
+            if validade == 'vencidas':
+                propostas = propostas.filter(data_validade__lt=hoje)
+            elif validade == 'vence_hoje':
+                propostas = propostas.filter(data_validade=hoje)
+            elif validade == 'vence_semana':
+                propostas = propostas.filter(data_validade__gte=hoje, data_validade__lte=hoje + timedelta(days=7))
+            elif validade == 'vigentes':
+                propostas = propostas.filter(data_validade__gte=hoje)
+
+        if 'valor' in filtros:
+            if dados.get('valor_min'):
+                propostas = propostas.filter(valor_proposta__gte=dados['valor_min'])
+            if dados.get('valor_max'):
+                propostas = propostas.filter(valor_proposta__lte=dados['valor_max'])
+
+        if 'q' in filtros and dados.get('q'):
+            propostas = cls.busca_textual(propostas, dados['q'].strip())
+        return propostas
+
+    @classmethod
+    def listar(cls, request, filtros_fixos, filtros=FILTROS_PADRAO, itens_por_pagina=15):
+        """
+        Contexto de um quadro.
+
+        Args:
+            request: GET com status_producao, ordem, cursor e campos do filtro
+            filtros_fixos (dict): filtro do quadro (ex.: status='aprovado')
+            filtros (tuple): filtros do formulário habilitados
+
+        Returns:
+            dict: propostas (PaginaKeyset), form, filtro_status_producao,
+                  total_propostas, ordem e ordenacoes
+        """
+        propostas = Proposta.objects.para_quadro_producao().select_related('cliente', 'vendedor').filter(**filtros_fixos)
+
+        filtro_status_producao = request.GET.get('status_producao', 'todos')
+        if filtro_status_producao != 'todos':
+            propostas = propostas.filter(status_producao=filtro_status_producao)
+
+        form = PropostaFiltroForm(request.GET)
+        if form.is_valid():
+            propostas = cls.filtrar(propostas, form.cleaned_data, filtros)
+
+        ordem = request.GET.get('ordem')
+        if ordem not in ORDENACOES:
+            ordem = 'recentes'
+
+        pagina = paginar_keyset(propostas, request, ORDENACOES[ordem][1], itens_por_pagina)
+        return {
+            'propostas': pagina,
+            'form': form,
+            'filtro_status_producao': filtro_status_producao,
+            'total_propostas': pagina.total,
+            'ordem': ordem,
+            'ordenacoes': [(chave, rotulo) for chave, (rotulo, _) in ORDENACOES.items()],
+        }
@@ -0,0 +1,263 @@
+# core/services/replay_regras.py
+
+"""
+Replay de uma versão candidata de RegraYAML sobre propostas já calculadas.
+
+Antes de gravar uma nova versão de cabine/carrinho/tração/sistemas, o autor
+pode ver como ela muda os itens e o total da categoria em propostas reais:
+cada proposta é avaliada com a regra ativa e com a candidata a partir das
+especificações e do `dimensionamento_detalhado` gravados, sem salvar nada.
+
+O catálogo e os dois YAMLs são carregados uma vez; as propostas são
+distribuídas entre processos (core.utils.processos) quando pedido.
+"""
+
+import logging
+import statistics
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+
+from core.models import Proposta
+from core.models.regras_yaml import TipoRegra
+from core.services.calculo_pedido import CalculoPedidoService
+from core.services.calculo_pedido_yaml import AdvancedContextBuilder, CalculoPedidoYAMLService
+from core.utils.processos import mapear_lotes
+
+logger = logging.getLogger(__name__)
+
+CONFIGURACAO_PADRAO = {
+    'REPLAY_LIMITE_PROPOSTAS': 500,
+    'REPLAY_PROCESSOS': 4,
+    'REPLAY_LIMITE_WEB': 500,
+}
+
+# JSONs grandes que o replay não usa (dimensionamento_detalhado é lido)
+CAMPOS_ADIADOS = (
+    'componentes_calculados', 'custos_detalhados', 'formacao_preco', 'ficha_tecnica', 'explicacao_calculo',
+)
+
+# Abaixo disto por processo, o custo do fork supera o ganho
+PROPOSTAS_POR_PROCESSO_MIN = 250
+
+# Variação abaixo disto (R$) é arredondamento, não mudança
+TOLERANCIA = 0.005
+
+
+def configuracao(chave):
+    """Lê a chave em FUZA_ELEVADORES_SETTINGS (com padrão)"""
+    return getattr(settings, 'FUZA_ELEVADORES_SETTINGS', {}).get(chave, CONFIGURACAO_PADRAO[chave])
+
+
+def _itens_por_codigo(resultado):
+    """{código: {'descricao', 'quantidade', 'valor'}} somando as subcategorias"""
+    itens = {}
+    for item in resultado.get('itens', []):
+        codigo = item.get('codigo') or item.get('nome') or '?'
+        atual = itens.setdefault(codigo, {'descricao': item.get('descricao', ''), 'quantidade': 0.0, 'valor': 0.0})
+        atual['quantidade'] += float(item.get('quantidade') or 0)
+        atual['valor'] += float(item.get('valor_total') or 0)
+    return itens
+
+
+class ReplayRegraYAML:
+    """
+    Compara a regra ativa de uma categoria com um conteúdo candidato.
+
+    Exemplo:
+        replay = ReplayRegraYAML('cabine', novo_conteudo)
+        resultado = replay.executar(limite=2000, processos=4)
+    """
+
+    def __init__(self, tipo: str, conteudo_candidato: str, custos_db=None):
+        """
+        Args:
+            tipo (str): categoria (TipoRegra)
+            conteudo_candidato (str): YAML da nova versão
+            custos_db (dict): catálogo {código: Produto} (padrão: carregar_custos_db)
+
+        Raises:
+            ValueError: tipo desconhecido ou YAML candidato inválido
+        """
+        if tipo not in TipoRegra.values:
+            raise ValueError(f"Tipo de regra desconhecido: {tipo}")
+        self.tipo = tipo
+
+        custos_db = custos_db if custos_db is not None else CalculoPedidoService.carregar_custos_db()
+        self.atual = CalculoPedidoYAMLService(custos_db)
+        self.candidato = CalculoPedidoYAMLService(custos_db)
+        try:
+            self.candidato.definir_yaml(tipo, conteudo_candidato)
+        except Exception as e:
+            raise ValueError(f"YAML candidato inválido: {e}")
+
+        # Carrega a versão ativa agora, para os processos filhos herdarem sem consultar o banco
+        try:
+            self.atual._load_yaml_dict(tipo)
+            self.sem_versao_ativa = False
+        except ValueError:
+            self.sem_versao_ativa = True
+
+    @staticmethod
+    def propostas(limite: Optional[int] = None):
+        """Últimas `limite` propostas com dimensionamento gravado"""
+        limite = limite or configuracao('REPLAY_LIMITE_PROPOSTAS')
+        return (
+            Proposta.objects.filter(dimensionamento_detalhado__isnull=False)
+            .defer(*CAMPOS_ADIADOS)
+            .order_by('-criado_em')[:limite]
+        )
+
+    # -------------------------------------------------------------------------
+    # Uma proposta
+    # -------------------------------------------------------------------------
+
+    def _avaliar(self, servico, context):
+        try:
+            resultado = servico.calcular_categoria_com_contexto(self.tipo, context)
+        except Exception as e:
+            return 0.0, {}, [str(e)]
+        return float(resultado.get('total_categoria') or 0), _itens_por_codigo(resultado), list(resultado.get('erros', []))
+
+    def comparar(self, proposta: Proposta) -> Dict[str, Any]:
+        """
+        Avalia a categoria nas duas versões para uma proposta.
+
+        Returns:
+            dict: totais, delta (R$ e %), impacto estimado no preço, itens
+                  alterados e erros de cada versão
+        """
+        base = {
+            'proposta_id': str(proposta.pk),
+            'numero': proposta.numero,
+            'status': proposta.status,
+        }
+        dimensionamento = proposta.dimensionamento_detalhado
+        if not isinstance(dimensionamento, dict) or not dimensionamento.get('cab'):
+            return {**base, 'erro': 'Dimensionamento ausente'}
+
+        try:
+            context = AdvancedContextBuilder.build(proposta, dimensionamento)
+        except Exception as e:
+            return {**base, 'erro': str(e)}
+
+        total_atual, itens_atual, erros_atual = self._avaliar(self.atual, context)
+        total_candidato, itens_candidato, erros_candidato = self._avaliar(self.candidato, context)
+
+        itens = []
+        for codigo in sorted(set(itens_atual) | set(itens_candidato)):
+            antes = itens_atual.get(codigo, {'quantidade': 0.0, 'valor': 0.0})
+            depois = itens_candidato.get(codigo, {'quantidade': 0.0, 'valor': 0.0})
+            if (abs(antes['quantidade'] - depois['quantidade']) < 1e-9
+                    and abs(antes['valor'] - depois['valor']) < TOLERANCIA):
+                continue
+            itens.append({
+                'codigo': codigo,
+                'descricao': depois.get('descricao') or antes.get('descricao', ''),
+                'situacao': 'novo' if codigo not in itens_atual else 'removido' if codigo not in itens_candidato else 'alterado',
+                'quantidade_atual': round(antes['quantidade'], 4),
+                'quantidade_candidato': round(depois['quantidade'], 4),
+                'valor_atual': round(antes['valor'], 2),
+                'valor_candidato': round(depois['valor'], 2),
+                'delta': round(depois['valor'] - antes['valor'], 2),
+            })
+
+        delta = total_candidato - total_atual
+        # Formação de preço é linear sobre o custo de materiais (ver ConsumoPropostaService.exposicao)
+        custo_materiais = float(proposta.custo_materiais or 0)
+        preco = float(proposta.preco_venda_calculado or 0)
+        markup = preco / custo_materiais if custo_materiais and preco else 1.0
+
+        return {
+            **base,
+            'erro': None,
+            'total_atual': round(total_atual, 2),
+            'total_candidato': round(total_candidato, 2),
+            'delta': round(delta, 2),
+            'delta_pct': round(delta / total_atual * 100, 2) if total_atual else None,
+            'delta_preco_estimado': round(delta * markup, 2),
+            'itens': itens,
+            'erros_atual': erros_atual,
+            'erros_candidato': erros_candidato,
+        }
+
+    def _comparar_lote(self, propostas):
+        return [self.comparar(proposta) for proposta in propostas]
+
+    # -------------------------------------------------------------------------
+    # Lote
+    # -------------------------------------------------------------------------
+
+    def executar(self, limite: Optional[int] = None, processos: Optional[int] = None,
+                 propostas: Optional[List[Proposta]] = None) -> Dict[str, Any]:
+        """
+        Replay sobre as últimas `limite` propostas.
+
+        Args:
+            limite (int): quantidade de propostas (padrão REPLAY_LIMITE_PROPOSTAS)
+            processos (int): > 1 distribui as propostas entre processos (padrão REPLAY_PROCESSOS)
+            propostas (list): lista explícita (ignora `limite`)
+
+        Returns:
+            dict: 'resumo' (agregados), 'resultados' (por proposta, maiores
+                  variações primeiro) e 'tempo_s'
+        """
+        inicio = time.perf_counter()
+        propostas = list(propostas if propostas is not None else self.propostas(limite))
+        processos = min(processos or configuracao('REPLAY_PROCESSOS'), len(propostas) // PROPOSTAS_POR_PROCESSO_MIN)
+
+        resultados = []
+        for lote in mapear_lotes(self._comparar_lote, propostas, processos):
+            resultados.extend(lote)
+
+        resultados.sort(key=lambda r: -abs(r.get('delta') or 0))
+        tempo = time.perf_counter() - inicio
+        logger.info(f"Replay {self.tipo}: {len(resultados)} propostas em {tempo:.1f}s")
+        return {
+            'tipo': self.tipo,
+            'sem_versao_ativa': self.sem_versao_ativa,
+            'resumo': self.resumir(resultados),
+            'resultados': resultados,
+            'tempo_s': round(tempo, 2),
+        }
+
+    @staticmethod
+    def resumir(resultados: List[Dict[str, Any]], limite_codigos: int = 20) -> Dict[str, Any]:
+        """Agregados do replay: contagens, soma/distribuição dos deltas e códigos mais afetados"""
+        avaliados = [r for r in resultados if not r.get('erro')]
+        alterados = [r for r in avaliados if abs(r['delta']) >= TOLERANCIA or r['itens']]
+        percentuais = [r['delta_pct'] for r in alterados if r['delta_pct'] is not None]
+
+        por_codigo = defaultdict(lambda: {'propostas': 0, 'delta': 0.0, 'situacoes': set()})
+        for r in alterados:
+            for item in r['itens']:
+                resumo = por_codigo[item['codigo']]
+                resumo['propostas'] += 1
+                resumo['delta'] += item['delta']
+                resumo['situacoes'].add(item['situacao'])
+
+        codigos = sorted(
+            (
+                {'codigo': codigo, 'propostas': v['propostas'], 'delta': round(v['delta'], 2),
+                 'situacoes': ', '.join(sorted(v['situacoes']))}
+                for codigo, v in por_codigo.items()
+            ),
+            key=lambda c: -abs(c['delta']),
+        )[:limite_codigos]
+
+        return {
+            'propostas': len(resultados),
+            'sem_dados': len(resultados) - len(avaliados),
+            'alteradas': len(alterados),
+            'novos_erros': sum(1 for r in avaliados if r['erros_candidato'] and not r['erros_atual']),
+            'erros_corrigidos': sum(1 for r in avaliados if r['erros_atual'] and not r['erros_candidato']),
+            'delta_total': round(sum(r['delta'] for r in avaliados), 2),
+            'delta_preco_total': round(sum(r['delta_preco_estimado'] for r in avaliados), 2),
+            'delta_pct_medio': round(statistics.mean(percentuais), 2) if percentuais else None,
+            'delta_pct_mediana': round(statistics.median(percentuais), 2) if percentuais else None,
+            'delta_pct_min': min(percentuais) if percentuais else None,
+            'delta_pct_max': max(percentuais) if percentuais else None,
+            'codigos': codigos,
+        }
@@ -0,0 +1,451 @@
+# core/services/tabela_precos.py
+
+"""
+Tabela de preços "what-if" sobre o espaço de configurações do elevador.
+
+Varre a combinação de faixas de campos da especificação (capacidade,
+pavimentos, material da cabine, ...) e calcula custo e preço de cada célula
+com o mesmo dimensionamento e as mesmas regras YAML do cálculo de proposta,
+sem criar Propostas:
+
+- catálogo (custos_db), YAMLs e parâmetros são lidos uma vez;
+- o dimensionamento é memoizado pelas especificações e cada categoria YAML
+  pelos valores do contexto que o YAML realmente referencia, então uma
+  variação de pavimentos não reavalia a cabine;
+- custo das categorias e formação de preço são calculados em lote com NumPy
+  (quantidades × vetor de custos unitários), o que também permite simular
+  ajustes percentuais de custo por código sem reavaliar as regras.
+
+Exemplo:
+    gerador = GeradorTabelaPrecos(ajustes={'MP0101': Decimal('8')})
+    tabela = gerador.gerar({'capacidade': [300, 450, 600], 'pavimentos': range(2, 11)})
+    gerador.exportar(tabela, 'tabela.xlsx')
+"""
+
+import itertools
+import logging
+import re
+import time
+from decimal import Decimal, InvalidOperation
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+
+from core.models import Proposta
+from core.models.propostas import CAMPOS_ESPECIFICACAO
+from core.services.calculo_pedido import CalculoPedidoService
+from core.services.calculo_pedido_yaml import (
+    AdvancedContextBuilder, CalculoPedidoYAMLService, _get_unit_cost,
+)
+from core.services.dimensionamento import DimensionamentoService
+from core.utils.formatters import extrair_especificacoes_do_pedido
+from core.utils.processos import mapear_lotes
+
+logger = logging.getLogger(__name__)
+
+# Categorias YAML na ordem do CalculoPedidoService
+CATEGORIAS = ['cabine', 'carrinho', 'tracao', 'sistemas']
+
+# Configuração base quando não há proposta de referência
+CONFIGURACAO_PADRAO = {
+    'faturado_por': 'Elevadores',
+    'modelo_elevador': 'Passageiro',
+    'capacidade': Decimal('600'),
+    'capacidade_pessoas': 8,
+    'acionamento': 'Motor',
+    'tracao': '1x1',
+    'contrapeso': 'Traseiro',
+    'largura_poco': Decimal('1.80'),
+    'comprimento_poco': Decimal('1.80'),
+    'altura_poco': Decimal('15.00'),
+    'pavimentos': 5,
+    'modelo_porta_cabine': 'Automática',
+    'material_porta_cabine': 'Inox 430',
+    'folhas_porta_cabine': '2',
+    'largura_porta_cabine': Decimal('0.80'),
+    'altura_porta_cabine': Decimal('2.00'),
+    'modelo_porta_pavimento': 'Automática',
+    'material_porta_pavimento': 'Inox 430',
+    'folhas_porta_pavimento': '2',
+    'largura_porta_pavimento': Decimal('0.80'),
+    'altura_porta_pavimento': Decimal('2.00'),
+    'material_cabine': 'Inox 430',
+    'espessura_cabine': '1,2',
+    'saida_cabine': 'Padrão',
+    'altura_cabine': Decimal('2.10'),
+    'piso_cabine': 'Por conta da empresa',
+    'material_piso_cabine': 'Antiderrapante',
+}
+
+# Acima disto a tabela provavelmente foi pedida por engano (ex.: passo errado na faixa)
+LIMITE_CELULAS = 200_000
+
+_CLIENTE = SimpleNamespace(nome='Tabela de preços', nome_fantasia='', telefone='', email='')
+
+_IDENTIFICADOR = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+
+
+# =============================================================================
+# EIXOS / CONFIGURAÇÕES
+# =============================================================================
+
+def converter_valor(campo: str, valor: Any) -> Any:
+    """Converte o valor para o tipo do campo da Proposta (Decimal, int, str)"""
+    if campo not in CAMPOS_ESPECIFICACAO:
+        raise ValueError(f"Campo '{campo}' não faz parte da especificação do elevador")
+    try:
+        return Proposta._meta.get_field(campo).to_python(valor)
+    except (FieldDoesNotExist, ValidationError) as e:
+        raise ValueError(f"Valor inválido para {campo}: {valor!r} ({e})")
+
+
+def interpretar_eixo(texto: str):
+    """
+    Interpreta um eixo no formato da linha de comando.
+
+    Args:
+        texto (str): 'campo=v1,v2,...' ou 'campo=inicio:fim:passo' (fim incluso)
+
+    Returns:
+        tuple: (campo, [valores convertidos])
+    """
+    if '=' not in texto:
+        raise ValueError(f"Eixo '{texto}' deve ter o formato campo=valores")
+    campo, valores = (parte.strip() for parte in texto.split('=', 1))
+
+    if valores.count(':') == 2 and ',' not in valores:
+        try:
+            inicio, fim, passo = (Decimal(v.strip()) for v in valores.split(':'))
+        except InvalidOperation:
+            raise ValueError(f"Faixa inválida em '{texto}'")
+        if passo <= 0 or fim < inicio:
+            raise ValueError(f"Faixa inválida em '{texto}' (passo deve ser positivo e fim >= início)")
+        lista = []
+        atual = inicio
+        while atual <= fim:
+            lista.append(atual)
+            atual += passo
+    else:
+        lista = [v.strip() for v in valores.split(',') if v.strip()]
+
+    if not lista:
+        raise ValueError(f"Eixo '{campo}' sem valores")
+    return campo, [converter_valor(campo, v) for v in lista]
+
+
+def configuracao_base(proposta: Optional[Proposta] = None) -> Dict[str, Any]:
+    """Especificação de partida: a da proposta informada ou CONFIGURACAO_PADRAO"""
+    if proposta is None:
+        return {campo: CONFIGURACAO_PADRAO.get(campo) for campo in CAMPOS_ESPECIFICACAO}
+    return {campo: getattr(proposta, campo) for campo in CAMPOS_ESPECIFICACAO}
+
+
+def _congelar(valor):
+    """Torna o valor utilizável em chave de dicionário"""
+    if isinstance(valor, dict):
+        return tuple(sorted((k, _congelar(v)) for k, v in valor.items()))
+    if isinstance(valor, (list, tuple)):
+        return tuple(_congelar(v) for v in valor)
+    return valor
+
+
+def _tokens(obj, acumulado):
+    """Identificadores citados em chaves e valores do YAML (expressões Jinja e condições)"""
+    if isinstance(obj, dict):
+        for chave, valor in obj.items():
+            _tokens(chave, acumulado)
+            _tokens(valor, acumulado)
+    elif isinstance(obj, list):
+        for valor in obj:
+            _tokens(valor, acumulado)
+    elif isinstance(obj, str):
+        acumulado.update(_IDENTIFICADOR.findall(obj))
+    return acumulado
+
+
+# =============================================================================
+# GERADOR
+# =============================================================================
+
+class GeradorTabelaPrecos:
+    """
+    Avalia configurações de elevador em lote e monta a tabela de preços.
+
+    Uma instância corresponde a um retrato do catálogo, dos YAMLs ativos e
+    dos parâmetros de preço; crie outra para enxergar alterações.
+    """
+
+    def __init__(self, ajustes: Optional[Dict[str, Decimal]] = None, custos_db=None):
+        """
+        Args:
+            ajustes (dict): {código: percentual} aplicado ao custo unitário (what-if)
+            custos_db (dict): catálogo {código: Produto} (padrão: carregar_custos_db)
+        """
+        self.custos_db = custos_db if custos_db is not None else CalculoPedidoService.carregar_custos_db()
+        self.ajustes = {codigo: Decimal(str(pct)) for codigo, pct in (ajustes or {}).items()}
+        self.yaml_service = CalculoPedidoYAMLService(self.custos_db)
+
+        self._tokens_categoria = {
+            slug: _tokens(self.yaml_service._load_yaml_dict(slug), set()) for slug in CATEGORIAS
+        }
+        self._dependencias: Dict[str, Any] = {}
+        self._dimensionamentos: Dict[tuple, Dict[str, Any]] = {}
+        self._avaliacoes: Dict[tuple, Dict[str, Any]] = {}
+        self.estatisticas: Dict[str, Any] = {}
+
+    # -------------------------------------------------------------------------
+    # Avaliação de uma configuração
+    # -------------------------------------------------------------------------
+
+    def _dependencias_categoria(self, slug, context):
+        """
+        Chaves de ctx/cab que o YAML da categoria referencia.
+
+        Um nome citado no YAML pode resolver para `nome`, `nome_cabine` ou
+        `nome_painel` do ctx (ver AdvancedRegraProcessor._valor_para_condicao).
+        Se o YAML acessa `pedido` ou `dimensionamento` direto, a categoria
+        depende da configuração inteira (None).
+        """
+        if slug not in self._dependencias:
+            tokens = self._tokens_categoria[slug]
+            if tokens & {'pedido', 'dimensionamento'}:
+                self._dependencias[slug] = None
+            else:
+                chaves_ctx = tuple(sorted(
+                    chave for chave in context['ctx']
+                    if chave in tokens or any(
+                        chave.endswith(sufixo) and chave[:-len(sufixo)] in tokens
+                        for sufixo in ('_cabine', '_painel')
+                    )
+                ))
+                chaves_cab = tuple(sorted(chave for chave in context['cab'] if chave in tokens))
+                self._dependencias[slug] = (chaves_ctx, chaves_cab)
+        return self._dependencias[slug]
+
+    def _chave_categoria(self, slug, context, configuracao):
+        dependencias = self._dependencias_categoria(slug, context)
+        if dependencias is None:
+            return (slug, _congelar(configuracao))
+        chaves_ctx, chaves_cab = dependencias
+        return (
+            slug,
+            tuple(context['ctx'].get(chave) for chave in chaves_ctx),
+            tuple(_congelar(context['cab'].get(chave)) for chave in chaves_cab),
+        )
+
+    def _avaliar_categoria(self, slug, context):
+        """Itens (código, quantidade) e erros de uma categoria; custos ficam para o lote"""
+        try:
+            resultado = self.yaml_service.calcular_categoria_com_contexto(slug, context)
+        except Exception as e:
+            return {'itens': [], 'erros': [str(e)]}
+        return {
+            'itens': [
+                (item['codigo'], float(item.get('quantidade') or 0))
+                for item in resultado.get('itens', []) if item.get('codigo')
+            ],
+            'erros': list(resultado.get('erros', [])),
+        }
+
+    def avaliar(self, configuracao: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Avalia uma configuração (dimensionamento + categorias), reaproveitando
+        o que já foi calculado para entradas iguais.
+
+        Returns:
+            dict: 'chaves' (chave da avaliação de cada categoria) e 'erro'
+        """
+        pedido = SimpleNamespace(**configuracao, cliente=_CLIENTE, numero='TABELA')
+        try:
+            especificacoes = extrair_especificacoes_do_pedido(pedido)
+            chave_dim = _congelar(especificacoes)
+            dimensionamento = self._dimensionamentos.get(chave_dim)
+            if dimensionamento is None:
+                dimensionamento, _ = DimensionamentoService.calcular_dimensionamento_completo(especificacoes)
+                self._dimensionamentos[chave_dim] = dimensionamento
+            context = AdvancedContextBuilder.build(pedido, dimensionamento)
+        except Exception as e:
+            return {'chaves': {}, 'erro': str(e)}
+
+        chaves = {}
+        for slug in CATEGORIAS:
+            chave = self._chave_categoria(slug, context, configuracao)
+            if chave not in self._avaliacoes:
+                self._avaliacoes[chave] = self._avaliar_categoria(slug, context)
+            chaves[slug] = chave
+        return {'chaves': chaves, 'erro': None}
+
+    # -------------------------------------------------------------------------
+    # Lote
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def configuracoes(eixos: Dict[str, Iterable], base: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Produto cartesiano dos eixos sobre a configuração base.
+
+        Args:
+            eixos (dict): {campo: valores}; a ordem define a ordem das linhas
+            base (dict): configuração base (padrão: configuracao_base())
+        """
+        base = base or configuracao_base()
+        campos = list(eixos)
+        valores = [[converter_valor(campo, v) for v in eixos[campo]] for campo in campos]
+        total = int(np.prod([len(v) for v in valores])) if valores else 1
+        if total > LIMITE_CELULAS:
+            raise ValueError(f"{total} combinações excedem o limite de {LIMITE_CELULAS}")
+        return [{**base, **dict(zip(campos, combinacao))} for combinacao in itertools.product(*valores)]
+
+    def _avaliar_lote(self, configuracoes):
+        """Avalia um lote e devolve também as avaliações de categoria criadas nele"""
+        existentes = set(self._avaliacoes)
+        celulas = [self.avaliar(configuracao) for configuracao in configuracoes]
+        novas = {chave: valor for chave, valor in self._avaliacoes.items() if chave not in existentes}
+        return celulas, novas
+
+    def _vetor_custos(self, codigos):
+        """Custo unitário de cada código (com ajustes); códigos fora do catálogo valem 0"""
+        custos = np.zeros(len(codigos))
+        for indice, codigo in enumerate(codigos):
+            produto = self.custos_db.get(codigo)
+            if produto is None:
+                continue
+            custo = _get_unit_cost(produto)
+            if codigo in self.ajustes:
+                custo *= 1 + self.ajustes[codigo] / Decimal('100')
+            custos[indice] = float(custo)
+        return custos
+
+    @staticmethod
+    def _percentuais_impostos(faturamentos):
+        """Alíquota por 'faturado_por' via Proposta.calcular_impostos_dinamicos (linear na base)"""
+        return {
+            faturado_por: float(Proposta(faturado_por=faturado_por).calcular_impostos_dinamicos(Decimal('100'))) / 100
+            for faturado_por in faturamentos
+        }
+
+    def gerar(self, eixos: Dict[str, Iterable], base: Optional[Dict[str, Any]] = None,
+              processos: int = 1) -> pd.DataFrame:
+        """
+        Calcula a tabela de preços.
+
+        Args:
+            eixos (dict): {campo: valores} varridos (produto cartesiano)
+            base (dict): configuração dos demais campos (padrão: configuracao_base())
+            processos (int): > 1 distribui a avaliação das regras entre processos
+
+        Returns:
+            DataFrame: uma linha por configuração, com os campos dos eixos, custo
+                       por categoria, custos totais, preço final e erro
+        """
+        inicio = time.perf_counter()
+        configuracoes = self.configuracoes(eixos, base)
+
+        celulas = []
+        for lote, novas in mapear_lotes(self._avaliar_lote, configuracoes, processos):
+            celulas.extend(lote)
+            for chave, avaliacao in novas.items():
+                self._avaliacoes.setdefault(chave, avaliacao)
+        tempo_regras = time.perf_counter() - inicio
+
+        # --- Matriz esparsa de itens: avaliação × código ---
+        indice_avaliacao = {chave: i for i, chave in enumerate(self._avaliacoes)}
+        codigos = sorted({codigo for a in self._avaliacoes.values() for codigo, _ in a['itens']})
+        indice_codigo = {codigo: i for i, codigo in enumerate(codigos)}
+
+        linhas, colunas, quantidades = [], [], []
+        erro_avaliacao = np.zeros(len(indice_avaliacao), dtype=bool)
+        for chave, avaliacao in self._avaliacoes.items():
+            i = indice_avaliacao[chave]
+            erro_avaliacao[i] = bool(avaliacao['erros'])
+            for codigo, quantidade in avaliacao['itens']:
+                linhas.append(i)
+                colunas.append(indice_codigo[codigo])
+                quantidades.append(quantidade)
+
+        custos_unitarios = self._vetor_custos(codigos)
+        valores_itens = np.round(np.asarray(quantidades) * custos_unitarios[np.asarray(colunas, dtype=int)], 2)
+        total_avaliacao = np.bincount(
+            np.asarray(linhas, dtype=int), weights=valores_itens, minlength=len(indice_avaliacao)
+        )
+
+        # --- Custos por célula ---
+        n = len(configuracoes)
+        referencias = np.zeros((n, len(CATEGORIAS)), dtype=int)
+        erro_celula = np.zeros(n, dtype=bool)
+        mensagens = [''] * n
+        for c, celula in enumerate(celulas):
+            if celula['erro']:
+                erro_celula[c] = True
+                mensagens[c] = celula['erro']
+                continue
+            for k, slug in enumerate(CATEGORIAS):
+                referencias[c, k] = indice_avaliacao[celula['chaves'][slug]]
+            erros = [e for slug in CATEGORIAS for e in self._avaliacoes[celula['chaves'][slug]]['erros']]
+            if erros:
+                erro_celula[c] = True
+                mensagens[c] = '; '.join(dict.fromkeys(erros))
+
+        custos_categoria = total_avaliacao[referencias]
+        custos_categoria[erro_celula] = np.nan
+        custo_materiais = custos_categoria.sum(axis=1)
+
+        # --- Formação de preço (a mesma do cálculo da proposta) ---
+        params = {k: float(v) for k, v in CalculoPedidoService._obter_parametros().items()}
+        faturamentos = [configuracao.get('faturado_por') for configuracao in configuracoes]
+        aliquotas = self._percentuais_impostos(set(faturamentos))
+        aliquota = np.array([aliquotas[f] for f in faturamentos])
+        formacao = CalculoPedidoService.formar_preco(custo_materiais, params, lambda base: base * aliquota)
+
+        tabela = pd.DataFrame({campo: [configuracao[campo] for configuracao in configuracoes] for campo in eixos})
+        for k, slug in enumerate(CATEGORIAS):
+            tabela[f'custo_{slug}'] = custos_categoria[:, k].round(2)
+        tabela['custo_materiais'] = custo_materiais.round(2)
+        for campo in ('custo_producao', 'custo_total_projeto', 'impostos', 'preco_final'):
+            tabela[campo] = formacao[campo].round(2)
+        tabela['erro'] = mensagens
+
+        self.estatisticas = {
+            'celulas': n,
+            'erros': int(erro_celula.sum()),
+            'dimensionamentos': len(self._dimensionamentos),
+            'avaliacoes_categoria': len(self._avaliacoes),
+            'codigos': len(codigos),
+            'tempo_regras_s': round(tempo_regras, 2),
+            'tempo_total_s': round(time.perf_counter() - inicio, 2),
+        }
+        logger.info(f"Tabela de preços: {self.estatisticas}")
+        return tabela
+
+    # -------------------------------------------------------------------------
+    # Exportação
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def matriz(tabela: pd.DataFrame, eixos: List[str], valor: str = 'preco_final') -> pd.DataFrame:
+        """Pivot com o último eixo nas colunas e os demais nas linhas"""
+        if len(eixos) < 2:
+            return tabela.set_index(eixos)[[valor]] if eixos else tabela[[valor]]
+        return tabela.pivot_table(index=eixos[:-1], columns=eixos[-1], values=valor, aggfunc='first', dropna=False)
+
+    @staticmethod
+    def exportar(tabela: pd.DataFrame, caminho: str, eixos: Optional[List[str]] = None) -> str:
+        """
+        Grava a tabela em .xlsx (abas Tabela e Matriz) ou .csv.
+
+        Returns:
+            str: caminho gravado
+        """
+        eixos = eixos if eixos is not None else [
+            coluna for coluna in tabela.columns if not coluna.startswith(('custo_', 'preco_')) and coluna not in ('impostos', 'erro')
+        ]
+        if caminho.lower().endswith('.csv'):
+            tabela.to_csv(caminho, index=False, sep=';', decimal=',', encoding='utf-8-sig')
+        else:
+            with pd.ExcelWriter(caminho, engine='openpyxl') as writer:
+                tabela.to_excel(writer, sheet_name='Tabela', index=False)
+                GeradorTabelaPrecos.matriz(tabela, eixos).to_excel(writer, sheet_name='Matriz')
+        return caminho
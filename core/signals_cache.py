@@ -0,0 +1,70 @@
+# core/signals_cache.py
+
+"""
+Invalidação do cache de dados de referência (core/utils/cache.py)
+Sistema de Elevadores FUZA
+"""
+
+from django.contrib.auth.models import Group, Permission
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+from core.models import ParametrosGerais, GrupoProduto, SubgrupoProduto, Usuario
+from core.utils.autorizacao import invalidar_usuario, invalidar_todos
+from core.utils.cache import invalidar, CHAVE_PARAMETROS, CHAVE_GRUPOS, CHAVE_SUBGRUPOS
+
+
+@receiver(post_save, sender=ParametrosGerais)
+@receiver(post_delete, sender=ParametrosGerais)
+def invalidar_parametros_gerais(sender, instance, **kwargs):
+    """ParametrosGerais alterado: próximos cálculos/PDFs relêem do banco"""
+    invalidar(CHAVE_PARAMETROS)
+
+
+@receiver(post_save, sender=GrupoProduto)
+@receiver(post_delete, sender=GrupoProduto)
+def invalidar_grupos(sender, instance, **kwargs):
+    """Grupo alterado: a lista de subgrupos também carrega o grupo"""
+    invalidar(CHAVE_GRUPOS, CHAVE_SUBGRUPOS)
+
+
+@receiver(post_save, sender=SubgrupoProduto)
+@receiver(post_delete, sender=SubgrupoProduto)
+def invalidar_subgrupos(sender, instance, update_fields=None, **kwargs):
+    """
+    Subgrupo alterado. O incremento de `ultimo_numero` a cada produto
+    cadastrado não muda as listas de seleção e não invalida.
+    """
+    if update_fields and set(update_fields) <= {'ultimo_numero'}:
+        return
+    invalidar(CHAVE_SUBGRUPOS)
+
+
+@receiver(m2m_changed, sender=Usuario.groups.through)
+@receiver(m2m_changed, sender=Usuario.user_permissions.through)
+def invalidar_permissoes_usuario(sender, instance, action, reverse, pk_set=None, **kwargs):
+    """Grupos/permissões diretas de usuários mudaram (core/utils/autorizacao.py)"""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        invalidar_usuario(instance.pk)
+    elif action == 'post_clear':
+        # group.user_set.clear(): os usuários afetados já não são conhecidos
+        invalidar_todos()
+    else:
+        invalidar_usuario(*pk_set)
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def invalidar_permissoes_grupo(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidar_todos()
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+def invalidar_matriz_permissoes(sender, instance, created=False, **kwargs):
+    """Grupo novo ainda não tem membros; renomear ou excluir muda a matriz"""
+    if not (sender is Group and created):
+        invalidar_todos()
@@ -0,0 +1,40 @@
+# core/signals_custos.py
+
+"""
+Enfileira o recálculo das propostas afetadas quando o custo de um produto muda
+Sistema de Elevadores FUZA
+"""
+
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+from core.models import Produto
+from core.services.consumo_proposta import ConsumoPropostaService
+
+
+@receiver(pre_save, sender=Produto)
+def detectar_alteracao_custo(sender, instance, update_fields=None, **kwargs):
+    """Compara os campos de custo com o valor gravado (uma leitura, só em updates)"""
+    instance._custo_alterado = False
+    if not instance.pk or kwargs.get('raw'):
+        return
+    campos = ConsumoPropostaService.CAMPOS_CUSTO
+    if update_fields is not None and not set(update_fields) & set(campos):
+        return
+
+    anterior = Produto.objects.filter(pk=instance.pk).values(*campos).first()
+    if anterior is None:
+        return
+    instance._custo_alterado = any(
+        (anterior[campo] or 0) != (getattr(instance, campo) or 0) for campo in campos
+    )
+
+
+@receiver(post_save, sender=Produto)
+def enfileirar_recalculo_por_custo(sender, instance, created, **kwargs):
+    """Só as propostas abertas que consomem o código entram na fila"""
+    if created or not getattr(instance, '_custo_alterado', False):
+        return
+    instance._custo_alterado = False
+    ConsumoPropostaService.enfileirar_recalculo(
+        [instance.codigo], motivo=f"Custo alterado: {instance.codigo}"
+    )
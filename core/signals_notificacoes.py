@@ -0,0 +1,46 @@
+# core/signals_notificacoes.py
+
+"""
+Atualiza os contadores de tarefas pendentes (core/services/notificacoes.py)
+Sistema de Elevadores FUZA
+"""
+
+from django.db.models.signals import post_save, pre_save, post_delete
+from django.dispatch import receiver
+from core.models import Tarefa
+from core.services.notificacoes import ContadorTarefas
+
+CAMPOS_DESTINO = ('status', 'usuario_destino_id', 'nivel_destino')
+
+
+@receiver(pre_save, sender=Tarefa)
+def guardar_destino_anterior(sender, instance, raw=False, **kwargs):
+    """Destino e status gravados, para avisar também quem deixou de ter a tarefa"""
+    instance._destino_anterior = None
+    if instance.pk and not raw:
+        instance._destino_anterior = Tarefa.objects.filter(pk=instance.pk).values(*CAMPOS_DESTINO).first()
+
+
+@receiver(post_save, sender=Tarefa)
+def tarefa_salva(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    anterior = getattr(instance, '_destino_anterior', None)
+    atual = {campo: getattr(instance, campo) for campo in CAMPOS_DESTINO}
+    if anterior == atual:
+        return
+    # Só importa se a tarefa era ou passou a ser pendente
+    if atual['status'] != 'pendente' and (anterior is None or anterior['status'] != 'pendente'):
+        return
+
+    destinos = [d for d in (anterior, atual) if d]
+    ContadorTarefas.tarefa_alterada(
+        usuarios=[d['usuario_destino_id'] for d in destinos],
+        niveis=[d['nivel_destino'] for d in destinos],
+    )
+
+
+@receiver(post_delete, sender=Tarefa)
+def tarefa_excluida(sender, instance, **kwargs):
+    if instance.status == 'pendente':
+        ContadorTarefas.tarefa_alterada(usuarios=[instance.usuario_destino_id], niveis=[instance.nivel_destino])
@@ -2,13 +2,14 @@
 
 """
 Signals para controle automático de saldo de requisições vinculadas a pedidos
+e dos fechamentos mensais de estoque
 Sistema de Elevadores FUZA
 """
 
 from django.db.models.signals import post_save, post_delete, pre_save
 from django.dispatch import receiver
 from django.db import models
-from core.models import ItemPedidoCompra, PedidoCompra
+from core.models import ItemPedidoCompra, MovimentoEstoque, PedidoCompra
 
 
 @receiver(post_save, sender=ItemPedidoCompra)
@@ -120,3 +121,14 @@ def validar_quantidade_contra_saldo(sender, instance, **kwargs):
         #     f"Quantidade do pedido ({instance.quantidade}) excede saldo disponível ({saldo_disponivel}) "
         #     f"da requisição {instance.item_requisicao.requisicao.numero}"
         # )
+
+
+# Fechamento mensal: movimento em mês já fechado deixa os saldos desatualizados
+@receiver(post_save, sender=MovimentoEstoque)
+@receiver(post_delete, sender=MovimentoEstoque)
+def invalidar_fechamentos_estoque(sender, instance, **kwargs):
+    """
+    Remove os SaldoEstoqueMensal do mês do movimento em diante
+    """
+    from core.services.kardex import KardexService
+    KardexService.invalidar_fechamentos(instance.data_movimento)
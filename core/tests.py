@@ -1,3 +1,33 @@
+import json
+import os
+from unittest import skipUnless
+
 from django.test import TestCase
 
-# Create your tests here.
+
+@skipUnless(os.environ.get('FUZA_BENCHMARK'), 'Defina FUZA_BENCHMARK=1 para rodar o benchmark')
+class BenchmarkTest(TestCase):
+    """
+    Entrada do benchmark para o runner de testes:
+        FUZA_BENCHMARK=1 python manage.py test core.tests.BenchmarkTest
+        FUZA_BENCHMARK=1 pytest --ds=fuza_elevadores.settings core/tests.py   (pytest-django)
+
+    FUZA_BENCHMARK_ESCALA escolhe o catálogo (1k/10k/50k) e FUZA_BENCHMARK_SAIDA
+    grava o JSON para comparação com `manage.py benchmark --comparar`.
+    """
+
+    def test_benchmark(self):
+        from core.benchmark.suite import rodar
+
+        resultado = rodar(
+            escala=os.environ.get('FUZA_BENCHMARK_ESCALA', '1k'),
+            repeticoes=int(os.environ.get('FUZA_BENCHMARK_REPETICOES', 3)),
+        )
+
+        saida = os.environ.get('FUZA_BENCHMARK_SAIDA')
+        if saida:
+            with open(saida, 'w', encoding='utf-8') as arquivo:
+                json.dump(resultado, arquivo, ensure_ascii=False, indent=2)
+
+        for r in resultado['resultados']:
+            self.assertEqual(r['erros'], [], r['cenario'])
@@ -0,0 +1,72 @@
+# core/utils/agregacao.py
+
+"""
+Contagens por faixa de status em uma única consulta.
+
+Os cards de estatística das listas faziam um COUNT por status sobre o
+mesmo queryset. `contar_faixas` monta um único
+`aggregate(Count('pk', filter=Q(...)), ...)` e, com `cache=True`, guarda o
+resultado pelo TTL de dashboard (core.utils.cache.agregado_dashboard). A
+chave inclui o SQL do queryset, então cada combinação de filtros (e de
+vendedor, quando a lista é filtrada por ele) tem a própria entrada.
+
+Exemplo:
+    stats = contar_faixas(propostas, {
+        'aprovado': Q(status='aprovado'),
+        'vencidas': Q(data_proxima_vistoria__lt=hoje),
+    }, cache=True)
+    # {'total': 42, 'aprovado': 30, 'vencidas': 5}
+"""
+
+import hashlib
+from typing import Dict, Optional
+
+from django.db.models import Count, Q, QuerySet
+
+from core.utils.cache import agregado_dashboard
+
+
+def faixas_por_valor(campo: str, valores) -> Dict[str, Q]:
+    """{chave: Q(campo=valor)}; cada item é o valor ou um par (chave, valor)"""
+    faixas = {}
+    for valor in valores:
+        chave, valor = valor if isinstance(valor, tuple) else (valor, valor)
+        faixas[chave] = Q(**{campo: valor})
+    return faixas
+
+
+def contar_faixas(queryset: QuerySet, faixas: Dict[str, Q], total: Optional[str] = 'total',
+                  cache: bool = False, nome: str = 'contagens') -> Dict[str, int]:
+    """
+    Conta o queryset em várias faixas com uma única consulta.
+
+    Args:
+        queryset: base já filtrada (anotações e ordenação são descartadas)
+        faixas (dict): {nome: Q} de cada card
+        total (str): nome da contagem sem filtro (None para omitir)
+        cache (bool): guarda o resultado pelo TTL de dashboard
+        nome (str): prefixo da chave no cache e nas estatísticas de cache
+
+    Returns:
+        dict: {nome: quantidade}
+    """
+    agregados = {}
+    if total:
+        agregados[total] = Count('pk')
+    for chave, condicao in faixas.items():
+        agregados[chave] = Count('pk', filter=condicao)
+
+    # Com distinct() (joins de filtro) ou anotações, conta cada linha uma vez
+    # via subconsulta de pks; as anotações só valem para filtrar
+    if queryset.query.distinct or queryset.query.annotations:
+        queryset = queryset.model._default_manager.filter(pk__in=queryset.values('pk'))
+    base = queryset.order_by()
+
+    def calcular():
+        return base.aggregate(**agregados)
+
+    if not cache:
+        return calcular()
+
+    assinatura = hashlib.md5(f"{sorted(faixas.items())}|{total}|{base.query}".encode()).hexdigest()
+    return agregado_dashboard(f'{nome}:{assinatura}', calcular)
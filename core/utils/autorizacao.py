@@ -0,0 +1,227 @@
+# core/utils/autorizacao.py
+
+"""
+Matriz de autorização compilada: nível → portal/módulo e usuário → permissões.
+
+- Portais, módulos e prefixos de URL são conjuntos congelados montados na
+  importação; a checagem é `nivel in frozenset`, sem consulta.
+- As permissões de cada usuário (grupos + diretas, como o ModelBackend
+  calcula) viram um PerfilAutorizacao com as alçadas de desconto e de
+  orçamento já resolvidas. O perfil fica no cache compartilhado por
+  CACHE_TTL_REFERENCIA_S e no próprio objeto do usuário durante a
+  requisição.
+- A chave inclui uma versão global, incrementada quando grupos ou
+  permissões mudam (core/signals_cache.py). Mudança nos grupos de um
+  usuário só remove a entrada dele.
+
+BackendPermissoes (AUTHENTICATION_BACKENDS) faz `user.has_perm` e `perms`
+nos templates lerem o mesmo perfil.
+"""
+
+import logging
+from typing import Iterable, Optional
+
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from django.db import transaction
+
+from core.utils.cache import _chave, configuracao, invalidar, obter
+
+logger = logging.getLogger(__name__)
+
+# Decorators (core/decorators.py)
+PORTAL_NIVEIS = {
+    'vendedor': ['vendedor', 'vistoria', 'gestor', 'admin'],
+    'gestor': ['gestor', 'admin'],
+    'producao': ['compras', 'engenharia', 'producao', 'almoxarifado', 'gestor', 'admin'],
+}
+
+MODULO_NIVEIS = {
+    # Portal Gestor - submodulos
+    'cadastros': ['gestor', 'admin'],
+    'estoque': ['almoxarifado', 'producao', 'gestor', 'admin'],
+    'estoque_movimento': ['almoxarifado', 'gestor', 'admin'],
+    'ordem_producao': ['producao', 'almoxarifado', 'gestor', 'admin'],
+    'usuarios': ['gestor', 'admin'],
+    'parametros': ['gestor', 'admin'],
+
+    # Portal Producao - submodulos
+    'compras': ['compras', 'gestor', 'admin'],
+    'requisicao': ['compras', 'engenharia', 'producao', 'gestor', 'admin'],
+    'estrutura': ['engenharia', 'producao', 'gestor', 'admin'],
+    'produtos_mp': ['compras', 'engenharia', 'almoxarifado', 'gestor', 'admin'],
+    'produtos_pi': ['engenharia', 'producao', 'gestor', 'admin'],
+    'produtos_pa': ['engenharia', 'gestor', 'admin'],
+}
+
+# Prefixos de URL (PermissaoPortalMiddleware)
+PREFIXO_NIVEIS = {
+    '/gestor/': ['admin', 'gestor', 'financeiro'],
+    '/vendedor/': ['admin', 'gestor', 'vendedor', 'engenharia', 'vistoria'],
+    '/producao/': ['admin', 'gestor', 'producao', 'compras', 'engenharia', 'almoxarifado'],
+    '/configuracao/': ['admin', 'gestor'],
+}
+
+# Alçadas, da maior para a menor: a primeira permissão que o usuário tiver vale
+ALCADAS_DESCONTO = (
+    ('core.aprovar_desconto_ilimitado', 100.0),
+    ('core.aprovar_desconto_20', 20.0),
+    ('core.aprovar_desconto_15', 15.0),
+    ('core.aprovar_desconto_10', 10.0),
+    ('core.aprovar_desconto_5', 5.0),
+)
+ALCADAS_ORCAMENTO = (
+    ('core.aprovar_orcamento_ilimitado', None),
+    ('core.aprovar_orcamento_ate_50000', 50000.0),
+    ('core.aprovar_orcamento_ate_10000', 10000.0),
+    ('core.aprovar_orcamento_ate_5000', 5000.0),
+)
+
+_PORTAIS = {portal: frozenset(niveis) for portal, niveis in PORTAL_NIVEIS.items()}
+_MODULOS = {modulo: frozenset(niveis) for modulo, niveis in MODULO_NIVEIS.items()}
+_PREFIXOS = tuple((prefixo, frozenset(niveis)) for prefixo, niveis in PREFIXO_NIVEIS.items())
+
+CHAVE_VERSAO = 'permissoes:versao'
+
+
+# =============================================================================
+# NÍVEL → PORTAL / MÓDULO / URL
+# =============================================================================
+
+def niveis_do_portal(portal: str) -> frozenset:
+    return _PORTAIS.get(portal, frozenset())
+
+
+def niveis_do_modulo(modulo: str) -> frozenset:
+    return _MODULOS.get(modulo, frozenset())
+
+
+def nivel_permitido_no_caminho(nivel: str, caminho: str) -> bool:
+    """False só se `caminho` está num portal que não aceita o nível"""
+    for prefixo, niveis in _PREFIXOS:
+        if caminho.startswith(prefixo):
+            return nivel in niveis
+    return True
+
+
+# =============================================================================
+# USUÁRIO → PERMISSÕES
+# =============================================================================
+
+class PerfilAutorizacao:
+    """Permissões de um usuário com as alçadas já resolvidas"""
+
+    __slots__ = ('permissoes', 'max_desconto', 'max_orcamento')
+
+    def __init__(self, permissoes: frozenset, superusuario: bool = False):
+        self.permissoes = permissoes
+        if superusuario:
+            self.max_desconto, self.max_orcamento = 100.0, None
+            return
+        self.max_desconto = next((v for perm, v in ALCADAS_DESCONTO if perm in permissoes), 0.0)
+        self.max_orcamento = next((v for perm, v in ALCADAS_ORCAMENTO if perm in permissoes), 0.0)
+
+
+_SEM_PERMISSOES = PerfilAutorizacao(frozenset())
+
+
+def _chave_usuario(usuario_id, versao):
+    return f'permissoes:v{versao}:{usuario_id}'
+
+
+def _versao() -> int:
+    try:
+        versao = cache.get(_chave(CHAVE_VERSAO))
+        if versao is None:
+            cache.add(_chave(CHAVE_VERSAO), 1, None)
+            versao = cache.get(_chave(CHAVE_VERSAO), 1)
+        return versao
+    except Exception as e:
+        logger.warning(f"Cache indisponível ao ler versão de permissões: {e}")
+        return 0
+
+
+def perfil(user) -> PerfilAutorizacao:
+    """Perfil do usuário (cache da requisição → cache compartilhado → banco)"""
+    if not getattr(user, 'is_active', False):
+        return _SEM_PERMISSOES
+    atual = getattr(user, '_perfil_autorizacao', None)
+    if atual is not None:
+        return atual
+
+    if user.is_superuser:
+        from django.contrib.auth.models import Permission
+
+        atual = obter(
+            f'permissoes:v{_versao()}:superusuario',
+            lambda: PerfilAutorizacao(frozenset(
+                f'{app}.{codigo}' for app, codigo in
+                Permission.objects.values_list('content_type__app_label', 'codename')
+            ), superusuario=True),
+            configuracao('CACHE_TTL_REFERENCIA_S'),
+        )
+    else:
+        atual = obter(
+            _chave_usuario(user.pk, _versao()),
+            lambda: PerfilAutorizacao(frozenset(ModelBackend().get_all_permissions(user))),
+            configuracao('CACHE_TTL_REFERENCIA_S'),
+        )
+    user._perfil_autorizacao = atual
+    return atual
+
+
+def tem_permissao(user, perm: str) -> bool:
+    return user.is_active and (user.is_superuser or perm in perfil(user).permissoes)
+
+
+def tem_todas(user, perms: Iterable[str]) -> bool:
+    return user.is_active and (user.is_superuser or perfil(user).permissoes.issuperset(perms))
+
+
+def tem_alguma(user, perms: Iterable[str]) -> bool:
+    return user.is_active and (user.is_superuser or not perfil(user).permissoes.isdisjoint(perms))
+
+
+def max_desconto(user) -> float:
+    return 100.0 if user.is_superuser else perfil(user).max_desconto
+
+
+def max_orcamento(user) -> Optional[float]:
+    """None = ilimitado"""
+    return None if user.is_superuser else perfil(user).max_orcamento
+
+
+# =============================================================================
+# INVALIDAÇÃO
+# =============================================================================
+
+def invalidar_usuario(*usuario_ids):
+    """Grupos/permissões diretas de usuários mudaram"""
+    versao = _versao()
+    invalidar(*(_chave_usuario(usuario_id, versao) for usuario_id in usuario_ids))
+
+
+def invalidar_todos():
+    """
+    Grupo ou permissão mudou: nova versão, as entradas antigas expiram
+    sozinhas. Incrementa agora e de novo após o commit (como `invalidar`),
+    para que um perfil montado com a transação aberta não fique na versão nova.
+    """
+    def incrementar():
+        try:
+            if not cache.add(_chave(CHAVE_VERSAO), 2, None):
+                cache.incr(_chave(CHAVE_VERSAO))
+        except Exception as e:
+            logger.warning(f"Erro ao invalidar permissões: {e}")
+
+    incrementar()
+    transaction.on_commit(incrementar)
+
+
+class BackendPermissoes(ModelBackend):
+    """ModelBackend com as permissões lidas do PerfilAutorizacao"""
+
+    def get_all_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        return perfil(user_obj).permissoes
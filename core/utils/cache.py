@@ -0,0 +1,285 @@
+# core/utils/cache.py
+
+"""
+Cache compartilhado (CACHES['default']) para dados de referência e
+agregados de dashboard.
+
+- Referência (ParametrosGerais, grupos e subgrupos ativos): TTL longo,
+  invalidado pelos signals em core/signals_cache.py.
+- Dashboards: TTL curto (CACHE_TTL_DASHBOARD_S), sem invalidação; os
+  números podem ficar até esse tempo defasados.
+
+Acertos/faltas são contados por processo e somados no próprio cache de
+tempos em tempos, para que o painel de desempenho mostre o total de todos
+os workers.
+"""
+
+import logging
+import threading
+import time
+from collections import Counter
+from operator import attrgetter
+from typing import Callable, List, Optional, TypeVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+PREFIXO = 'fuza'
+
+CONFIGURACAO_PADRAO = {
+    'CACHE_TTL_REFERENCIA_S': 60 * 60,
+    'CACHE_TTL_DASHBOARD_S': 60,
+    'CACHE_INTERVALO_ESTATISTICAS_S': 60,
+}
+
+CHAVE_PARAMETROS = 'parametros_gerais'
+CHAVE_GRUPOS = 'grupos_ativos'
+CHAVE_SUBGRUPOS = 'subgrupos_ativos'
+
+# Distingue "não está no cache" de um None guardado (ex.: sem ParametrosGerais)
+_AUSENTE = object()
+
+
+def configuracao(chave):
+    """Lê a chave em FUZA_ELEVADORES_SETTINGS (com padrão)"""
+    return getattr(settings, 'FUZA_ELEVADORES_SETTINGS', {}).get(chave, CONFIGURACAO_PADRAO[chave])
+
+
+def _chave(nome):
+    return f'{PREFIXO}:{nome}'
+
+
+# =============================================================================
+# ESTATÍSTICAS
+# =============================================================================
+
+class EstatisticasCache:
+    """
+    Contadores de acerto/falta por nome de entrada.
+
+    O incremento é local (Counter sob lock); `descarregar` soma os deltas em
+    chaves do cache compartilhado. O incr do backend de arquivo/banco não é
+    atômico entre processos, então o total é aproximado.
+    """
+
+    CHAVE_NOMES = 'stats:nomes'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pendentes = Counter()
+        self._ultima_descarga = time.monotonic()
+
+    def registrar(self, nome, acerto):
+        with self._lock:
+            self._pendentes[(nome, 'acertos' if acerto else 'faltas')] += 1
+            vencido = (
+                time.monotonic() - self._ultima_descarga
+                >= configuracao('CACHE_INTERVALO_ESTATISTICAS_S')
+            )
+        if vencido:
+            self.descarregar()
+
+    def descarregar(self):
+        with self._lock:
+            pendentes, self._pendentes = self._pendentes, Counter()
+            self._ultima_descarga = time.monotonic()
+        if not pendentes:
+            return
+
+        try:
+            nomes = set(cache.get(_chave(self.CHAVE_NOMES), ()))
+            for (nome, tipo), quantidade in pendentes.items():
+                chave = _chave(f'stats:{nome}:{tipo}')
+                if not cache.add(chave, quantidade, None):
+                    cache.incr(chave, quantidade)
+                nomes.add(nome)
+            cache.set(_chave(self.CHAVE_NOMES), sorted(nomes), None)
+        except Exception as e:
+            logger.warning(f"Erro ao gravar estatísticas de cache: {e}")
+
+    def resumo(self):
+        """
+        Returns:
+            list[dict]: nome, acertos, faltas, taxa_acerto (%) por entrada
+        """
+        self.descarregar()
+        nomes = cache.get(_chave(self.CHAVE_NOMES), [])
+        valores = cache.get_many([
+            _chave(f'stats:{nome}:{tipo}') for nome in nomes for tipo in ('acertos', 'faltas')
+        ])
+
+        linhas = []
+        for nome in nomes:
+            acertos = valores.get(_chave(f'stats:{nome}:acertos'), 0)
+            faltas = valores.get(_chave(f'stats:{nome}:faltas'), 0)
+            total = acertos + faltas
+            linhas.append({
+                'nome': nome,
+                'acertos': acertos,
+                'faltas': faltas,
+                'taxa_acerto': round(acertos / total * 100, 1) if total else None,
+            })
+        return linhas
+
+
+estatisticas = EstatisticasCache()
+
+
+# =============================================================================
+# LEITURA / INVALIDAÇÃO
+# =============================================================================
+
+def obter(nome: str, funcao: Callable[[], T], ttl: int) -> T:
+    """
+    Devolve o valor em cache ou calcula com `funcao` e grava.
+
+    Falhas do backend (diretório sem permissão, tabela ausente) não derrubam
+    a requisição: o valor é calculado direto do banco.
+
+    Args:
+        nome (str): chave no cache e nome da entrada nas estatísticas
+        funcao (callable): calcula o valor (deve ser serializável com pickle)
+        ttl (int): validade em segundos
+    """
+    chave = _chave(nome)
+    try:
+        valor = cache.get(chave, _AUSENTE)
+    except Exception as e:
+        logger.warning(f"Cache indisponível ao ler {chave}: {e}")
+        return funcao()
+
+    if valor is not _AUSENTE:
+        estatisticas.registrar(nome, True)
+        return valor
+
+    estatisticas.registrar(nome, False)
+    valor = funcao()
+    try:
+        cache.set(chave, valor, ttl)
+    except Exception as e:
+        logger.warning(f"Cache indisponível ao gravar {chave}: {e}")
+    return valor
+
+
+def invalidar(*nomes):
+    """
+    Remove as entradas agora e de novo após o commit, para que outro
+    processo não regrave o valor antigo enquanto a transação está aberta.
+    """
+    chaves = [_chave(nome) for nome in nomes]
+
+    def remover():
+        try:
+            cache.delete_many(chaves)
+        except Exception as e:
+            logger.warning(f"Erro ao invalidar cache {chaves}: {e}")
+
+    remover()
+    transaction.on_commit(remover)
+
+
+def invalidar_referencias():
+    """Invalida todos os dados de referência (parâmetros, grupos e subgrupos)"""
+    invalidar(CHAVE_PARAMETROS, CHAVE_GRUPOS, CHAVE_SUBGRUPOS)
+
+
+# =============================================================================
+# DADOS DE REFERÊNCIA
+# =============================================================================
+
+def parametros_gerais() -> Optional['ParametrosGerais']:  # noqa: F821
+    """ParametrosGerais.objects.first() em cache (None se não houver registro)"""
+    from core.models import ParametrosGerais
+
+    return obter(
+        CHAVE_PARAMETROS,
+        ParametrosGerais.objects.first,
+        configuracao('CACHE_TTL_REFERENCIA_S'),
+    )
+
+
+def _ordenar(itens, ordem):
+    campos = ordem if isinstance(ordem, (list, tuple)) else (ordem,)
+    return sorted(itens, key=lambda item: tuple(
+        str(attrgetter(campo.replace('__', '.'))(item) or '').casefold() for campo in campos
+    ))
+
+
+def grupos_ativos(tipo_produto: Optional[str] = None, ordem='codigo') -> List['GrupoProduto']:  # noqa: F821
+    """
+    Grupos ativos para listas de seleção.
+
+    A lista completa fica em uma única entrada; filtro por tipo e ordenação
+    são feitos em memória (poucas dezenas de grupos).
+
+    Args:
+        tipo_produto (str): 'MP', 'PI' ou 'PA' (None = todos)
+        ordem (str | tuple): campo(s) de ordenação, ex. 'nome' ou ('tipo_produto', 'codigo')
+    """
+    from core.models import GrupoProduto
+
+    grupos = obter(
+        CHAVE_GRUPOS,
+        lambda: list(GrupoProduto.objects.filter(ativo=True).order_by('codigo')),
+        configuracao('CACHE_TTL_REFERENCIA_S'),
+    )
+    if tipo_produto:
+        grupos = [grupo for grupo in grupos if grupo.tipo_produto == tipo_produto]
+    return grupos if ordem == 'codigo' else _ordenar(grupos, ordem)
+
+
+def subgrupos_ativos(grupo_id: Optional[int] = None, tipo_produto: Optional[str] = None,
+                     ordem=('grupo__codigo', 'codigo')) -> List['SubgrupoProduto']:  # noqa: F821
+    """
+    Subgrupos ativos (com o grupo carregado) para listas de seleção.
+
+    `ultimo_numero` pode estar defasado (o incremento não invalida o cache);
+    para gerar códigos, leia o subgrupo do banco.
+
+    Args:
+        grupo_id (int): restringe a um grupo (None = todos)
+        tipo_produto (str): restringe pelo tipo do grupo
+        ordem (str | tuple): campo(s) de ordenação
+    """
+    from core.models import SubgrupoProduto
+
+    subgrupos = obter(
+        CHAVE_SUBGRUPOS,
+        lambda: list(
+            SubgrupoProduto.objects.filter(ativo=True)
+            .select_related('grupo')
+            .order_by('grupo__codigo', 'codigo')
+        ),
+        configuracao('CACHE_TTL_REFERENCIA_S'),
+    )
+    if grupo_id:
+        subgrupos = [subgrupo for subgrupo in subgrupos if subgrupo.grupo_id == int(grupo_id)]
+    if tipo_produto:
+        subgrupos = [subgrupo for subgrupo in subgrupos if subgrupo.grupo.tipo_produto == tipo_produto]
+    return subgrupos if tuple(ordem) == ('grupo__codigo', 'codigo') else _ordenar(subgrupos, ordem)
+
+
+# =============================================================================
+# DASHBOARDS
+# =============================================================================
+
+def agregado_dashboard(nome: str, funcao: Callable[[], T], ttl: Optional[int] = None) -> T:
+    """
+    Agregados de dashboard com TTL curto.
+
+    `funcao` deve devolver valores já avaliados (dict/list), nunca QuerySets
+    preguiçosos, senão a consulta rodaria de novo a cada acerto.
+
+    Args:
+        nome (str): identificador do fragmento, ex. 'dashboard:producao'
+        funcao (callable): calcula os agregados
+        ttl (int): validade em segundos (padrão CACHE_TTL_DASHBOARD_S)
+    """
+    if ttl is None:
+        ttl = configuracao('CACHE_TTL_DASHBOARD_S')
+    return obter(nome, funcao, ttl)
@@ -0,0 +1,239 @@
+# core/utils/desempenho.py
+
+"""
+Coleta de métricas de desempenho por view.
+
+Cada requisição gera uma amostra (latência, nº de queries, tempo de banco,
+tamanho da resposta) que vai para um buffer circular em memória
+(collections.deque com maxlen: append/popleft são atômicos, sem lock).
+De tempos em tempos o buffer é drenado, agregado por view/hora e somado na
+tabela DesempenhoView; se a gravação falhar, os agregados voltam para a
+próxima descarga.
+"""
+
+import bisect
+import logging
+import time
+from collections import Counter, deque
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from core.models.monitoramento import (
+    FAIXAS_LATENCIA_MS, histograma_vazio, somar_histogramas, percentil_histograma,
+)
+
+logger = logging.getLogger(__name__)
+
+CONFIGURACAO_PADRAO = {
+    'DESEMPENHO_ATIVO': True,
+    'DESEMPENHO_LIMITE_LENTA_MS': 1000,
+    'DESEMPENHO_INTERVALO_DESCARGA_S': 60,
+    'DESEMPENHO_TAMANHO_BUFFER': 10000,
+    'DESEMPENHO_TOP_SQL_DUPLICADO': 5,
+    'PERFIL_QUERIES_ATIVO': False,
+    'PERFIL_QUERIES_LIMITE_REPETICAO': 5,
+}
+
+
+def configuracao(chave):
+    """Lê a chave em FUZA_ELEVADORES_SETTINGS (com padrão)"""
+    return getattr(settings, 'FUZA_ELEVADORES_SETTINGS', {}).get(chave, CONFIGURACAO_PADRAO[chave])
+
+
+class RastreadorQueries:
+    """
+    Wrapper para connection.execute_wrapper: conta queries, soma o tempo
+    de banco e agrupa o SQL para detectar repetições (N+1).
+    """
+
+    def __init__(self):
+        self.quantidade = 0
+        self.tempo_ms = 0.0
+        self.sqls = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.tempo_ms += (time.perf_counter() - inicio) * 1000
+            self.quantidade += 1
+            self.sqls[sql] += 1
+
+    def duplicados(self, limite):
+        """Os `limite` SQLs mais repetidos (só os executados mais de uma vez)"""
+        return [(sql, vezes) for sql, vezes in self.sqls.most_common(limite) if vezes > 1]
+
+
+def _somar_agregado(destino, origem):
+    """Soma o agregado `origem` em `destino` (mesmas regras de DesempenhoView.acumular)"""
+    for campo in ('requisicoes', 'erros', 'lentas', 'tempo_total_ms', 'tempo_db_total_ms',
+                  'queries_total', 'bytes_total'):
+        destino[campo] += origem[campo]
+    destino['tempo_max_ms'] = max(destino['tempo_max_ms'], origem['tempo_max_ms'])
+    destino['queries_max'] = max(destino['queries_max'], origem['queries_max'])
+    destino['histograma'] = somar_histogramas(destino['histograma'], origem['histograma'])
+
+
+class ColetorDesempenho:
+    """
+    Buffer em memória do processo com as amostras ainda não gravadas
+    """
+
+    def __init__(self, tamanho=None):
+        self.amostras = deque(maxlen=tamanho or configuracao('DESEMPENHO_TAMANHO_BUFFER'))
+        # Agregados de descargas que falharam, somados na próxima
+        self.pendentes = {}
+        self.ultima_descarga = time.monotonic()
+
+    def registrar(self, url_name, metodo, status, duracao_ms, queries, tempo_db_ms, tamanho_bytes):
+        self.amostras.append(
+            (url_name, metodo, status, duracao_ms, queries, tempo_db_ms, tamanho_bytes, timezone.now())
+        )
+
+    def descarregar_se_necessario(self):
+        agora = time.monotonic()
+        if agora - self.ultima_descarga < configuracao('DESEMPENHO_INTERVALO_DESCARGA_S'):
+            return 0
+        self.ultima_descarga = agora
+        return self.descarregar()
+
+    def _drenar(self):
+        """Remove e agrega todas as amostras do buffer por (view, método, hora)"""
+        limite_lenta = configuracao('DESEMPENHO_LIMITE_LENTA_MS')
+        agregados = {}
+        while True:
+            try:
+                url_name, metodo, status, duracao_ms, queries, tempo_db_ms, tamanho, momento = self.amostras.popleft()
+            except IndexError:
+                break
+
+            periodo = momento.replace(minute=0, second=0, microsecond=0)
+            agregado = agregados.get((url_name, metodo, periodo))
+            if agregado is None:
+                agregado = agregados[(url_name, metodo, periodo)] = {
+                    'requisicoes': 0, 'erros': 0, 'lentas': 0,
+                    'tempo_total_ms': 0.0, 'tempo_max_ms': 0.0, 'tempo_db_total_ms': 0.0,
+                    'queries_total': 0, 'queries_max': 0, 'bytes_total': 0,
+                    'histograma': histograma_vazio(),
+                }
+            agregado['requisicoes'] += 1
+            agregado['erros'] += status >= 500
+            agregado['lentas'] += duracao_ms >= limite_lenta
+            agregado['tempo_total_ms'] += duracao_ms
+            agregado['tempo_max_ms'] = max(agregado['tempo_max_ms'], duracao_ms)
+            agregado['tempo_db_total_ms'] += tempo_db_ms
+            agregado['queries_total'] += queries
+            agregado['queries_max'] = max(agregado['queries_max'], queries)
+            agregado['bytes_total'] += tamanho
+            agregado['histograma'][bisect.bisect_left(FAIXAS_LATENCIA_MS, duracao_ms)] += 1
+        return agregados
+
+    def _devolver(self, agregados):
+        for chave, agregado in agregados.items():
+            if chave in self.pendentes:
+                _somar_agregado(self.pendentes[chave], agregado)
+            else:
+                self.pendentes[chave] = agregado
+
+    def descarregar(self):
+        """
+        Grava o conteúdo do buffer na tabela DesempenhoView.
+
+        As linhas que faltam são criadas antes com ignore_conflicts (outro
+        worker pode criar a mesma view/hora ao mesmo tempo) e depois somadas
+        sob select_for_update. Se a gravação falhar, os agregados voltam
+        para `pendentes`.
+
+        Returns:
+            int: quantidade de registros (view/hora) atualizados
+        """
+        from core.models import DesempenhoView
+
+        agregados = self._drenar()
+        pendentes, self.pendentes = self.pendentes, {}
+        for chave, agregado in pendentes.items():
+            if chave in agregados:
+                _somar_agregado(agregados[chave], agregado)
+            else:
+                agregados[chave] = agregado
+        if not agregados:
+            return 0
+
+        try:
+            with transaction.atomic():
+                DesempenhoView.objects.bulk_create(
+                    [DesempenhoView(url_name=url_name, metodo=metodo, periodo=periodo)
+                     for url_name, metodo, periodo in agregados],
+                    ignore_conflicts=True,
+                )
+                for (url_name, metodo, periodo), agregado in agregados.items():
+                    registro = DesempenhoView.objects.select_for_update().get(
+                        url_name=url_name, metodo=metodo, periodo=periodo,
+                    )
+                    registro.acumular(agregado)
+                    registro.save()
+        except Exception as e:
+            # Métrica nunca pode derrubar a requisição
+            logger.warning(f"Falha ao gravar métricas de desempenho (reenviadas na próxima descarga): {e}")
+            self._devolver(agregados)
+            return 0
+        return len(agregados)
+
+
+coletor = ColetorDesempenho()
+
+
+def resumo_por_view(horas=24):
+    """
+    Consolida os agregados horários das últimas `horas` por view.
+
+    Returns:
+        list[dict]: uma linha por (url_name, método), da maior para a menor
+        latência p95, com médias e percentis p50/p95/p99
+    """
+    from core.models import DesempenhoView
+
+    desde = timezone.now() - timedelta(hours=horas)
+    linhas = {}
+    for registro in DesempenhoView.objects.filter(periodo__gte=desde).order_by():
+        chave = (registro.url_name, registro.metodo)
+        linha = linhas.get(chave)
+        if linha is None:
+            linha = linhas[chave] = {
+                'url_name': registro.url_name, 'metodo': registro.metodo,
+                'requisicoes': 0, 'erros': 0, 'lentas': 0,
+                'tempo_total_ms': 0.0, 'tempo_max_ms': 0.0, 'tempo_db_total_ms': 0.0,
+                'queries_total': 0, 'queries_max': 0, 'bytes_total': 0,
+                'histograma': histograma_vazio(),
+            }
+        linha['requisicoes'] += registro.requisicoes
+        linha['erros'] += registro.erros
+        linha['lentas'] += registro.lentas
+        linha['tempo_total_ms'] += registro.tempo_total_ms
+        linha['tempo_max_ms'] = max(linha['tempo_max_ms'], registro.tempo_max_ms)
+        linha['tempo_db_total_ms'] += registro.tempo_db_total_ms
+        linha['queries_total'] += registro.queries_total
+        linha['queries_max'] = max(linha['queries_max'], registro.queries_max)
+        linha['bytes_total'] += registro.bytes_total
+        linha['histograma'] = somar_histogramas(linha['histograma'], registro.histograma)
+
+    resumo = []
+    for linha in linhas.values():
+        total = linha['requisicoes'] or 1
+        linha.update({
+            'p50_ms': percentil_histograma(linha['histograma'], 50, linha['tempo_max_ms']),
+            'p95_ms': percentil_histograma(linha['histograma'], 95, linha['tempo_max_ms']),
+            'p99_ms': percentil_histograma(linha['histograma'], 99, linha['tempo_max_ms']),
+            'tempo_medio_ms': linha['tempo_total_ms'] / total,
+            'tempo_db_medio_ms': linha['tempo_db_total_ms'] / total,
+            'queries_media': linha['queries_total'] / total,
+            'kb_medio': linha['bytes_total'] / total / 1024,
+        })
+        resumo.append(linha)
+
+    resumo.sort(key=lambda l: (l['p95_ms'] or 0, l['tempo_total_ms']), reverse=True)
+    return resumo
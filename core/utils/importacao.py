@@ -0,0 +1,77 @@
+# core/utils/importacao.py
+
+"""
+Importação tardia das bibliotecas pesadas (PDF, planilhas, ciência de dados).
+
+Módulos importados pelas URLs não devem importar WeasyPrint, ReportLab,
+openpyxl, pandas ou numpy no topo: cada worker (e cada `manage.py` do
+entrypoint, que carrega as URLs no system check) pagaria esse custo antes
+de atender a primeira requisição. Em vez disso:
+
+    weasyprint = modulo_tardio('weasyprint')
+    ...
+    weasyprint.HTML(string=html)   # importa aqui, no primeiro uso
+
+A verificação do tempo de boot fica em
+`python manage.py perfil_importacao --orcamento-ms N --sem-pesados`.
+"""
+
+import importlib
+import threading
+
+# Não devem ser carregados ao subir um worker (verificado por perfil_importacao)
+PACOTES_PESADOS = (
+    'weasyprint',
+    'reportlab',
+    'openpyxl',
+    'pandas',
+    'numpy',
+    'matplotlib',
+)
+
+
+class ModuloTardio:
+    """Proxy que importa o módulo no primeiro acesso a um atributo"""
+
+    __slots__ = ('_nome', '_modulo', '_lock')
+
+    def __init__(self, nome: str):
+        object.__setattr__(self, '_nome', nome)
+        object.__setattr__(self, '_modulo', None)
+        object.__setattr__(self, '_lock', threading.Lock())
+
+    def _carregar(self):
+        modulo = self._modulo
+        if modulo is None:
+            with self._lock:
+                modulo = self._modulo
+                if modulo is None:
+                    modulo = importlib.import_module(self._nome)
+                    object.__setattr__(self, '_modulo', modulo)
+        return modulo
+
+    def __getattr__(self, atributo):
+        return getattr(self._carregar(), atributo)
+
+    def __setattr__(self, atributo, valor):
+        setattr(self._carregar(), atributo, valor)
+
+    def __dir__(self):
+        return dir(self._carregar())
+
+    def __repr__(self):
+        estado = 'carregado' if self._modulo is not None else 'não carregado'
+        return f"<ModuloTardio '{self._nome}' ({estado})>"
+
+
+def modulo_tardio(nome: str) -> ModuloTardio:
+    """
+    Proxy para o módulo `nome`, importado no primeiro uso.
+
+    Args:
+        nome (str): caminho do módulo ('openpyxl', 'openpyxl.styles', ...)
+
+    Returns:
+        ModuloTardio: acessos a atributos são repassados ao módulo real
+    """
+    return ModuloTardio(nome)
@@ -11,7 +11,7 @@ from io import BytesIO
 from decimal import Decimal
 from datetime import datetime
 from django.conf import settings
-from core.models import ParametrosGerais
+from core.utils.cache import parametros_gerais
 import requests
 from PIL import Image as PILImage
 import logging
@@ -38,7 +38,7 @@ def gerar_pdf_pedido_compra(pedido):
     
     # Buscar parâmetros da empresa
     try:
-        parametros = ParametrosGerais.objects.first()
+        parametros = parametros_gerais()
     except:
         parametros = None
     
@@ -576,7 +576,7 @@ def gerar_pdf_vistoria(vistoria):
 
     # Buscar parâmetros da empresa
     try:
-        parametros = ParametrosGerais.objects.first()
+        parametros = parametros_gerais()
     except:
         parametros = None
 
@@ -0,0 +1,271 @@
+# core/utils/perfil_queries.py
+
+"""
+Atribuição de queries SQL ao template (arquivo, linha e expressão) ou à
+linha de código Python que as disparou - para achar N+1 em páginas de lista.
+
+Uso pontual:
+
+    with PerfilQueries() as perfil:
+        client.get('/producao/grupos/')
+    for linha in perfil.piores():
+        print(linha['vezes'], linha['origem'], linha['sql'])
+
+Em desenvolvimento, PerfilQueriesMiddleware (PERFIL_QUERIES_ATIVO) faz o
+mesmo em cada requisição, loga as origens repetidas e acumula o relatório
+por view; `manage.py perfil_queries <url> ...` gera o relatório direto.
+
+Nos testes, QueriesConstantesMixin.assertQueriesNaoCrescem falha quando o
+número de queries de uma lista cresce com a quantidade de linhas.
+
+Como funciona: enquanto o perfil está ativo, Node.render_annotated empilha
+o nó em renderização (por thread); cada query executada é atribuída ao nó
+mais interno da pilha ({{ grupo.subgrupos.count }} em grupo_list.html:84)
+ou, fora de templates, ao primeiro frame do projeto na pilha Python.
+Queries com o mesmo formato (listas IN de tamanhos diferentes viram
+"IN (...)") e a mesma origem são somadas.
+"""
+
+import os
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection
+from django.template.base import Node, TokenType
+
+_local = threading.local()
+_render_original = None
+_trava_instalacao = threading.Lock()
+
+_LISTA_IN = re.compile(r'IN \((?:%s, )*%s\)')
+_ESTE_ARQUIVO = os.path.abspath(__file__)
+
+
+def _render_rastreado(self, context):
+    pilha = getattr(_local, 'pilha', None)
+    if pilha is None:
+        return _render_original(self, context)
+    pilha.append(self)
+    try:
+        return _render_original(self, context)
+    finally:
+        pilha.pop()
+
+
+def _instalar():
+    """Troca Node.render_annotated uma única vez (sem perfil ativo, custo de um getattr)"""
+    global _render_original
+    with _trava_instalacao:
+        if _render_original is None:
+            _render_original = Node.render_annotated
+            Node.render_annotated = _render_rastreado
+
+
+def forma_sql(sql):
+    """SQL sem a variação de tamanho das listas IN"""
+    return _LISTA_IN.sub('IN (...)', sql)
+
+
+def _origem_template(no):
+    token = getattr(no, 'token', None)
+    origem = getattr(no, 'origin', None)
+    if token is None or origem is None:
+        return None
+    nome = origem.template_name or origem.name
+    if token.token_type == TokenType.VAR:
+        expressao = f'{{{{ {token.contents} }}}}'
+    elif token.token_type == TokenType.BLOCK:
+        expressao = f'{{% {token.contents} %}}'
+    else:
+        expressao = ''
+    return f'{nome}:{token.lineno} {expressao}'.strip()
+
+
+def _origem_python():
+    """Primeiro frame do projeto (fora de site-packages e deste módulo)"""
+    raiz = str(settings.BASE_DIR)
+    frame = sys._getframe(2)
+    while frame is not None:
+        arquivo = frame.f_code.co_filename
+        if arquivo.startswith(raiz) and 'site-packages' not in arquivo and arquivo != _ESTE_ARQUIVO:
+            return f'{os.path.relpath(arquivo, raiz)}:{frame.f_lineno} {frame.f_code.co_name}()'
+        frame = frame.f_back
+    return '<fora do projeto>'
+
+
+class PerfilQueries:
+    """
+    Context manager que registra cada query com sua origem.
+
+    Attributes:
+        registros (dict): {(origem, forma do SQL): [vezes, tempo_ms]}
+        quantidade (int): total de queries
+        tempo_ms (float): tempo total de banco
+    """
+
+    def __init__(self, conexao=None):
+        self.conexao = conexao or connection
+        self.registros = defaultdict(lambda: [0, 0.0])
+        self.quantidade = 0
+        self.tempo_ms = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duracao = (time.perf_counter() - inicio) * 1000
+            pilha = getattr(_local, 'pilha', None)
+            origem = None
+            for no in reversed(pilha or ()):
+                origem = _origem_template(no)
+                if origem:
+                    break
+            registro = self.registros[(origem or _origem_python(), forma_sql(sql))]
+            registro[0] += 1
+            registro[1] += duracao
+            self.quantidade += 1
+            self.tempo_ms += duracao
+
+    def __enter__(self):
+        _instalar()
+        self._pilha_anterior = getattr(_local, 'pilha', None)
+        _local.pilha = []
+        self._wrapper = self.conexao.execute_wrapper(self)
+        self._wrapper.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        self._wrapper.__exit__(*exc)
+        _local.pilha = self._pilha_anterior
+        return False
+
+    def piores(self, limite=10):
+        """
+        Origens/SQL mais repetidos.
+
+        Returns:
+            list[dict]: origem, sql, vezes, tempo_ms (do mais repetido ao menos)
+        """
+        linhas = [
+            {'origem': origem, 'sql': sql, 'vezes': vezes, 'tempo_ms': tempo}
+            for (origem, sql), (vezes, tempo) in self.registros.items()
+        ]
+        linhas.sort(key=lambda l: (l['vezes'], l['tempo_ms']), reverse=True)
+        return linhas[:limite]
+
+    def por_origem(self):
+        """{origem: quantidade de queries}"""
+        contagem = defaultdict(int)
+        for (origem, _), (vezes, _) in self.registros.items():
+            contagem[origem] += vezes
+        return dict(contagem)
+
+
+class RelatorioPerfil:
+    """
+    Acumula perfis de várias requisições por view e ordena os piores ofensores
+    """
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        self.views = {}
+
+    def registrar(self, view, perfil):
+        with self._trava:
+            dados = self.views.setdefault(view, {
+                'requisicoes': 0, 'queries': 0, 'tempo_ms': 0.0, 'ofensores': defaultdict(lambda: [0, 0.0]),
+            })
+            dados['requisicoes'] += 1
+            dados['queries'] += perfil.quantidade
+            dados['tempo_ms'] += perfil.tempo_ms
+            for chave, (vezes, tempo) in perfil.registros.items():
+                dados['ofensores'][chave][0] += vezes
+                dados['ofensores'][chave][1] += tempo
+
+    def gerar(self, limite=10):
+        """
+        Returns:
+            list[dict]: por view (mais queries por requisição primeiro): view,
+                        requisicoes, queries_media, tempo_ms_medio e ofensores
+                        (origem, sql, vezes_por_requisicao, tempo_ms)
+        """
+        with self._trava:
+            relatorio = []
+            for view, dados in self.views.items():
+                n = dados['requisicoes']
+                ofensores = sorted(dados['ofensores'].items(), key=lambda i: (i[1][0], i[1][1]), reverse=True)
+                relatorio.append({
+                    'view': view,
+                    'requisicoes': n,
+                    'queries_media': dados['queries'] / n,
+                    'tempo_ms_medio': dados['tempo_ms'] / n,
+                    'ofensores': [
+                        {'origem': origem, 'sql': sql, 'vezes_por_requisicao': vezes / n, 'tempo_ms': tempo}
+                        for (origem, sql), (vezes, tempo) in ofensores[:limite]
+                    ],
+                })
+        relatorio.sort(key=lambda v: v['queries_media'], reverse=True)
+        return relatorio
+
+    def limpar(self):
+        with self._trava:
+            self.views.clear()
+
+
+relatorio = RelatorioPerfil()
+
+
+class QueriesConstantesMixin:
+    """
+    Para TestCase: verifica que uma página de lista não faz N+1.
+
+        class GrupoListTest(QueriesConstantesMixin, TestCase):
+            def test_lista(self):
+                self.client.force_login(self.admin)
+                self.assertQueriesNaoCrescem(
+                    reverse('producao:grupo_list'),
+                    lambda n: criar_grupos(n),
+                )
+    """
+
+    def assertQueriesNaoCrescem(self, url, preparar, tamanhos=(2, 10), folga=0, cliente=None):
+        """
+        Requisita `url` depois de `preparar(n)` para cada n de `tamanhos` e falha
+        se o número de queries aumentar mais que `folga` entre o menor e o maior.
+
+        Args:
+            url (str): página a requisitar (GET)
+            preparar (callable): recebe n e deixa a lista com n linhas
+            tamanhos (tuple): quantidades de linhas comparadas
+            folga (int): queries extras toleradas
+            cliente: django.test.Client (padrão: self.client)
+        """
+        cliente = cliente or self.client
+        perfis = []
+        for tamanho in tamanhos:
+            preparar(tamanho)
+            with PerfilQueries() as perfil:
+                resposta = cliente.get(url)
+            self.assertLess(resposta.status_code, 400, f'{url} respondeu {resposta.status_code}')
+            perfis.append(perfil)
+
+        menor, maior = perfis[0], perfis[-1]
+        if maior.quantidade - menor.quantidade <= folga:
+            return
+
+        antes = menor.por_origem()
+        cresceram = sorted(
+            ((origem, antes.get(origem, 0), vezes) for origem, vezes in maior.por_origem().items()
+             if vezes > antes.get(origem, 0)),
+            key=lambda c: c[2] - c[1], reverse=True,
+        )
+        detalhes = '\n'.join(f'  {origem}: {a} -> {b}' for origem, a, b in cresceram[:10])
+        self.fail(
+            f'{url}: queries cresceram com a lista ({tamanhos[0]} linhas: {menor.quantidade}, '
+            f'{tamanhos[-1]} linhas: {maior.quantidade})\n{detalhes}'
+        )
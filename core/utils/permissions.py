@@ -12,6 +12,8 @@ from django.shortcuts import redirect
 from django.contrib import messages
 from django.contrib.auth.mixins import AccessMixin
 
+from core.utils import autorizacao
+
 
 # ========================================
 # DECORATORS PARA VIEWS BASEADAS EM FUNÇÃO
@@ -67,13 +69,12 @@ def require_permission(*permissions):
                 return view_func(request, *args, **kwargs)
 
             # Verificar se tem TODAS as permissões
-            for perm in permissions:
-                if not request.user.has_perm(perm):
-                    messages.error(
-                        request,
-                        f'Você não tem permissão para realizar esta ação.'
-                    )
-                    raise PermissionDenied(f"Permissão necessária: {perm}")
+            if not autorizacao.tem_todas(request.user, permissions):
+                messages.error(
+                    request,
+                    f'Você não tem permissão para realizar esta ação.'
+                )
+                raise PermissionDenied(f"Permissão necessária: {', '.join(permissions)}")
 
             return view_func(request, *args, **kwargs)
         return wrapped_view
@@ -97,7 +98,7 @@ def require_any_permission(*permissions):
                 return view_func(request, *args, **kwargs)
 
             # Verificar se tem PELO MENOS UMA permissão
-            tem_permissao = any(request.user.has_perm(perm) for perm in permissions)
+            tem_permissao = autorizacao.tem_alguma(request.user, permissions)
 
             if not tem_permissao:
                 messages.error(
@@ -138,13 +139,12 @@ def require_nivel_and_permission(niveis, permissions):
                 raise PermissionDenied(f"Nível requerido: {', '.join(niveis)}")
 
             # Verificar permissões
-            for perm in permissions:
-                if not request.user.has_perm(perm):
-                    messages.error(
-                        request,
-                        'Você não tem permissão para realizar esta ação.'
-                    )
-                    raise PermissionDenied(f"Permissão necessária: {perm}")
+            if not autorizacao.tem_todas(request.user, permissions):
+                messages.error(
+                    request,
+                    'Você não tem permissão para realizar esta ação.'
+                )
+                raise PermissionDenied(f"Permissão necessária: {', '.join(permissions)}")
 
             return view_func(request, *args, **kwargs)
         return wrapped_view
@@ -221,7 +221,7 @@ class PermissionRequiredMixin(AccessMixin):
         if isinstance(perms, str):
             perms = [perms]
 
-        return all(self.request.user.has_perm(perm) for perm in perms)
+        return autorizacao.tem_todas(self.request.user, perms)
 
 
 class AnyPermissionRequiredMixin(AccessMixin):
@@ -241,9 +241,7 @@ class AnyPermissionRequiredMixin(AccessMixin):
         if request.user.is_superuser:
             return super().dispatch(request, *args, **kwargs)
 
-        tem_permissao = any(
-            request.user.has_perm(perm) for perm in self.permissions_required
-        )
+        tem_permissao = autorizacao.tem_alguma(request.user, self.permissions_required)
 
         if not tem_permissao:
             messages.error(
@@ -288,7 +286,7 @@ class NivelAndPermissionMixin(AccessMixin):
             if isinstance(perms, str):
                 perms = [perms]
 
-            if not all(request.user.has_perm(perm) for perm in perms):
+            if not autorizacao.tem_todas(request.user, perms):
                 messages.error(
                     request,
                     'Você não tem permissão para acessar esta página.'
@@ -309,22 +307,7 @@ def get_max_desconto_percentual(user):
     Returns:
         Decimal: percentual máximo (5.0, 10.0, 15.0, etc.) ou 0 se não tiver permissão
     """
-    if user.is_superuser or user.has_perm('core.aprovar_desconto_ilimitado'):
-        return 100.0
-
-    if user.has_perm('core.aprovar_desconto_20'):
-        return 20.0
-
-    if user.has_perm('core.aprovar_desconto_15'):
-        return 15.0
-
-    if user.has_perm('core.aprovar_desconto_10'):
-        return 10.0
-
-    if user.has_perm('core.aprovar_desconto_5'):
-        return 5.0
-
-    return 0.0
+    return autorizacao.max_desconto(user)
 
 
 def get_max_valor_orcamento(user):
@@ -334,19 +317,7 @@ def get_max_valor_orcamento(user):
     Returns:
         Decimal: valor máximo ou None se ilimitado
     """
-    if user.is_superuser or user.has_perm('core.aprovar_orcamento_ilimitado'):
-        return None  # Ilimitado
-
-    if user.has_perm('core.aprovar_orcamento_ate_50000'):
-        return 50000.0
-
-    if user.has_perm('core.aprovar_orcamento_ate_10000'):
-        return 10000.0
-
-    if user.has_perm('core.aprovar_orcamento_ate_5000'):
-        return 5000.0
-
-    return 0.0
+    return autorizacao.max_orcamento(user)
 
 
 def pode_aprovar_desconto(user, percentual):
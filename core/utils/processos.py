@@ -0,0 +1,77 @@
+# core/utils/processos.py
+
+"""
+Processamento em lotes em processos filhos.
+
+Os filhos são criados com fork e herdam o estado já carregado no pai
+(catálogo, YAMLs parseados, serviços), então nada disso é serializado; só
+as fatias de índices vão para os filhos e os resultados voltam.
+
+A conexão de banco herdada pertence ao pai: o filho descarta a referência
+(sem fechar o socket) e, se precisar consultar, abre uma conexão própria,
+que não enxerga dados não commitados do pai.
+"""
+
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, List, Sequence
+
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# (funcao, itens) do mapeamento em andamento, lido pelos filhos após o fork
+_ESTADO = None
+
+
+def fork_disponivel() -> bool:
+    return 'fork' in multiprocessing.get_all_start_methods()
+
+
+def _inicializar_filho():
+    for conexao in connections.all(initialized_only=True):
+        conexao.connection = None
+    logging.disable(logging.INFO)
+
+
+def _executar_lote(intervalo):
+    funcao, itens = _ESTADO
+    inicio, fim = intervalo
+    return funcao(itens[inicio:fim])
+
+
+def mapear_lotes(funcao: Callable[[Sequence], Any], itens: Sequence, processos: int,
+                 lotes_por_processo: int = 4) -> List[Any]:
+    """
+    Aplica `funcao` a fatias de `itens` em `processos` processos.
+
+    Sem fork (Windows) ou com processos <= 1, roda tudo no processo atual.
+
+    Args:
+        funcao (callable): recebe uma fatia de itens e devolve um resultado serializável
+        itens (sequence): entradas (não são serializadas)
+        processos (int): quantidade de processos filhos
+        lotes_por_processo (int): fatias por processo, para equilibrar a carga
+
+    Returns:
+        list: resultado de cada fatia, na ordem dos itens
+    """
+    global _ESTADO
+
+    if processos <= 1 or len(itens) <= 1 or not fork_disponivel():
+        return [funcao(itens)]
+
+    tamanho = max(1, -(-len(itens) // (processos * lotes_por_processo)))
+    intervalos = [(inicio, min(inicio + tamanho, len(itens))) for inicio in range(0, len(itens), tamanho)]
+
+    _ESTADO = (funcao, itens)
+    try:
+        with ProcessPoolExecutor(
+            max_workers=processos,
+            mp_context=multiprocessing.get_context('fork'),
+            initializer=_inicializar_filho,
+        ) as executor:
+            return list(executor.map(_executar_lote, intervalos))
+    finally:
+        _ESTADO = None
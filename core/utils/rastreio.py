@@ -0,0 +1,123 @@
+# core/utils/rastreio.py
+
+"""
+Rastreio do cálculo de proposta.
+
+Os pontos do cálculo chamam `rastrear(etapa, mensagem, *args)` com a
+mensagem no estilo do logging (%s) e os argumentos crus, em vez de montar
+f-strings para logger.info a cada cálculo:
+
+- sem rastreio ativo, o custo é um ContextVar.get() e a checagem de nível
+  do logger (cacheada); nada é formatado;
+- dentro de `rastreando()`, o evento vai para uma lista em memória e só é
+  formatado quando alguém lê (view de rastreio, gravação em
+  RastreioCalculoProposta);
+- com o logger 'core.calculo' em DEBUG, os eventos também vão para o log,
+  formatados pelo próprio logging.
+
+Exemplo:
+    with rastreando(f'Proposta {proposta.numero}') as rastreio:
+        CalculoPedidoService.calcular_custos_completo(proposta)
+    print(rastreio.texto())
+"""
+
+import json
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+logger = logging.getLogger('core.calculo')
+
+_atual: ContextVar[Optional['RastreioCalculo']] = ContextVar('rastreio_calculo', default=None)
+
+# Eventos guardados por rastreio (o restante é só contado)
+LIMITE_EVENTOS = 5000
+
+
+class RastreioCalculo:
+    """Buffer de eventos de um cálculo; a formatação acontece na leitura"""
+
+    __slots__ = ('descricao', 'inicio', 'fim', 'eventos', 'descartados')
+
+    def __init__(self, descricao: str = ''):
+        self.descricao = descricao
+        self.inicio = time.perf_counter_ns()
+        self.fim = None
+        self.eventos = []
+        self.descartados = 0
+
+    def registrar(self, etapa: str, mensagem: str, args: tuple, dados: Any = None) -> None:
+        if len(self.eventos) >= LIMITE_EVENTOS:
+            self.descartados += 1
+            return
+        self.eventos.append((time.perf_counter_ns(), etapa, mensagem, args, dados))
+
+    def encerrar(self) -> None:
+        self.fim = time.perf_counter_ns()
+
+    @property
+    def duracao_ms(self) -> float:
+        return ((self.fim or time.perf_counter_ns()) - self.inicio) / 1e6
+
+    def eventos_formatados(self) -> List[Dict[str, Any]]:
+        """
+        Returns:
+            list[dict]: ms (desde o início), etapa, mensagem e dados (serializáveis em JSON)
+        """
+        formatados = []
+        for instante, etapa, mensagem, args, dados in self.eventos:
+            try:
+                texto = mensagem % args if args else mensagem
+            except (TypeError, ValueError):
+                texto = f"{mensagem} {args!r}"
+            formatados.append({
+                'ms': round((instante - self.inicio) / 1e6, 3),
+                'etapa': etapa,
+                'mensagem': texto,
+                'dados': json.loads(json.dumps(dados, cls=DjangoJSONEncoder, default=str)) if dados is not None else None,
+            })
+        return formatados
+
+    def texto(self) -> str:
+        linhas = [f"{e['ms']:>10.3f} ms  [{e['etapa']}] {e['mensagem']}" for e in self.eventos_formatados()]
+        if self.descartados:
+            linhas.append(f"... {self.descartados} eventos descartados (limite {LIMITE_EVENTOS})")
+        return '\n'.join(linhas)
+
+
+def ativo() -> bool:
+    """True dentro de `rastreando()`; use para evitar montar `dados` caros à toa"""
+    return _atual.get() is not None
+
+
+def rastrear(etapa: str, mensagem: str, *args, dados: Any = None) -> None:
+    """
+    Registra um evento do cálculo.
+
+    Args:
+        etapa (str): agrupador curto, ex. 'dimensionamento', 'categoria', 'preco'
+        mensagem (str): texto com %s, formatado só na leitura
+        *args: valores da mensagem (guardados por referência)
+        dados: estrutura opcional exibida/gravada junto com o evento
+    """
+    rastreio = _atual.get()
+    if rastreio is not None:
+        rastreio.registrar(etapa, mensagem, args, dados)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug('[%s] ' + mensagem, etapa, *args)
+
+
+@contextmanager
+def rastreando(descricao: str = '') -> Iterator[RastreioCalculo]:
+    """Ativa o rastreio no contexto atual (thread/tarefa) até o fim do bloco"""
+    rastreio = RastreioCalculo(descricao)
+    token = _atual.set(rastreio)
+    try:
+        yield rastreio
+    finally:
+        rastreio.encerrar()
+        _atual.reset(token)
@@ -3,9 +3,13 @@
 """
 Utilitários para views e templates
 """
+import base64
+import binascii
+import json
 import logging
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from django import forms
+from django.db.models import Q
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -184,3 +188,122 @@ class PaginacaoMixin:
             Objeto Page contendo os itens da página atual
         """
         return paginar_lista(queryset, self.request, self.itens_por_pagina)
+
+
+# ===== PAGINAÇÃO POR CHAVE (KEYSET) =====
+
+class PaginaKeyset:
+    """
+    Página de `paginar_keyset`. Iterável como uma Page do Django.
+
+    Attributes:
+        object_list (list): linhas da página
+        total (int): total de linhas do filtro (um único COUNT)
+        has_next / has_previous (bool)
+        cursor_proximo / cursor_anterior (str): valor de `?cursor=` das páginas vizinhas
+        start_index / end_index (int): posição das linhas (para "Mostrando 16-30 de N")
+        num_pages (int): páginas estimadas pelo total
+    """
+
+    def __init__(self, object_list, total, itens_por_pagina, inicio, cursor_proximo, cursor_anterior):
+        self.object_list = object_list
+        self.total = total
+        self.has_next = cursor_proximo is not None
+        self.has_previous = cursor_anterior is not None
+        self.cursor_proximo = cursor_proximo
+        self.cursor_anterior = cursor_anterior
+        self.start_index = inicio + 1 if object_list else 0
+        self.end_index = inicio + len(object_list)
+        self.num_pages = max(1, -(-total // itens_por_pagina))
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+def _codificar_cursor(valores, inicio, direcao):
+    dados = json.dumps({'v': [str(v) for v in valores], 'i': inicio, 'd': direcao}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(dados.encode()).decode().rstrip('=')
+
+
+def _decodificar_cursor(cursor, campos_saida):
+    """(valores, inicio, direcao) ou None se o cursor for inválido"""
+    try:
+        dados = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        valores = [campo.to_python(valor) for campo, valor in zip(campos_saida, dados['v'], strict=True)]
+        return valores, max(int(dados['i']), 0), dados['d']
+    except (ValueError, TypeError, KeyError, binascii.Error, forms.ValidationError):
+        return None
+
+
+def _depois_de(campos, valores):
+    """Linhas depois de `valores` na ordenação (comparação lexicográfica)"""
+    condicao = Q()
+    for i, (campo, decrescente) in enumerate(campos):
+        termo = Q(**{f"{campo}__{'lt' if decrescente else 'gt'}": valores[i]})
+        for anterior, valor in zip(campos[:i], valores[:i]):
+            termo &= Q(**{anterior[0]: valor})
+        condicao |= termo
+    return condicao
+
+
+def paginar_keyset(queryset, request, ordenacao, itens_por_pagina=15, total=None):
+    """
+    Paginação por chave: a página seguinte filtra "depois da última linha"
+    na ordenação em vez de usar OFFSET, então qualquer página custa o mesmo
+    que a primeira e inclusões durante a navegação não duplicam linhas.
+
+    Args:
+        queryset: QuerySet filtrado (pode ter anotações usadas na ordenação)
+        request: lê `?cursor=`
+        ordenacao (tuple): campos sem nulos terminando num campo único,
+                           ex.: ('-criado_em', '-id')
+        itens_por_pagina (int): linhas por página
+        total (int): COUNT já calculado (padrão: calcula uma vez aqui)
+
+    Returns:
+        PaginaKeyset
+    """
+    campos = [(campo.lstrip('-'), campo.startswith('-')) for campo in ordenacao]
+    anotacoes = queryset.query.annotations
+    campos_saida = [
+        anotacoes[nome].output_field if nome in anotacoes else queryset.model._meta.get_field(nome)
+        for nome, _ in campos
+    ]
+    if total is None:
+        total = queryset.order_by().count()
+
+    cursor = _decodificar_cursor(request.GET.get('cursor', ''), campos_saida) if request.GET.get('cursor') else None
+    valores, inicio, direcao = cursor or (None, 0, 'proximo')
+
+    if direcao == 'anterior':
+        invertidos = [(campo, not decrescente) for campo, decrescente in campos]
+        linhas = list(
+            queryset.order_by(*[('-' if d else '') + c for c, d in invertidos])
+            .filter(_depois_de(invertidos, valores))[:itens_por_pagina + 1]
+        )
+        tem_anterior = len(linhas) > itens_por_pagina
+        linhas = linhas[:itens_por_pagina][::-1]
+        tem_proximo = True
+        inicio = inicio if tem_anterior else 0
+    else:
+        consulta = queryset.order_by(*ordenacao)
+        if valores is not None:
+            consulta = consulta.filter(_depois_de(campos, valores))
+        linhas = list(consulta[:itens_por_pagina + 1])
+        tem_proximo = len(linhas) > itens_por_pagina
+        linhas = linhas[:itens_por_pagina]
+        tem_anterior = valores is not None
+
+    def chave(linha):
+        return [getattr(linha, campo) for campo, _ in campos]
+
+    cursor_proximo = cursor_anterior = None
+    if linhas and tem_proximo:
+        cursor_proximo = _codificar_cursor(chave(linhas[-1]), inicio + len(linhas), 'proximo')
+    if linhas and tem_anterior:
+        cursor_anterior = _codificar_cursor(chave(linhas[0]), max(inicio - itens_por_pagina, 0), 'anterior')
+
+    return PaginaKeyset(linhas, total, itens_por_pagina, inicio, cursor_proximo, cursor_anterior)
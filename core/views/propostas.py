@@ -12,7 +12,7 @@ from django.shortcuts import render, get_object_or_404
 from django.http import JsonResponse
 from django.views.decorators.http import require_POST
 
-from core.models import Proposta, HistoricoProposta,ParametrosGerais 
+from core.models import Proposta, ParametrosGerais
 logger = logging.getLogger(__name__)
 
 def safe_json_load(json_field):
@@ -41,8 +41,8 @@ def proposta_detail_base(request, pk, template_name, extra_context=None):
     proposta = get_object_or_404(Proposta, pk=pk)
     
     # ✅ CARREGAR PARÂMETROS PARA IMPOSTOS DINÂMICOS
-    from core.models import ParametrosGerais
-    parametros = ParametrosGerais.objects.first()
+    from core.utils.cache import parametros_gerais
+    parametros = parametros_gerais()
     
     # Preparar dados JSON
     ficha_tecnica = safe_json_load(proposta.ficha_tecnica)
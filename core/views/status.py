@@ -6,8 +6,9 @@ from django.contrib import messages
 from datetime import date, timedelta
 import logging
 
-from core.models import Proposta, HistoricoProposta
+from core.models import Proposta
 from core.forms import PropostaStatusForm
+from core.services.auditoria import AuditoriaService
 
 logger = logging.getLogger(__name__)
 
@@ -22,12 +23,13 @@ def vendedor_proposta_alterar_status(request, pk):
     proposta = get_object_or_404(Proposta, pk=pk)
     
     if request.method == 'POST':
+        # Antes do is_valid, que já aplica os dados do POST na instância
+        status_anterior = proposta.status
         form = PropostaStatusForm(request.POST, instance=proposta)
         
         if form.is_valid():
             try:
                 # Capturar dados antes do save
-                status_anterior = proposta.status
                 status_novo = form.cleaned_data['status']
                 observacao = form.cleaned_data.get('observacao_status', '')
                 data_vistoria = form.cleaned_data.get('data_vistoria_medicao_prevista')
@@ -46,13 +48,12 @@ def vendedor_proposta_alterar_status(request, pk):
                     proposta.save()
                 
                 # Criar histórico da mudança
-                from core.models import HistoricoProposta
-                HistoricoProposta.objects.create(
-                    proposta=proposta,
-                    status_anterior=status_anterior,
-                    status_novo=status_novo,
+                AuditoriaService.registrar(
+                    proposta,
+                    'Alteração de status',
+                    usuario=request.user,
                     observacao=observacao or f"Status alterado para {proposta.get_status_display()}",
-                    usuario=request.user
+                    alteracoes={'status': [status_anterior, status_novo]},
                 )
                 
                 # Log da alteração
@@ -88,6 +89,7 @@ def vendedor_proposta_alterar_status(request, pk):
     context = {
         'form': form,
         'proposta': proposta,
+        'historico': AuditoriaService.ultimas(proposta, 5),
         'base_template': 'vendedor/base_vendedor.html',
     }
     
@@ -12,6 +12,10 @@ done
 echo "Applying database migrations..."
 python manage.py migrate
 
+# Create the cache table (no-op unless CACHE_BACKEND=db)
+echo "Creating cache table..."
+python manage.py createcachetable
+
 # Collect static files
 echo "Collecting static files..."
 python manage.py collectstatic --no-input
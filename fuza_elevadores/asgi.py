@@ -3,6 +3,11 @@ ASGI config for fuza_elevadores project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Necessário para o stream de notificações (producao:tarefas_eventos, com
+NOTIFICACOES_SSE=True), que mantém a conexão aberta sem ocupar um worker.
+Ex.: gunicorn -k uvicorn.workers.UvicornWorker fuza_elevadores.asgi:application
+Com mais de um worker, use NOTIFICACOES_HUB = HubPostgres.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 """
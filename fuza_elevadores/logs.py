@@ -0,0 +1,494 @@
+# fuza_elevadores/logs.py
+
+"""
+Logging sem escrita em disco nas threads de requisição.
+
+Os handlers de settings.LOGGING são HandlerFila: a thread que loga só
+resolve a mensagem e coloca o registro numa fila em memória. Uma thread
+ouvinte por processo junta os registros de até LOG_INTERVALO_MS (200 ms)
+e, a cada lote, formata, grava e faz um flush por destino.
+
+Destinos de arquivo:
+- rotação por tamanho (`rotacao='tamanho'`) ou por tempo (`'tempo'`),
+  com os arquivos antigos comprimidos em .gz;
+- com vários workers gravando no mesmo arquivo, a rotação é feita sob
+  trava (fcntl) por um processo só, e os demais reabrem o arquivo novo.
+
+Também:
+- FormatadorJSON: uma linha JSON por registro (LOG_FORMATO=json);
+- FiltroAmostragem: mantém 1 de cada N registros DEBUG dos loggers
+  configurados (LOG_AMOSTRAGEM="core.services.calculo_pedido=0.1").
+
+Com a fila cheia (LOG_FILA_MAX), registros são descartados em vez de
+bloquear a requisição; o total descartado é avisado no próprio log.
+LOG_ASSINCRONO=0 volta à escrita direta, útil para depurar.
+"""
+
+import atexit
+import gzip
+import itertools
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+try:
+    import fcntl
+except ImportError:  # Windows: rotação sem trava entre processos
+    fcntl = None
+
+TAMANHO_FILA = int(os.getenv('LOG_FILA_MAX', '10000'))
+# O ouvinte acumula registros por até este intervalo antes de gravar: menos
+# trocas de thread (GIL) durante a requisição e uma escrita por lote
+INTERVALO_LOTE_S = int(os.getenv('LOG_INTERVALO_MS', '200')) / 1000
+
+_FIM = object()
+
+
+class _Marca:
+    """Posição na fila; o ouvinte avisa quando tudo antes dela foi gravado"""
+
+    def __init__(self):
+        self.gravado = threading.Event()
+
+
+# =============================================================================
+# OUVINTE
+# =============================================================================
+
+class _Ouvinte:
+    """Fila e thread consumidora do processo (recriadas após fork)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = None
+        self._thread = None
+        self._atexit = False
+        self._acordar = threading.Event()
+        self.fila = None
+        self.descartados = 0
+
+    def fila_do_processo(self) -> queue.SimpleQueue:
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self.fila = queue.SimpleQueue()
+                    self.descartados = 0
+                    self._acordar = threading.Event()
+                    self._thread = threading.Thread(target=self._consumir, args=(self.fila,),
+                                                    name='fuza-logs', daemon=True)
+                    self._thread.start()
+                    self._pid = os.getpid()
+                    if not self._atexit:
+                        atexit.register(self.parar)
+                        self._atexit = True
+        return self.fila
+
+    def _consumir(self, fila):
+        while True:
+            lote = [fila.get()]
+            self._acordar.wait(INTERVALO_LOTE_S)
+            self._acordar.clear()
+            while True:
+                try:
+                    lote.append(fila.get_nowait())
+                except queue.Empty:
+                    break
+            if not self._escrever(lote):
+                return
+
+    def _escrever(self, lote) -> bool:
+        """Grava o lote; False se recebeu o pedido de parada"""
+        continuar = True
+        destinos, marcas = {}, []
+        for item in lote:
+            if item is _FIM:
+                continuar = False
+                continue
+            if isinstance(item, _Marca):
+                marcas.append(item)
+                continue
+            destino, record = item
+            if id(destino) not in destinos:
+                destinos[id(destino)] = destino
+                if hasattr(destino, 'antes_do_lote'):
+                    destino.antes_do_lote()
+            destino.handle(record)
+
+        if self.descartados:
+            descartados, self.descartados = self.descartados, 0
+            aviso = logging.LogRecord(
+                'fuza.logs', logging.WARNING, __file__, 0,
+                f'{descartados} registros de log descartados (fila cheia, LOG_FILA_MAX={TAMANHO_FILA})',
+                None, None,
+            )
+            for destino in destinos.values():
+                destino.handle(aviso)
+
+        for destino in destinos.values():
+            try:
+                destino.flush()
+            except Exception:
+                pass
+        for marca in marcas:
+            marca.gravado.set()
+        return continuar
+
+    def esvaziar(self, timeout=5.0):
+        """Espera os registros já enfileirados neste processo serem gravados"""
+        if self._pid != os.getpid() or not (self._thread and self._thread.is_alive()):
+            return
+        marca = _Marca()
+        self.fila.put(marca)
+        self._acordar.set()
+        marca.gravado.wait(timeout)
+
+    def parar(self, timeout=5.0):
+        if self._pid != os.getpid() or not (self._thread and self._thread.is_alive()):
+            return
+        self.fila.put(_FIM)
+        self._acordar.set()
+        self._thread.join(timeout)
+
+
+_ouvinte = _Ouvinte()
+
+
+def esvaziar(timeout=5.0):
+    """Bloqueia até os registros já enfileirados serem gravados (benchmarks, comandos)"""
+    _ouvinte.esvaziar(timeout)
+
+
+class HandlerFila(logging.handlers.QueueHandler):
+    """
+    Enfileira o registro para o `destino`, que grava na thread ouvinte.
+
+    Nível e filtros (ex.: FiltroAmostragem) são aplicados aqui, antes de
+    enfileirar; o formatador configurado é repassado ao destino.
+    """
+
+    def __init__(self, destino: logging.Handler):
+        super().__init__(None)
+        self.destino = destino
+        destino.em_lote = True
+
+    def setFormatter(self, fmt):
+        super().setFormatter(fmt)
+        self.destino.setFormatter(fmt)
+
+    def prepare(self, record):
+        # Mensagem resolvida agora (os args podem mudar depois) e no próprio
+        # registro: os demais handlers chegam ao mesmo texto. Traceback também
+        # vira texto aqui; a formatação da linha fica para o ouvinte.
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = _FORMATADOR_EXCECAO.formatException(record.exc_info)
+        return record
+
+    def enqueue(self, record):
+        fila = _ouvinte.fila_do_processo()
+        if fila.qsize() >= TAMANHO_FILA:
+            _ouvinte.descartados += 1
+            return
+        fila.put((self.destino, record))
+
+    def flush(self):
+        _ouvinte.esvaziar()
+
+    def close(self):
+        _ouvinte.esvaziar()
+        self.destino.close()
+        super().close()
+
+
+_FORMATADOR_EXCECAO = logging.Formatter()
+
+
+# =============================================================================
+# DESTINOS DE ARQUIVO
+# =============================================================================
+
+def _comprimir(origem, destino):
+    with open(origem, 'rb') as entrada, gzip.open(destino, 'wb') as saida:
+        shutil.copyfileobj(entrada, saida)
+    os.remove(origem)
+
+
+@contextmanager
+def _trava(caminho):
+    if fcntl is None:
+        yield
+        return
+    with open(caminho, 'a') as arquivo:
+        fcntl.flock(arquivo, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(arquivo, fcntl.LOCK_UN)
+
+
+class _ArquivoEmLoteMixin:
+    """
+    Arquivo rotativo gravado pelo ouvinte:
+    - sem flush por registro (o ouvinte faz um por lote);
+    - reabre o arquivo se outro processo já o rotacionou;
+    - rotação sob trava. O arquivo recém-rotacionado fica sem comprimir até
+      a rotação seguinte (como o `delaycompress` do logrotate): outro
+      worker pode ainda estar gravando nele até reabrir o arquivo novo.
+    """
+
+    em_lote = False
+
+    def _rotacionado_por_outro(self) -> bool:
+        if self.stream is None:
+            return False
+        try:
+            atual = os.stat(self.baseFilename)
+        except FileNotFoundError:
+            return True
+        aberto = os.fstat(self.stream.fileno())
+        return (atual.st_ino, atual.st_dev) != (aberto.st_ino, aberto.st_dev)
+
+    def _reabrir(self):
+        if self.stream is not None:
+            self.stream.close()
+        self.stream = self._open()
+
+    def antes_do_lote(self):
+        if self._rotacionado_por_outro():
+            self._reabrir()
+            self._apos_rotacao_externa()
+
+    def _rotacionar(self):
+        with _trava(f'{self.baseFilename}.lock'):
+            if self._rotacionado_por_outro():
+                self._reabrir()
+                self._apos_rotacao_externa()
+            elif self._ja_rotacionado():
+                # Período já rotacionado por outro processo: doRollover
+                # apagaria o backup dele
+                self._apos_rotacao_externa()
+            else:
+                self.doRollover()
+                if self.stream is None:
+                    self.stream = self._open()
+
+    def _apos_rotacao_externa(self):
+        pass
+
+    def _ja_rotacionado(self) -> bool:
+        return False
+
+    def emit(self, record):
+        try:
+            if self.stream is None:
+                self.stream = self._open()
+            if self._deve_rotacionar(record):
+                self._rotacionar()
+            self.stream.write(self.format(record) + self.terminator)
+            if not self.em_lote:
+                self.stream.flush()
+        except Exception:
+            self.handleError(record)
+
+
+class ArquivoRotativoTamanho(_ArquivoEmLoteMixin, logging.handlers.RotatingFileHandler):
+    """
+    Rotaciona quando o arquivo passa de `maxBytes` (0 = nunca):
+    arquivo.log -> arquivo.log.1 -> arquivo.log.2.gz ... arquivo.log.N.gz
+    """
+
+    def __init__(self, filename, maxBytes=0, backupCount=0, encoding='utf-8', comprimir=True):
+        super().__init__(filename, maxBytes=maxBytes, backupCount=backupCount, encoding=encoding, delay=True)
+        self.comprimir = comprimir
+
+    def _deve_rotacionar(self, record):
+        return self.maxBytes > 0 and self.backupCount > 0 and self.stream.tell() >= self.maxBytes
+
+    def _backup(self, indice):
+        nome = f'{self.baseFilename}.{indice}'
+        return f'{nome}.gz' if self.comprimir and indice > 1 else nome
+
+    def doRollover(self):
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        for indice in range(self.backupCount - 1, 0, -1):
+            origem, destino = self._backup(indice), self._backup(indice + 1)
+            if not os.path.exists(origem):
+                continue
+            if indice == 1 and self.comprimir:
+                _comprimir(origem, destino)
+            else:
+                os.replace(origem, destino)
+        if os.path.exists(self.baseFilename):
+            os.replace(self.baseFilename, self._backup(1))
+
+
+class ArquivoRotativoTempo(_ArquivoEmLoteMixin, logging.handlers.TimedRotatingFileHandler):
+    """
+    Rotaciona por período (`when`: 'midnight', 'H', 'W0', ...):
+    arquivo.log -> arquivo.log.2025-01-31 -> arquivo.log.2025-01-30.gz
+    """
+
+    def __init__(self, filename, when='midnight', backupCount=0, encoding='utf-8', comprimir=True):
+        super().__init__(filename, when=when, backupCount=backupCount, encoding=encoding, delay=True)
+        self.comprimir = comprimir
+
+    def _deve_rotacionar(self, record):
+        return record.created >= self.rolloverAt
+
+    def _apos_rotacao_externa(self):
+        self.rolloverAt = self.computeRollover(int(time.time()))
+
+    def _destino_rotacao(self):
+        # Mesmo nome que TimedRotatingFileHandler.doRollover daria agora
+        inicio = self.rolloverAt - self.interval
+        if self.utc:
+            periodo = time.gmtime(inicio)
+        else:
+            periodo = time.localtime(inicio)
+            dst_agora = time.localtime()[-1]
+            if dst_agora != periodo[-1]:
+                periodo = time.localtime(inicio + (3600 if dst_agora else -3600))
+        return self.rotation_filename(f'{self.baseFilename}.{time.strftime(self.suffix, periodo)}')
+
+    def _ja_rotacionado(self):
+        destino = self._destino_rotacao()
+        return os.path.exists(destino) or os.path.exists(f'{destino}.gz')
+
+    def doRollover(self):
+        super().doRollover()
+        if not self.comprimir:
+            return
+        pasta, nome = os.path.split(self.baseFilename)
+        anteriores = sorted(
+            arquivo for arquivo in os.listdir(pasta)
+            if arquivo.startswith(f'{nome}.') and not arquivo.endswith(('.gz', '.lock'))
+        )
+        # O mais recente fica sem comprimir até a próxima rotação
+        for arquivo in anteriores[:-1]:
+            caminho = os.path.join(pasta, arquivo)
+            _comprimir(caminho, f'{caminho}.gz')
+
+
+# =============================================================================
+# FORMATADOR E FILTRO
+# =============================================================================
+
+_ATRIBUTOS_PADRAO = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+
+class FormatadorJSON(logging.Formatter):
+    """Uma linha JSON por registro; atributos passados em `extra=` vão em "extra" """
+
+    def format(self, record):
+        dados = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'modulo': record.module,
+            'linha': record.lineno,
+            'processo': record.process,
+            'thread': record.threadName,
+            'mensagem': record.getMessage(),
+        }
+        extras = {
+            chave: valor for chave, valor in vars(record).items()
+            if chave not in _ATRIBUTOS_PADRAO and not chave.startswith('_')
+        }
+        if extras:
+            dados['extra'] = extras
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            dados['excecao'] = record.exc_text
+        if record.stack_info:
+            dados['pilha'] = record.stack_info
+        return json.dumps(dados, ensure_ascii=False, default=str)
+
+
+class FiltroAmostragem(logging.Filter):
+    """
+    Mantém 1 de cada N registros até `nivel_maximo` (padrão DEBUG) dos
+    loggers configurados; níveis acima passam sempre.
+
+    Args:
+        taxas: {"prefixo.do.logger": fração mantida} ou o texto
+               "core.services.calculo_pedido=0.1,vendedor=0.5"
+        nivel_maximo (str): maior nível amostrado
+    """
+
+    def __init__(self, taxas='', nivel_maximo='DEBUG'):
+        super().__init__()
+        if isinstance(taxas, str):
+            taxas = dict(item.split('=', 1) for item in taxas.split(',') if '=' in item)
+        self.intervalos = {
+            prefixo.strip(): (round(1 / float(taxa)) if float(taxa) > 0 else 0)
+            for prefixo, taxa in taxas.items()
+        }
+        self.nivel_maximo = logging.getLevelName(nivel_maximo) if isinstance(nivel_maximo, str) else nivel_maximo
+        self._por_logger = {}
+        self._contadores = {}
+
+    def _intervalo(self, nome):
+        if nome not in self._por_logger:
+            prefixos = [p for p in self.intervalos if nome == p or nome.startswith(f'{p}.')]
+            self._por_logger[nome] = self.intervalos[max(prefixos, key=len)] if prefixos else None
+        return self._por_logger[nome]
+
+    def filter(self, record):
+        if not self.intervalos or record.levelno > self.nivel_maximo:
+            return True
+        # Mesma decisão para todos os handlers do registro
+        decisao = getattr(record, '_amostrado', None)
+        if decisao is None:
+            intervalo = self._intervalo(record.name)
+            if intervalo is None or intervalo == 1:
+                decisao = True
+            elif intervalo == 0:
+                decisao = False
+            else:
+                contador = self._contadores.setdefault(record.name, itertools.count())
+                decisao = next(contador) % intervalo == 0
+            record._amostrado = decisao
+        return decisao
+
+
+# =============================================================================
+# FÁBRICAS (settings.LOGGING, chave '()')
+# =============================================================================
+
+def arquivo(filename, rotacao='tamanho', max_mb=50, backups=10, quando='midnight',
+            comprimir=True, assincrono=True):
+    """
+    Handler de arquivo.
+
+    Args:
+        filename (str): caminho do log
+        rotacao (str): 'tamanho', 'tempo' ou 'nenhuma'
+        max_mb (float): tamanho para rotação por tamanho
+        backups (int): arquivos antigos mantidos
+        quando (str): período da rotação por tempo
+        comprimir (bool): comprime os arquivos rotacionados (.gz)
+        assincrono (bool): grava na thread ouvinte (HandlerFila)
+    """
+    if rotacao == 'tempo':
+        destino = ArquivoRotativoTempo(filename, when=quando, backupCount=int(backups), comprimir=comprimir)
+    else:
+        max_bytes = int(float(max_mb) * 1024 * 1024) if rotacao == 'tamanho' else 0
+        destino = ArquivoRotativoTamanho(filename, maxBytes=max_bytes, backupCount=int(backups), comprimir=comprimir)
+    return HandlerFila(destino) if assincrono else destino
+
+
+def console(stream=None, assincrono=True):
+    """Handler de console (stdout por padrão), opcionalmente pela fila"""
+    destino = logging.StreamHandler(stream)
+    return HandlerFila(destino) if assincrono else destino
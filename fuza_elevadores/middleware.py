@@ -2,7 +2,11 @@
 
 import logging
 import time
-from django.db import models
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection, models
+
+from core.utils.autorizacao import nivel_permitido_no_caminho
 
 
 class AppContextMiddleware:
@@ -154,6 +158,101 @@ class FuzaLogMiddleware:
         return response
 
 
+class DesempenhoMiddleware:
+    """
+    Middleware de instrumentação: latência, queries, tempo de banco e tamanho
+    da resposta por view (nome da URL resolvida). As amostras vão para o
+    buffer em memória de core.utils.desempenho e são gravadas periodicamente
+    em DesempenhoView. Requisições acima do limite de lentidão registram no
+    log os SQLs mais repetidos.
+    """
+    def __init__(self, get_response):
+        from core.utils.desempenho import configuracao
+
+        if not configuracao('DESEMPENHO_ATIVO'):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.prefixos_ignorados = tuple(
+            prefixo for prefixo in (settings.STATIC_URL, settings.MEDIA_URL) if prefixo
+        )
+
+    def __call__(self, request):
+        from core.utils.desempenho import RastreadorQueries, coletor, configuracao
+
+        if self.prefixos_ignorados and request.path.startswith(self.prefixos_ignorados):
+            return self.get_response(request)
+
+        rastreador = RastreadorQueries()
+        inicio = time.perf_counter()
+        with connection.execute_wrapper(rastreador):
+            response = self.get_response(request)
+        duracao_ms = (time.perf_counter() - inicio) * 1000
+
+        url_name = self._nome_view(request)
+        tamanho = 0 if response.streaming else len(response.content)
+        coletor.registrar(
+            url_name, request.method, response.status_code,
+            duracao_ms, rastreador.quantidade, rastreador.tempo_ms, tamanho,
+        )
+
+        if duracao_ms >= configuracao('DESEMPENHO_LIMITE_LENTA_MS'):
+            duplicados = rastreador.duplicados(configuracao('DESEMPENHO_TOP_SQL_DUPLICADO'))
+            logger = logging.getLogger('fuza.desempenho')
+            logger.warning(
+                f"Requisição lenta: {request.method} {url_name} ({request.path}) - "
+                f"{duracao_ms:.0f}ms, {rastreador.quantidade} queries, {rastreador.tempo_ms:.0f}ms de banco"
+            )
+            for sql, vezes in duplicados:
+                logger.warning(f"  {vezes}x {sql[:300]}")
+
+        # Fora do execute_wrapper: a gravação não entra na conta da requisição
+        coletor.descarregar_se_necessario()
+        return response
+
+    @staticmethod
+    def _nome_view(request):
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return '<nao-resolvida>'
+        nome = match.url_name or match.route or match.view_name
+        return f"{match.namespace}:{nome}" if match.namespace else nome
+
+
+class PerfilQueriesMiddleware:
+    """
+    Middleware de desenvolvimento: atribui cada query da requisição ao
+    template/linha ou código que a disparou (core.utils.perfil_queries),
+    acumula o relatório por view e loga as origens que se repetem (N+1).
+    Ativo só com PERFIL_QUERIES_ATIVO.
+    """
+    def __init__(self, get_response):
+        from core.utils.desempenho import configuracao
+
+        if not configuracao('PERFIL_QUERIES_ATIVO'):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.limite = configuracao('PERFIL_QUERIES_LIMITE_REPETICAO')
+
+    def __call__(self, request):
+        from core.utils.perfil_queries import PerfilQueries, relatorio
+
+        with PerfilQueries() as perfil:
+            response = self.get_response(request)
+
+        url_name = DesempenhoMiddleware._nome_view(request)
+        relatorio.registrar(url_name, perfil)
+
+        repetidos = [linha for linha in perfil.piores() if linha['vezes'] >= self.limite]
+        if repetidos:
+            logger = logging.getLogger('fuza.desempenho')
+            logger.warning(
+                f"Possível N+1 em {url_name} ({request.path}): {perfil.quantidade} queries"
+            )
+            for linha in repetidos:
+                logger.warning(f"  {linha['vezes']}x {linha['origem']} - {linha['sql'][:200]}")
+        return response
+
+
 class PermissaoPortalMiddleware:
     """
     Middleware para verificar permissões de acesso aos portais
@@ -178,23 +277,12 @@ class PermissaoPortalMiddleware:
             
             user_nivel = request.user.nivel
             
-            # Definir permissões por portal
-            portal_permissions = {
-                '/gestor/': ['admin', 'gestor', 'financeiro'],
-                '/vendedor/': ['admin', 'gestor', 'vendedor', 'engenharia', 'vistoria'],
-                '/producao/': ['admin', 'gestor', 'producao', 'compras', 'engenharia', 'almoxarifado'],
-                '/configuracao/': ['admin', 'gestor'],
-            }
-            
-            # Verificar se o usuário tem permissão para acessar o portal
-            for portal_path, allowed_levels in portal_permissions.items():
-                if path.startswith(portal_path):
-                    if user_nivel not in allowed_levels:
-                        from django.http import HttpResponseForbidden
-                        return HttpResponseForbidden(
-                            f"Acesso negado. Seu nível ({user_nivel}) não tem permissão para acessar este portal."
-                        )
-                    break
+            # Verificar se o usuário tem permissão para acessar o portal (matriz compilada)
+            if not nivel_permitido_no_caminho(user_nivel, path):
+                from django.http import HttpResponseForbidden
+                return HttpResponseForbidden(
+                    f"Acesso negado. Seu nível ({user_nivel}) não tem permissão para acessar este portal."
+                )
         
         response = self.get_response(request)
         return response
\ No newline at end of file
@@ -4,35 +4,14 @@ import dj_database_url
 from dotenv import load_dotenv
 import sys
 
-# Debug para identificar problemas de logging
-print("=== INICIANDO CONFIGURAÇÃO SISTEMA ELEVADORES FUZA ===")
-print(f"Diretório de execução atual: {os.getcwd()}")
-
 # Carrega variáveis do arquivo .env
 load_dotenv()
 
 BASE_DIR = Path(__file__).resolve().parent.parent
-print(f"BASE_DIR: {BASE_DIR}")
 
-# Criar diretório de logs com notificação
+# Diretório de logs (handlers em fuza_elevadores/logs.py)
 logs_dir = os.path.join(BASE_DIR, 'logs')
-print(f"Tentando criar diretório de logs em: {logs_dir}")
-try:
-    os.makedirs(logs_dir, exist_ok=True)
-    print(f"✓ Diretório de logs criado/verificado com sucesso: {logs_dir}")
-    print(f"  Permissões do diretório: {oct(os.stat(logs_dir).st_mode)[-3:]}")
-except Exception as e:
-    print(f"✗ ERRO ao criar diretório de logs: {str(e)}")
-
-# Tentar criar arquivo de teste para verificar permissões
-try:
-    test_log_path = os.path.join(logs_dir, 'test_write.log')
-    print(f"Tentando escrever arquivo de teste em: {test_log_path}")
-    with open(test_log_path, 'w') as f:
-        f.write('Teste de escrita de log - Sistema Fuza OK')
-    print(f"✓ Teste de escrita no diretório de logs bem-sucedido")
-except Exception as e:
-    print(f"✗ ERRO ao escrever arquivo de teste: {str(e)}")
+os.makedirs(logs_dir, exist_ok=True)
 
 # Security
 SECRET_KEY = os.getenv('SECRET_KEY')
@@ -95,6 +74,8 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'fuza_elevadores.middleware.DesempenhoMiddleware',
+    'fuza_elevadores.middleware.PerfilQueriesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -140,6 +121,26 @@ DATABASES = {
     )
 }
 
+# Cache compartilhado entre os workers (sem serviço externo).
+# CACHE_BACKEND=db usa a tabela fuza_cache (criar com `manage.py createcachetable`);
+# o padrão é em arquivo, em CACHE_DIR.
+if os.getenv('CACHE_BACKEND', 'arquivo') == 'db':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'fuza_cache',
+            'OPTIONS': {'MAX_ENTRIES': 5000},
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.getenv('CACHE_DIR', os.path.join(BASE_DIR, 'cache')),
+            'OPTIONS': {'MAX_ENTRIES': 5000},
+        }
+    }
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -157,6 +158,10 @@ USE_THOUSAND_SEPARATOR = True
 
 # Auth settings
 AUTH_USER_MODEL = 'core.Usuario'
+
+# Permissões lidas da matriz em cache (core/utils/autorizacao.py)
+AUTHENTICATION_BACKENDS = ['core.utils.autorizacao.BackendPermissoes']
+
 LOGIN_REDIRECT_URL = '/'
 LOGIN_URL = '/login/'
 LOGOUT_REDIRECT_URL = '/login/'
@@ -182,7 +187,11 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    'PAGE_SIZE': 20
+    'PAGE_SIZE': 20,
+    # API versionada na URL (api/urls.py)
+    'DEFAULT_VERSIONING_CLASS': 'rest_framework.versioning.URLPathVersioning',
+    'DEFAULT_VERSION': 'v1',
+    'ALLOWED_VERSIONS': ['v1'],
 }
 
 # Configurações específicas do Sistema Fuza
@@ -228,29 +237,52 @@ FUZA_ELEVADORES_SETTINGS = {
     'NOTIFICAR_ESTOQUE_BAIXO': True,
     'NOTIFICAR_COMPONENTE_INDISPONIVEL': True,
     'NOTIFICAR_APROVACAO_NECESSARIA': True,
+
+    # Monitoramento de desempenho (DesempenhoMiddleware)
+    'DESEMPENHO_ATIVO': True,
+    'DESEMPENHO_LIMITE_LENTA_MS': 1000,       # Loga SQLs repetidos acima disso
+    'DESEMPENHO_INTERVALO_DESCARGA_S': 60,    # Buffer -> tabela DesempenhoView
+    'DESEMPENHO_TAMANHO_BUFFER': 10000,       # Amostras mantidas em memória
+    'DESEMPENHO_TOP_SQL_DUPLICADO': 5,
+
+    # Atribuição de queries a templates (PerfilQueriesMiddleware, só desenvolvimento)
+    'PERFIL_QUERIES_ATIVO': DEBUG and os.getenv('PERFIL_QUERIES', 'False') == 'True',
+    'PERFIL_QUERIES_LIMITE_REPETICAO': 5,   # Loga origens com tantas queries repetidas
+
+    # Cache (core/utils/cache.py)
+    'CACHE_TTL_REFERENCIA_S': 3600,           # Parâmetros/grupos; invalidado por signal
+    'CACHE_TTL_DASHBOARD_S': 60,              # Agregados dos dashboards
+    'CACHE_INTERVALO_ESTATISTICAS_S': 60,     # Contadores de acerto/falta -> cache
+
+    # Replay de regras YAML (core/services/replay_regras.py)
+    'REPLAY_LIMITE_PROPOSTAS': 500,           # Propostas mais recentes avaliadas por padrão
+    'REPLAY_PROCESSOS': 4,                    # Processos filhos (1 = sem paralelismo)
+    'REPLAY_LIMITE_WEB': 500,                 # Máximo pela tela (no processo do servidor); acima, use o comando
+
+    # Notificações de tarefas (core/services/notificacoes.py)
+    'NOTIFICACOES_SSE': os.getenv('NOTIFICACOES_SSE', 'False') == 'True',  # Exige servidor ASGI
+    'NOTIFICACOES_HUB': 'core.services.notificacoes.HubLocal',  # HubPostgres com vários workers
+    'NOTIFICACOES_HEARTBEAT_S': 25,           # Comentário SSE para manter a conexão aberta
+    'NOTIFICACOES_TTL_CONTADOR_S': 3600,      # Contadores em cache; invalidados por signal
 }
 
 # Configurações de logging - Sistema Fuza
-print("Configurando sistema de logging do Sistema Fuza...")
-
-# Verifica permissões no diretório de logs
+# Gravação na thread ouvinte (fuza_elevadores/logs.py), com rotação e compressão
 LOG_DEBUG_PATH = os.path.join(logs_dir, 'fuza_debug.log')
 LOG_SIMULACOES_PATH = os.path.join(logs_dir, 'fuza_simulacoes.log')
 LOG_VENDAS_PATH = os.path.join(logs_dir, 'fuza_vendas.log')
 
-print(f"Arquivos de log que serão usados:")
-print(f" - Debug: {LOG_DEBUG_PATH}")
-print(f" - Simulações: {LOG_SIMULACOES_PATH}")
-print(f" - Vendas: {LOG_VENDAS_PATH}")
-
-# Testa escrita nos arquivos de log
-for log_path, log_name in [(LOG_DEBUG_PATH, 'debug'), (LOG_SIMULACOES_PATH, 'simulacoes'), (LOG_VENDAS_PATH, 'vendas')]:
-    try:
-        with open(log_path, 'a') as f:
-            f.write(f'Teste de inicialização - Sistema Fuza {log_name}.log\n')
-        print(f"✓ Teste de escrita em {log_name}.log bem-sucedido")
-    except Exception as e:
-        print(f"✗ ERRO ao escrever em {log_name}.log: {str(e)}")
+LOG_ASSINCRONO = os.getenv('LOG_ASSINCRONO', '1') == '1'
+LOG_FORMATADOR = 'json' if os.getenv('LOG_FORMATO', 'texto') == 'json' else 'fuza_format'
+LOG_ARQUIVO = {
+    '()': 'fuza_elevadores.logs.arquivo',
+    'rotacao': os.getenv('LOG_ROTACAO', 'tamanho'),   # tamanho | tempo | nenhuma
+    'max_mb': os.getenv('LOG_MAX_MB', '50'),
+    'backups': os.getenv('LOG_BACKUPS', '10'),
+    'quando': os.getenv('LOG_ROTACAO_QUANDO', 'midnight'),
+    'assincrono': LOG_ASSINCRONO,
+    'formatter': LOG_FORMATADOR,
+}
 
 LOGGING = {
     'version': 1,
@@ -268,36 +300,44 @@ LOGGING = {
             'format': '[{levelname}] {message}',
             'style': '{',
         },
+        'json': {
+            '()': 'fuza_elevadores.logs.FormatadorJSON',
+        },
     },
     'filters': {
         'require_debug_true': {
             '()': 'django.utils.log.RequireDebugTrue',
         },
+        # Canais DEBUG verbosos: LOG_AMOSTRAGEM="core.services.calculo_pedido=0.1,vendedor=0.5"
+        'amostragem': {
+            '()': 'fuza_elevadores.logs.FiltroAmostragem',
+            'taxas': os.getenv('LOG_AMOSTRAGEM', ''),
+        },
     },
     'handlers': {
         'console': {
+            '()': 'fuza_elevadores.logs.console',
             'level': 'DEBUG',
-            'class': 'logging.StreamHandler',
-            'formatter': 'fuza_format',
             'stream': sys.stdout,
+            'assincrono': LOG_ASSINCRONO,
+            'formatter': LOG_FORMATADOR,
+            'filters': ['amostragem'],
         },
         'debug_file': {
+            **LOG_ARQUIVO,
             'level': 'DEBUG',
-            'class': 'logging.FileHandler',
             'filename': LOG_DEBUG_PATH,
-            'formatter': 'fuza_format',
+            'filters': ['amostragem'],
         },
         'simulacoes_file': {
+            **LOG_ARQUIVO,
             'level': 'INFO',
-            'class': 'logging.FileHandler',
             'filename': LOG_SIMULACOES_PATH,
-            'formatter': 'fuza_format',
         },
         'vendas_file': {
+            **LOG_ARQUIVO,
             'level': 'INFO',
-            'class': 'logging.FileHandler',
             'filename': LOG_VENDAS_PATH,
-            'formatter': 'fuza_format',
         },
     },
     'loggers': {
@@ -316,6 +356,12 @@ LOGGING = {
             'level': 'DEBUG',
             'propagate': True,
         },
+        # Rastreio do cálculo (core.utils.rastreio): eventos só formatados em DEBUG
+        'core.calculo': {
+            'handlers': ['console', 'debug_file'],
+            'level': os.getenv('LOG_CALCULO', 'INFO'),
+            'propagate': False,
+        },
         'configuracao': {
             'handlers': ['console', 'debug_file'],
             'level': 'DEBUG',
@@ -348,12 +394,11 @@ LOGGING = {
             'level': 'INFO',
             'propagate': False,
         },
+        # Requisições lentas (DesempenhoMiddleware)
+        'fuza.desempenho': {
+            'handlers': ['console', 'debug_file'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
     },
 }
-
-print("=== CONFIGURAÇÃO SISTEMA FUZA CONCLUÍDA ===")
-
-# Teste final do sistema de logging
-import logging
-logger = logging.getLogger('fuza.simulacoes')
-logger.info("Sistema Elevadores Fuza inicializado com sucesso")
@@ -23,9 +23,11 @@ urlpatterns = [
     path('vendedor/', include('vendedor.urls', namespace='vendedor')), # 💼 Vendas e simulações
     path('producao/', include('producao.urls')),
     
-    # APIs e configurações - COMENTADO TEMPORARIAMENTE
+    # 🔌 API REST (somente leitura, versionada)
+    path('api/', include('api.urls', namespace='api')),
+
+    # Configurações - COMENTADO TEMPORARIAMENTE
     # path('configuracao/', include('configuracao.urls')),  # ⚙️ Configurações
-    # path('api/', include('api.urls', namespace='api')),
 ]
 
 # Servir mídia durante desenvolvimento
@@ -145,6 +145,9 @@ urlpatterns = [
     # Dashboard analytics (opcional)
     path('analytics/', views.dashboard_analytics, name='dashboard_analytics'),
 
+    # Desempenho das views (monitoramento)
+    path('desempenho/', views.desempenho_views, name='desempenho_views'),
+
     # Painel de Projetos
     path('painel-projetos/', views.painel_projetos, name='painel_projetos'),
     path('painel-projetos/<uuid:pk>/', views.projeto_detail, name='projeto_detail'),
@@ -19,6 +19,7 @@ from django.db.models.deletion import ProtectedError
 
 from django.forms import inlineformset_factory
 from django.utils import timezone
+from django.conf import settings
 
 from core.models import (
     Usuario, Produto, GrupoProduto, SubgrupoProduto, Fornecedor,
@@ -41,6 +42,8 @@ from core.forms import (
     # FASE 4 - Ordens de Producao
     OrdemProducaoForm, OrdemProducaoFiltroForm, ApontamentoProducaoForm
 )
+from core.utils.agregacao import contar_faixas, faixas_por_valor
+from core.utils.cache import agregado_dashboard, grupos_ativos, subgrupos_ativos
 
 logger = logging.getLogger(__name__)
 
@@ -55,16 +58,20 @@ def home(request):
 
 @portal_gestor
 def dashboard(request):
-    """Dashboard do gestor com estatísticas"""
-    context = {
-        'total_usuarios': Usuario.objects.count(),
-        'total_produtos': Produto.objects.count(),
-        'total_fornecedores': Fornecedor.objects.filter(ativo=True).count(),
-        'produtos_sem_estoque': Produto.objects.filter(
-            controla_estoque=True, 
-            estoque_atual__lte=models.F('estoque_minimo')
-        ).count() if Produto.objects.exists() else 0,
-    }
+    """Dashboard do gestor com estatísticas (cache de TTL curto)"""
+    def estatisticas():
+        contagens = Produto.objects.aggregate(
+            total_produtos=Count('id'),
+            produtos_sem_estoque=Count('id', filter=Q(
+                controla_estoque=True,
+                estoque_atual__lte=models.F('estoque_minimo'),
+            )),
+        )
+        contagens['total_usuarios'] = Usuario.objects.count()
+        contagens['total_fornecedores'] = Fornecedor.objects.filter(ativo=True).count()
+        return contagens
+
+    context = agregado_dashboard('dashboard:gestor', estatisticas)
     return render(request, 'gestor/dashboard.html', context)
 
 # =============================================================================
@@ -170,7 +177,7 @@ def usuario_toggle_status(request, pk):
 
 @modulo_cadastros
 def grupo_list(request):
-    grupos_list = GrupoProduto.objects.all().order_by('codigo')
+    grupos_list = GrupoProduto.objects.para_lista().order_by('codigo')
     
     # Filtros
     status = request.GET.get('status')
@@ -264,7 +271,7 @@ def grupo_toggle_status(request, pk):
 
 @modulo_cadastros
 def subgrupo_list(request):
-    subgrupos_list = SubgrupoProduto.objects.select_related('grupo').order_by('grupo__codigo', 'codigo')
+    subgrupos_list = SubgrupoProduto.objects.para_lista().order_by('grupo__codigo', 'codigo')
     
     # Filtros
     grupo_id = request.GET.get('grupo')
@@ -297,7 +304,7 @@ def subgrupo_list(request):
         subgrupos = paginator.page(paginator.num_pages)
     
     # Para o filtro de grupos
-    grupos = GrupoProduto.objects.filter(ativo=True).order_by('nome')
+    grupos = grupos_ativos(ordem='nome')
     
     return render(request, 'gestor/subgrupo_list.html', {
         'subgrupos': subgrupos,
@@ -481,7 +488,7 @@ def fornecedor_toggle_status(request, pk):
 @modulo_cadastros
 def api_subgrupos_por_grupo(request, grupo_id):
     """API para buscar subgrupos por grupo"""
-    subgrupos = SubgrupoProduto.objects.filter(grupo_id=grupo_id, ativo=True).order_by('nome')
+    subgrupos = subgrupos_ativos(grupo_id, ordem='nome')
     
     data = [
         {
@@ -675,9 +682,7 @@ def cliente_toggle_status(request, pk):
 @modulo_estoque
 def materiaprima_list(request):
     """Lista apenas produtos do tipo Matéria Prima (MP)"""
-    produtos_list = Produto.objects.select_related(
-        'grupo', 'subgrupo', 'fornecedor_principal'
-    ).filter(tipo='MP').order_by('codigo')
+    produtos_list = Produto.objects.para_lista().filter(tipo='MP').order_by('codigo')
     
     # Filtros
     grupo_id = request.GET.get('grupo')
@@ -714,7 +719,7 @@ def materiaprima_list(request):
         produtos = paginator.page(paginator.num_pages)
     
     # Para os filtros
-    grupos = GrupoProduto.objects.filter(ativo=True).order_by('nome')
+    grupos = grupos_ativos(ordem='nome')
     
     return render(request, 'gestor/materiaprima_list.html', {
         'produtos': produtos,
@@ -814,9 +819,7 @@ def materiaprima_delete(request, pk):
 @modulo_estoque
 def produto_intermediario_list(request):
     """Lista apenas produtos do tipo Produto Intermediário (PI)"""
-    produtos_list = Produto.objects.select_related(
-        'grupo', 'subgrupo', 'fornecedor_principal'
-    ).filter(tipo='PI').order_by('codigo')
+    produtos_list = Produto.objects.para_lista().filter(tipo='PI').order_by('codigo')
 
     # Filtros
     grupo_id = request.GET.get('grupo')
@@ -853,7 +856,7 @@ def produto_intermediario_list(request):
         produtos = paginator.page(paginator.num_pages)
 
     # Para os filtros
-    grupos = GrupoProduto.objects.filter(ativo=True, tipo_produto='PI').order_by('nome')
+    grupos = grupos_ativos('PI', ordem='nome')
 
     return render(request, 'gestor/produto_intermediario_list.html', {
         'produtos': produtos,
@@ -993,7 +996,7 @@ def produto_acabado_list(request):
         produtos = paginator.page(paginator.num_pages)
 
     # Para os filtros
-    grupos = GrupoProduto.objects.filter(ativo=True, tipo_produto='PA').order_by('nome')
+    grupos = grupos_ativos('PA', ordem='nome')
 
     return render(request, 'gestor/produto_acabado_list.html', {
         'produtos': produtos,
@@ -1153,35 +1156,73 @@ def relatorio_produtos_sem_fornecedor(request):
 @portal_gestor
 def dashboard_analytics(request):
     """
-    Dashboard com analytics mais detalhados
+    Dashboard com analytics mais detalhados (cache de TTL curto)
     """
-    # Estatísticas por tipo de produto
-    stats_por_tipo = Produto.objects.values('tipo').annotate(
-        total=Count('id'),
-        ativos=Count('id', filter=Q(status='ATIVO')),
-        inativos=Count('id', filter=Q(status='INATIVO'))
-    ).order_by('tipo')
-    
-    # Produtos mais caros
-    produtos_caros = Produto.objects.filter(
-        preco_venda__isnull=False,
-        status='ATIVO'
-    ).order_by('-preco_venda')[:10]
-    
-    # Fornecedores com mais produtos
-    fornecedores_top = Fornecedor.objects.annotate(
-        total_produtos=Count('produtos_fornecedor')
-    ).filter(total_produtos__gt=0).order_by('-total_produtos')[:10]
-    
-    context = {
-        'stats_por_tipo': stats_por_tipo,
-        'produtos_caros': produtos_caros,
-        'fornecedores_top': fornecedores_top,
-    }
+    def estatisticas():
+        return {
+            # Estatísticas por tipo de produto
+            'stats_por_tipo': list(Produto.objects.values('tipo').annotate(
+                total=Count('id'),
+                ativos=Count('id', filter=Q(status='ATIVO')),
+                inativos=Count('id', filter=Q(status='INATIVO'))
+            ).order_by('tipo')),
+            # Produtos mais caros
+            'produtos_caros': list(Produto.objects.filter(
+                preco_venda__isnull=False,
+                status='ATIVO'
+            ).order_by('-preco_venda')[:10]),
+            # Fornecedores com mais produtos
+            'fornecedores_top': list(Fornecedor.objects.annotate(
+                total_produtos=Count('produtos_fornecedor')
+            ).filter(total_produtos__gt=0).order_by('-total_produtos')[:10]),
+        }
+
+    context = agregado_dashboard('dashboard:gestor_analytics', estatisticas)
 
     return render(request, 'gestor/dashboard_analytics.html', context)
 
 
+# =============================================================================
+# DESEMPENHO (MONITORAMENTO)
+# =============================================================================
+
+@modulo_parametros
+def desempenho_views(request):
+    """
+    Latência (p50/p95/p99), queries, tempo de banco e tamanho de resposta
+    por view, consolidados a partir da tabela DesempenhoView, e acertos/faltas
+    do cache de referência e dashboards
+    """
+    from core.utils.cache import estatisticas as estatisticas_cache
+    from core.utils.desempenho import coletor, configuracao, resumo_por_view
+
+    # Grava o que ainda está no buffer deste processo antes de consultar
+    coletor.descarregar()
+
+    try:
+        horas = min(max(int(request.GET.get('horas', 24)), 1), 24 * 30)
+    except ValueError:
+        horas = 24
+
+    query = request.GET.get('q', '').strip()
+    resumo = resumo_por_view(horas)
+    if query:
+        resumo = [linha for linha in resumo if query.lower() in linha['url_name'].lower()]
+
+    context = {
+        'resumo': resumo,
+        'horas': horas,
+        'query': query,
+        'limite_lenta_ms': configuracao('DESEMPENHO_LIMITE_LENTA_MS'),
+        'total_requisicoes': sum(linha['requisicoes'] for linha in resumo),
+        'total_lentas': sum(linha['lentas'] for linha in resumo),
+        'total_erros': sum(linha['erros'] for linha in resumo),
+        'cache': estatisticas_cache.resumo(),
+        'cache_backend': settings.CACHES['default']['BACKEND'].rsplit('.', 1)[-1],
+    }
+    return render(request, 'gestor/desempenho.html', context)
+
+
 # =============================================================================
 # PAINEL DE PROJETOS
 # =============================================================================
@@ -1194,7 +1235,7 @@ def painel_projetos(request):
     """
     from core.models import Proposta
 
-    propostas = Proposta.objects.select_related(
+    propostas = Proposta.objects.sem_calculos().select_related(
         'cliente',
         'vendedor'
     ).order_by('-data_aprovacao')
@@ -1350,7 +1391,7 @@ def liberacao_producao_salvar(request, pk):
     from core.models import Proposta
 
     if request.method == 'POST':
-        proposta = get_object_or_404(Proposta, pk=pk)
+        proposta = get_object_or_404(Proposta.objects.sem_calculos(), pk=pk)
 
         novo_status = request.POST.get('status_financeiro', '').strip()
 
@@ -2424,13 +2465,12 @@ def ordem_producao_list(request):
         )
 
     # Estatisticas
-    stats = {
-        'total': OrdemProducao.objects.count(),
-        'rascunho': OrdemProducao.objects.filter(status='rascunho').count(),
-        'liberada': OrdemProducao.objects.filter(status='liberada').count(),
-        'em_producao': OrdemProducao.objects.filter(status='em_producao').count(),
-        'concluida': OrdemProducao.objects.filter(status='concluida').count(),
-    }
+    stats = contar_faixas(
+        OrdemProducao.objects.all(),
+        faixas_por_valor('status', ['rascunho', 'liberada', 'em_producao', 'concluida']),
+        cache=True,
+        nome='ordens_producao',
+    )
 
     # Paginacao
     paginator = Paginator(ops_list, 20)
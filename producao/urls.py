@@ -28,6 +28,7 @@ urlpatterns = [
     path('tarefas/<int:tarefa_id>/concluir/', views.concluir_tarefa, name='tarefa_concluir'),
     path('tarefas/<int:tarefa_id>/cancelar/', views.cancelar_tarefa, name='tarefa_cancelar'),
     path('api/tarefas/contador/', views.contador_tarefas_pendentes, name='tarefas_contador'),
+    path('api/tarefas/eventos/', views.eventos_tarefas, name='tarefas_eventos'),
 
     # =======================================================================
     # 🔧 MOTOR DE REGRAS YAML
@@ -39,6 +40,7 @@ urlpatterns = [
     path('regras-yaml/<int:pk>/excluir/', views.regra_yaml_delete, name='regra_yaml_delete'),
     path('regras-yaml/<int:pk>/toggle-status/', views.regra_yaml_toggle_status, name='regra_yaml_toggle_status'),
     path('regras-yaml/<int:pk>/validar/', views.regra_yaml_validar, name='regra_yaml_validar'),
+    path('regras-yaml/<int:pk>/replay/', views.regra_yaml_replay, name='regra_yaml_replay'),
 
     # =======================================================================
     # 📐 FÓRMULAS DE CÁLCULO (Documentação)
@@ -111,6 +113,7 @@ urlpatterns = [
     path('propostas/', views.proposta_list_producao, name='proposta_list_producao'),
     path('ordens-producao-projetos/', views.op_list, name='op_list'),
     path('propostas/<uuid:pk>/', views.proposta_detail_producao, name='proposta_detail_producao'),
+    path('propostas/<uuid:pk>/rastreio-calculo/', views.proposta_rastreio_calculo, name='proposta_rastreio_calculo'),
     path('propostas/<uuid:pk>/alterar-status-producao/', views.alterar_status_producao, name='alterar_status_producao'),
     path('propostas/<uuid:pk>/gerar-lista-materiais/', views.gerar_lista_materiais, name='gerar_lista_materiais'),
     path('propostas/<uuid:pk>/upload-projeto-executivo/', views.upload_projeto_executivo, name='upload_projeto_executivo'),
@@ -169,6 +172,7 @@ urlpatterns = [
 
     # Criar pedido a partir de requisição
     path('pedidos-compra/from-requisicao/<int:requisicao_pk>/', views.pedido_compra_from_requisicao, name='pedido_compra_from_requisicao'),
+    path('requisicoes-compra/<int:requisicao_pk>/alocar-fornecedores/', views.requisicao_compra_alocar, name='requisicao_compra_alocar'),
 
     # (Opcional) Criar pedido a partir de orçamento - para uso futuro
     path('pedidos-compra/from-orcamento/<int:orcamento_pk>/', views.pedido_compra_from_orcamento, name='pedido_compra_from_orcamento'),
@@ -194,6 +198,7 @@ urlpatterns = [
     path('relatorios/producao/', views.relatorio_producao, name='relatorio_producao'),
     path('relatorios/produtos-pi-por-tipo/', views.relatorio_produtos_pi_por_tipo, name='relatorio_produtos_pi_por_tipo'),
     path('relatorios/produtos-completo/', views.relatorio_produtos_completo, name='relatorio_produtos_completo'),
+    path('relatorios/curva-abc/', views.relatorio_curva_abc, name='relatorio_curva_abc'),
     
     # =======================================================================
     # 🔌 APIs AJAX E ENDPOINTS
@@ -274,6 +279,7 @@ urlpatterns = [
     # ESTOQUE - Posicao
     # =======================================================================
     path('posicao-estoque/', views.posicao_estoque, name='posicao_estoque'),
+    path('kardex/', views.kardex_produto, name='kardex_produto'),
 
     # =======================================================================
     # REQUISIÇÃO DE MATERIAL
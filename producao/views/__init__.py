@@ -86,6 +86,7 @@ from .pedidos_compra import (
     pedido_compra_recebimento, receber_item_pedido,
     # NOVO: Controle de Saldo Requisição -> Pedido
     pedido_compra_from_requisicao,
+    requisicao_compra_alocar,
     pedido_compra_from_orcamento,
     relatorio_saldos_requisicoes,
     requisicao_saldo_detail,
@@ -103,6 +104,7 @@ from .propostas_producao import (
     op_list,
     alterar_status_producao,
     proposta_detail_producao,
+    proposta_rastreio_calculo,
     gerar_lista_materiais,
     lista_materiais_edit,
     lista_materiais_aprovar,
@@ -136,7 +138,7 @@ from .apis import (
 # Relatórios
 from .relatorios import (
     relatorio_estoque_baixo, relatorio_produtos_sem_fornecedor,
-    relatorio_producao
+    relatorio_producao, relatorio_curva_abc
 )
 
 # =============================================================================
@@ -153,6 +155,7 @@ from .regras_yaml import (
     # Actions Regras YAML
     regra_yaml_toggle_status,
     regra_yaml_validar,
+    regra_yaml_replay,
 
     # Documentação de Fórmulas
     formulas_calculo,
@@ -168,6 +171,7 @@ from .tarefas import (
     concluir_tarefa,
     cancelar_tarefa,
     contador_tarefas_pendentes,
+    eventos_tarefas,
 )
 
 # =============================================================================
@@ -200,6 +204,9 @@ from .estoque import (
 
     # Posicao de Estoque
     posicao_estoque,
+
+    # Kardex
+    kardex_produto,
 )
 
 # =============================================================================
@@ -303,7 +310,7 @@ __all__ = [
     'pedido_compra_toggle_status', 'pedido_compra_gerar_pdf', 'pedido_compra_duplicar',
     'pedido_compra_recebimento', 'receber_item_pedido',
     # Controle de Saldo Requisição -> Pedido
-    'pedido_compra_from_requisicao', 'pedido_compra_from_orcamento',
+    'pedido_compra_from_requisicao', 'requisicao_compra_alocar', 'pedido_compra_from_orcamento',
     'relatorio_saldos_requisicoes', 'requisicao_saldo_detail', 'exportar_saldos_requisicoes_excel',
     
     # <<<< NOVO: RECLASSIFICAÇÃO DE PRODUTOS
@@ -323,6 +330,7 @@ __all__ = [
     # Actions Regras YAML
     'regra_yaml_toggle_status',
     'regra_yaml_validar',
+    'regra_yaml_replay',
 
     # Tarefas e Workflow
     'lista_tarefas',
@@ -331,6 +339,7 @@ __all__ = [
     'concluir_tarefa',
     'cancelar_tarefa',
     'contador_tarefas_pendentes',
+    'eventos_tarefas',
 
     # APIs Gerais
     'get_subgrupos_by_grupo', 'get_info_produto_codigo',
@@ -342,6 +351,7 @@ __all__ = [
     'relatorio_producao',
     'relatorio_produtos_pi_por_tipo',  # NOVO RELATÓRIO PI
     'relatorio_produtos_completo',      # RELATÓRIO PRODUTOS COMPLETO
+    'relatorio_curva_abc',              # CURVA ABC/XYZ
     'api_subgrupos_por_grupo_relatorio', # API PARA RELATÓRIOS
 
     # Estoque - Locais
@@ -370,6 +380,7 @@ __all__ = [
 
     # Estoque - Posicao
     'posicao_estoque',
+    'kardex_produto',
 
     # Requisição de Material
     'requisicao_material_list',
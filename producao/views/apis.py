@@ -16,6 +16,8 @@ from django.views.decorators.http import require_GET
 from core.models import (
     GrupoProduto, SubgrupoProduto, Produto, Fornecedor, FornecedorProduto
 )
+from core.services.historico_precos import HistoricoPrecosService
+from core.utils.cache import grupos_ativos
 
 logger = logging.getLogger(__name__)
 
@@ -149,6 +151,16 @@ def api_produto_info(request):
                 data['prazo_entrega'] = fornecedor_produto.prazo_entrega
                 data['quantidade_minima'] = float(fornecedor_produto.quantidade_minima) if fornecedor_produto.quantidade_minima else 1
 
+        # Preços pagos (todos os fornecedores, mais recente primeiro)
+        historico = HistoricoPrecosService.do_produto(produto.id)
+        data['historico_precos'] = historico
+        if fornecedor_id:
+            data['ultima_compra'] = next(
+                (h for h in historico if str(h['fornecedor_id']) == str(fornecedor_id)), None
+            )
+        else:
+            data['ultima_compra'] = historico[0] if historico else None
+
         return JsonResponse({'success': True, 'produto': data})
 
     except Produto.DoesNotExist:
@@ -241,6 +253,11 @@ def api_buscar_produtos(request):
             models.Q(pk__in=produtos_com_requisicao_ids)  # OU tem requisição aberta
         ).select_related('grupo', 'subgrupo').order_by('codigo')[:20]  # Limitar a 20 resultados
         
+        # Última compra de cada resultado (do fornecedor do formulário, se informado)
+        ultimas_compras = HistoricoPrecosService.ultimos_precos(
+            [produto.id for produto in produtos], request.GET.get('fornecedor_id') or None
+        )
+
         produtos_data = []
         for produto in produtos:
             produtos_data.append({
@@ -252,6 +269,7 @@ def api_buscar_produtos(request):
                 'grupo': produto.grupo.nome if produto.grupo else '',
                 'subgrupo': produto.subgrupo.nome if produto.subgrupo else '',
                 'custo_medio': float(produto.custo_medio) if produto.custo_medio else None,
+                'ultima_compra': ultimas_compras.get(produto.id),
                 'texto_completo': f"{produto.codigo} - {produto.nome}"
             })
         
@@ -279,7 +297,7 @@ def api_grupos_todos(request):
     """
     try:
         # Buscar todos os grupos ativos
-        grupos = GrupoProduto.objects.filter(ativo=True).order_by('tipo_produto', 'codigo')
+        grupos = grupos_ativos(ordem=('tipo_produto', 'codigo'))
         
         grupos_data = []
         for grupo in grupos:
@@ -15,6 +15,7 @@ from django.db.models import Q, Sum, Count
 from core.models import (
     Produto, Fornecedor, GrupoProduto, SubgrupoProduto
 )
+from core.utils.cache import agregado_dashboard
 
 logger = logging.getLogger(__name__)
 
@@ -30,60 +31,69 @@ def home(request):
 
 @portal_producao
 def dashboard(request):
-    """Dashboard da produção com estatísticas básicas"""
-    context = {
-        'total_materias_primas': Produto.objects.filter(tipo='MP').count(),
-        'total_produtos_intermediarios': Produto.objects.filter(tipo='PI').count(),
-        'total_produtos_acabados': Produto.objects.filter(tipo='PA').count(),
-        'total_fornecedores': Fornecedor.objects.filter(ativo=True).count(),
-        'produtos_sem_estoque': Produto.objects.filter(
-            controla_estoque=True,
-            estoque_atual__lte=models.F('estoque_minimo')
-        ).count() if Produto.objects.exists() else 0,
-        'produtos_indisponiveis': Produto.objects.filter(disponivel=False).count(),
-    }
+    """Dashboard da produção com estatísticas básicas (cache de TTL curto)"""
+    context = agregado_dashboard('dashboard:producao', _estatisticas_dashboard)
     return render(request, 'producao/dashboard.html', context)
 
 
+def _estatisticas_dashboard():
+    """Contagens do dashboard em uma única consulta sobre Produto"""
+    contagens = Produto.objects.aggregate(
+        total_materias_primas=Count('id', filter=Q(tipo='MP')),
+        total_produtos_intermediarios=Count('id', filter=Q(tipo='PI')),
+        total_produtos_acabados=Count('id', filter=Q(tipo='PA')),
+        produtos_sem_estoque=Count('id', filter=Q(
+            controla_estoque=True,
+            estoque_atual__lte=models.F('estoque_minimo'),
+        )),
+        produtos_indisponiveis=Count('id', filter=Q(disponivel=False)),
+    )
+    contagens['total_fornecedores'] = Fornecedor.objects.filter(ativo=True).count()
+    return contagens
+
+
 @portal_producao
 def dashboard_analytics(request):
     """Dashboard com analytics detalhados para produção"""
-    
+    context = agregado_dashboard('dashboard:producao_analytics', _estatisticas_analytics)
+    return render(request, 'producao/dashboard_analytics.html', context)
+
+
+def _estatisticas_analytics():
+    """Agregados do dashboard analítico, já avaliados para o cache"""
     # Estatísticas por tipo de produto
-    stats_por_tipo = Produto.objects.values('tipo').annotate(
+    stats_por_tipo = list(Produto.objects.values('tipo').annotate(
         total=Count('id'),
         ativos=Count('id', filter=Q(status='ATIVO')),
         inativos=Count('id', filter=Q(status='INATIVO'))
-    ).order_by('tipo')
+    ).order_by('tipo'))
 
     # Produtos com maior valor (mais importantes)
-    produtos_importantes = Produto.objects.filter(
+    produtos_importantes = list(Produto.objects.filter(
         preco_venda__isnull=False,
         status='ATIVO'
-    ).order_by('-preco_venda')[:10]
+    ).order_by('-preco_venda')[:10])
 
     # Fornecedores com mais produtos
-    fornecedores_principais = Fornecedor.objects.annotate(
+    fornecedores_principais = list(Fornecedor.objects.annotate(
         total_produtos=Count('produtos_fornecedor')
-    ).filter(total_produtos__gt=0).order_by('-total_produtos')[:10]
-
-    # Estatísticas de estoque por tipo
-    stats_estoque = {}
-    for tipo in ['MP', 'PI', 'PA']:
-        produtos_tipo = Produto.objects.filter(tipo=tipo, controla_estoque=True)
-        stats_estoque[tipo] = {
-            'total_controlados': produtos_tipo.count(),
-            'estoque_baixo': produtos_tipo.filter(
-                estoque_atual__lte=models.F('estoque_minimo')
-            ).count(),
-            'sem_estoque': produtos_tipo.filter(estoque_atual=0).count(),
-        }
-
-    context = {
+    ).filter(total_produtos__gt=0).order_by('-total_produtos')[:10])
+
+    # Estatísticas de estoque por tipo (uma consulta agrupada)
+    stats_estoque = {tipo: {'total_controlados': 0, 'estoque_baixo': 0, 'sem_estoque': 0}
+                     for tipo in ['MP', 'PI', 'PA']}
+    for linha in Produto.objects.filter(
+        tipo__in=stats_estoque.keys(), controla_estoque=True
+    ).values('tipo').annotate(
+        total_controlados=Count('id'),
+        estoque_baixo=Count('id', filter=Q(estoque_atual__lte=models.F('estoque_minimo'))),
+        sem_estoque=Count('id', filter=Q(estoque_atual=0)),
+    ).order_by():
+        stats_estoque[linha.pop('tipo')] = linha
+
+    return {
         'stats_por_tipo': stats_por_tipo,
         'stats_estoque': stats_estoque,
         'produtos_importantes': produtos_importantes,
         'fornecedores_principais': fornecedores_principais,
-    }
-
-    return render(request, 'producao/dashboard_analytics.html', context)
\ No newline at end of file
+    }
\ No newline at end of file
@@ -13,14 +13,17 @@ from django.db.models import Q, Sum
 from django.db.models.deletion import ProtectedError
 from django.forms import inlineformset_factory
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 
 from core.decorators import portal_producao
 from core.models import (
     LocalEstoque, TipoMovimentoEntrada, TipoMovimentoSaida,
     MovimentoEntrada, ItemMovimentoEntrada,
     MovimentoSaida, ItemMovimentoSaida,
-    Estoque, MovimentoEstoque
+    Estoque, MovimentoEstoque, Produto
 )
+from core.services.historico_precos import HistoricoPrecosService
+from core.services.kardex import KardexService
 from core.forms import (
     LocalEstoqueForm, LocalEstoqueFiltroForm,
     TipoMovimentoEntradaForm, TipoMovimentoEntradaFiltroForm,
@@ -586,7 +589,8 @@ def movimento_entrada_confirmar(request, pk):
         return redirect('producao:movimento_entrada_detail', pk=pk)
 
     # Processar cada item
-    for item in movimento.itens.all():
+    itens = list(movimento.itens.all())
+    for item in itens:
         # Buscar ou criar posicao de estoque
         estoque, created = Estoque.objects.get_or_create(
             produto=item.produto,
@@ -641,6 +645,9 @@ def movimento_entrada_confirmar(request, pk):
     movimento.confirmado_por = request.user
     movimento.save()
 
+    # Preços pagos ao fornecedor (último/médio/mínimo/máximo)
+    HistoricoPrecosService.registrar_entrada(movimento, itens)
+
     messages.success(request, f'Entrada "{movimento.numero}" confirmada. Estoque atualizado.')
     return redirect('producao:movimento_entrada_detail', pk=pk)
 
@@ -999,3 +1006,65 @@ def posicao_estoque(request):
         'locais': LocalEstoque.objects.filter(ativo=True).order_by('tipo', 'nome'),
     }
     return render(request, 'producao/estoque/posicao_estoque.html', context)
+
+
+# =============================================================================
+# KARDEX (Consulta)
+# =============================================================================
+
+@portal_producao
+def kardex_produto(request):
+    """Kardex por produto: movimentos com saldo corrido e saldo em data"""
+    produto = None
+    saldo_inicial = None
+    saldo_atual = None
+    movimentos = None
+
+    codigo = (request.GET.get('produto') or '').strip()
+    local = None
+    local_id = request.GET.get('local')
+    if local_id and local_id.isdigit():
+        local = LocalEstoque.objects.filter(pk=local_id).first()
+
+    datas = {}
+    for parametro in ('data_de', 'data_ate'):
+        valor = request.GET.get(parametro) or ''
+        try:
+            datas[parametro] = parse_date(valor)
+        except ValueError:
+            datas[parametro] = None
+            messages.warning(request, f'Data invalida ignorada: {valor}')
+    data_de, data_ate = datas['data_de'], datas['data_ate']
+
+    if codigo:
+        produto = Produto.objects.filter(codigo=codigo).only('id', 'codigo', 'nome', 'unidade_medida').first()
+        if not produto:
+            messages.warning(request, f'Produto "{codigo}" nao encontrado.')
+
+    if produto:
+        saldo_inicial, movimentos_list = KardexService.kardex(
+            produto, local_estoque=local, data_inicio=data_de, data_fim=data_ate
+        )
+        saldo_atual = KardexService.saldo_em(produto, local_estoque=local, data=data_ate)
+
+        # Paginacao (o saldo corrido e calculado no banco, antes do LIMIT)
+        paginator = Paginator(movimentos_list, 25)
+        page = request.GET.get('page', 1)
+
+        try:
+            movimentos = paginator.page(page)
+        except PageNotAnInteger:
+            movimentos = paginator.page(1)
+        except EmptyPage:
+            movimentos = paginator.page(paginator.num_pages)
+
+    context = {
+        'produto': produto,
+        'local': local,
+        'saldo_inicial': saldo_inicial,
+        'saldo_atual': saldo_atual,
+        'movimentos': movimentos,
+        'tipos_entrada': MovimentoEstoque.TIPOS_ENTRADA,
+        'locais': LocalEstoque.objects.filter(ativo=True).order_by('tipo', 'nome'),
+    }
+    return render(request, 'producao/estoque/kardex.html', context)
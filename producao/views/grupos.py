@@ -16,6 +16,7 @@ from django.db.models.deletion import ProtectedError
 
 from core.models import GrupoProduto, SubgrupoProduto
 from core.forms import GrupoProdutoForm, SubgrupoProdutoForm
+from core.utils.cache import grupos_ativos
 
 logger = logging.getLogger(__name__)
 
@@ -26,7 +27,7 @@ logger = logging.getLogger(__name__)
 @portal_producao
 def grupo_list(request):
     """Lista de grupos de produtos com filtros"""
-    grupos_list = GrupoProduto.objects.all().order_by('codigo')
+    grupos_list = GrupoProduto.objects.para_lista().order_by('codigo')
 
     # Filtros
     status = request.GET.get('status')
@@ -144,7 +145,7 @@ def grupo_toggle_status(request, pk):
 @portal_producao
 def subgrupo_list(request):
     """Lista de subgrupos de produtos com filtros"""
-    subgrupos_list = SubgrupoProduto.objects.select_related('grupo').order_by('grupo__codigo', 'codigo')
+    subgrupos_list = SubgrupoProduto.objects.para_lista().order_by('grupo__codigo', 'codigo')
 
     # Filtros
     grupo_id = request.GET.get('grupo')
@@ -182,7 +183,7 @@ def subgrupo_list(request):
         subgrupos = paginator.page(paginator.num_pages)
 
     # Para o filtro de grupos
-    grupos = GrupoProduto.objects.filter(ativo=True).order_by('nome')
+    grupos = grupos_ativos(ordem='nome')
 
     return render(request, 'producao/produtos/subgrupo_list.html', {
         'subgrupos': subgrupos,
@@ -15,6 +15,7 @@ from django.db.models import Q
 
 from core.models import Produto, GrupoProduto, SubgrupoProduto
 from core.forms import ProdutoForm
+from core.utils.cache import grupos_ativos, subgrupos_ativos
 
 logger = logging.getLogger(__name__)
 
@@ -25,9 +26,7 @@ logger = logging.getLogger(__name__)
 @portal_producao
 def materiaprima_list(request):
     """Lista apenas produtos do tipo Matéria Prima (MP)"""
-    produtos_list = Produto.objects.select_related(
-        'grupo', 'subgrupo', 'fornecedor_principal'
-    ).filter(tipo='MP').order_by('codigo')
+    produtos_list = Produto.objects.para_lista().filter(tipo='MP').order_by('codigo')
 
     # Filtros
     grupo_id = request.GET.get('grupo')
@@ -77,18 +76,12 @@ def materiaprima_list(request):
     except EmptyPage:
         produtos = paginator.page(paginator.num_pages)
 
-    grupos = GrupoProduto.objects.filter(ativo=True, tipo_produto='MP').order_by('codigo')
+    grupos = grupos_ativos('MP')
 
     if grupo_id:
-        subgrupos = SubgrupoProduto.objects.filter(
-            grupo_id=grupo_id,
-            ativo=True
-        ).order_by('codigo')
+        subgrupos = subgrupos_ativos(grupo_id)
     else:
-        subgrupos = SubgrupoProduto.objects.filter(
-            grupo__tipo_produto='MP',
-            ativo=True
-        ).select_related('grupo').order_by('grupo__codigo', 'codigo')
+        subgrupos = subgrupos_ativos(tipo_produto='MP')
 
     return render(request, 'producao/produtos/materiaprima_list.html', {
         'produtos': produtos,
@@ -7,6 +7,7 @@ Portal de Produção - Sistema Elevadores FUZA
 
 import json
 import logging
+from decimal import Decimal, InvalidOperation
 from datetime import datetime, timedelta, timezone
 from django.db import models
 from django.shortcuts import render, redirect, get_object_or_404
@@ -21,9 +22,11 @@ from django.views.decorators.http import require_POST
 from django.utils import timezone
 
 from core.models import (
-    OrcamentoCompra, ItemOrcamentoCompra, HistoricoOrcamentoCompra,
+    OrcamentoCompra, ItemOrcamentoCompra,
     RequisicaoCompra, Fornecedor, Produto
 )
+from core.services.alocacao_compras import AlocacaoComprasService
+from core.services.auditoria import AuditoriaService
 from core.forms import (
     OrcamentoCompraForm, ItemOrcamentoCompraFormSet, OrcamentoCompraFiltroForm,
     AlterarStatusOrcamentoForm
@@ -157,11 +160,11 @@ def orcamento_compra_create(request):
                     orcamento.save(update_fields=['valor_total_estimado', 'valor_total_cotado'])
 
                     # Registrar no histórico
-                    HistoricoOrcamentoCompra.objects.create(
-                        orcamento=orcamento,
+                    AuditoriaService.registrar(
+                        orcamento,
+                        'Orçamento criado',
                         usuario=request.user,
-                        acao='Orçamento criado',
-                        observacao=f'Orçamento criado com {itens_salvos} itens'
+                        observacao=f'Orçamento criado com {itens_salvos} itens',
                     )
 
                     messages.success(request, f'Orçamento {orcamento.numero} criado com sucesso!')
@@ -193,7 +196,7 @@ def orcamento_compra_detail(request, pk):
     """Detalhes do orçamento de compra"""
     orcamento = get_object_or_404(
         OrcamentoCompra.objects.select_related('comprador_responsavel', 'solicitante', 'criado_por')
-        .prefetch_related('itens__produto', 'itens__fornecedor', 'requisicoes', 'historico__usuario'),
+        .prefetch_related('itens__produto', 'itens__fornecedor', 'requisicoes'),
         pk=pk
     )
 
@@ -202,6 +205,7 @@ def orcamento_compra_detail(request, pk):
         'pode_editar': orcamento.pode_editar,
         'pode_cancelar': orcamento.pode_cancelar,
         'pode_gerar_pedido': orcamento.pode_gerar_pedido,
+        'historico': AuditoriaService.ultimas(orcamento, 10),
     }
 
     return render(request, 'producao/orcamentos/orcamento_compra_detail.html', context)
@@ -244,11 +248,11 @@ def orcamento_compra_update(request, pk):
                     orcamento.save(update_fields=['valor_total_estimado', 'valor_total_cotado'])
 
                     # Registrar no histórico
-                    HistoricoOrcamentoCompra.objects.create(
-                        orcamento=orcamento,
+                    AuditoriaService.registrar(
+                        orcamento,
+                        'Orçamento atualizado',
                         usuario=request.user,
-                        acao='Orçamento atualizado',
-                        observacao='Dados do orçamento foram alterados'
+                        observacao='Dados do orçamento foram alterados',
                     )
 
                     messages.success(request, f'Orçamento {orcamento.numero} atualizado com sucesso!')
@@ -369,11 +373,11 @@ def orcamento_compra_duplicar(request, pk):
             novo_orcamento.save(update_fields=['valor_total_estimado', 'valor_total_cotado'])
 
             # Registrar no histórico
-            HistoricoOrcamentoCompra.objects.create(
-                orcamento=novo_orcamento,
+            AuditoriaService.registrar(
+                novo_orcamento,
+                'Orçamento duplicado',
                 usuario=request.user,
-                acao='Orçamento duplicado',
-                observacao=f'Duplicado a partir do orçamento {orcamento_original.numero}'
+                observacao=f'Duplicado a partir do orçamento {orcamento_original.numero}',
             )
 
             messages.success(request, f'Orçamento duplicado com sucesso! Novo número: {novo_orcamento.numero}')
@@ -393,6 +397,10 @@ def orcamento_compra_gerar_pedido(request, pk):
         messages.error(request, 'Orçamento deve estar aprovado para gerar pedido de compra.')
         return redirect('producao:orcamento_compra_detail', pk=pk)
 
+    # ?otimizar=1: fornecedores escolhidos pela alocação automática (cadastro + cotações)
+    if request.GET.get('otimizar') == '1':
+        return _gerar_pedidos_alocados(request, orcamento)
+
     try:
         from core.models import PedidoCompra, ItemPedidoCompra
         
@@ -434,11 +442,11 @@ def orcamento_compra_gerar_pedido(request, pk):
                 pedidos_criados.append(pedido)
 
             # Registrar no histórico do orçamento
-            HistoricoOrcamentoCompra.objects.create(
-                orcamento=orcamento,
+            AuditoriaService.registrar(
+                orcamento,
+                'Pedidos gerados',
                 usuario=request.user,
-                acao='Pedidos gerados',
-                observacao=f'Gerados {len(pedidos_criados)} pedidos de compra'
+                observacao=f'Gerados {len(pedidos_criados)} pedidos de compra',
             )
 
             if len(pedidos_criados) == 1:
@@ -451,4 +459,44 @@ def orcamento_compra_gerar_pedido(request, pk):
 
     except Exception as e:
         messages.error(request, f'Erro ao gerar pedido de compra: {str(e)}')
-        return redirect('producao:orcamento_compra_detail', pk=pk)
\ No newline at end of file
+        return redirect('producao:orcamento_compra_detail', pk=pk)
+
+
+def _gerar_pedidos_alocados(request, orcamento):
+    """Gera os pedidos do orçamento com a alocação de AlocacaoComprasService"""
+    try:
+        frete = Decimal(request.GET.get('frete_por_pedido') or '0')
+    except InvalidOperation:
+        frete = Decimal('0')
+
+    plano = AlocacaoComprasService.planejar(
+        AlocacaoComprasService.linhas_orcamento(orcamento), frete_por_pedido=frete,
+    )
+    if not plano['pedidos']:
+        messages.error(request, 'Nenhum item do orçamento tem fornecedor cadastrado ou cotado.')
+        return redirect('producao:orcamento_compra_detail', pk=orcamento.pk)
+
+    try:
+        with transaction.atomic():
+            pedidos = AlocacaoComprasService.criar_pedidos(
+                plano, request.user,
+                prioridade=orcamento.prioridade,
+                observacoes=f"Gerado a partir do orçamento {orcamento.numero}",
+            )
+            AuditoriaService.registrar(
+                orcamento,
+                'Pedidos gerados',
+                usuario=request.user,
+                observacao=f'Gerados {len(pedidos)} pedidos de compra (alocação automática, '
+                           f'custo estimado R$ {plano["custo_total"]:.2f})',
+            )
+    except Exception as e:
+        logger.error(f"Erro na alocação do orçamento {orcamento.numero}: {str(e)}", exc_info=True)
+        messages.error(request, f'Erro ao gerar pedido de compra: {str(e)}')
+        return redirect('producao:orcamento_compra_detail', pk=orcamento.pk)
+
+    if plano['sem_fornecedor']:
+        codigos = sorted({linha['produto_codigo'] for linha in plano['sem_fornecedor']})
+        messages.warning(request, f'Sem fornecedor para: {", ".join(codigos)}')
+    messages.success(request, f'Pedidos gerados com sucesso: {", ".join(p.numero for p in pedidos)}')
+    return redirect('producao:pedido_compra_list')
@@ -7,6 +7,7 @@ Portal de Produção - Sistema Elevadores FUZA
 
 import json
 import logging
+from decimal import Decimal, InvalidOperation
 from datetime import datetime, timedelta, timezone
 from django.db import models
 from django.shortcuts import render, redirect, get_object_or_404
@@ -21,10 +22,13 @@ from django.views.decorators.http import require_POST
 from django.utils import timezone
 
 from core.models import (
-    PedidoCompra, ItemPedidoCompra, HistoricoPedidoCompra,
+    PedidoCompra, ItemPedidoCompra,
     Fornecedor, Produto, OrcamentoCompra, ItemOrcamentoCompra,
     RequisicaoCompra, ItemRequisicaoCompra
 )
+from core.services.alocacao_compras import AlocacaoComprasService
+from core.services.auditoria import AuditoriaService
+from core.services.historico_precos import HistoricoPrecosService
 from core.forms import (
     PedidoCompraForm, ItemPedidoCompraFormSet, PedidoCompraFiltroForm,
     AlterarStatusPedidoForm
@@ -157,11 +161,11 @@ def pedido_compra_create(request):
                     pedido.recalcular_valores()
 
                     # Registrar no histórico
-                    HistoricoPedidoCompra.objects.create(
-                        pedido=pedido,
+                    AuditoriaService.registrar(
+                        pedido,
+                        'Pedido criado',
                         usuario=request.user,
-                        acao='Pedido criado',
-                        observacao=f'Pedido criado com {len(itens_salvos)} itens'
+                        observacao=f'Pedido criado com {len(itens_salvos)} itens',
                     )
 
                     messages.success(request, f'Pedido {pedido.numero} criado com sucesso!')
@@ -208,7 +212,7 @@ def pedido_compra_detail(request, pk):
     """Detalhes do pedido de compra"""
     pedido = get_object_or_404(
         PedidoCompra.objects.select_related('fornecedor', 'criado_por')
-        .prefetch_related('itens__produto', 'historico__usuario'),
+        .prefetch_related('itens__produto'),
         pk=pk
     )
 
@@ -291,11 +295,11 @@ def pedido_compra_update(request, pk):
                     pedido.recalcular_valores()
 
                     # Registrar no histórico
-                    HistoricoPedidoCompra.objects.create(
-                        pedido=pedido,
+                    AuditoriaService.registrar(
+                        pedido,
+                        'Pedido atualizado',
                         usuario=request.user,
-                        acao='Pedido atualizado',
-                        observacao='Dados do pedido foram alterados'
+                        observacao='Dados do pedido foram alterados',
                     )
 
                     messages.success(request, f'Pedido {pedido.numero} atualizado com sucesso!')
@@ -440,11 +444,11 @@ def pedido_compra_gerar_pdf(request, pk):
         pdf_buffer = gerar_pdf_pedido_compra(pedido)
 
         # Registrar no histórico
-        HistoricoPedidoCompra.objects.create(
-            pedido=pedido,
+        AuditoriaService.registrar(
+            pedido,
+            'PDF gerado',
             usuario=request.user,
-            acao='PDF gerado',
-            observacao='PDF do pedido foi gerado e baixado'
+            observacao='PDF do pedido foi gerado e baixado',
         )
 
         # Preparar resposta
@@ -506,11 +510,11 @@ def pedido_compra_duplicar(request, pk):
             novo_pedido.recalcular_valores()
 
             # Registrar no histórico
-            HistoricoPedidoCompra.objects.create(
-                pedido=novo_pedido,
+            AuditoriaService.registrar(
+                novo_pedido,
+                'Pedido duplicado',
                 usuario=request.user,
-                acao='Pedido duplicado',
-                observacao=f'Duplicado a partir do pedido {pedido_original.numero}'
+                observacao=f'Duplicado a partir do pedido {pedido_original.numero}',
             )
 
             messages.success(request, f'Pedido duplicado com sucesso! Novo número: {novo_pedido.numero}')
@@ -578,6 +582,8 @@ def receber_item_pedido(request, pedido_pk, item_pk):
                 item.produto.estoque_atual += quantidade_recebida
                 item.produto.save()
 
+            HistoricoPrecosService.registrar_recebimento(item, quantidade_recebida)
+
             # Verificar se pedido está totalmente recebido
             itens_pendentes = pedido.itens.filter(quantidade_recebida__lt=models.F('quantidade'))
 
@@ -593,11 +599,11 @@ def receber_item_pedido(request, pedido_pk, item_pk):
             pedido.save()
 
             # Registrar no histórico
-            HistoricoPedidoCompra.objects.create(
-                pedido=pedido,
+            AuditoriaService.registrar(
+                pedido,
+                'Item recebido',
                 usuario=request.user,
-                acao='Item recebido',
-                observacao=f'Recebido {quantidade_recebida} {item.unidade} do produto {item.produto.codigo}'
+                observacao=f'Recebido {quantidade_recebida} {item.unidade} do produto {item.produto.codigo}',
             )
 
         return JsonResponse({
@@ -686,11 +692,11 @@ def pedido_compra_from_requisicao(request, requisicao_pk):
                     pedido.recalcular_valores()
 
                     # Registrar no histórico
-                    HistoricoPedidoCompra.objects.create(
-                        pedido=pedido,
+                    AuditoriaService.registrar(
+                        pedido,
+                        'Pedido criado de requisição',
                         usuario=request.user,
-                        acao='Pedido criado de requisição',
-                        observacao=f'Criado a partir da requisição {requisicao.numero} com {itens_criados} itens'
+                        observacao=f'Criado a partir da requisição {requisicao.numero} com {itens_criados} itens',
                     )
 
                     messages.success(request, f'Pedido {pedido.numero} criado com sucesso!')
@@ -715,6 +721,66 @@ def pedido_compra_from_requisicao(request, requisicao_pk):
     return render(request, 'producao/pedidos/pedido_from_requisicao.html', context)
 
 
+@portal_producao
+def requisicao_compra_alocar(request, requisicao_pk):
+    """
+    Alocação automática de fornecedores para o saldo da requisição.
+
+    GET devolve a proposta de pedidos em JSON; POST grava os pedidos.
+    Parâmetros: `itens_selecionados` (opcional) e `frete_por_pedido`.
+    """
+    requisicao = get_object_or_404(RequisicaoCompra, pk=requisicao_pk)
+
+    if requisicao.status not in ['aberta', 'aprovada']:
+        mensagem = 'Somente requisições abertas ou aprovadas podem gerar pedidos.'
+        if request.method != 'POST':
+            return JsonResponse({'success': False, 'error': mensagem}, status=400)
+        messages.error(request, mensagem)
+        return redirect('producao:requisicao_compra_detail', pk=requisicao_pk)
+
+    dados = request.POST if request.method == 'POST' else request.GET
+    try:
+        frete = Decimal(dados.get('frete_por_pedido') or '0')
+    except InvalidOperation:
+        frete = Decimal('0')
+
+    linhas = AlocacaoComprasService.linhas_requisicao(requisicao, dados.getlist('itens_selecionados'))
+    plano = AlocacaoComprasService.planejar(linhas, frete_por_pedido=frete)
+
+    if request.method != 'POST':
+        return JsonResponse({'success': True, 'plano': plano})
+
+    if not plano['pedidos']:
+        messages.error(request, 'Nenhum item com saldo tem fornecedor cadastrado ou cotado.')
+        return redirect('producao:requisicao_compra_detail', pk=requisicao_pk)
+
+    try:
+        with transaction.atomic():
+            pedidos = AlocacaoComprasService.criar_pedidos(
+                plano, request.user,
+                prioridade=requisicao.prioridade,
+                observacoes=f'Gerado a partir da requisição {requisicao.numero}',
+            )
+            AuditoriaService.registrar_varios(
+                pedidos,
+                'Pedido criado de requisição',
+                usuario=request.user,
+                observacao=f'Alocação automática de fornecedores da requisição {requisicao.numero}',
+            )
+    except Exception as e:
+        logger.error(f"Erro na alocação da requisição {requisicao.numero}: {str(e)}", exc_info=True)
+        messages.error(request, f'Erro ao criar pedidos: {str(e)}')
+        return redirect('producao:requisicao_compra_detail', pk=requisicao_pk)
+
+    if plano['sem_fornecedor']:
+        codigos = sorted({linha['produto_codigo'] for linha in plano['sem_fornecedor']})
+        messages.warning(request, f'Sem fornecedor para: {", ".join(codigos)}')
+    if plano['atrasados']:
+        messages.warning(request, f'{plano["atrasados"]} itens não chegam até a data de necessidade.')
+    messages.success(request, f'Pedidos gerados: {", ".join(p.numero for p in pedidos)}')
+    return redirect('producao:pedido_compra_list')
+
+
 # =============================================================================
 # CRIAR PEDIDO A PARTIR DE ORÇAMENTO (SE NECESSÁRIO NO FUTURO)
 # =============================================================================
@@ -783,11 +849,11 @@ def pedido_compra_from_orcamento(request, orcamento_pk):
                     pedido.recalcular_valores()
 
                     # Registrar no histórico
-                    HistoricoPedidoCompra.objects.create(
-                        pedido=pedido,
+                    AuditoriaService.registrar(
+                        pedido,
+                        'Pedido criado de orçamento',
                         usuario=request.user,
-                        acao='Pedido criado de orçamento',
-                        observacao=f'Criado a partir do orçamento {orcamento.numero} com {itens_criados} itens'
+                        observacao=f'Criado a partir do orçamento {orcamento.numero} com {itens_criados} itens',
                     )
 
                     messages.success(request, f'Pedido {pedido.numero} criado com sucesso a partir do orçamento!')
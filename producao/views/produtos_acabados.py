@@ -15,6 +15,7 @@ from django.db.models import Q
 
 from core.models import Produto, GrupoProduto
 from core.forms import ProdutoForm
+from core.utils.cache import grupos_ativos
 
 logger = logging.getLogger(__name__)
 
@@ -63,7 +64,7 @@ def produto_acabado_list(request):
     except EmptyPage:
         produtos = paginator.page(paginator.num_pages)
 
-    grupos = GrupoProduto.objects.filter(ativo=True, tipo_produto='PA').order_by('codigo')
+    grupos = grupos_ativos('PA')
 
     return render(request, 'producao/produtos/produto_acabado_list.html', {
         'produtos': produtos,
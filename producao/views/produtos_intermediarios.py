@@ -13,7 +13,7 @@ from django.contrib.auth.decorators import login_required
 from core.decorators import portal_producao
 from django.contrib import messages
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
-from django.db.models import Q, Prefetch
+from django.db.models import Q
 from django.http import JsonResponse
 from django.db import transaction
 from django.views.decorators.http import require_http_methods
@@ -21,6 +21,8 @@ from django.views.decorators.http import require_http_methods
 # IMPORTS PRINCIPAIS
 from core.models import Produto, GrupoProduto, SubgrupoProduto #
 from core.forms import ProdutoForm #
+from core.utils.agregacao import contar_faixas
+from core.utils.cache import grupos_ativos, subgrupos_ativos
 
 # IMPORT CONDICIONAL DA ESTRUTURA
 try:
@@ -40,23 +42,8 @@ logger = logging.getLogger(__name__)
 def produto_intermediario_list(request):
     """Lista produtos PI com informações de estrutura otimizadas"""
     
-    # QUERY OTIMIZADA COM PREFETCH PARA ESTRUTURAS
-    produtos_query = Produto.objects.select_related(
-        'grupo', 'subgrupo', 'fornecedor_principal'
-    ).filter(tipo='PI') #
-    
-    # Adicionar prefetch de estrutura se disponível
-    if ESTRUTURA_DISPONIVEL: #
-        produtos_query = produtos_query.prefetch_related(
-            Prefetch(
-                'componentes',
-                queryset=EstruturaProduto.objects.select_related(
-                    'produto_filho', 'produto_filho__grupo'
-                )
-            )
-        ) #
-    
-    produtos_list = produtos_query.order_by('codigo')
+    # Quantidade de componentes anotada na query da página (sem COUNT por linha)
+    produtos_list = Produto.objects.para_lista(componentes=ESTRUTURA_DISPONIVEL).filter(tipo='PI').order_by('codigo')
 
     # Filtros existentes (mantidos)
     grupo_id = request.GET.get('grupo')
@@ -111,16 +98,12 @@ def produto_intermediario_list(request):
         produtos = paginator.page(paginator.num_pages)
 
     # Para os filtros
-    grupos = GrupoProduto.objects.filter(ativo=True, tipo_produto='PI').order_by('codigo') #
-    
+    grupos = grupos_ativos('PI')
+
     if grupo_id:
-        subgrupos = SubgrupoProduto.objects.filter(
-            grupo_id=grupo_id, ativo=True
-        ).order_by('codigo') #
+        subgrupos = subgrupos_ativos(grupo_id)
     else:
-        subgrupos = SubgrupoProduto.objects.filter(
-            grupo__tipo_produto='PI', ativo=True
-        ).select_related('grupo').order_by('grupo__codigo', 'codigo') #
+        subgrupos = subgrupos_ativos(tipo_produto='PI')
 
     return render(request, 'producao/produtos/produto_intermediario_list.html', {
         'produtos': produtos,
@@ -491,28 +474,42 @@ def api_tipo_pi_info(request):
 @portal_producao
 def relatorio_produtos_pi_por_tipo(request):
     """Relatório de produtos intermediários agrupados por tipo - ATUALIZADO"""
-    from django.db.models import Count, Avg
+    from django.db.models import Avg
     
+    produtos_pi = Produto.objects.filter(tipo='PI')
+
+    # Cards por tipo em uma consulta; custo médio agrupado em outra
+    faixas = {'sem_tipo': Q(tipo_pi__isnull=True)}
+    for tipo_codigo, _ in Produto.TIPO_PI_CHOICES:
+        faixas[f'{tipo_codigo}_total'] = Q(tipo_pi=tipo_codigo)
+        faixas[f'{tipo_codigo}_ativos'] = Q(tipo_pi=tipo_codigo, status='ATIVO')
+        faixas[f'{tipo_codigo}_com_custo'] = Q(tipo_pi=tipo_codigo, custo_medio__isnull=False)
+    contagens = contar_faixas(produtos_pi, faixas, total='total_pi')
+    custo_por_tipo = dict(
+        produtos_pi.filter(custo_medio__isnull=False).values('tipo_pi')
+        .annotate(media=Avg('custo_medio')).order_by().values_list('tipo_pi', 'media')
+    )
+
     stats_por_tipo = []
     
     # ATUALIZADA: Usando os novos choices
     for tipo_codigo, tipo_nome in Produto.TIPO_PI_CHOICES: #
-        produtos = Produto.objects.filter(tipo='PI', tipo_pi=tipo_codigo)
-        
-        if produtos.exists():
+        if contagens[f'{tipo_codigo}_total']:
             stats = {
                 'tipo_codigo': tipo_codigo,
                 'tipo_nome': tipo_nome,
-                'total_produtos': produtos.count(),
-                'produtos_ativos': produtos.filter(status='ATIVO').count(),
-                'produtos_com_custo': produtos.filter(custo_medio__isnull=False).count(),
-                'custo_medio': produtos.filter(custo_medio__isnull=False).aggregate(media=Avg('custo_medio'))['media'] or 0,
+                'total_produtos': contagens[f'{tipo_codigo}_total'],
+                'produtos_ativos': contagens[f'{tipo_codigo}_ativos'],
+                'produtos_com_custo': contagens[f'{tipo_codigo}_com_custo'],
+                'custo_medio': custo_por_tipo.get(tipo_codigo) or 0,
                 'pode_estrutura': tipo_codigo in ['MONTADO_INTERNO', 'MONTADO_EXTERNO'], #
             }
             
             if stats['pode_estrutura'] and ESTRUTURA_DISPONIVEL: #
                 try:
-                    stats['produtos_com_estrutura'] = produtos.filter(componentes__isnull=False).distinct().count()
+                    stats['produtos_com_estrutura'] = produtos_pi.filter(
+                        tipo_pi=tipo_codigo, componentes__isnull=False
+                    ).distinct().count()
                 except Exception:
                     stats['produtos_com_estrutura'] = 0
             else:
@@ -520,12 +517,10 @@ def relatorio_produtos_pi_por_tipo(request):
             
             stats_por_tipo.append(stats)
     
-    produtos_sem_tipo = Produto.objects.filter(tipo='PI', tipo_pi__isnull=True).count()
-    
     context = {
         'stats_por_tipo': stats_por_tipo,
-        'produtos_sem_tipo': produtos_sem_tipo,
-        'total_pi': Produto.objects.filter(tipo='PI').count(),
+        'produtos_sem_tipo': contagens['sem_tipo'],
+        'total_pi': contagens['total_pi'],
         'estrutura_disponivel': ESTRUTURA_DISPONIVEL, #
     }
     
@@ -2,13 +2,11 @@
 
 import json
 import logging
-from datetime import date, timedelta
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from core.decorators import portal_producao
 from django.contrib import messages
 from django.core.paginator import Paginator
-from django.db.models import Q
 from django.db import transaction
 from django.http import JsonResponse
 from django.urls import reverse
@@ -17,8 +15,8 @@ from django.utils import timezone
 
 from core.models import Proposta, ListaMateriais, ItemListaMateriais, Produto, Cliente, Usuario
 from core.forms import ListaMateriaisForm, ItemListaMateriaisForm, ItemListaMateriaisFormSet
-from core.forms.propostas import PropostaFiltroForm
 from core.services.calculo_pedido import CalculoPedidoService
+from core.services.quadro_producao import QuadroProducaoService
 from core.views.propostas import proposta_detail_base
 
 logger = logging.getLogger(__name__)
@@ -61,79 +59,9 @@ def get_valor_total_seguro(lista_materiais):
 def proposta_list_producao(request):
     """
     Lista de propostas para o portal de produção
-    ✅ ATUALIZADA: Idêntica ao portal vendedor com filtros completos
+    Apenas propostas APROVADAS; filtros, ordenação e paginação em QuadroProducaoService
     """
-    
-    # 🎯 Apenas propostas APROVADAS para produção
-    propostas_list = Proposta.objects.filter(status='aprovado').select_related('cliente', 'vendedor').order_by('-criado_em')
-
-    # Filtro por status de produção
-    filtro_status_producao = request.GET.get('status_producao', 'todos')
-    if filtro_status_producao != 'todos':
-        propostas_list = propostas_list.filter(status_producao=filtro_status_producao)
-
-    # Aplicar filtros do formulário (status fixo em 'aprovado')
-    form = PropostaFiltroForm(request.GET)
-    if form.is_valid():
-
-        # Filtro por modelo de elevador (se selecionado)
-        if form.cleaned_data.get('modelo_elevador'):
-            propostas_list = propostas_list.filter(modelo_elevador=form.cleaned_data['modelo_elevador'])
-
-        # Filtro por vendedor (se selecionado)
-        vendedor_filter = form.cleaned_data.get('vendedor')
-        if vendedor_filter:
-            propostas_list = propostas_list.filter(vendedor=vendedor_filter)
-        
-        # Filtro por validade (se selecionado)
-        validade = form.cleaned_data.get('validade')
-        if validade:
-            hoje = date.today()
-            if validade == 'vencidas':
-                propostas_list = propostas_list.filter(data_validade__lt=hoje)
-            elif validade == 'vence_hoje':
-                propostas_list = propostas_list.filter(data_validade=hoje)
-            elif validade == 'vence_semana':
-                propostas_list = propostas_list.filter(
-                    data_validade__lte=hoje + timedelta(days=7),
-                    data_validade__gte=hoje
-                )
-            elif validade == 'vigentes':
-                propostas_list = propostas_list.filter(data_validade__gte=hoje)
-        
-        # Filtro por faixa de valor (se informado)
-        if form.cleaned_data.get('valor_min'):
-            propostas_list = propostas_list.filter(valor_proposta__gte=form.cleaned_data['valor_min'])
-        
-        if form.cleaned_data.get('valor_max'):
-            propostas_list = propostas_list.filter(valor_proposta__lte=form.cleaned_data['valor_max'])
-        
-        # Busca textual (se preenchida)
-        if form.cleaned_data.get('q'):
-            query = form.cleaned_data['q']
-            propostas_list = propostas_list.filter(
-                Q(numero__icontains=query) |
-                Q(numero_op__icontains=query) |
-                Q(nome_projeto__icontains=query) |
-                Q(cliente__nome__icontains=query) |
-                Q(cliente__nome_fantasia__icontains=query)
-            )
-    
-    # Paginação
-    paginator = Paginator(propostas_list, 15)
-    page = request.GET.get('page', 1)
-    try:
-        propostas = paginator.page(page)
-    except:
-        propostas = paginator.page(1)
-    
-    context = {
-        'propostas': propostas,
-        'form': form,
-        'total_propostas': propostas_list.count(),
-        'filtro_status_producao': filtro_status_producao,
-    }
-    
+    context = QuadroProducaoService.listar(request, {'status': 'aprovado'})
     return render(request, 'producao/propostas/proposta_list_producao.html', context)
 
 
@@ -143,52 +71,11 @@ def op_list(request):
     Lista de Ordens de Produção (propostas liberadas financeiramente)
     Filtro fixo: status_financeiro = 'liberado'
     """
-
-    # 🎯 Apenas propostas com financeiro LIBERADO
-    propostas_list = Proposta.objects.filter(
-        status='aprovado',
-        status_financeiro='liberado'
-    ).select_related('cliente', 'vendedor').order_by('-criado_em')
-
-    # Filtro por status de produção
-    filtro_status_producao = request.GET.get('status_producao', 'todos')
-    if filtro_status_producao != 'todos':
-        propostas_list = propostas_list.filter(status_producao=filtro_status_producao)
-
-    # Aplicar filtros do formulário
-    form = PropostaFiltroForm(request.GET)
-    if form.is_valid():
-
-        # Filtro por modelo de elevador (se selecionado)
-        if form.cleaned_data.get('modelo_elevador'):
-            propostas_list = propostas_list.filter(modelo_elevador=form.cleaned_data['modelo_elevador'])
-
-        # Busca textual (se preenchida)
-        if form.cleaned_data.get('q'):
-            query = form.cleaned_data['q']
-            propostas_list = propostas_list.filter(
-                Q(numero__icontains=query) |
-                Q(numero_op__icontains=query) |
-                Q(nome_projeto__icontains=query) |
-                Q(cliente__nome__icontains=query) |
-                Q(cliente__nome_fantasia__icontains=query)
-            )
-
-    # Paginação
-    paginator = Paginator(propostas_list, 15)
-    page = request.GET.get('page', 1)
-    try:
-        propostas = paginator.page(page)
-    except:
-        propostas = paginator.page(1)
-
-    context = {
-        'propostas': propostas,
-        'form': form,
-        'total_propostas': propostas_list.count(),
-        'filtro_status_producao': filtro_status_producao,
-    }
-
+    context = QuadroProducaoService.listar(
+        request,
+        {'status': 'aprovado', 'status_financeiro': 'liberado'},
+        filtros=('modelo_elevador', 'q'),
+    )
     return render(request, 'producao/propostas/op_list.html', context)
 
 
@@ -198,7 +85,7 @@ def alterar_status_producao(request, pk):
     """
     Altera o status de produção de uma proposta via AJAX
     """
-    proposta = get_object_or_404(Proposta, pk=pk)
+    proposta = get_object_or_404(Proposta.objects.sem_calculos(), pk=pk)
 
     status = request.POST.get('status_producao', '')
 
@@ -264,6 +151,52 @@ def proposta_detail_producao(request, pk):
     )
 
 
+@portal_producao
+def proposta_rastreio_calculo(request, pk):
+    """
+    Rastreio do cálculo da proposta: executa o cálculo completo sem salvar
+    e mostra cada etapa; opcionalmente grava o rastreio
+    """
+    proposta = get_object_or_404(Proposta, pk=pk)
+    resultado = None
+
+    if request.method == 'POST':
+        if not proposta.pode_calcular():
+            messages.error(request, 'Proposta sem dados suficientes para cálculo.')
+            return redirect('producao:proposta_rastreio_calculo', pk=pk)
+
+        resultado = CalculoPedidoService.calcular_com_rastreio(
+            proposta,
+            gravar=request.POST.get('gravar') == 'on',
+            usuario=request.user,
+        )
+        if resultado['registro']:
+            messages.success(request, 'Rastreio gravado.')
+        # O cálculo alterou o objeto em memória; o banco foi preservado
+        proposta.refresh_from_db()
+
+    elif request.GET.get('rastreio'):
+        registro = get_object_or_404(proposta.rastreios, pk=request.GET['rastreio'])
+        resultado = {
+            'sucesso': registro.sucesso,
+            'erro': registro.erro,
+            'duracao_ms': registro.duracao_ms,
+            'eventos': registro.eventos,
+            'descartados': 0,
+            'registro': registro,
+        }
+
+    paginator = Paginator(proposta.rastreios.select_related('criado_por').defer('eventos'), 20)
+    rastreios = paginator.get_page(request.GET.get('page'))
+
+    context = {
+        'proposta': proposta,
+        'resultado': resultado,
+        'rastreios': rastreios,
+    }
+    return render(request, 'producao/propostas/rastreio_calculo.html', context)
+
+
 @portal_producao
 def lista_materiais_detail(request, pk):
     """
@@ -10,6 +10,7 @@ from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods
 
 from core.models import Produto, GrupoProduto, SubgrupoProduto
+from core.services.manutencao_catalogo import ManutencaoCatalogoService
 
 logger = logging.getLogger(__name__)
 
@@ -39,15 +40,8 @@ def reclassificar_produto_executar(request):
         subgrupo = SubgrupoProduto.objects.get(id=novo_subgrupo_id, grupo=grupo)
         
         with transaction.atomic():
-            # Gerar novo código
-            subgrupo_locked = SubgrupoProduto.objects.select_for_update().get(id=subgrupo.id)
-            proximo_numero = subgrupo_locked.ultimo_numero + 1
-            novo_codigo = f"{grupo.codigo}.{subgrupo_locked.codigo}.{proximo_numero:05d}"
-            
-            # Verificar se código já existe
-            while Produto.objects.filter(codigo=novo_codigo).exists():
-                proximo_numero += 1
-                novo_codigo = f"{grupo.codigo}.{subgrupo_locked.codigo}.{proximo_numero:05d}"
+            # Gerar novo código (trava o subgrupo e já atualiza o contador)
+            novo_codigo, = ManutencaoCatalogoService.alocar_codigos(subgrupo, 1)
             
             # Atualizar produto
             codigo_antigo = produto.codigo
@@ -62,10 +56,6 @@ def reclassificar_produto_executar(request):
             
             produto.save()
             
-            # Atualizar contador
-            subgrupo_locked.ultimo_numero = proximo_numero
-            subgrupo_locked.save()
-            
             messages.success(request, f'Produto reclassificado: {codigo_antigo} → {novo_codigo}')
             
             return redirect('producao:materiaprima_list' if novo_tipo == 'MP' else 'producao:produto_intermediario_list')
@@ -10,6 +10,7 @@ from django.db.models import Q
 
 from core.models.regras_yaml import RegraYAML
 from core.forms.regras_yaml import RegraYAMLForm, RegraYAMLFiltroForm
+from core.services.replay_regras import ReplayRegraYAML, configuracao as configuracao_replay
 
 logger = logging.getLogger(__name__)
 
@@ -201,6 +202,44 @@ def regra_yaml_validar(request, pk):
     return redirect('producao:regras_yaml_list')
 
 
+@portal_producao
+def regra_yaml_replay(request, pk):
+    """
+    Simula uma nova versão da regra sobre as últimas propostas (nada é salvo).
+
+    Roda no próprio processo do servidor, limitado a REPLAY_LIMITE_WEB
+    propostas; replays maiores (e paralelos) ficam com o comando
+    replay_regra_yaml.
+    """
+    regra = get_object_or_404(RegraYAML, pk=pk)
+    limite_web = configuracao_replay('REPLAY_LIMITE_WEB')
+
+    conteudo = request.POST.get('conteudo_yaml', regra.conteudo_yaml)
+    try:
+        limite = int(request.POST.get('limite') or configuracao_replay('REPLAY_LIMITE_PROPOSTAS'))
+    except ValueError:
+        limite = configuracao_replay('REPLAY_LIMITE_PROPOSTAS')
+    limite = max(1, min(limite, limite_web))
+
+    resultado = None
+    if request.method == 'POST':
+        try:
+            resultado = ReplayRegraYAML(regra.tipo, conteudo).executar(limite=limite, processos=1)
+            if resultado['sem_versao_ativa']:
+                messages.warning(request, 'A regra está inativa: a comparação é contra nenhuma versão.')
+        except ValueError as e:
+            messages.error(request, str(e))
+
+    return render(request, 'producao/regras_yaml/regra_yaml_replay.html', {
+        'regra': regra,
+        'conteudo': conteudo,
+        'limite': limite,
+        'limite_web': limite_web,
+        'resultado': resultado,
+        'resultados': resultado['resultados'][:100] if resultado else [],
+    })
+
+
 # =============================================================================
 # FÓRMULAS DE CÁLCULO - DOCUMENTAÇÃO
 # =============================================================================
@@ -211,10 +250,10 @@ def formulas_calculo(request):
     Exibe a documentação das fórmulas de cálculo de dimensionamento.
     Inclui os parâmetros atuais configurados no sistema.
     """
-    from core.models import ParametrosGerais
+    from core.utils.cache import parametros_gerais
 
     # Obter parâmetros atuais
-    params_obj = ParametrosGerais.objects.first()
+    params_obj = parametros_gerais()
 
     params = {
         'percentual_mao_obra': params_obj.percentual_mao_obra if params_obj else 15.00,
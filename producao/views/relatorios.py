@@ -9,10 +9,12 @@ import logging
 from django.db import models
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
+from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from core.decorators import portal_producao
-from django.db.models import Q, Sum, Count
+from django.db.models import Q, Sum, Count, Max
 
-from core.models import Produto, Fornecedor, GrupoProduto, SubgrupoProduto
+from core.models import Produto, Fornecedor, GrupoProduto, SubgrupoProduto, ClassificacaoEstoque
+from core.utils.agregacao import contar_faixas
 
 logger = logging.getLogger(__name__)
 
@@ -57,35 +59,18 @@ def relatorio_produtos_sem_fornecedor(request):
 def relatorio_producao(request):
     """Relatório específico da produção com estatísticas por tipo"""
     
-    # Estatísticas por tipo de produto
+    # Estatísticas por tipo de produto (uma consulta para os três tipos)
+    estoque_baixo = Q(controla_estoque=True, estoque_atual__lte=models.F('estoque_minimo'))
+    tipos = {'materias_primas': 'MP', 'produtos_intermediarios': 'PI', 'produtos_acabados': 'PA'}
+    faixas = {}
+    for tipo in tipos.values():
+        faixas[f'{tipo}_total'] = Q(tipo=tipo)
+        faixas[f'{tipo}_ativas'] = Q(tipo=tipo, status='ATIVO')
+        faixas[f'{tipo}_estoque_baixo'] = Q(tipo=tipo) & estoque_baixo
+    contagens = contar_faixas(Produto.objects.filter(tipo__in=tipos.values()), faixas, total=None)
     stats_producao = {
-        'materias_primas': {
-            'total': Produto.objects.filter(tipo='MP').count(),
-            'ativas': Produto.objects.filter(tipo='MP', status='ATIVO').count(),
-            'estoque_baixo': Produto.objects.filter(
-                tipo='MP',
-                controla_estoque=True,
-                estoque_atual__lte=models.F('estoque_minimo')
-            ).count(),
-        },
-        'produtos_intermediarios': {
-            'total': Produto.objects.filter(tipo='PI').count(),
-            'ativas': Produto.objects.filter(tipo='PI', status='ATIVO').count(),
-            'estoque_baixo': Produto.objects.filter(
-                tipo='PI',
-                controla_estoque=True,
-                estoque_atual__lte=models.F('estoque_minimo')
-            ).count(),
-        },
-        'produtos_acabados': {
-            'total': Produto.objects.filter(tipo='PA').count(),
-            'ativas': Produto.objects.filter(tipo='PA', status='ATIVO').count(),
-            'estoque_baixo': Produto.objects.filter(
-                tipo='PA',
-                controla_estoque=True,
-                estoque_atual__lte=models.F('estoque_minimo')
-            ).count(),
-        }
+        nome: {campo: contagens[f'{tipo}_{campo}'] for campo in ('total', 'ativas', 'estoque_baixo')}
+        for nome, tipo in tipos.items()
     }
 
     # Estatísticas de grupos por tipo
@@ -113,4 +98,64 @@ def relatorio_producao(request):
         'total_fornecedores': Fornecedor.objects.filter(ativo=True).count(),
     }
 
-    return render(request, 'producao/relatorio_producao.html', context)
\ No newline at end of file
+    return render(request, 'producao/relatorio_producao.html', context)
+
+
+@portal_producao
+def relatorio_curva_abc(request):
+    """
+    Curva ABC/XYZ e produtos sem movimentação.
+    Lê a tabela ClassificacaoEstoque (atualizada pelo comando classificar_estoque).
+    """
+    classificacoes = ClassificacaoEstoque.objects.select_related(
+        'produto', 'produto__grupo'
+    ).order_by('-valor_consumido', 'produto__codigo')
+
+    classe_abc = request.GET.get('abc')
+    if classe_abc:
+        classificacoes = classificacoes.filter(classe_abc=classe_abc)
+
+    classe_xyz = request.GET.get('xyz')
+    if classe_xyz:
+        classificacoes = classificacoes.filter(classe_xyz=classe_xyz)
+
+    sem_movimento = request.GET.get('sem_movimento')
+    if sem_movimento and sem_movimento.isdigit():
+        classificacoes = classificacoes.filter(
+            Q(dias_sem_movimento__gte=int(sem_movimento)) | Q(dias_sem_movimento__isnull=True)
+        ).order_by(models.F('dias_sem_movimento').desc(nulls_first=True), 'produto__codigo')
+
+    query = request.GET.get('q')
+    if query:
+        classificacoes = classificacoes.filter(
+            Q(produto__codigo__icontains=query) |
+            Q(produto__nome__icontains=query)
+        )
+
+    # Resumo por classe em uma única agregação
+    resumo = ClassificacaoEstoque.objects.aggregate(
+        total_a=Count('id', filter=Q(classe_abc='A')),
+        total_b=Count('id', filter=Q(classe_abc='B')),
+        total_c=Count('id', filter=Q(classe_abc='C')),
+        valor_a=Sum('valor_consumido', filter=Q(classe_abc='A')),
+        valor_total=Sum('valor_consumido'),
+        calculado_em=Max('calculado_em'),
+    )
+
+    # Paginacao
+    paginator = Paginator(classificacoes, 25)
+    page = request.GET.get('page', 1)
+
+    try:
+        itens = paginator.page(page)
+    except PageNotAnInteger:
+        itens = paginator.page(1)
+    except EmptyPage:
+        itens = paginator.page(paginator.num_pages)
+
+    context = {
+        'itens': itens,
+        'resumo': resumo,
+    }
+
+    return render(request, 'producao/relatorios/curva_abc.html', context)
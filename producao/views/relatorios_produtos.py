@@ -6,9 +6,6 @@ Portal de Produção - Sistema Elevadores FUZA
 """
 
 import logging
-import openpyxl
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-from openpyxl.utils import get_column_letter
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
 from core.decorators import portal_producao
@@ -18,6 +15,12 @@ from django.utils import timezone
 from io import BytesIO
 
 from core.models import Produto, GrupoProduto, SubgrupoProduto
+from core.utils.cache import grupos_ativos, subgrupos_ativos
+from core.utils.importacao import modulo_tardio
+
+# openpyxl só é importado na exportação
+openpyxl = modulo_tardio('openpyxl')
+estilos = modulo_tardio('openpyxl.styles')
 
 logger = logging.getLogger(__name__)
 
@@ -100,8 +103,8 @@ def relatorio_produtos_completo(request):
         'filtros': filtros_aplicados,
         
         # Para os selects de filtro
-        'grupos': GrupoProduto.objects.filter(ativo=True).order_by('codigo'),
-        'subgrupos': SubgrupoProduto.objects.filter(ativo=True).select_related('grupo').order_by('grupo__codigo', 'codigo'),
+        'grupos': grupos_ativos(),
+        'subgrupos': subgrupos_ativos(),
         'tipo_pi_choices': Produto.TIPO_PI_CHOICES,
         
         # Valores dos filtros para manter selecionados
@@ -129,22 +132,22 @@ def exportar_produtos_excel(request, produtos, filtros_aplicados):
     ws.title = "Relatório Produtos"
     
     # Estilos
-    header_font = Font(bold=True, color="FFFFFF")
-    header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-    header_alignment = Alignment(horizontal="center", vertical="center")
-    
-    border_thin = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
+    header_font = estilos.Font(bold=True, color="FFFFFF")
+    header_fill = estilos.PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+    header_alignment = estilos.Alignment(horizontal="center", vertical="center")
+    
+    border_thin = estilos.Border(
+        left=estilos.Side(style='thin'),
+        right=estilos.Side(style='thin'),
+        top=estilos.Side(style='thin'),
+        bottom=estilos.Side(style='thin')
     )
     
     # Cabeçalho do relatório
     ws.merge_cells('A1:M1')
     ws['A1'] = "RELATÓRIO COMPLETO DE PRODUTOS - SISTEMA FUZA"
-    ws['A1'].font = Font(bold=True, size=14)
-    ws['A1'].alignment = Alignment(horizontal="center")
+    ws['A1'].font = estilos.Font(bold=True, size=14)
+    ws['A1'].alignment = estilos.Alignment(horizontal="center")
     
     # Data e filtros
     linha_atual = 2
@@ -239,7 +242,7 @@ def exportar_produtos_excel(request, produtos, filtros_aplicados):
     # Totais
     linha_atual += 1
     ws[f'A{linha_atual}'] = f"Total de produtos: {produtos.count()}"
-    ws[f'A{linha_atual}'].font = Font(bold=True)
+    ws[f'A{linha_atual}'].font = estilos.Font(bold=True)
     
     # Ajustar largura das colunas
     column_widths = {
@@ -4,15 +4,26 @@
 Views para gerenciamento de tarefas do sistema de workflow
 """
 
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
-from core.decorators import portal_producao
+from core.decorators import PORTAL_NIVEIS, portal_producao
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.db.models import Q
 from django.utils import timezone
 
-from core.models import Tarefa, HistoricoTarefa
+from core.models import Tarefa
+from core.services.auditoria import AuditoriaService
+from core.services.notificacoes import (
+    ContadorTarefas,
+    canais_do_usuario,
+    configuracao as configuracao_notificacoes,
+    hub,
+)
 
 
 @portal_producao
@@ -112,7 +123,7 @@ def detalhes_tarefa(request, tarefa_id):
         return redirect('producao:tarefas')
 
     # Histórico da tarefa
-    historico = tarefa.historico.all().order_by('-data')
+    historico = AuditoriaService.ultimas(tarefa, 20)
 
     context = {
         'tarefa': tarefa,
@@ -148,14 +159,16 @@ def iniciar_tarefa(request, tarefa_id):
         return redirect('producao:tarefa_detalhes', tarefa_id=tarefa_id)
 
     # Iniciar tarefa
+    status_anterior = tarefa.status
     tarefa.iniciar(usuario)
 
     # Registrar no histórico
-    HistoricoTarefa.objects.create(
-        tarefa=tarefa,
+    AuditoriaService.registrar(
+        tarefa,
+        'iniciada',
         usuario=usuario,
-        acao='iniciada',
-        descricao=f'{usuario.get_full_name() or usuario.username} iniciou a tarefa'
+        observacao=f'{usuario.get_full_name() or usuario.username} iniciou a tarefa',
+        alteracoes={'status': [status_anterior, tarefa.status]},
     )
 
     messages.success(request, 'Tarefa iniciada com sucesso!')
@@ -191,14 +204,16 @@ def concluir_tarefa(request, tarefa_id):
         observacoes = request.POST.get('observacoes', '')
 
         # Concluir tarefa
+        status_anterior = tarefa.status
         tarefa.concluir(usuario, observacoes)
 
         # Registrar no histórico
-        HistoricoTarefa.objects.create(
-            tarefa=tarefa,
+        AuditoriaService.registrar(
+            tarefa,
+            'concluida',
             usuario=usuario,
-            acao='concluida',
-            descricao=f'{usuario.get_full_name() or usuario.username} concluiu a tarefa'
+            observacao=f'{usuario.get_full_name() or usuario.username} concluiu a tarefa',
+            alteracoes={'status': [status_anterior, tarefa.status]},
         )
 
         messages.success(request, 'Tarefa concluída com sucesso!')
@@ -234,14 +249,16 @@ def cancelar_tarefa(request, tarefa_id):
         motivo = request.POST.get('motivo', '')
 
         # Cancelar tarefa
+        status_anterior = tarefa.status
         tarefa.cancelar(usuario, motivo)
 
         # Registrar no histórico
-        HistoricoTarefa.objects.create(
-            tarefa=tarefa,
+        AuditoriaService.registrar(
+            tarefa,
+            'cancelada',
             usuario=usuario,
-            acao='cancelada',
-            descricao=f'{usuario.get_full_name() or usuario.username} cancelou a tarefa: {motivo}'
+            observacao=f'{usuario.get_full_name() or usuario.username} cancelou a tarefa: {motivo}',
+            alteracoes={'status': [status_anterior, tarefa.status]},
         )
 
         messages.success(request, 'Tarefa cancelada.')
@@ -258,14 +275,49 @@ def cancelar_tarefa(request, tarefa_id):
 def contador_tarefas_pendentes(request):
     """
     API que retorna o número de tarefas pendentes do usuário
-    Usado para atualizar badge no menu
-    Sistema simplificado: filtra por nível
+    Usado para atualizar badge no menu (quando o SSE está desligado)
+    Sistema simplificado: filtra por nível; contadores em cache
     """
-    usuario = request.user
+    return JsonResponse({'count': ContadorTarefas.pendentes(request.user)})
 
-    pendentes = Tarefa.objects.filter(
-        Q(usuario_destino=usuario) | Q(nivel_destino=usuario.nivel),
-        status='pendente'
-    ).count()
 
-    return JsonResponse({'count': pendentes})
+async def eventos_tarefas(request):
+    """
+    Stream SSE com o total de tarefas pendentes do usuário: envia o valor
+    atual ao conectar e um novo a cada mudança em Tarefa que o afete.
+    Requer servidor ASGI; com NOTIFICACOES_SSE desligado responde 204 e a
+    página volta a consultar tarefas_contador.
+    """
+    if not configuracao_notificacoes('NOTIFICACOES_SSE'):
+        return HttpResponse(status=204)
+
+    usuario = await request.auser()
+    if not usuario.is_authenticated:
+        return JsonResponse({'error': 'Não autenticado'}, status=401)
+    if not (usuario.is_superuser or usuario.nivel in PORTAL_NIVEIS['producao']):
+        return JsonResponse({'error': 'Sem permissão'}, status=403)
+
+    pendentes = sync_to_async(ContadorTarefas.pendentes)
+    heartbeat = configuracao_notificacoes('NOTIFICACOES_HEARTBEAT_S')
+
+    async def stream():
+        fila = hub().assinar(canais_do_usuario(usuario))
+        try:
+            yield f"event: tarefas\ndata: {json.dumps({'count': await pendentes(usuario)})}\n\n"
+            while True:
+                try:
+                    await asyncio.wait_for(fila.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                # Várias mudanças seguidas viram um único envio
+                while not fila.empty():
+                    fila.get_nowait()
+                yield f"event: tarefas\ndata: {json.dumps({'count': await pendentes(usuario)})}\n\n"
+        finally:
+            hub().cancelar(fila)
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -92,7 +92,12 @@ class ProdutoSearch {
         }
         
         try {
-            const url = `/producao/api/buscar-produtos/?q=${encodeURIComponent(termo)}`;
+            // Fornecedor do formulário (pedido de compra): última compra dele
+            const fornecedor = document.querySelector('select[name="fornecedor"]');
+            let url = `/producao/api/buscar-produtos/?q=${encodeURIComponent(termo)}`;
+            if (fornecedor && fornecedor.value) {
+                url += `&fornecedor_id=${encodeURIComponent(fornecedor.value)}`;
+            }
             console.log('🌐 Fazendo requisição para:', url);
             
             const response = await fetch(url);
@@ -140,6 +145,7 @@ class ProdutoSearch {
                         ${produto.grupo || ''} ${produto.subgrupo ? '- ' + produto.subgrupo : ''}
                         | ${produto.unidade_medida || produto.unidade || ''}
                         ${produto.custo_medio ? '| R$ ' + produto.custo_medio.toFixed(2) : ''}
+                        ${produto.ultima_compra ? '| Última compra R$ ' + produto.ultima_compra.ultimo_preco.toFixed(2) + ' em ' + produto.ultima_compra.data_ultima_compra.split('-').reverse().join('/') : ''}
                     </small>
                 </div>
             </div>
@@ -314,11 +320,12 @@ class ProdutoSearch {
                 this.produtoHiddenInput.value = produto.id;
             }
 
-            // Preencher valor unitário se disponível
-            if (produto.custo_medio) {
+            // Preencher valor unitário: último preço pago, senão custo médio
+            const precoSugerido = produto.ultima_compra ? produto.ultima_compra.ultimo_preco : produto.custo_medio;
+            if (precoSugerido) {
                 const valorUnitarioInput = this.input.closest('tr').querySelector('input[name*="-valor_unitario"]');
                 if (valorUnitarioInput && !valorUnitarioInput.value) {
-                    valorUnitarioInput.value = produto.custo_medio.toFixed(2).replace('.', ',');
+                    valorUnitarioInput.value = precoSugerido.toFixed(2).replace('.', ',');
                 }
             }
 
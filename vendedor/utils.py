@@ -3,10 +3,11 @@
 # =============================================================================
 
 from datetime import datetime, timedelta
-from django.db.models import Count
+from django.db.models import Count, Q
 
 # Importar apenas o que precisa do core
-from core.utils import safe_int
+from core.utils.decimal_helpers import safe_int
+from core.utils.agregacao import contar_faixas
 
 
 def gerar_numero_proposta_sequencial():
@@ -74,12 +75,11 @@ def calcular_estatisticas_vendedor(user):
     
     propostas = Proposta.objects.filter(vendedor=user)
     
-    stats = {
-        'total': propostas.count(),
-        'hoje': propostas.filter(criado_em__date=hoje).count(),
-        'mes': propostas.filter(criado_em__date__gte=inicio_mes).count(),
-        'ano': propostas.filter(criado_em__date__gte=inicio_ano).count(),
-    }
+    stats = contar_faixas(propostas, {
+        'hoje': Q(criado_em__date=hoje),
+        'mes': Q(criado_em__date__gte=inicio_mes),
+        'ano': Q(criado_em__date__gte=inicio_ano),
+    })
     
     # Estatísticas por status
     stats_status = list(
@@ -10,7 +10,10 @@ from core.decorators import portal_vendedor
 from django.contrib import messages
 from django.http import JsonResponse
 
-from core.models import Proposta, AnexoProposta, HistoricoProposta, ParametrosGerais
+from core.models import Proposta, AnexoProposta, Cliente
+from core.services.auditoria import AuditoriaService
+from core.services.duplicacao_proposta import DuplicacaoPropostaService
+from core.utils.cache import parametros_gerais
 
 logger = logging.getLogger(__name__)
 
@@ -34,7 +37,7 @@ def proposta_calcular(request, pk):
     if request.method == 'POST':
         try:
             # === CARREGAR PARÂMETROS DO SISTEMA ===
-            parametros = ParametrosGerais.objects.first()
+            parametros = parametros_gerais()
             
             # === EXECUTAR CÁLCULOS TÉCNICOS VIA SERVICE (COM IMPOSTOS DINÂMICOS) ===
             from core.services.calculo_pedido import CalculoPedidoService
@@ -88,7 +91,7 @@ def proposta_calcular(request, pk):
             return redirect('vendedor:proposta_detail', pk=proposta.pk)
     
     # ✅ GET REQUEST: Mostrar página de confirmação
-    parametros = ParametrosGerais.objects.first()
+    parametros = parametros_gerais()
     context = {
         'proposta': proposta,
         'pedido': proposta,  # Compatibilidade
@@ -102,103 +105,45 @@ def proposta_calcular(request, pk):
 @portal_vendedor
 def proposta_duplicar(request, pk):
     """
-    Duplicar proposta existente
+    Duplicar proposta existente (especificação, portas e, se ainda válido,
+    o cálculo), opcionalmente para outro cliente/obra
     """
     proposta_original = get_object_or_404(Proposta, pk=pk)
     
     if request.method == 'POST':
+        cliente_id = request.POST.get('cliente', '')
+        cliente = Cliente.objects.filter(pk=cliente_id, ativo=True).first() if cliente_id.isdigit() else None
+        nome_projeto = (request.POST.get('nome_projeto') or '').strip() or None
+
         try:
-            # Criar nova proposta baseada na original
-            nova_proposta = Proposta.objects.create(
-                # Dados do cliente
-                cliente=proposta_original.cliente,
-                nome_projeto=f"{proposta_original.nome_projeto} (Cópia)",
-                faturado_por=proposta_original.faturado_por,
-                observacoes=proposta_original.observacoes,
-                
-                # ✅ INCLUIR NORMAS ABNT SE EXISTE
-                normas_abnt=proposta_original.normas_abnt if hasattr(proposta_original, 'normas_abnt') else 'NBR 16858',
-                
-                # Vendedor
-                vendedor=request.user,  
-                
-                # Dados do elevador
-                modelo_elevador=proposta_original.modelo_elevador,
-                capacidade=proposta_original.capacidade,
-                capacidade_pessoas=proposta_original.capacidade_pessoas,
-                acionamento=proposta_original.acionamento,
-                tracao=proposta_original.tracao,
-                contrapeso=proposta_original.contrapeso,
-                
-                # Dimensões do poço
-                largura_poco=proposta_original.largura_poco,
-                comprimento_poco=proposta_original.comprimento_poco,
-                altura_poco=proposta_original.altura_poco,
-                pavimentos=proposta_original.pavimentos,
-                
-                # Dados da cabine
-                material_cabine=proposta_original.material_cabine,
-                material_cabine_outro=proposta_original.material_cabine_outro,
-                valor_cabine_outro=proposta_original.valor_cabine_outro,
-                espessura_cabine=proposta_original.espessura_cabine,
-                saida_cabine=proposta_original.saida_cabine,
-                altura_cabine=proposta_original.altura_cabine,
-                piso_cabine=proposta_original.piso_cabine,
-                material_piso_cabine=proposta_original.material_piso_cabine,
-                material_piso_cabine_outro=proposta_original.material_piso_cabine_outro,
-                valor_piso_cabine_outro=proposta_original.valor_piso_cabine_outro,
-                
-                # Porta da cabine
-                modelo_porta_cabine=proposta_original.modelo_porta_cabine,
-                material_porta_cabine=proposta_original.material_porta_cabine,
-                material_porta_cabine_outro=proposta_original.material_porta_cabine_outro,
-                valor_porta_cabine_outro=proposta_original.valor_porta_cabine_outro,
-                folhas_porta_cabine=proposta_original.folhas_porta_cabine,
-                largura_porta_cabine=proposta_original.largura_porta_cabine,
-                altura_porta_cabine=proposta_original.altura_porta_cabine,
-                
-                # Porta do pavimento
-                modelo_porta_pavimento=proposta_original.modelo_porta_pavimento,
-                material_porta_pavimento=proposta_original.material_porta_pavimento,
-                material_porta_pavimento_outro=proposta_original.material_porta_pavimento_outro,
-                valor_porta_pavimento_outro=proposta_original.valor_porta_pavimento_outro,
-                folhas_porta_pavimento=proposta_original.folhas_porta_pavimento,
-                largura_porta_pavimento=proposta_original.largura_porta_pavimento,
-                altura_porta_pavimento=proposta_original.altura_porta_pavimento,
-                
-                # === NÃO DUPLICAR VALORES COMERCIAIS ===
-                # Status sempre rascunho
-                status='rascunho',
-                
-                # === NÃO DUPLICAR: ===
-                # - preco_venda_calculado (será recalculado)
-                # - valor_proposta (será definido pelo vendedor)
-                # - data_validade (será definida automaticamente)
-                # - forma_pagamento (será definida pelo vendedor)
-            )
-            
-            # Log da ação
-            logger.info(
-                f"Proposta {proposta_original.numero} duplicada como {nova_proposta.numero} "
-                f"pelo usuário {request.user.username}"
+            nova_proposta, reaproveitado, motivo = DuplicacaoPropostaService.duplicar(
+                proposta_original, request.user, cliente=cliente, nome_projeto=nome_projeto
             )
-            
-            messages.success(request,
-                f'Proposta duplicada com sucesso! '
-                f'Nova proposta: {nova_proposta.numero}'
-            )
-            
-            # Redirecionar para edição da nova proposta
-            return redirect('vendedor:proposta_step3', pk=nova_proposta.pk)
-            
         except Exception as e:
             logger.error(f"Erro ao duplicar proposta {proposta_original.numero}: {str(e)}")
             messages.error(request, f'Erro ao duplicar proposta: {str(e)}')
             return redirect('vendedor:proposta_detail', pk=proposta_original.pk)
+
+        if reaproveitado:
+            messages.success(request,
+                f'Proposta duplicada com sucesso! Nova proposta: {nova_proposta.numero} '
+                f'| Valor calculado: R$ {nova_proposta.preco_venda_calculado:,.2f}'
+            )
+            return redirect('vendedor:proposta_step3', pk=nova_proposta.pk)
+
+        messages.warning(request,
+            f'Proposta duplicada: {nova_proposta.numero}. '
+            f'Execute o cálculo novamente ({motivo}).'
+        )
+        return redirect('vendedor:proposta_detail', pk=nova_proposta.pk)
     
+    reaproveitavel, motivo = DuplicacaoPropostaService.calculo_reutilizavel(proposta_original)
     context = {
         'proposta': proposta_original,
         'pedido': proposta_original,  # Compatibilidade
+        'clientes': Cliente.objects.filter(ativo=True).only('id', 'nome', 'nome_fantasia').order_by('nome'),
+        'reaproveitavel': reaproveitavel,
+        'motivo': motivo,
     }
     
     return render(request, 'vendedor/proposta_duplicar.html', context)
@@ -225,12 +170,12 @@ def proposta_enviar_cliente(request, pk):
             proposta.save()
             
             # Registrar no histórico
-            HistoricoProposta.objects.create(
-                proposta=proposta,
-                status_anterior=status_anterior,
-                status_novo='aprovado',
+            AuditoriaService.registrar(
+                proposta,
+                'Alteração de status',
+                usuario=request.user,
                 observacao='Proposta enviada para o cliente',
-                usuario=request.user
+                alteracoes={'status': [status_anterior, 'aprovado']},
             )
             
             # Log da ação
@@ -301,14 +246,10 @@ def proposta_historico(request, pk):
     """
     proposta = get_object_or_404(Proposta, pk=pk)
     
-    historico = HistoricoProposta.objects.filter(
-        proposta=proposta
-    ).select_related('usuario').order_by('-data_mudanca')
-    
     context = {
         'proposta': proposta,
         'pedido': proposta,  # Compatibilidade
-        'historico': historico,
+        'historico': AuditoriaService.pagina(proposta, request),
     }
     
     return render(request, 'vendedor/proposta_historico.html', context)
@@ -12,10 +12,13 @@ from core.decorators import portal_vendedor
 from django.http import HttpResponse
 from django.template.loader import render_to_string
 from django.conf import settings
-from weasyprint import HTML, CSS
 import logging
 
 from core.models import Proposta
+from core.utils.importacao import modulo_tardio
+
+# WeasyPrint só é importado ao gerar o PDF
+weasyprint = modulo_tardio('weasyprint')
 
 logger = logging.getLogger(__name__)
 
@@ -60,10 +63,10 @@ def gerar_contrato_pdf(request, pk):
     css_path = os.path.join(settings.BASE_DIR, 'static/css/contrato.css')
     stylesheets = []
     if os.path.exists(css_path):
-        stylesheets.append(CSS(css_path))
+        stylesheets.append(weasyprint.CSS(css_path))
         
     # Gerar PDF
-    pdf = HTML(
+    pdf = weasyprint.HTML(
         string=html_content, 
         base_url=request.build_absolute_uri()
     ).write_pdf(stylesheets=stylesheets)
@@ -21,7 +21,7 @@ def proposta_list(request):
     """Lista de propostas - APENAS com filtros escolhidos pelo usuário no formulário"""
     
     # 🎯 TODAS as propostas inicialmente - SEM FILTROS AUTOMÁTICOS
-    propostas_list = Proposta.objects.all().select_related('cliente', 'vendedor').order_by('-criado_em')
+    propostas_list = Proposta.objects.sem_calculos().select_related('cliente', 'vendedor').order_by('-criado_em')
     
     # Aplicar APENAS os filtros do formulário
     form = PropostaFiltroForm(request.GET)
@@ -14,6 +14,7 @@ from django.contrib import messages
 from django.db.models import Count
 
 from core.models import Proposta
+from core.utils.agregacao import contar_faixas, faixas_por_valor
 
 logger = logging.getLogger(__name__)
 
@@ -51,13 +52,12 @@ def relatorios_vendedor(request):
     # Para relatórios pessoais, mantemos o filtro por vendedor
     propostas = Proposta.objects.filter(vendedor=request.user)
     
-    stats = {
-        'total': propostas.count(),
-        'rascunho': propostas.filter(status='rascunho').count(),
-        'pendente': propostas.filter(status='pendente').count(),  # ✅ TROCAR
-        'aprovado': propostas.filter(status='aprovado').count(),
-        'rejeitado': propostas.filter(status='rejeitado').count(),  # ✅ ADICIONAR
-    }
+    stats = contar_faixas(
+        propostas,
+        faixas_por_valor('status', ['rascunho', 'pendente', 'aprovado', 'rejeitado']),
+        cache=True,
+        nome='relatorios_vendedor',
+    )
 
     
     # Propostas por mês (últimos 12 meses)
@@ -108,7 +108,7 @@ def relatorios_vendedor(request):
         'stats_mensais': stats_mensais,
         'top_clientes_count': top_clientes_count,
         'top_clientes_valor': top_clientes_valor,
-        'total_propostas': propostas.count(),
+        'total_propostas': stats['total'],
     }
     
     return render(request, 'vendedor/relatorios.html', context)
\ No newline at end of file
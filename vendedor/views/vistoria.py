@@ -19,6 +19,8 @@ import uuid
 import base64
 
 from core.models import Proposta, VistoriaHistorico
+from core.services.auditoria import AuditoriaService
+from core.utils.agregacao import contar_faixas, faixas_por_valor
 from core.forms import (
     PropostaVistoriaForm,
     VistoriaHistoricoForm,
@@ -120,7 +122,7 @@ def vistoria_list(request):
     Lista de propostas para vistoria - apenas propostas aprovadas e não finalizadas
     """
     # Filtrar apenas propostas aprovadas E não finalizadas    
-    propostas_query = Proposta.objects.filter(
+    propostas_query = Proposta.objects.sem_calculos().filter(
         status='aprovado'
     ).select_related('cliente', 'vendedor').order_by('data_proxima_vistoria', '-criado_em')
 
@@ -173,6 +175,12 @@ def vistoria_list(request):
                 Q(cliente__nome_fantasia__icontains=query)
             )
     
+    # Estatísticas rápidas (uma consulta, antes das anotações de vistoria)
+    estatisticas = contar_faixas(propostas_query, {
+        **faixas_por_valor('status_obra', [('sem_vistoria', ''), 'medicao_ok', 'em_vistoria', 'obra_ok']),
+        'vencidas': Q(data_proxima_vistoria__lt=date.today()),
+    }, total='total_propostas', cache=True, nome='vistorias')
+
     # Adicionar informações de vistoria
     propostas_query = propostas_query.annotate(
         total_vistorias=Count('vistorias'),
@@ -187,18 +195,6 @@ def vistoria_list(request):
     except:
         propostas = paginator.page(1)
     
-    # Estatísticas rápidas
-    estatisticas = {
-        'total_propostas': propostas_query.count(),
-        'sem_vistoria': propostas_query.filter(status_obra='').count(),
-        'medicao_ok': propostas_query.filter(status_obra='medicao_ok').count(),
-        'em_vistoria': propostas_query.filter(status_obra='em_vistoria').count(),
-        'obra_ok': propostas_query.filter(status_obra='obra_ok').count(),
-        'vencidas': propostas_query.filter(
-            data_proxima_vistoria__lt=date.today()
-        ).count(),
-    }
-    
     context = {
         'propostas': propostas,
         'form': form,
@@ -471,7 +467,7 @@ def api_vistoria_quick_status(request, proposta_pk):
         return JsonResponse({'success': False, 'error': 'Método não permitido'})
     
     try:
-        proposta = get_object_or_404(Proposta, pk=proposta_pk)
+        proposta = get_object_or_404(Proposta.objects.sem_calculos(), pk=proposta_pk)
         novo_status = request.POST.get('status_obra', '')
         
         if novo_status not in [choice[0] for choice in Proposta.STATUS_OBRA_CHOICES]:
@@ -482,13 +478,12 @@ def api_vistoria_quick_status(request, proposta_pk):
         proposta.save()
         
         # Criar entrada no histórico
-        from core.models import HistoricoProposta
-        HistoricoProposta.objects.create(
-            proposta=proposta,
-            status_anterior=f"Obra: {status_anterior or 'Aguardando'}",
-            status_novo=f"Obra: {novo_status}",
+        AuditoriaService.registrar(
+            proposta,
+            'Alteração de status da obra',
+            usuario=request.user,
             observacao="Alteração rápida via interface de vistoria",
-            usuario=request.user
+            alteracoes={'status_obra': [status_anterior or None, novo_status]},
         )
         
         return JsonResponse({